@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Frontmatter parser benchmark
+Times the three parsing tiers on representative project, task and artifact
+frontmatter:
+
+  flat   hyper_frontmatter.parse_flat (no YAML library)
+  c      yaml.load(..., Loader=yaml.CSafeLoader), when libyaml is available
+  pure   yaml.safe_load (pure-Python loader)
+
+Usage:
+  python3 bench_frontmatter.py [--iterations N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_frontmatter  # noqa: E402
+
+# Frontmatter as written by the Hyper templates and commands
+SAMPLES = {
+    'project': '''id: proj-auth-system
+title: "Authentication System"
+type: project
+status: in-progress
+priority: high
+summary: "OAuth login, sessions and account recovery"
+project_type: feature
+archived: false
+created: 2025-12-28
+updated: 2026-01-04
+tags: [auth, security, backend]''',
+    'task': '''id: task-auth-system-001
+title: "Phase 1: OAuth Provider Setup"
+type: task
+status: todo
+priority: high
+parent: proj-auth-system
+depends_on: []
+blocks:
+  - task-auth-system-002
+  - task-auth-system-003
+created: 2025-12-28
+updated: 2025-12-28
+# Custom fields
+estimated_hours: 4
+complexity: medium
+tags:
+  - oauth
+  - setup''',
+    'artifact': '''id: personal:artifact-oauth-notes-1234
+title: 'Notes on OAuth providers'
+type: artifact
+status: draft
+created: 2026-01-02
+updated: 2026-01-02
+tags: [research, oauth]
+source: https://example.com/oauth''',
+}
+
+
+def tiers() -> dict:
+    """Available parsing tiers: name -> callable(text) -> dict."""
+    result = {'flat': hyper_frontmatter.parse_flat}
+    try:
+        import yaml
+    except ImportError:
+        return result
+    if hasattr(yaml, 'CSafeLoader'):
+        result['c'] = lambda text: yaml.load(text, Loader=yaml.CSafeLoader)
+    result['pure'] = yaml.safe_load
+    return result
+
+
+def measure(iterations: int = 2000) -> dict:
+    """Return {sample: {tier: microseconds per parse}}."""
+    results = {}
+    for name, text in SAMPLES.items():
+        results[name] = {}
+        for tier, parse in tiers().items():
+            parse(text)  # Warm up imports and caches
+            start = time.perf_counter()
+            for _ in range(iterations):
+                parse(text)
+            results[name][tier] = round((time.perf_counter() - start) / iterations * 1e6, 2)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark frontmatter parsing tiers')
+    parser.add_argument('--iterations', type=int, default=2000, help='Parses per sample and tier')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = measure(args.iterations)
+    if args.json:
+        print(json.dumps({'success': True, 'us_per_parse': results}))
+        return 0
+
+    for name, timings in results.items():
+        baseline = timings.get('pure')
+        cells = []
+        for tier, micros in timings.items():
+            speedup = f' ({baseline / micros:.0f}x)' if baseline and tier != 'pure' else ''
+            cells.append(f'{tier} {micros:8.2f} us{speedup}')
+        print(f'{name:<10} ' + '   '.join(cells))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
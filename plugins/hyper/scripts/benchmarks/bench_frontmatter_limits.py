@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Worst-case frontmatter parse time
+Feeds hostile frontmatter through the validator's parse path
+(parse_frontmatter_block, all tiers) and checks how long the slowest input
+takes:
+
+  rejected   pathological inputs that must fail with FRONTMATTER_TOO_COMPLEX:
+             alias bombs, deep nesting, huge inline lists, thousands of keys,
+             oversized blocks
+  accepted   the largest inputs that still fit every limit, i.e. the most a
+             well-formed document can cost
+  fuzz       random mutations (seeded) of real and pathological frontmatter;
+             any outcome is allowed, only the time is checked
+
+Each case reports the median of several parses; fuzz reports the slowest
+mutation. The script exits 1 if a group's worst time exceeds its budget, so
+a parser change that reopens a slow path fails CI.
+
+Usage:
+  python3 bench_frontmatter_limits.py [--runs N] [--mutations N] [--seed N] [--json]
+
+Budgets (milliseconds) can be overridden with HYPER_BUDGET_REJECTED_MS,
+HYPER_BUDGET_ACCEPTED_MS and HYPER_BUDGET_FUZZ_MS.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'benchmarks'))
+
+import bench_frontmatter  # noqa: E402
+import hyper_frontmatter  # noqa: E402
+from hyper_validator import core as validator  # noqa: E402
+
+# Worst case in milliseconds; a rejection stops at the first limit crossed,
+# while an accepted document pays for constructing up to PARSE_LIMITS['nodes']
+# values through PyYAML
+DEFAULT_BUDGETS = {
+    'rejected': 20.0,
+    'accepted': 60.0,
+    'fuzz': 60.0,
+}
+
+
+def budgets() -> dict:
+    result = dict(DEFAULT_BUDGETS)
+    for name in result:
+        value = os.environ.get(f'HYPER_BUDGET_{name.upper()}_MS', '').strip()
+        if value:
+            result[name] = float(value)
+    return result
+
+
+def alias_bomb(levels: int = 9, width: int = 9) -> str:
+    lines = ['a0: &a0 [' + ', '.join(['lol'] * width) + ']']
+    for level in range(1, levels):
+        lines.append(f'a{level}: &a{level} [' + ', '.join([f'*a{level - 1}'] * width) + ']')
+    return '\n'.join(lines)
+
+
+def rejected_cases() -> dict:
+    """Inputs that must be rejected, with the limit each one trips."""
+    limits = hyper_frontmatter.PARSE_LIMITS
+    nodes = limits['nodes']
+    return {
+        # Expands past the node limit after a few levels, long before the
+        # alias limit
+        'alias_bomb': ('nodes', alias_bomb()),
+        'many_aliases': ('aliases', 'a: &a x\nb: [' + ', '.join(['*a'] * 1000) + ']'),
+        'alias_fanout': ('nodes', 'a: &a [' + ', '.join(['x'] * 1000) + ']\n'
+                                  'b: [' + ', '.join(['*a'] * 10) + ']'),
+        'deep_flow': ('depth', 'x: ' + '[' * 5000 + ']' * 5000),
+        'deep_block': ('depth', '\n'.join(' ' * i + f'k{i}:' for i in range(200)) + ' leaf'),
+        'inline_list': ('nodes', 'tags: [' + ', '.join(f't{i}' for i in range(nodes)) + ']'),
+        'many_keys': ('nodes', '\n'.join(f'k{i}: v' for i in range(nodes))),
+        'flow_maps': ('nodes', 'items: [' + ', '.join('{a: 1, b: 2}' for _ in range(nodes // 4)) + ']'),
+        'oversized': ('parse_bytes', 'title: ' + 'a' * (limits['parse_bytes'] * 16)),
+    }
+
+
+def accepted_cases() -> dict:
+    """The most expensive inputs that stay inside every limit."""
+    limits = hyper_frontmatter.PARSE_LIMITS
+    # Each {a: 1, b: 2} is five nodes; leave room for the mapping and key
+    maps = (limits['nodes'] - 3) // 5
+    activity = '\n'.join(
+        f'  - {{at: "2026-01-{i % 28 + 1:02d}T10:00:00Z", actor: "session:{i}", action: modified}}'
+        for i in range((limits['nodes'] - 3) // 7)
+    )
+    return {
+        'flat_keys': '\n'.join(f'k{i}: v' for i in range((limits['nodes'] - 1) // 2)),
+        'flow_maps': 'items: [' + ', '.join('{a: 1, b: 2}' for _ in range(maps)) + ']',
+        'activity_log': 'id: task-001\nactivity:\n' + activity,
+        'deep_flow': 'x: ' + '[' * (limits['depth'] - 1) + ']' * (limits['depth'] - 1),
+    }
+
+
+# Fragments the mutator splices in: YAML indicators that switch parsers,
+# open collections or reference anchors
+FUZZ_TOKENS = ['[', ']', '{', '}', ',', ':', '- ', '&a ', '*a', '!!str ', '"', "'", '#',
+               '\n', '\n  ', '? ', '|', '>', '%', '@', '\\', '\t', '---', '...']
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    for _ in range(rng.randint(1, 8)):
+        choice = rng.random()
+        pos = rng.randint(0, len(text))
+        if choice < 0.5:
+            text = text[:pos] + rng.choice(FUZZ_TOKENS) + text[pos:]
+        elif choice < 0.75 and text:
+            end = min(len(text), pos + rng.randint(1, 64))
+            text = text[:pos] + text[end:]
+        else:
+            # Duplicate a slice many times: grows lists, keys and nesting
+            end = min(len(text), pos + rng.randint(1, 64))
+            text = text[:pos] + text[pos:end] * rng.randint(2, 400) + text[end:]
+    return text
+
+
+def fuzz_inputs(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    seeds = list(bench_frontmatter.SAMPLES.values())
+    seeds += [text[:4096] for _limit, text in rejected_cases().values()]
+    seeds += [text[:4096] for text in accepted_cases().values()]
+    return [mutate(rng.choice(seeds), rng) for _ in range(count)]
+
+
+def _time_parse(parse, text: str) -> tuple:
+    start = time.perf_counter()
+    _frontmatter, error = parse(text)
+    return (time.perf_counter() - start) * 1000, error
+
+
+def measure(runs: int = 5, mutations: int = 500, seed: int = 0) -> dict:
+    """
+    Time every case. Returns {'rejected': {case: ms}, 'accepted': {case: ms},
+    'fuzz': {'worst_ms', 'mutations', 'too_complex'}}; raises RuntimeError if a
+    case is not handled as expected.
+    """
+    parse = validator.parse_frontmatter_block
+    parse(bench_frontmatter.SAMPLES['task'])  # Warm up PyYAML import
+    parse('a: {b: c}')
+
+    results = {'rejected': {}, 'accepted': {}}
+    for name, (limit, text) in rejected_cases().items():
+        samples = []
+        for _ in range(runs):
+            elapsed, error = _time_parse(parse, text)
+            if not error or error.get('limit') != limit:
+                raise RuntimeError(f'{name}: expected the {limit} limit, got {error}')
+            samples.append(elapsed)
+        results['rejected'][name] = round(statistics.median(samples), 2)
+
+    for name, text in accepted_cases().items():
+        samples = []
+        for _ in range(runs):
+            elapsed, error = _time_parse(parse, text)
+            if error:
+                raise RuntimeError(f'{name}: expected to parse, got {error}')
+            samples.append(elapsed)
+        results['accepted'][name] = round(statistics.median(samples), 2)
+
+    worst = 0.0
+    too_complex = 0
+    for text in fuzz_inputs(mutations, seed):
+        elapsed, error = _time_parse(parse, text)
+        worst = max(worst, elapsed)
+        too_complex += bool(error and error['code'] == 'FRONTMATTER_TOO_COMPLEX')
+    results['fuzz'] = {'worst_ms': round(worst, 2), 'mutations': mutations, 'too_complex': too_complex}
+    return results
+
+
+def worst(results: dict) -> dict:
+    """Worst time per budget group."""
+    return {
+        'rejected': max(results['rejected'].values()),
+        'accepted': max(results['accepted'].values()),
+        'fuzz': results['fuzz']['worst_ms'],
+    }
+
+
+def check(results: dict, limits: dict = None) -> list:
+    """Return a list of (group, worst_ms, budget) for every exceeded budget."""
+    limits = limits or budgets()
+    return [(name, ms, limits[name]) for name, ms in worst(results).items() if ms > limits[name]]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check worst-case frontmatter parse time against its budget')
+    parser.add_argument('--runs', type=int, default=5, help='Parses per case')
+    parser.add_argument('--mutations', type=int, default=500, help='Fuzzed inputs to parse')
+    parser.add_argument('--seed', type=int, default=0, help='Fuzzer seed')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    limits = budgets()
+    results = measure(args.runs, args.mutations, args.seed)
+    over = check(results, limits)
+
+    if args.json:
+        print(json.dumps({
+            'success': not over,
+            'medians_ms': {'rejected': results['rejected'], 'accepted': results['accepted']},
+            'fuzz': results['fuzz'],
+            'worst_ms': worst(results),
+            'budgets_ms': limits,
+        }))
+    else:
+        for group in ('rejected', 'accepted'):
+            for name, ms in results[group].items():
+                print(f'{group:<9} {name:<14} {ms:8.2f} ms')
+        fuzz = results['fuzz']
+        print(f'fuzz      {fuzz["mutations"]} mutations, {fuzz["too_complex"]} too complex, '
+              f'worst {fuzz["worst_ms"]:.2f} ms')
+        for name, ms in worst(results).items():
+            status = 'OVER' if ms > limits[name] else 'ok'
+            print(f'worst {name:<9} {ms:8.2f} ms  (budget {limits[name]:.0f} ms)  {status}')
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
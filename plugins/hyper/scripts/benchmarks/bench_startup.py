@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget for validate-hyper-file.py
+Measures what every hook invocation pays before doing useful work:
+
+  import            cold interpreter start plus validator import (wall clock)
+  import_self       time spent inside the validator import itself, measured
+                    in-process; the run uses -X importtime so the heaviest
+                    imported modules can be reported
+  first_validation  a complete --pre-validate run against a scratch workspace
+
+Each measurement is the median of several fresh interpreter runs. The script
+exits 1 if any median exceeds its budget, so hook latency regressions fail CI.
+
+Usage:
+  python3 bench_startup.py [--runs N] [--json]
+
+Budgets (milliseconds) can be overridden with HYPER_BUDGET_IMPORT_MS,
+HYPER_BUDGET_IMPORT_SELF_MS and HYPER_BUDGET_FIRST_VALIDATION_MS.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VALIDATOR_PATH = os.path.join(SCRIPTS_DIR, 'validate-hyper-file.py')
+
+# Medians in milliseconds; generous enough for slow CI machines, tight enough
+# to catch an eager subprocess or heavy import sneaking back in
+DEFAULT_BUDGETS = {
+    'import': 250.0,
+    'import_self': 40.0,
+    'first_validation': 400.0,
+}
+
+IMPORT_SNIPPET = (
+    'import sys, time; sys.path.insert(0, {scripts!r}); '
+    'start = time.perf_counter(); '
+    'from hyper_validator import core as module; '
+    'print((time.perf_counter() - start) * 1000)'
+)
+
+TASK_CONTENT = '''---
+id: bench-001
+title: Startup benchmark
+type: task
+status: todo
+priority: medium
+parent: proj-bench
+---
+# Startup benchmark
+'''
+
+
+def budgets() -> dict:
+    result = dict(DEFAULT_BUDGETS)
+    for name in result:
+        value = os.environ.get(f'HYPER_BUDGET_{name.upper()}_MS', '').strip()
+        if value:
+            result[name] = float(value)
+    return result
+
+
+def _timed_run(cmd: list, env: dict) -> tuple:
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def heaviest_imports(importtime_stderr: str, limit: int = 5) -> list:
+    """Top-level modules by cumulative time (ms) from -X importtime output."""
+    modules = []
+    for line in importtime_stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if name.startswith(' ' * 3):
+            continue  # Nested import, already counted by its parent
+        modules.append((name.strip(), int(parts[1]) / 1000))
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return [(name, round(ms, 1)) for name, ms in modules[:limit]]
+
+
+def scratch_workspace() -> str:
+    root = tempfile.mkdtemp(prefix='hyper-bench-')
+    os.makedirs(os.path.join(root, 'projects', 'bench', 'tasks'))
+    with open(os.path.join(root, 'projects', 'bench', '_project.mdx'), 'w') as f:
+        f.write('---\nid: proj-bench\ntitle: Bench\ntype: project\nstatus: todo\npriority: low\n---\n')
+    return root
+
+
+def measure(runs: int = 5) -> tuple:
+    """
+    Run each measurement `runs` times in fresh interpreters.
+    Returns (medians_ms, heaviest_imports) where heaviest_imports is a list of
+    (module, cumulative_ms) from the last -X importtime run.
+    """
+    root = scratch_workspace()
+    env = dict(os.environ,
+               HYPER_WORKSPACE_ROOT=root,
+               HYPER_CACHE_DIR=os.path.join(root, '.cache'),
+               HYPER_VALIDATOR_DAEMON='off')
+    snippet = IMPORT_SNIPPET.format(scripts=SCRIPTS_DIR)
+    task_path = os.path.join(root, 'projects', 'bench', 'tasks', 'task-001.mdx')
+    samples = {name: [] for name in DEFAULT_BUDGETS}
+    importtime = ''
+    try:
+        for _ in range(runs):
+            elapsed, result = _timed_run([sys.executable, '-c', snippet], env)
+            samples['import'].append(elapsed)
+            samples['import_self'].append(float(result.stdout))
+
+            _elapsed, result = _timed_run([sys.executable, '-X', 'importtime', '-c', snippet], env)
+            importtime = result.stderr
+
+            elapsed, result = _timed_run(
+                [sys.executable, VALIDATOR_PATH, '--pre-validate', '--path', task_path,
+                 '--content', TASK_CONTENT], env)
+            if result.returncode != 0:
+                raise RuntimeError(f'Validation failed: {result.stdout}{result.stderr}')
+            samples['first_validation'].append(elapsed)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    medians = {name: round(statistics.median(values), 1) for name, values in samples.items()}
+    return medians, heaviest_imports(importtime)
+
+
+def check(medians: dict, limits: dict = None) -> list:
+    """Return a list of (name, median, budget) for every exceeded budget."""
+    limits = limits or budgets()
+    return [(name, medians[name], limits[name]) for name in medians if medians[name] > limits[name]]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check validator startup time against its budget')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreter runs per measurement')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    limits = budgets()
+    medians, heaviest = measure(args.runs)
+    over = check(medians, limits)
+
+    if args.json:
+        print(json.dumps({
+            'success': not over,
+            'medians_ms': medians,
+            'budgets_ms': limits,
+            'heaviest_imports_ms': dict(heaviest),
+        }))
+    else:
+        for name, value in medians.items():
+            status = 'OVER' if value > limits[name] else 'ok'
+            print(f'{name:<18} {value:8.1f} ms  (budget {limits[name]:.0f} ms)  {status}')
+        print('heaviest imports: ' + ', '.join(f'{name} {ms} ms' for name, ms in heaviest))
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Validator scaling benchmark
+Generates a synthetic workspace (generate_workspace.py) and measures:
+
+  cold_start_ms          fresh interpreter --pre-validate of one task, with
+                         the workspace index already on disk
+  index_build_ms         building the workspace index from scratch
+  validate_content_us    validate_content() per document, sharing one
+                         workspace graph (as batch runs do)
+  relationships_us       validate_relationships() per task through the
+                         workspace index (as the hook does)
+  batch_files_per_s      run_batch() throughput over the whole workspace
+  batch_serial_files_per_s
+                         the same with a single process
+
+Times are medians over --runs; the result cache and latency journal are off
+so every run does the full work. Results are written as JSON (--output) and
+compared against a stored baseline (--baseline, default
+baselines/bench_validator.json): a metric more than --tolerance worse than the
+baseline is a regression and the script exits 1. The baseline is only
+compared when it was recorded with the same workspace parameters;
+--update-baseline records the current results instead.
+
+Usage:
+  python3 bench_validator.py [--projects N] [--tasks N] [--shape S] [--activity N]
+                             [--body-bytes N] [--docs N] [--seed N] [--runs N]
+                             [--jobs N] [--output FILE] [--baseline FILE]
+                             [--tolerance F] [--update-baseline] [--json]
+
+The tolerance (a fraction, default 0.5) can also be set with
+HYPER_BENCH_TOLERANCE.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCH_DIR)
+VALIDATOR_PATH = os.path.join(SCRIPTS_DIR, 'validate-hyper-file.py')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baselines', 'bench_validator.json')
+
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import generate_workspace  # noqa: E402
+from hyper_validator import core as validator  # noqa: E402
+
+# Metric -> whether larger values are better
+METRICS = {
+    'cold_start_ms': False,
+    'index_build_ms': False,
+    'validate_content_us': False,
+    'relationships_us': False,
+    'batch_files_per_s': True,
+    'batch_serial_files_per_s': True,
+}
+
+# Machine noise is large for sub-second runs; flag only clear regressions
+DEFAULT_TOLERANCE = 0.5
+
+
+def tolerance() -> float:
+    value = os.environ.get('HYPER_BENCH_TOLERANCE', '').strip()
+    return float(value) if value else DEFAULT_TOLERANCE
+
+
+def bench_env(root: str) -> dict:
+    """Environment for the validator: the synthetic workspace, no caching or journaling."""
+    return {
+        'HYPER_WORKSPACE_ROOT': root,
+        'HYPER_CACHE_DIR': os.path.join(root, '.cache'),
+        'HYPER_RESULT_CACHE': 'off',
+        'HYPER_JOURNAL': 'off',
+        'HYPER_VALIDATOR_DAEMON': 'off',
+    }
+
+
+@contextlib.contextmanager
+def validator_state(root: str):
+    """
+    Point the validator's module-level roots at root with the result cache
+    off, restoring the previous state afterwards.
+    """
+    state = vars(validator)
+    names = ('WORKSPACE_ROOT', 'PERSONAL_DRIVE', '_result_cache', '_result_cache_pid')
+    saved = {name: state[name] for name in names if name in state}
+    validator.WORKSPACE_ROOT, validator.PERSONAL_DRIVE = root, ''
+    validator._result_cache, validator._result_cache_pid = None, os.getpid()
+    try:
+        yield
+    finally:
+        for name in names:
+            if name in saved:
+                state[name] = saved[name]
+            else:
+                state.pop(name, None)
+        index = validator._workspace_indexes.pop(root, None)
+        if index is not None:
+            index.close()
+
+
+def _median_ms(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure_cold_start(root: str, task_path: str, runs: int) -> float:
+    env = dict(os.environ, **bench_env(root))
+    with open(task_path, encoding='utf-8') as f:
+        content = f.read()
+    cmd = [sys.executable, VALIDATOR_PATH, '--pre-validate', '--path', task_path, '--content', content]
+    subprocess.run(cmd, capture_output=True, env=env)  # Build the on-disk index first
+
+    def run():
+        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            raise RuntimeError(f'Validation failed: {result.stdout}{result.stderr}')
+    return _median_ms(run, runs)
+
+
+def measure_index_build(root: str, runs: int) -> float:
+    import hyper_index
+
+    def build():
+        db_path = os.path.join(root, '.cache', 'bench-index.sqlite')
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        index = hyper_index.WorkspaceIndex(root, validator.parse_frontmatter_block, db_path=db_path)
+        index.refresh()
+        index.close()
+    return _median_ms(build, runs)
+
+
+def measure(config: dict, runs: int = 3, jobs: int = None) -> dict:
+    """
+    Generate the workspace described by config (generate_workspace()
+    keyword arguments) in a temporary directory and measure every metric.
+    Returns {'config': ..., 'workspace': stats, 'results': {metric: value}}.
+    """
+    root = tempfile.mkdtemp(prefix='hyper-bench-')
+    saved_env = {key: os.environ.get(key) for key in bench_env(root)}
+    try:
+        stats = generate_workspace.generate_workspace(root, **config)
+        os.environ.update(bench_env(root))
+        with validator_state(root):
+            results = _measure(root, runs, jobs)
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(root, ignore_errors=True)
+    return {
+        'config': config,
+        'workspace': stats,
+        'results': {metric: round(value, 1) for metric, value in results.items()},
+    }
+
+
+def _measure(root: str, runs: int, jobs: int) -> dict:
+    paths = list(validator.discover_files([root]))
+    documents = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            documents[path] = f.read()
+    tasks = [path for path in paths if validator.infer_type_from_path(path) == 'task']
+    if not tasks:
+        raise RuntimeError('The benchmark workspace needs at least one task')
+
+    results = {'cold_start_ms': measure_cold_start(root, tasks[len(tasks) // 2], runs),
+               'index_build_ms': measure_index_build(root, runs)}
+
+    graph = validator.build_workspace_graph()
+
+    def validate_all():
+        for path, content in documents.items():
+            is_valid, errors = validator.validate_content(path, content, workspace_graph=graph)
+            if not is_valid:
+                raise RuntimeError(f'{path} is invalid: {errors}')
+    results['validate_content_us'] = _median_ms(validate_all, runs) * 1000 / len(documents)
+
+    task_frontmatter = [(path, validator.parse_frontmatter(documents[path])[0]) for path in tasks]
+
+    def check_relationships():
+        for path, frontmatter in task_frontmatter:
+            validator.validate_relationships(frontmatter, 'task', path)
+    results['relationships_us'] = _median_ms(check_relationships, runs) * 1000 / len(tasks)
+
+    for metric, batch_jobs in (('batch_files_per_s', jobs), ('batch_serial_files_per_s', 1)):
+        elapsed = _median_ms(lambda: validator.batch_summary(validator.run_batch([root], jobs=batch_jobs)),
+                             runs)
+        results[metric] = len(paths) / (elapsed / 1000)
+    return results
+
+
+def compare(report: dict, baseline: dict, limit: float = None) -> list:
+    """
+    Return (metric, value, baseline_value, change) for every metric more
+    than limit (a fraction) worse than the baseline. change is the relative
+    slowdown, e.g. 0.6 for 60% worse.
+    """
+    limit = tolerance() if limit is None else limit
+    regressions = []
+    for metric, higher_is_better in METRICS.items():
+        old = baseline['results'].get(metric)
+        new = report['results'].get(metric)
+        if not old or new is None:
+            continue
+        change = (old / new - 1) if higher_is_better else (new / old - 1)
+        if change > limit:
+            regressions.append((metric, new, old, round(change, 3)))
+    return regressions
+
+
+def load_baseline(path: str, config: dict):
+    """The stored baseline for config, or None when missing or recorded with other parameters."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return baseline if baseline.get('config') == config else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark validation against a synthetic workspace')
+    for name, default in generate_workspace.DEFAULTS.items():
+        option = '--' + name.replace('_', '-')
+        if name == 'shape':
+            parser.add_argument(option, choices=generate_workspace.SHAPES, default=default)
+        else:
+            parser.add_argument(option, type=int, default=default)
+    parser.add_argument('--runs', type=int, default=3, help='Repetitions per measurement')
+    parser.add_argument('--jobs', type=int, default=None, help='Batch worker processes (default: CPU count)')
+    parser.add_argument('--output', help='Write the results JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results to compare against')
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help=f'Allowed slowdown as a fraction (default {DEFAULT_TOLERANCE})')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    config = {name: getattr(args, name) for name in generate_workspace.DEFAULTS}
+    report = measure(config, args.runs, args.jobs)
+
+    baseline = None if args.update_baseline else load_baseline(args.baseline, config)
+    regressions = compare(report, baseline, args.tolerance) if baseline else []
+    report['baseline'] = {
+        'path': args.baseline,
+        'compared': baseline is not None,
+        'regressions': [dict(zip(('metric', 'value', 'baseline', 'change'), r)) for r in regressions],
+    }
+    report['success'] = not regressions
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'workspace': report['workspace'], 'results': report['results']},
+                      f, indent=2)
+            f.write('\n')
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        stats = report['workspace']
+        print(f'workspace: {stats["files"]} files, {stats["tasks"]} tasks, {stats["edges"]} dependencies')
+        old = baseline['results'] if baseline else {}
+        flagged = {r[0] for r in regressions}
+        for metric, value in report['results'].items():
+            against = f'  (baseline {old[metric]})' if metric in old else ''
+            status = '  REGRESSION' if metric in flagged else ''
+            print(f'{metric:<26} {value:10.1f}{against}{status}')
+        if not baseline and not args.update_baseline:
+            print('no baseline recorded for these parameters')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
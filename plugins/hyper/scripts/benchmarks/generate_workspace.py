@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Synthetic HyperHome workspace generator
+Writes a workspace of projects, tasks and docs that validates cleanly, for
+benchmarks that need to show how validation scales:
+
+  projects      number of projects (projects/<slug>/_project.mdx)
+  tasks         tasks per project (projects/<slug>/tasks/task-NNN.mdx)
+  shape         dependency DAG within each project:
+                  chain   every task depends on the one before it
+                  fan_in  blocks of fan_in tasks, each closed by a task that
+                          depends on the rest of its block and the previous
+                          block's closing task
+                  random  each task depends on up to max_deps earlier tasks
+  activity      activity log entries per task (frontmatter size)
+  body_bytes    approximate markdown body size per document
+  docs          number of docs/ pages
+
+The same seed always produces the same workspace.
+
+Usage:
+  python3 generate_workspace.py ROOT [--projects N] [--tasks N] [--shape S]
+                                     [--activity N] [--body-bytes N] [--docs N] [--seed N]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+SHAPES = ('chain', 'fan_in', 'random')
+
+DEFAULTS = {
+    'projects': 5,
+    'tasks': 100,
+    'shape': 'random',
+    'activity': 3,
+    'body_bytes': 1000,
+    'docs': 10,
+    'seed': 0,
+}
+
+STATUSES = ['todo', 'in-progress', 'qa', 'review', 'complete', 'blocked']
+PRIORITIES = ['urgent', 'high', 'medium', 'low']
+ACTIONS = ['created', 'modified', 'status_changed', 'commented']
+WORDS = ('the validator reads frontmatter from each task and checks its parent project '
+         'dependencies status priority before the write reaches disk so agents get '
+         'structured errors with suggestions for every field that does not match').split()
+
+
+def dependency_graph(shape: str, count: int, rng: random.Random, fan_in: int = 20, max_deps: int = 3) -> list:
+    """Return depends_on for tasks 0..count-1 as lists of earlier task indexes."""
+    if shape == 'chain':
+        return [[i - 1] if i else [] for i in range(count)]
+    if shape == 'fan_in':
+        graph = []
+        for i in range(count):
+            block_start = i - i % fan_in
+            if i % fan_in == fan_in - 1 or i == count - 1:
+                deps = list(range(block_start, i))
+                if block_start:
+                    deps.append(block_start - 1)
+                graph.append(deps)
+            else:
+                graph.append([])
+        return graph
+    if shape == 'random':
+        return [sorted(rng.sample(range(i), min(i, rng.randint(0, max_deps)))) for i in range(count)]
+    raise ValueError(f'Unknown shape: {shape} (expected one of {", ".join(SHAPES)})')
+
+
+def body(title: str, size: int, rng: random.Random) -> str:
+    lines = [f'# {title}', '']
+    length = len(lines[0])
+    while length < size:
+        line = ' '.join(rng.choice(WORDS) for _ in range(12)).capitalize() + '.'
+        if rng.random() < 0.2:
+            line = '\n## ' + rng.choice(WORDS).capitalize() + '\n\n' + line
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines) + '\n'
+
+
+def activity_log(entries: int, rng: random.Random) -> str:
+    lines = ['activity:']
+    for i in range(entries):
+        lines += [
+            f'  - timestamp: "2026-01-{i % 28 + 1:02d}T{rng.randint(0, 23):02d}:00:00Z"',
+            '    actor:',
+            '      type: session',
+            f'      id: "session-{rng.randrange(16 ** 8):08x}"',
+            f'    action: {rng.choice(ACTIONS)}',
+            f'    content: "{" ".join(rng.choice(WORDS) for _ in range(6))}"',
+        ]
+    return '\n'.join(lines) + '\n' if entries else ''
+
+
+def task_document(slug: str, number: int, depends_on: list, activity: int, body_bytes: int,
+                  rng: random.Random) -> str:
+    task_id = f'{slug}-{number:03d}'
+    deps = ''.join(f'  - {slug}-{dep:03d}\n' for dep in depends_on)
+    return (
+        '---\n'
+        f'id: {task_id}\n'
+        f'title: "Task {number} of {slug}"\n'
+        'type: task\n'
+        f'status: {rng.choice(STATUSES)}\n'
+        f'priority: {rng.choice(PRIORITIES)}\n'
+        f'parent: proj-{slug}\n'
+        + (f'depends_on:\n{deps}' if deps else 'depends_on: []\n')
+        + 'created: 2026-01-01\n'
+        f'updated: 2026-01-{number % 28 + 1:02d}\n'
+        f'tags: [{rng.choice(WORDS)}, {rng.choice(WORDS)}]\n'
+        + activity_log(activity, rng)
+        + '---\n'
+        + body(f'Task {number}', body_bytes, rng)
+    )
+
+
+def write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def generate_workspace(root: str, projects: int = DEFAULTS['projects'], tasks: int = DEFAULTS['tasks'],
+                       shape: str = DEFAULTS['shape'], activity: int = DEFAULTS['activity'],
+                       body_bytes: int = DEFAULTS['body_bytes'], docs: int = DEFAULTS['docs'],
+                       seed: int = DEFAULTS['seed']) -> dict:
+    """
+    Write the workspace under root.
+    Returns {'files': N, 'tasks': N, 'edges': N, 'bytes': N}.
+    """
+    rng = random.Random(seed)
+    stats = {'files': 0, 'tasks': 0, 'edges': 0, 'bytes': 0}
+
+    def emit(path, content):
+        write(path, content)
+        stats['files'] += 1
+        stats['bytes'] += len(content)
+
+    for p in range(projects):
+        slug = f'bench{p:03d}'
+        project_dir = os.path.join(root, 'projects', slug)
+        emit(os.path.join(project_dir, '_project.mdx'),
+             f'---\nid: proj-{slug}\ntitle: "Project {slug}"\ntype: project\nstatus: in-progress\n'
+             f'priority: {rng.choice(PRIORITIES)}\ncreated: 2026-01-01\ntags: [bench]\n---\n'
+             + body(f'Project {slug}', body_bytes, rng))
+        for i, deps in enumerate(dependency_graph(shape, tasks, rng)):
+            emit(os.path.join(project_dir, 'tasks', f'task-{i + 1:03d}.mdx'),
+                 task_document(slug, i + 1, [dep + 1 for dep in deps], activity, body_bytes, rng))
+            stats['tasks'] += 1
+            stats['edges'] += len(deps)
+
+    for d in range(docs):
+        emit(os.path.join(root, 'docs', f'guide-{d:03d}.mdx'),
+             f'---\nid: guide-{d:03d}\ntitle: "Guide {d}"\n---\n' + body(f'Guide {d}', body_bytes, rng))
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Generate a synthetic HyperHome workspace')
+    parser.add_argument('root', help='Directory to write the workspace into')
+    parser.add_argument('--projects', type=int, default=DEFAULTS['projects'])
+    parser.add_argument('--tasks', type=int, default=DEFAULTS['tasks'], help='Tasks per project')
+    parser.add_argument('--shape', choices=SHAPES, default=DEFAULTS['shape'], help='Dependency DAG shape')
+    parser.add_argument('--activity', type=int, default=DEFAULTS['activity'], help='Activity entries per task')
+    parser.add_argument('--body-bytes', type=int, default=DEFAULTS['body_bytes'], help='Body size per document')
+    parser.add_argument('--docs', type=int, default=DEFAULTS['docs'])
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'])
+    args = parser.parse_args()
+
+    stats = generate_workspace(args.root, args.projects, args.tasks, args.shape, args.activity,
+                               args.body_bytes, args.docs, args.seed)
+    print(json.dumps({'success': True, 'root': args.root, **stats}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
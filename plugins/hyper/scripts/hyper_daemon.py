@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""
+Hyper Validator Daemon
+Long-lived validation server for the PreToolUse/PostToolUse hooks.
+
+A cold `validate-hyper-file.py` process imports PyYAML and resolves Hyper
+paths before it can validate anything. The daemon does that work once and
+serves validation requests over a Unix domain socket, keeping the validator
+module, resolved paths and workspace caches warm between hook invocations.
+Each workspace it serves is watched (hyper_watch), so its index and task
+graph follow filesystem events instead of being re-walked per request
+(HYPER_WATCH=off to disable).
+
+Usage:
+  python3 hyper_daemon.py serve               # Run in the foreground
+  python3 hyper_daemon.py start               # Start in the background
+  python3 hyper_daemon.py stop
+  python3 hyper_daemon.py status
+  python3 hyper_daemon.py validate --path P   # Thin client (content on stdin)
+  python3 hyper_daemon.py validate --path P --edit   # Edit tool_input on stdin
+  python3 hyper_daemon.py pre-hook            # Thin client (PreToolUse JSON on stdin)
+  python3 hyper_daemon.py post-hook           # Thin client (hook JSON on stdin)
+
+The client commands fall back to validating in-process (the one-shot mode)
+when the daemon is not running, and start it in the background for the next
+call unless HYPER_VALIDATOR_DAEMON=off. A daemon holds <socket>.lock from
+startup to exit, and clients do not start another while it is held. Each
+start is recorded in <socket>.spawn, which the daemon removes once it
+serves; while it is there, clients wait SPAWN_BACKOFF seconds, doubling per
+failed start up to SPAWN_BACKOFF_MAX, before trying again, so a daemon that
+cannot start is not forked by every hook.
+
+The socket lives in a directory only its user can enter
+(<runtime dir>/hyper-validator-<uid>/, created 0700) and is bound 0600. A
+client only talks to a socket that it, its directory and (where the platform
+reports it) the listening process belong to the calling user, so another
+local user cannot answer hook requests.
+
+Protocol: one JSON request line per connection, one JSON response line back.
+  {"op": "pre", "path": ..., "content": ..., "cwd": ..., "env": {...}}
+  {"op": "pre-edit", "path": ..., "edits": [...], "cwd": ..., "env": {...}}
+  {"op": "pre-hook", "input": {...hook payload...}, "cwd": ..., "env": {...}}
+  {"op": "post", "path": ..., "cwd": ..., "env": {...}}
+  {"op": "ping"} / {"op": "shutdown"}
+Clients also send "settings" (see SETTINGS_ENV); a daemon started with
+other values answers {"ok": false, "error": "settings"} and the client
+validates in-process.
+ping answers with the daemon's pid and its lock contention totals
+(hyper_lock.STATS), which `status` prints.
+Validation requests may add "timings": true (set by clients when
+HYPER_VALIDATOR_TIMINGS=1) to get the per-phase breakdown in the response.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+import time
+
+import hyper_metrics
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Directories whose Python sources make up the validator
+SOURCE_DIRS = (SCRIPT_DIR, os.path.join(SCRIPT_DIR, 'hyper_validator'))
+
+# Environment variables forwarded from the hook process to the daemon.
+# They feed path resolution, so the daemon resolves paths as the caller would.
+FORWARDED_ENV = (
+    'HOME', 'USERPROFILE', 'LOCALAPPDATA', 'XDG_DATA_HOME', 'XDG_CACHE_HOME',
+    'HYPER_CACHE_DIR', 'HYPER_WORKSPACE_ROOT',
+)
+
+# Validator settings read from the environment (switches and limits). The
+# daemon keeps the values it was started with and many are read once into
+# its caches, so instead of forwarding them, requests carry the caller's
+# values and the daemon declines ('settings') when they differ from its own;
+# the client then validates in-process with its own settings.
+SETTINGS_ENV = (
+    'HYPER_INDEX', 'HYPER_SNAPSHOT', 'HYPER_WATCH', 'HYPER_WATCH_INTERVAL',
+    'HYPER_RESULT_CACHE', 'HYPER_RESULT_CACHE_MAX',
+    'HYPER_JOURNAL', 'HYPER_JOURNAL_DIR', 'HYPER_JOURNAL_MAX_BYTES',
+)
+SETTINGS_PREFIXES = ('HYPER_FRONTMATTER_MAX_',)
+
+DEFAULT_IDLE_TIMEOUT = 1800.0
+CONNECT_TIMEOUT = 0.05
+REQUEST_TIMEOUT = 7.0
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+SPAWN_BACKOFF = 2.0
+SPAWN_BACKOFF_MAX = 300.0
+
+
+def socket_path() -> str:
+    """Per-user socket location (override with HYPER_VALIDATOR_SOCKET)."""
+    override = os.environ.get('HYPER_VALIDATOR_SOCKET', '').strip()
+    if override:
+        return override
+    runtime_dir = (os.environ.get('XDG_RUNTIME_DIR', '').strip()
+                   or os.environ.get('TMPDIR', '').strip() or '/tmp')
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return os.path.join(runtime_dir, f'hyper-validator-{uid}', 'validator.sock')
+
+
+def _private_dir(directory: str) -> bool:
+    """True when directory belongs to this user and nobody else can add or replace entries in it."""
+    try:
+        st = os.stat(directory)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def _trusted_socket(path: str) -> bool:
+    """True when the socket at path and its directory belong to this user."""
+    if not hasattr(os, 'getuid'):
+        return os.path.exists(path)
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+            and _private_dir(os.path.dirname(os.path.abspath(path))))
+
+
+def _trusted_peer(sock) -> bool:
+    """True unless the platform reports that the listening process belongs to another user."""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _pid, uid, _gid = struct.unpack('3i', credentials)
+    return uid == os.getuid()
+
+
+def prepare_socket_dir(path: str) -> None:
+    """
+    Create the socket's directory (0700) if missing.
+    Raises PermissionError when it exists but another user owns it or can
+    write to it.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if hasattr(os, 'getuid') and not _private_dir(directory):
+        raise PermissionError(f'{directory} must belong to uid {os.getuid()} and not be writable by others')
+
+
+def settings(environ=None) -> dict:
+    """The validator settings set in environ (default: this process's environment)."""
+    environ = os.environ if environ is None else environ
+    return {name: value for name, value in environ.items()
+            if name in SETTINGS_ENV or name.startswith(SETTINGS_PREFIXES)}
+
+
+def daemon_enabled() -> bool:
+    return os.environ.get('HYPER_VALIDATOR_DAEMON', '').strip().lower() not in ('0', 'off', 'false', 'no')
+
+
+def load_validator():
+    """The validator's function API (hyper_validator.core)."""
+    from hyper_validator import core
+
+    return core
+
+
+def _source_mtimes() -> dict:
+    """mtimes of the validator's Python sources, to detect code updates."""
+    mtimes = {}
+    for directory in SOURCE_DIRS:
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.py'):
+                try:
+                    mtimes[entry.path] = entry.stat().st_mtime_ns
+                except OSError:
+                    mtimes[entry.path] = None
+    return mtimes
+
+
+def _read_message(sock) -> dict:
+    buf = bytearray()
+    while not buf.endswith(b'\n'):
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        buf.extend(chunk)
+        if len(buf) > MAX_MESSAGE_BYTES:
+            raise ValueError('message too large')
+    if not buf:
+        raise ValueError('empty message')
+    return json.loads(buf.decode('utf-8'))
+
+
+def _write_message(sock, message: dict) -> None:
+    sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+
+# ==============================================================================
+# Server
+# ==============================================================================
+
+class ValidatorService:
+    """Warm validator state shared by all daemon connections."""
+
+    def __init__(self):
+        self.validator = load_validator()
+        self.source_mtimes = _source_mtimes()
+        # The validator reads its roots from module globals, so requests for
+        # different workspaces must not interleave. Watchers apply filesystem
+        # events under the same lock (re-entered when a request syncs them).
+        self.lock = threading.RLock()
+
+    def close(self) -> None:
+        self.validator.unwatch_workspace()
+
+    def is_stale(self) -> bool:
+        """True when the validator code changed on disk since startup."""
+        return _source_mtimes() != self.source_mtimes
+
+    def _roots_for(self, cwd: str, env: dict) -> tuple:
+        # Native resolution is memoized and revalidated by hyper_paths, so
+        # asking on every request keeps roots current at negligible cost
+        paths = self.validator.get_hyper_paths(cwd=cwd or None, env=env)
+        personal_drive = self.validator.resolve_personal_drive(paths)
+        workspace_root = self.validator.resolve_workspace_root(paths, env=env)
+        return personal_drive, workspace_root
+
+    def handle(self, request: dict) -> dict:
+        op = request.get('op')
+        if op == 'ping':
+            import hyper_lock
+
+            return {'ok': True, 'pid': os.getpid(), 'locks': dict(hyper_lock.STATS)}
+
+        if 'settings' in request and request['settings'] != settings():
+            return {'ok': False, 'error': 'settings'}
+
+        cwd = request.get('cwd') or ''
+        env = {k: v for k, v in (request.get('env') or {}).items() if k in FORWARDED_ENV}
+        path = request.get('path') or ''
+
+        with self.lock:
+            personal_drive, workspace_root = self._roots_for(cwd, env)
+            self.validator.PERSONAL_DRIVE = personal_drive
+            self.validator.WORKSPACE_ROOT = workspace_root
+            if workspace_root:
+                self.validator.watch_workspace(workspace_root, lock=self.lock)
+
+            run_hook = self.validator.run_hook
+            timings = bool(request.get('timings'))
+            if op == 'pre':
+                response, exit_code = run_hook('pre', path, request.get('content') or '', timings=timings)
+                return {'ok': True, 'exit_code': exit_code, 'response': response}
+            if op == 'pre-edit':
+                response, exit_code = run_hook('pre-edit', path, request.get('edits') or [], timings=timings)
+                return {'ok': True, 'exit_code': exit_code, 'response': response}
+            if op == 'post':
+                lines, exit_code = run_hook('post', path, timings=timings)
+                return {'ok': True, 'exit_code': exit_code, 'stderr': lines}
+            if op == 'pre-hook':
+                decision, exit_code = self.validator.pre_hook_decision(request.get('input'), timings=timings)
+                return {'ok': True, 'exit_code': exit_code, 'response': decision}
+
+        return {'ok': False, 'error': f'Unknown op: {op}'}
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        server.touch()
+        try:
+            request = _read_message(self.request)
+        except (ValueError, OSError):
+            return
+
+        if request.get('op') == 'shutdown':
+            _write_message(self.request, {'ok': True})
+            server.stop()
+            return
+
+        if server.service.is_stale():
+            # Let the client fall back; a fresh daemon picks up the new code
+            _write_message(self.request, {'ok': False, 'error': 'stale'})
+            server.stop()
+            return
+
+        try:
+            response = server.service.handle(request)
+        except Exception as e:
+            response = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+        _write_message(self.request, response)
+
+
+class ValidatorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: ValidatorService, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.service = service
+        self.idle_timeout = idle_timeout
+        self.last_activity = time.monotonic()
+        self.stopping = False
+        # Bind with a private mode from the start rather than chmod afterwards
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+    def stop(self):
+        self.stopping = True
+
+    def run(self):
+        self.timeout = 0.25
+        while not self.stopping:
+            self.handle_request()
+            if self.idle_timeout and time.monotonic() - self.last_activity > self.idle_timeout:
+                break
+
+
+def serve(path: str = None, idle_timeout: float = None) -> int:
+    path = path or socket_path()
+    if idle_timeout is None:
+        idle_timeout = float(os.environ.get('HYPER_VALIDATOR_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT))
+
+    try:
+        prepare_socket_dir(path)
+    except OSError as e:
+        print(f"Cannot serve on {path}: {e}", file=sys.stderr)
+        return 1
+    import hyper_lock
+
+    # Held until exit: a second daemon for the same socket stops here
+    try:
+        server_lock = hyper_lock.FileLock(path + '.lock', timeout=0).__enter__()
+    except TimeoutError:
+        print(f"Validator daemon already running or starting on {path}", file=sys.stderr)
+        return 1
+    try:
+        if request({'op': 'ping'}, path=path) is not None:
+            print(f"Validator daemon already running on {path}", file=sys.stderr)
+            return 1
+        # Remove a socket left behind by a daemon that died
+        if os.path.exists(path):
+            os.unlink(path)
+
+        service = ValidatorService()
+        server = ValidatorServer(path, service, idle_timeout)
+        try:
+            # Started: clients may spawn again at once if this daemon goes away
+            os.unlink(path + '.spawn')
+        except OSError:
+            pass
+        try:
+            server.run()
+        finally:
+            server.server_close()
+            service.close()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    finally:
+        server_lock.__exit__(None, None, None)
+    return 0
+
+
+def spawn_background(path: str = None) -> None:
+    """Start the daemon detached from the calling hook process."""
+    import subprocess
+
+    args = [sys.executable, os.path.abspath(__file__), 'serve']
+    if path:
+        args += ['--socket', path]
+    subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def _server_starting(path: str) -> bool:
+    """True while a daemon holds the server lock of path (starting up or serving)."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        fd = os.open(path + '.lock', os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    finally:
+        # Closing the descriptor releases a lock taken just now
+        os.close(fd)
+    return False
+
+
+def _claim_spawn(path: str) -> bool:
+    """
+    Record a start attempt in <socket>.spawn unless the previous one is too
+    recent. Returns False while backing off.
+    """
+    stamp = path + '.spawn'
+    try:
+        with open(stamp) as f:
+            attempts = max(int(f.read() or 1), 1)
+        age = time.time() - os.stat(stamp).st_mtime
+    except (OSError, ValueError):
+        attempts, age = 0, None
+    if age is not None and age < min(SPAWN_BACKOFF * 2 ** (attempts - 1), SPAWN_BACKOFF_MAX):
+        return False
+    with open(stamp, 'w') as f:
+        f.write(str(attempts + 1))
+    return True
+
+
+# ==============================================================================
+# Client
+# ==============================================================================
+
+def request(message: dict, path: str = None, timeout: float = REQUEST_TIMEOUT):
+    """Send one request to the daemon. Returns the response or None if unavailable."""
+    path = path or socket_path()
+    if not _trusted_socket(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+        if not _trusted_peer(sock):
+            return None
+        sock.settimeout(timeout)
+        _write_message(sock, message)
+        response = _read_message(sock)
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+    if not response.get('ok'):
+        return None
+    return response
+
+
+def _caller_context() -> dict:
+    return {
+        'cwd': os.getcwd(),
+        'env': {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ},
+        'settings': settings(),
+        'timings': hyper_metrics.timings_enabled(),
+    }
+
+
+def _autostart(path: str) -> None:
+    if _server_starting(path):
+        return
+    try:
+        prepare_socket_dir(path)
+        if _claim_spawn(path):
+            spawn_background(path)
+    except OSError:
+        pass
+
+
+def _request_or_autostart(message: dict):
+    if not daemon_enabled():
+        return None
+    path = socket_path()
+    response = request(message, path=path)
+    if response is None:
+        _autostart(path)
+    return response
+
+
+def client_pre_validate(file_path: str, content: str) -> tuple:
+    """PreToolUse validation via the daemon, falling back to in-process validation."""
+    message = {'op': 'pre', 'path': file_path, 'content': content, **_caller_context()}
+    response = _request_or_autostart(message)
+    if response is not None:
+        return response['response'], response['exit_code']
+    return load_validator().run_hook('pre', file_path, content, timings=hyper_metrics.timings_enabled())
+
+
+def client_pre_validate_edit(file_path: str, edits: list) -> tuple:
+    """PreToolUse validation of an Edit via the daemon, whose file cache is warm."""
+    message = {'op': 'pre-edit', 'path': file_path, 'edits': edits, **_caller_context()}
+    response = _request_or_autostart(message)
+    if response is not None:
+        return response['response'], response['exit_code']
+    return load_validator().run_hook('pre-edit', file_path, edits, timings=hyper_metrics.timings_enabled())
+
+
+def client_pre_hook(hook_input) -> tuple:
+    """
+    PreToolUse hook decision via the daemon. Files that are not .mdx are
+    allowed here, so ordinary Writes never wait on (or start) the daemon.
+    """
+    tool_input = hook_input.get('tool_input') if isinstance(hook_input, dict) else None
+    file_path = tool_input.get('file_path') if isinstance(tool_input, dict) else None
+    if not isinstance(file_path, str) or not file_path.endswith('.mdx'):
+        return {'decision': 'allow'}, 0
+    message = {'op': 'pre-hook', 'input': hook_input, **_caller_context()}
+    response = _request_or_autostart(message)
+    if response is not None:
+        return response['response'], response['exit_code']
+    return load_validator().pre_hook_decision(hook_input, timings=hyper_metrics.timings_enabled())
+
+
+def client_post_validate(file_path: str) -> tuple:
+    """PostToolUse validation via the daemon, falling back to in-process validation."""
+    message = {'op': 'post', 'path': file_path, **_caller_context()}
+    response = _request_or_autostart(message)
+    if response is not None:
+        return response['stderr'], response['exit_code']
+    return load_validator().run_hook('post', file_path, timings=hyper_metrics.timings_enabled())
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Hyper validator daemon')
+    parser.add_argument('command', choices=['serve', 'start', 'stop', 'status', 'validate', 'pre-hook', 'post-hook'])
+    parser.add_argument('--socket', type=str, help='Socket path (default: per-user runtime dir)')
+    parser.add_argument('--path', type=str, help='File path to validate (validate command)')
+    parser.add_argument('--edit', action='store_true',
+                        help='validate: stdin is an Edit/MultiEdit tool_input instead of file content')
+    args = parser.parse_args(argv)
+
+    if args.socket:
+        os.environ['HYPER_VALIDATOR_SOCKET'] = args.socket
+    path = socket_path()
+
+    if args.command == 'serve':
+        return serve(path)
+
+    if args.command == 'start':
+        if request({'op': 'ping'}, path=path) is not None:
+            return 0
+        spawn_background(path)
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            if request({'op': 'ping'}, path=path) is not None:
+                return 0
+            time.sleep(0.05)
+        print("Validator daemon did not start", file=sys.stderr)
+        return 1
+
+    if args.command == 'stop':
+        request({'op': 'shutdown'}, path=path)
+        return 0
+
+    if args.command == 'status':
+        response = request({'op': 'ping'}, path=path)
+        running = response is not None
+        print(json.dumps({'running': running, 'socket': path, 'pid': response.get('pid') if running else None,
+                          'locks': response.get('locks') if running else None}))
+        return 0 if running else 1
+
+    if args.command == 'validate':
+        if not args.path:
+            print(json.dumps({'success': False, 'error': {'message': 'Missing --path argument'}}))
+            return 2
+        if args.edit:
+            import hyper_filecache
+
+            response, exit_code = client_pre_validate_edit(args.path, hyper_filecache.read_edits(sys.stdin))
+        else:
+            response, exit_code = client_pre_validate(args.path, sys.stdin.read())
+        print(json.dumps(response))
+        return exit_code
+
+    if args.command == 'pre-hook':
+        try:
+            hook_input = json.load(sys.stdin)
+        except json.JSONDecodeError:
+            hook_input = None
+        decision, exit_code = client_pre_hook(hook_input)
+        print(json.dumps(decision))
+        return exit_code
+
+    # post-hook: PostToolUse hook JSON on stdin
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        return 1
+    file_path = input_data.get('tool_input', {}).get('file_path', '')
+    lines, exit_code = client_post_validate(file_path)
+    for line in lines:
+        print(line, file=sys.stderr)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Hyper File Cache
+Stat-validated in-memory cache of workspace file contents, plus the Edit /
+MultiEdit string replacement the validator applies before a write happens.
+
+A cached copy is reused while the file's (mtime, size, inode) are unchanged,
+so in the long-lived validator daemon an Edit's pre-validation and the
+PostToolUse check that follows share one read of the file.
+"""
+
+import json
+import os
+from collections import OrderedDict
+
+import hyper_metrics
+
+# Total bytes of file content kept in memory (least recently used evicted first)
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class EditError(ValueError):
+    """An edit cannot be applied (the Edit tool itself will reject it)."""
+
+
+class FileCache:
+    """LRU cache of decoded file contents, revalidated with stat() on every read."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (stamp, content)
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _stamp(st) -> tuple:
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def read(self, path: str) -> str:
+        """
+        Return the file's text, reading it only if the cached copy is stale.
+        Raises OSError/UnicodeDecodeError like open().read().
+        """
+        st = os.stat(path)
+        stamp = self._stamp(st)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            self._entries.move_to_end(path)
+            return entry[1]
+
+        with hyper_metrics.phase('read'), open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+            hyper_metrics.count('files_read')
+            hyper_metrics.count('bytes_read', st.st_size)
+        # Stamp from before the read: if the file changed meanwhile, the next
+        # stat() differs and the copy is re-read rather than trusted
+        self._store(path, stamp, content)
+        return content
+
+    def _store(self, path: str, stamp: tuple, content: str) -> None:
+        self.discard(path)
+        size = len(content)
+        if size > self.max_bytes:
+            return
+        self._entries[path] = (stamp, content)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _path, (_stamp, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def discard(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+
+def apply_edit(content: str, old_string: str, new_string: str, replace_all: bool = False) -> str:
+    """
+    Apply one Edit tool replacement to content, with the tool's rules:
+    old_string must occur, and exactly once unless replace_all is set.
+    Raises EditError when the Edit tool would refuse the edit.
+    """
+    if not old_string:
+        raise EditError('old_string is empty')
+    if old_string == new_string:
+        raise EditError('old_string and new_string are identical')
+    count = content.count(old_string)
+    if count == 0:
+        raise EditError('old_string not found in file')
+    if count > 1 and not replace_all:
+        raise EditError(f'old_string occurs {count} times; replace_all is not set')
+    return content.replace(old_string, new_string) if replace_all else content.replace(old_string, new_string, 1)
+
+
+def apply_edits(content: str, edits: list) -> str:
+    """Apply a sequence of edits ({old_string, new_string, replace_all}) in order."""
+    for edit in edits:
+        if not isinstance(edit, dict):
+            raise EditError('Each edit must be an object')
+        content = apply_edit(
+            content,
+            edit.get('old_string') or '',
+            edit.get('new_string') or '',
+            bool(edit.get('replace_all')),
+        )
+    return content
+
+
+def edits_from_tool_input(tool_input: dict) -> list:
+    """Normalize Edit ({old_string, ...}) and MultiEdit ({edits: [...]}) payloads to a list."""
+    if isinstance(tool_input.get('edits'), list):
+        return tool_input['edits']
+    if 'old_string' in tool_input:
+        return [tool_input]
+    return []
+
+
+def read_edits(stream) -> list:
+    """Read an Edit/MultiEdit tool_input JSON object and return its edits."""
+    try:
+        tool_input = json.load(stream)
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(tool_input, dict):
+        return []
+    return edits_from_tool_input(tool_input)
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Hyper Frontmatter Reader
+Reads only the YAML frontmatter block of an MDX/MD file.
+
+Bulk scans (index builds, relationship lookups) only need frontmatter, but
+reading whole files copies large MDX bodies into memory just to discard them.
+read_frontmatter() streams bytes until the closing `---` line and stops,
+enforcing a byte cap; large files are searched through mmap instead of being
+read at all.
+
+parse_flat() is the fast tier of frontmatter parsing: a strict parser for the
+flat `key: scalar` / `key: [list]` / block-list subset that nearly all Hyper
+documents use. It returns None for anything it cannot prove it parses exactly
+like yaml.safe_load, and callers then fall back to PyYAML.
+
+Frontmatter comes from agents, so parsing is bounded: check_size() caps the
+block's bytes before any tier runs, and check_yaml_events() walks PyYAML's
+event stream (which is cheap and never builds objects) before a document is
+constructed, stopping at the first of
+
+  nodes    scalars and collections, counting each alias as the full size of
+           what it refers to, so alias bombs are caught before expansion
+  aliases  alias references
+  depth    collection nesting
+
+Both raise FrontmatterTooComplex. Limits come from PARSE_LIMITS, each
+overridable with HYPER_FRONTMATTER_MAX_<NAME> (e.g. HYPER_FRONTMATTER_MAX_NODES).
+"""
+
+import datetime
+import mmap
+import os
+import re
+
+import hyper_metrics
+
+# Upper bound on frontmatter size (override with HYPER_FRONTMATTER_MAX_BYTES)
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+# Files at least this large are searched via mmap rather than buffered reads
+MMAP_THRESHOLD = 256 * 1024
+
+DELIMITER = b'---'
+
+
+# Bounds on frontmatter handed to a parser. Real frontmatter is a few hundred
+# bytes and well under 100 nodes; these keep worst-case parse time in the
+# low milliseconds (see benchmarks/bench_frontmatter_limits.py)
+PARSE_LIMITS = {
+    'parse_bytes': 64 * 1024,
+    'nodes': 5000,
+    'aliases': 100,
+    'depth': 32,
+}
+
+
+class FrontmatterTooLarge(ValueError):
+    """The frontmatter block did not close within the byte cap."""
+
+
+class FrontmatterTooComplex(ValueError):
+    """The frontmatter exceeds one of PARSE_LIMITS."""
+
+    def __init__(self, limit: str, maximum: int):
+        self.limit = limit
+        self.maximum = maximum
+        super().__init__(f'Frontmatter exceeds the {limit} limit ({maximum})')
+
+
+def max_frontmatter_bytes() -> int:
+    try:
+        return int(os.environ.get('HYPER_FRONTMATTER_MAX_BYTES', '') or DEFAULT_MAX_BYTES)
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+
+
+def parse_limits() -> dict:
+    """PARSE_LIMITS with HYPER_FRONTMATTER_MAX_<NAME> overrides applied."""
+    limits = dict(PARSE_LIMITS)
+    for name in limits:
+        try:
+            limits[name] = int(os.environ.get(f'HYPER_FRONTMATTER_MAX_{name.upper()}', '') or limits[name])
+        except ValueError:
+            pass
+    return limits
+
+
+def check_size(text: str, limits: dict = None) -> None:
+    """Raise FrontmatterTooComplex if text is over the parse_bytes limit."""
+    maximum = (limits or parse_limits())['parse_bytes']
+    # Characters are at most 4 bytes: only encode when the length is ambiguous
+    if len(text) > maximum or (len(text) * 4 > maximum and len(text.encode('utf-8')) > maximum):
+        raise FrontmatterTooComplex('parse_bytes', maximum)
+
+
+def check_yaml_events(yaml, events, limits: dict = None) -> None:
+    """
+    Consume a PyYAML event stream (yaml.parse(...)), raising
+    FrontmatterTooComplex as soon as it exceeds a limit. YAML syntax errors
+    propagate as yaml.YAMLError.
+    """
+    limits = limits or parse_limits()
+    max_nodes, max_aliases, max_depth = limits['nodes'], limits['aliases'], limits['depth']
+    nodes = aliases = 0
+    anchors = {}  # anchor -> nodes the anchored value expands to
+    open_collections = []  # (anchor, nodes counted before it started)
+    for event in events:
+        if isinstance(event, yaml.ScalarEvent):
+            nodes += 1
+            if event.anchor is not None:
+                anchors[event.anchor] = 1
+        elif isinstance(event, yaml.CollectionStartEvent):
+            open_collections.append((event.anchor, nodes))
+            nodes += 1
+            if len(open_collections) > max_depth:
+                raise FrontmatterTooComplex('depth', max_depth)
+        elif isinstance(event, yaml.CollectionEndEvent):
+            anchor, start = open_collections.pop()
+            if anchor is not None:
+                anchors[anchor] = nodes - start
+        elif isinstance(event, yaml.AliasEvent):
+            aliases += 1
+            if aliases > max_aliases:
+                raise FrontmatterTooComplex('aliases', max_aliases)
+            nodes += anchors.get(event.anchor, 1)
+        else:
+            continue
+        if nodes > max_nodes:
+            raise FrontmatterTooComplex('nodes', max_nodes)
+
+
+def _is_delimiter_line(line: bytes) -> bool:
+    return line.rstrip() == DELIMITER
+
+
+def _read_buffered(f, max_bytes: int) -> tuple:
+    first = f.readline(max_bytes + 1)
+    if not _is_delimiter_line(first):
+        return None, 0
+
+    offset = len(first)
+    start = offset
+    lines = []
+    while True:
+        line = f.readline(max_bytes + 1)
+        if not line:
+            return None, 0  # Never closed: not frontmatter
+        offset += len(line)
+        if _is_delimiter_line(line):
+            return b''.join(lines), offset
+        lines.append(line)
+        if offset - start > max_bytes:
+            raise FrontmatterTooLarge(f'Frontmatter exceeds {max_bytes} bytes')
+
+
+def _read_mmap(f, size: int, max_bytes: int) -> tuple:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        first_end = mm.find(b'\n', 0, max_bytes + 1)
+        if first_end == -1 or not _is_delimiter_line(mm[:first_end + 1]):
+            return None, 0
+
+        start = first_end + 1
+        limit = min(size, start + max_bytes + len(DELIMITER) + 2)
+        pos = start
+        while True:
+            # A closing delimiter is a line that is exactly `---` (plus whitespace)
+            if mm[pos:pos + len(DELIMITER)] == DELIMITER:
+                line_end = mm.find(b'\n', pos, limit)
+                line_end = size if line_end == -1 and limit == size else line_end
+                if line_end != -1 and _is_delimiter_line(mm[pos:line_end]):
+                    return mm[start:pos], min(line_end + 1, size)
+            newline = mm.find(b'\n', pos, limit)
+            if newline == -1:
+                if limit < size:
+                    raise FrontmatterTooLarge(f'Frontmatter exceeds {max_bytes} bytes')
+                return None, 0
+            pos = newline + 1
+
+
+def read_frontmatter(path: str, max_bytes: int = None) -> tuple:
+    """
+    Read the frontmatter block of a file without reading its body.
+    Returns (block, body_offset): block is the decoded text between the
+    opening and closing `---` lines (None if the file has no frontmatter),
+    body_offset the byte offset where the body starts (0 without frontmatter).
+    Raises FrontmatterTooLarge if the block does not close within max_bytes,
+    OSError/UnicodeDecodeError for unreadable files.
+    """
+    if max_bytes is None:
+        max_bytes = max_frontmatter_bytes()
+    with hyper_metrics.phase('read'), open(path, 'rb') as f:
+        hyper_metrics.count('files_read')
+        size = os.fstat(f.fileno()).st_size
+        if size < len(DELIMITER):
+            return None, 0
+        if size >= MMAP_THRESHOLD:
+            block, offset = _read_mmap(f, size, max_bytes)
+            hyper_metrics.count('bytes_read', offset)
+        else:
+            block, offset = _read_buffered(f, max_bytes)
+            hyper_metrics.count('bytes_read', f.tell())
+    if block is None:
+        return None, 0
+    return block.decode('utf-8'), offset
+
+
+def read_document(path: str, max_bytes: int = None) -> tuple:
+    """
+    Read a whole file split at its frontmatter.
+    Returns (block, body): block as from read_frontmatter() (None without
+    frontmatter), body the decoded text after the closing `---` line (the
+    whole file without frontmatter). Raises like read_frontmatter().
+    """
+    if max_bytes is None:
+        max_bytes = max_frontmatter_bytes()
+    with hyper_metrics.phase('read'), open(path, 'rb') as f:
+        hyper_metrics.count('files_read')
+        block, _offset = _read_buffered(f, max_bytes)
+        if block is None:
+            f.seek(0)
+        body = f.read()
+        hyper_metrics.count('bytes_read', f.tell())
+    return (None if block is None else block.decode('utf-8')), body.decode('utf-8')
+
+
+# ----------------------------------------------------------------------
+# Flat frontmatter parser
+# ----------------------------------------------------------------------
+
+_KEY_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_-]*\Z')
+_INT_RE = re.compile(r'[-+]?(?:0|[1-9][0-9]*)\Z')
+_DATE_RE = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})\Z')
+
+# YAML 1.1 implicit types as resolved by PyYAML's SafeLoader
+_NULLS = frozenset(('', '~', 'null', 'Null', 'NULL'))
+_BOOLS = {
+    'yes': True, 'Yes': True, 'YES': True, 'true': True, 'True': True, 'TRUE': True,
+    'on': True, 'On': True, 'ON': True,
+    'no': False, 'No': False, 'NO': False, 'false': False, 'False': False, 'FALSE': False,
+    'off': False, 'Off': False, 'OFF': False,
+}
+
+# Characters that cannot start a plain scalar, or that start something other
+# than a plain string (numbers, dates, anchors, tags, flow collections, ...)
+_UNSAFE_PLAIN_START = frozenset('-?:,[]{}#&*!|>\'"%@`=<+.0123456789')
+_FLOW_INDICATORS = frozenset(',[]{}')
+
+
+class _NotFlat(Exception):
+    """The text is outside the subset parse_flat() handles."""
+
+
+def _plain_scalar(text: str, in_flow: bool = False):
+    """Resolve an unquoted scalar the way YAML 1.1 / SafeLoader does."""
+    if ' #' in text or ': ' in text or text.endswith(':'):
+        raise _NotFlat
+    if in_flow and (':' in text or _FLOW_INDICATORS.intersection(text)):
+        raise _NotFlat
+    if text in _NULLS:
+        return None
+    if text in _BOOLS:
+        return _BOOLS[text]
+    if text[0] in _UNSAFE_PLAIN_START:
+        if _INT_RE.match(text):
+            return int(text)
+        match = _DATE_RE.match(text)
+        if match:
+            try:
+                return datetime.date(*(int(part) for part in match.groups()))
+            except ValueError:
+                raise _NotFlat
+        raise _NotFlat
+    return text
+
+
+def _scalar(text: str, in_flow: bool = False):
+    """Resolve a plain, single-quoted or (escape-free) double-quoted scalar."""
+    if not text:
+        return None
+    quote = text[0]
+    if quote == '"':
+        inner = text[1:-1]
+        if len(text) < 2 or text[-1] != '"' or '"' in inner or '\\' in inner:
+            raise _NotFlat
+        return inner
+    if quote == "'":
+        inner = text[1:-1]
+        if len(text) < 2 or text[-1] != "'" or "'" in inner.replace("''", ''):
+            raise _NotFlat
+        return inner.replace("''", "'")
+    return _plain_scalar(text, in_flow)
+
+
+def _flow_list(text: str, nodes_left: int) -> list:
+    inner = text[1:-1].strip()
+    if not text.endswith(']') or '"' in inner or "'" in inner:
+        raise _NotFlat
+    if not inner:
+        return []
+    items = inner.split(',')
+    if len(items) > nodes_left:
+        raise _TooManyNodes
+    items = [item.strip() for item in items]
+    if not all(items):
+        raise _NotFlat  # Empty entries / trailing commas
+    return [_plain_scalar(item, in_flow=True) for item in items]
+
+
+class _TooManyNodes(Exception):
+    pass
+
+
+def _parse_flat(text: str, max_nodes: int) -> dict:
+    result = {}
+    list_key = None
+    list_indent = None
+    # Counted like check_yaml_events(): the mapping, each key, each value,
+    # and each list item
+    nodes = 1
+    for line in text.split('\n'):
+        line = line.rstrip(' \r')
+        if not line.isprintable():
+            raise _NotFlat  # Tabs, control characters, other YAML line breaks
+        stripped = line.lstrip(' ')
+        if not stripped or stripped.startswith('#'):
+            continue
+        indent = len(line) - len(stripped)
+
+        # Block list items under the preceding `key:`
+        if stripped == '-' or stripped.startswith('- '):
+            if list_key is None:
+                raise _NotFlat
+            if list_indent is None:
+                list_indent = indent
+            elif indent != list_indent:
+                raise _NotFlat
+            item = stripped[1:].strip()
+            if item.startswith(('[', '{', '- ')) or item == '-':
+                raise _NotFlat
+            if result[list_key] is None:
+                result[list_key] = []
+            result[list_key].append(_scalar(item))
+            nodes += 1
+            if nodes > max_nodes:
+                raise _TooManyNodes
+            continue
+
+        if indent:
+            raise _NotFlat  # Nested mappings or multi-line scalars
+        key, sep, value = line.partition(':')
+        if not sep or not _KEY_RE.match(key) or key in _BOOLS or key in _NULLS:
+            raise _NotFlat
+        if key in result:
+            raise _NotFlat  # Duplicate keys: leave the semantics to PyYAML
+        if value and value[0] != ' ':
+            raise _NotFlat
+        value = value.strip()
+
+        list_key = list_indent = None
+        nodes += 2
+        if nodes > max_nodes:
+            raise _TooManyNodes
+        if not value:
+            # Either null or the start of a block list
+            result[key] = None
+            list_key = key
+            continue
+        if value[0] == '[':
+            result[key] = _flow_list(value, max_nodes - nodes)
+            nodes += len(result[key])
+        else:
+            result[key] = _scalar(value)
+    return result
+
+
+def parse_flat(text: str, max_nodes: int = None):
+    """
+    Parse flat frontmatter without PyYAML.
+    Handles top-level `key: scalar`, `key: [a, b]` and `key:` followed by
+    `- item` lines, with strings, ints, bools, nulls and YYYY-MM-DD dates.
+    Returns the same dict yaml.safe_load would, or None when the text uses
+    anything else (nesting, anchors, escapes, floats, ...) or is empty.
+    Raises FrontmatterTooComplex as soon as it passes max_nodes (default:
+    the nodes parse limit).
+    """
+    if max_nodes is None:
+        max_nodes = parse_limits()['nodes']
+    try:
+        result = _parse_flat(text, max_nodes)
+    except _NotFlat:
+        return None
+    except _TooManyNodes:
+        raise FrontmatterTooComplex('nodes', max_nodes) from None
+    return result or None
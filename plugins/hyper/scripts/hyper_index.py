@@ -0,0 +1,951 @@
+#!/usr/bin/env python3
+"""
+Hyper Workspace Index
+Persistent, incrementally-updated index of workspace frontmatter.
+
+The index lives in <workspace root>/.index/workspace.sqlite (SQLite, WAL mode)
+and stores one row per .mdx/.md file: id, title, type, status, priority,
+parent, depends_on, tags, updated, path, mtime and size. A refresh walks the
+tree with stat() only; files whose mtime/size are unchanged are not re-read,
+and changed files are read only up to the end of their frontmatter, so
+relationship checks stay cheap as the workspace grows.
+
+Each WorkspaceIndex also keeps, in memory, a dynamic topological order of
+every project whose dependency graph has been asked for (hyper_topo), and
+moves it forward with the task rows each refresh changes, so cycle checks
+stay incremental in a long-lived process such as the validator daemon.
+update_paths() re-reads just the files a filesystem watcher (hyper_watch)
+reported, so a watched index is kept current without walking the tree.
+
+An on-disk index also publishes a relationship snapshot (hyper_snapshot)
+beside it whenever a project or task changes, which hook processes
+memory-map instead of opening the index at all.
+
+Many processes may share one index (parallel agents, each hook its own
+process). WAL mode lets readers run alongside the single writer. Files are
+parsed before the write lock is taken, and writers wait for it with
+backoff (hyper_lock), so the lock is held only for the row updates and
+contention shows up in hyper_metrics. Every write bumps a generation counter
+stored in the index: a writer that finds the generation moved since it
+looked re-checks its rows against what the other writer stored and drops
+in-memory state derived from the old rows.
+
+Secondary indexes on type, status, priority, parent, updated and tags (one
+row per tag in the tags table) back query(), so questions like "blocked
+urgent tasks" or "tasks tagged X in project Y" are answered without parsing
+any file.
+
+Task file numbers (task-NNN.mdx, verify-task-NNN.mdx) are handed out by
+reserve_task_number(): one short write transaction takes the project's next
+number from a counter kept in the index and records a reservation, so
+parallel workers never pick the same file. Only a project's first number
+lists its tasks directory, to seed the counter from up-to-date rows.
+Reservations whose file was never written are reclaimed after
+RESERVATION_TTL and their numbers handed out again. Counters and
+reservations survive schema rebuilds.
+
+Usage:
+  python3 hyper_index.py [refresh] [--root DIR]   # Refresh and print stats as JSON
+  python3 hyper_index.py query [--status blocked --priority urgent --tag X ...]
+  python3 hyper_index.py allocate --project SLUG [--prefix verify-task]
+  python3 hyper_index.py release --project SLUG --number N [--prefix verify-task]
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from stat import S_ISREG
+
+import hyper_lock
+import hyper_snapshot
+from hyper_frontmatter import FrontmatterTooLarge, read_frontmatter
+from hyper_topo import DependencyOrder
+
+INDEX_DIRNAME = '.index'
+INDEX_FILENAME = 'workspace.sqlite'
+
+# Bump when the table layout changes; older index files are rebuilt (keeping
+# the task number tables)
+SCHEMA_VERSION = 4
+
+INDEXED_EXTENSIONS = ('.mdx', '.md')
+
+# Columns returned by query(), in table order
+QUERY_FIELDS = ('path', 'kind', 'project', 'id', 'title', 'type', 'status', 'priority',
+                'parent', 'depends_on', 'tags', 'updated')
+
+# Equality filters accepted by query(); each takes a value or a list of values
+FILTER_COLUMNS = ('kind', 'project', 'id', 'type', 'status', 'priority', 'parent')
+
+# File name prefixes of numbered task documents (hyper_schema task filename)
+TASK_PREFIXES = ('task', 'verify-task')
+
+# Seconds before a reserved task number whose file was not written is reused
+RESERVATION_TTL = 3600.0
+
+ORDERINGS = {
+    'path': 'path',
+    'updated': 'updated IS NULL, updated DESC, path',
+    'priority': ("CASE priority WHEN 'urgent' THEN 0 WHEN 'high' THEN 1 WHEN 'medium' THEN 2 "
+                 "WHEN 'low' THEN 3 ELSE 4 END, path"),
+}
+
+
+def index_enabled() -> bool:
+    return os.environ.get('HYPER_INDEX', '').strip().lower() not in ('0', 'off', 'false', 'no')
+
+
+def classify_path(rel_path: str) -> tuple:
+    """
+    Derive (kind, project_slug) from a path relative to the workspace root.
+    kind is 'project', 'task', 'resource', 'doc' or '' for anything else.
+    """
+    parts = rel_path.split('/')
+    if parts[0] == 'projects' and len(parts) >= 3:
+        slug = parts[1]
+        if len(parts) == 3 and parts[2] == '_project.mdx':
+            return 'project', slug
+        if len(parts) == 4 and parts[2] == 'tasks' and parts[3].endswith('.mdx'):
+            return 'task', slug
+        if parts[2] == 'resources':
+            return 'resource', slug
+        return '', slug
+    if parts[0] == 'docs':
+        return 'doc', ''
+    return '', ''
+
+
+def prepare_index_dir(db_path: str) -> None:
+    """Create the directory of an on-disk index, git-ignored, if it is missing."""
+    index_dir = os.path.dirname(db_path)
+    if db_path != ':memory:' and not os.path.isdir(index_dir):
+        os.makedirs(index_dir, exist_ok=True)
+        # Keep the index out of version control for legacy in-repo .hyper dirs
+        with open(os.path.join(index_dir, '.gitignore'), 'w') as f:
+            f.write('*\n')
+
+
+def task_filename(prefix: str, number: int) -> str:
+    """File name of a numbered task document, e.g. task_filename('task', 7) -> 'task-007.mdx'."""
+    return f'{prefix}-{number:03d}.mdx'
+
+
+def _tasks_dir(root: str, project_slug: str, prefix: str) -> str:
+    if prefix not in TASK_PREFIXES:
+        raise ValueError(f"Unknown task prefix '{prefix}' (expected one of: {', '.join(TASK_PREFIXES)})")
+    if not project_slug or project_slug.startswith('.') or '/' in project_slug or os.sep in project_slug:
+        raise ValueError(f"Invalid project slug '{project_slug}'")
+    return os.path.join(root, 'projects', project_slug, 'tasks')
+
+
+def reserve_task_number_by_scan(root: str, project_slug: str, prefix: str = 'task',
+                                ttl: float = RESERVATION_TTL) -> int:
+    """
+    WorkspaceIndex.reserve_task_number() for workspaces without an index:
+    lists the tasks directory and claims the number with an O_EXCL marker
+    file (.task-NNN.mdx.reserved, skipped by the index walk). Markers of
+    written files, or older than ttl, are removed on the way.
+    """
+    tasks_dir = _tasks_dir(root, project_slug, prefix)
+    os.makedirs(tasks_dir, exist_ok=True)
+    pattern = re.compile(rf'^(\.?){re.escape(prefix)}-(\d+)\.mdx((?:\.reserved)?)$')
+    now = time.time()
+    highest = 0
+    with os.scandir(tasks_dir) as entries:
+        for entry in entries:
+            match = pattern.match(entry.name)
+            if match is None or bool(match.group(1)) != bool(match.group(3)):
+                continue
+            number = int(match.group(2))
+            if match.group(3):
+                try:
+                    written = os.path.lexists(os.path.join(tasks_dir, task_filename(prefix, number)))
+                    if written or now - entry.stat().st_mtime > ttl:
+                        os.unlink(entry.path)
+                        if not written:
+                            continue
+                except OSError:
+                    pass
+            highest = max(highest, number)
+
+    number = highest + 1
+    while True:
+        marker = os.path.join(tasks_dir, f'.{task_filename(prefix, number)}.reserved')
+        try:
+            os.close(os.open(marker, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        except FileExistsError:
+            number += 1
+            continue
+        if not os.path.lexists(os.path.join(tasks_dir, task_filename(prefix, number))):
+            return number
+        os.unlink(marker)
+        number += 1
+
+
+def release_task_number_by_scan(root: str, project_slug: str, number: int, prefix: str = 'task') -> bool:
+    """Drop a reservation made by reserve_task_number_by_scan(). Returns False if there was none."""
+    marker = os.path.join(_tasks_dir(root, project_slug, prefix), f'.{task_filename(prefix, number)}.reserved')
+    try:
+        os.unlink(marker)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def walk_documents(root: str):
+    """Yield (rel_path, abs_path, stat) for indexable files under root, skipping dot dirs."""
+    stack = [root]
+    root_len = len(root) + 1
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(INDEXED_EXTENSIONS):
+                    yield entry.path[root_len:].replace(os.sep, '/'), entry.path, entry.stat()
+            except OSError:
+                continue
+
+
+def _normalize_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None]
+    return [str(value)]
+
+
+def _scalar(value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+class WorkspaceIndex:
+    """Frontmatter index for one workspace root."""
+
+    def __init__(self, root: str, parse_block, db_path: str = None):
+        """
+        root: workspace root directory
+        parse_block: callable(frontmatter_text) -> (frontmatter, error),
+            i.e. hyper_validator.core.parse_frontmatter_block
+        """
+        self.root = root.rstrip('/')
+        self.parse_block = parse_block
+        self.db_path = db_path or os.path.join(self.root, INDEX_DIRNAME, INDEX_FILENAME)
+        self._conn = None
+        # project slug -> DependencyOrder, built on first use
+        self._orders = {}
+        # Index generation the in-memory state above was derived from
+        self._generation = None
+        # Serializes updates: the daemon's request threads and a filesystem
+        # watcher (hyper_watch) share one index
+        self.lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Connection / schema
+    # ------------------------------------------------------------------
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        prepare_index_dir(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            self._create_schema(conn)
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        # Continue the generations of a snapshot left by a previous index
+        generation = hyper_snapshot.read_generation(self.snapshot_path) if self.snapshot_path else 0
+        hyper_lock.begin_immediate(conn)
+        if conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+            # Another process created it while we waited for the lock
+            conn.execute('COMMIT')
+            return
+        try:
+            conn.execute('DROP TABLE IF EXISTS files')
+            conn.execute('DROP TABLE IF EXISTS tags')
+            conn.execute('''
+                CREATE TABLE files (
+                    path TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    project TEXT NOT NULL,
+                    id TEXT,
+                    title TEXT,
+                    type TEXT,
+                    status TEXT,
+                    priority TEXT,
+                    parent TEXT,
+                    depends_on TEXT,
+                    tags TEXT,
+                    updated TEXT,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX files_kind_project ON files (kind, project)')
+            for column in ('type', 'status', 'priority', 'parent', 'updated'):
+                conn.execute(f'CREATE INDEX files_{column} ON files ({column})')
+            conn.execute('''
+                CREATE TABLE tags (
+                    tag TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    PRIMARY KEY (tag, path)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX tags_path ON tags (path)')
+            conn.execute('DROP TABLE IF EXISTS meta')
+            conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            # Task number allocation: the next never-used number per project
+            # and file prefix, and numbers handed out but not known to be
+            # written (free = 1 once reclaimed). Unlike the rows above they
+            # cannot be rebuilt from the files, so they are kept across schema
+            # versions; a version that changes their layout must migrate them.
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS task_counters (
+                    project TEXT NOT NULL,
+                    prefix TEXT NOT NULL,
+                    next INTEGER NOT NULL,
+                    PRIMARY KEY (project, prefix)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS task_reservations (
+                    project TEXT NOT NULL,
+                    prefix TEXT NOT NULL,
+                    number INTEGER NOT NULL,
+                    reserved_ns INTEGER NOT NULL,
+                    free INTEGER NOT NULL,
+                    PRIMARY KEY (project, prefix, number)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute("INSERT INTO meta VALUES ('generation', ?)", (generation,))
+            conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def generation(self) -> int:
+        """Number of writes the index has seen, from any process."""
+        return self.conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+
+    def _observe(self, generation: int) -> bool:
+        """
+        Note the generation the index is at. Returns True (and drops the
+        dependency orders) when another connection wrote since this one
+        last looked.
+        """
+        if generation == self._generation:
+            return False
+        self._orders.clear()
+        self._generation = generation
+        return True
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _read_row(self, rel_path: str, abs_path: str, st) -> tuple:
+        kind, project = classify_path(rel_path)
+        fm = {}
+        try:
+            block, _ = read_frontmatter(abs_path)
+        except (OSError, UnicodeDecodeError, FrontmatterTooLarge):
+            block = None
+        if block is not None:
+            parsed, error = self.parse_block(block)
+            if not error and isinstance(parsed, dict):
+                fm = parsed
+        depends_on = _normalize_list(fm.get('depends_on'))
+        # Dates parsed by YAML become ISO strings, which sort chronologically
+        return (
+            rel_path, kind, project,
+            _scalar(fm.get('id')), _scalar(fm.get('title')), _scalar(fm.get('type')),
+            _scalar(fm.get('status')), _scalar(fm.get('priority')), _scalar(fm.get('parent')),
+            json.dumps(depends_on), json.dumps(_normalize_list(fm.get('tags'))),
+            _scalar(fm.get('updated')),
+            st.st_mtime_ns, st.st_size,
+        )
+
+    def refresh(self) -> dict:
+        """Bring the index up to date. Only new or changed files are parsed."""
+        with self.lock:
+            conn = self.conn
+            # One read transaction: the rows and the generation they are at
+            conn.execute('BEGIN')
+            try:
+                generation = self.generation
+                known = {
+                    path: (mtime_ns, size)
+                    for path, mtime_ns, size in conn.execute('SELECT path, mtime_ns, size FROM files')
+                }
+            finally:
+                conn.execute('COMMIT')
+            self._observe(generation)
+
+            updates = []
+            seen = set()
+            for rel_path, abs_path, st in walk_documents(self.root):
+                seen.add(rel_path)
+                if known.get(rel_path) != (st.st_mtime_ns, st.st_size):
+                    updates.append(self._read_row(rel_path, abs_path, st))
+            removed = [path for path in known if path not in seen]
+            projects = self._apply(updates, removed, known)
+            self._publish_snapshot(projects)
+        return {'files': len(seen), 'updated': len(updates), 'removed': len(removed)}
+
+    def update_paths(self, paths) -> dict:
+        """
+        Bring the given files (absolute paths, e.g. from a filesystem watcher)
+        up to date without walking the tree. Paths outside the root, in dot
+        directories or without an indexed extension are ignored; missing
+        files are removed.
+        Returns {'updated': N, 'removed': N, 'projects': set of project slugs
+        whose project document or tasks changed}. When another process
+        wrote to the index since, the projects of every given path are
+        included, as it may already have stored their changes.
+        """
+        updates = []
+        removed = []
+        known = {}
+        prefix = self.root + os.sep
+        with self.lock:
+            generation = self.generation
+            foreign = self._observe(generation)
+            projects = set()
+            for abs_path in paths:
+                if not abs_path.startswith(prefix) or not abs_path.endswith(INDEXED_EXTENSIONS):
+                    continue
+                rel_path = abs_path[len(prefix):].replace(os.sep, '/')
+                if any(part.startswith('.') for part in rel_path.split('/')):
+                    continue
+                kind, project = classify_path(rel_path)
+                if foreign and kind in ('project', 'task'):
+                    projects.add(project)
+                row = self.conn.execute('SELECT mtime_ns, size FROM files WHERE path = ?', (rel_path,)).fetchone()
+                if row is not None:
+                    known[rel_path] = tuple(row)
+                try:
+                    st = os.stat(abs_path)
+                except OSError:
+                    st = None
+                if st is None or not S_ISREG(st.st_mode):
+                    if row is not None:
+                        removed.append(rel_path)
+                elif known.get(rel_path) != (st.st_mtime_ns, st.st_size):
+                    updates.append(self._read_row(rel_path, abs_path, st))
+            projects |= self._apply(updates, removed, known)
+            self._publish_snapshot(projects)
+        return {'updated': len(updates), 'removed': len(removed), 'projects': projects}
+
+    def _apply(self, updates: list, removed: list, known: dict) -> set:
+        """
+        Write new rows and delete removed paths (known: the previously
+        indexed paths among them). Returns the slugs of projects whose project
+        document or tasks changed.
+        """
+        if not updates and not removed:
+            return set()
+        conn = self.conn
+        projects = {row[2] for row in updates if row[1] in ('project', 'task')}
+        for path in removed:
+            kind, project = classify_path(path)
+            if kind in ('project', 'task'):
+                projects.add(project)
+
+        hyper_lock.begin_immediate(conn)
+        try:
+            current = self.generation
+            if self._observe(current):
+                # Another writer got the lock first
+                updates, removed = self._reconcile(updates, removed)
+
+            # Tasks whose dependencies may have changed, for the dependency orders
+            touched = {}
+            if self._orders:
+                for row in updates:
+                    if row[1] == 'task' and row[3] is not None:
+                        touched.setdefault(row[2], set()).add(row[3])
+                for path in [row[0] for row in updates if row[0] in known] + removed:
+                    old = conn.execute(
+                        "SELECT project, id FROM files WHERE path = ? AND kind = 'task' AND id IS NOT NULL",
+                        (path,),
+                    ).fetchone()
+                    if old is not None:
+                        touched.setdefault(old[0], set()).add(old[1])
+
+            conn.executemany(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', updates
+            )
+            stale = [(row[0],) for row in updates] + [(p,) for p in removed]
+            conn.executemany('DELETE FROM tags WHERE path = ?', stale)
+            conn.executemany('DELETE FROM files WHERE path = ?', [(p,) for p in removed])
+            conn.executemany('INSERT OR IGNORE INTO tags VALUES (?, ?)', [
+                (tag, row[0]) for row in updates for tag in json.loads(row[10])
+            ])
+            if updates or removed:
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+                current += 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._generation = current
+        self._update_orders(touched)
+        return projects
+
+    def _reconcile(self, updates: list, removed: list) -> tuple:
+        """
+        Drop the changes another writer already made (or superseded) since
+        they were read: rows whose stored copy is at least as new, and
+        removals of paths that were re-indexed or exist again.
+        """
+        stored = {}
+        for path in [row[0] for row in updates] + removed:
+            row = self.conn.execute('SELECT mtime_ns, size FROM files WHERE path = ?', (path,)).fetchone()
+            if row is not None:
+                stored[path] = tuple(row)
+        updates = [row for row in updates
+                   if row[0] not in stored or (stored[row[0]] != (row[12], row[13])
+                                               and stored[row[0]][0] <= row[12])]
+        removed = [path for path in removed
+                   if path in stored and not os.path.isfile(os.path.join(self.root, path))]
+        return updates, removed
+
+    @property
+    def snapshot_path(self):
+        """Where this index publishes its relationship snapshot; None for in-memory indexes."""
+        if self.db_path == ':memory:':
+            return None
+        return os.path.join(os.path.dirname(self.db_path), hyper_snapshot.SNAPSHOT_FILENAME)
+
+    def _publish_snapshot(self, projects: set) -> None:
+        """Publish the snapshot if a project or task changed, or none exists yet."""
+        path = self.snapshot_path
+        if path is None or not hyper_snapshot.snapshot_enabled():
+            return
+        if not projects and os.path.exists(path):
+            return
+        try:
+            self.publish_snapshot()
+        except OSError:
+            pass  # Read-only workspace: hooks fall back to the index
+
+    def publish_snapshot(self) -> bool:
+        """
+        Write the relationship snapshot (hyper_snapshot) of the indexed
+        projects and tasks, unless one of this generation or newer is already
+        published. Returns False, removing any previous snapshot, when the
+        workspace cannot be represented in one (see
+        hyper_snapshot.build_snapshot).
+        """
+        path = self.snapshot_path
+        projects = []
+        tasks = []
+        project_entries = []
+        task_entries = {}
+        with self.lock:
+            conn = self.conn
+            conn.execute('BEGIN')
+            try:
+                generation = self.generation
+                if hyper_snapshot.read_generation(path) >= generation:
+                    return True
+                rows = conn.execute(
+                    "SELECT path, kind, project, id, parent, status, depends_on, mtime_ns, size FROM files "
+                    "WHERE kind IN ('project', 'task') ORDER BY path"
+                ).fetchall()
+            finally:
+                conn.execute('COMMIT')
+        for rel_path, kind, project, doc_id, parent, status, depends_on, mtime_ns, size in rows:
+            if kind == 'project':
+                project_entries.append((project, mtime_ns, size))
+                if doc_id is not None:
+                    projects.append((doc_id, status))
+            else:
+                task_entries.setdefault(project, []).append((rel_path.rsplit('/', 1)[1], mtime_ns, size))
+                if doc_id is not None:
+                    tasks.append((project, doc_id, parent, status, json.loads(depends_on) if depends_on else []))
+
+        data = hyper_snapshot.build_snapshot(
+            projects, tasks, hyper_snapshot.stamp(project_entries),
+            {slug: hyper_snapshot.stamp(entries) for slug, entries in task_entries.items()},
+            generation=generation,
+        )
+        prepare_index_dir(self.db_path)
+        hyper_snapshot.publish(path, data, generation)
+        return data is not None
+
+    # ------------------------------------------------------------------
+    # Task numbers
+    # ------------------------------------------------------------------
+
+    def reserve_task_number(self, project_slug: str, prefix: str = 'task',
+                            ttl: float = RESERVATION_TTL) -> int:
+        """
+        Hand out the next free number for a task file of a project (prefix
+        'task' or 'verify-task') and reserve it. Numbers reserved more than
+        ttl seconds ago whose file was never written are reused first,
+        lowest first. Safe across threads and processes; costs one write
+        transaction and a stat per candidate number. Only the first number of
+        a project lists its tasks directory, to bring its rows up to date
+        before the counter is seeded from them.
+        Raises ValueError for an invalid project slug or prefix.
+        """
+        tasks_dir = _tasks_dir(self.root, project_slug, prefix)
+
+        def written(number: int) -> bool:
+            return os.path.lexists(os.path.join(tasks_dir, task_filename(prefix, number)))
+
+        key = (project_slug, prefix)
+        now = time.time_ns()
+        with self.lock:
+            conn = self.conn
+            # First number of this project: its counter is seeded from the rows
+            if conn.execute('SELECT 1 FROM task_counters WHERE project = ? AND prefix = ?', key).fetchone() is None:
+                self._update_tasks_dir(project_slug, tasks_dir)
+            hyper_lock.begin_immediate(conn)
+            try:
+                expired = conn.execute(
+                    'SELECT number FROM task_reservations WHERE project = ? AND prefix = ? AND free = 0 '
+                    'AND reserved_ns < ?', (*key, now - int(ttl * 1e9)),
+                ).fetchall()
+                for (number,) in expired:
+                    if written(number):
+                        self._forget_reservation(key, number)
+                    else:
+                        conn.execute('UPDATE task_reservations SET free = 1 '
+                                     'WHERE project = ? AND prefix = ? AND number = ?', (*key, number))
+
+                reserved = None
+                for (number,) in conn.execute(
+                    'SELECT number FROM task_reservations WHERE project = ? AND prefix = ? AND free = 1 '
+                    'ORDER BY number', key,
+                ).fetchall():
+                    if not written(number):
+                        reserved = number
+                        break
+                    # Written after all, only late
+                    self._forget_reservation(key, number)
+
+                if reserved is None:
+                    row = conn.execute('SELECT next FROM task_counters WHERE project = ? AND prefix = ?',
+                                       key).fetchone()
+                    reserved = row[0] if row is not None else self._first_task_number(*key)
+                    # Skip files created without a reservation
+                    while written(reserved):
+                        reserved += 1
+                    conn.execute('INSERT OR REPLACE INTO task_counters VALUES (?, ?, ?)', (*key, reserved + 1))
+
+                conn.execute('INSERT OR REPLACE INTO task_reservations VALUES (?, ?, ?, ?, 0)',
+                             (*key, reserved, now))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return reserved
+
+    def release_task_number(self, project_slug: str, number: int, prefix: str = 'task') -> bool:
+        """
+        Give back a reserved number whose file will not be written, so the
+        next reservation reuses it. Returns False when it was not reserved
+        or its file exists.
+        """
+        tasks_dir = _tasks_dir(self.root, project_slug, prefix)
+        key = (project_slug, prefix)
+        with self.lock:
+            conn = self.conn
+            hyper_lock.begin_immediate(conn)
+            try:
+                released = conn.execute(
+                    'UPDATE task_reservations SET free = 1 '
+                    'WHERE project = ? AND prefix = ? AND number = ? AND free = 0', (*key, number),
+                ).rowcount > 0
+                if released and os.path.lexists(os.path.join(tasks_dir, task_filename(prefix, number))):
+                    self._forget_reservation(key, number)
+                    released = False
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return released
+
+    def _forget_reservation(self, key: tuple, number: int) -> None:
+        self.conn.execute('DELETE FROM task_reservations WHERE project = ? AND prefix = ? AND number = ?',
+                          (*key, number))
+
+    def _update_tasks_dir(self, project_slug: str, tasks_dir: str) -> None:
+        """Bring the rows of a tasks directory up to date (new, changed and removed files)."""
+        try:
+            names = os.listdir(tasks_dir)
+        except OSError:
+            names = []
+        paths = {os.path.join(tasks_dir, name) for name in names}
+        rel_dir = os.path.relpath(tasks_dir, self.root).replace(os.sep, '/') + '/'
+        paths.update(
+            os.path.join(self.root, path)
+            for (path,) in self.conn.execute("SELECT path FROM files WHERE kind = 'task' AND project = ?",
+                                             (project_slug,))
+            if path.startswith(rel_dir)
+        )
+        self.update_paths(sorted(paths))
+
+    def _first_task_number(self, project_slug: str, prefix: str) -> int:
+        """One past the highest indexed number: where a project's counter starts."""
+        pattern = re.compile(rf'^{re.escape(prefix)}-(\d+)\.mdx$')
+        highest = 0
+        for (path,) in self.conn.execute("SELECT path FROM files WHERE kind = 'task' AND project = ?",
+                                         (project_slug,)):
+            match = pattern.match(path.rsplit('/', 1)[1])
+            if match is not None:
+                highest = max(highest, int(match.group(1)))
+        return highest + 1
+
+    def _update_orders(self, touched: dict) -> None:
+        for project_slug, task_ids in touched.items():
+            order = self._orders.get(project_slug)
+            if order is None:
+                continue
+            changes = {}
+            for task_id in task_ids:
+                # First file wins for duplicate ids, matching task_dependencies()
+                row = self.conn.execute(
+                    "SELECT depends_on FROM files WHERE kind = 'task' AND project = ? AND id = ? "
+                    "ORDER BY path LIMIT 1",
+                    (project_slug, task_id),
+                ).fetchone()
+                changes[task_id] = json.loads(row[0]) if row and row[0] else []
+            if not order.acyclic or not order.update(changes):
+                # A cycle on disk: rebuild (and fall back to full searches) next time
+                del self._orders[project_slug]
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def project_ids(self) -> list:
+        rows = self.conn.execute(
+            "SELECT id FROM files WHERE kind = 'project' AND id IS NOT NULL ORDER BY path"
+        )
+        return [row[0] for row in rows]
+
+    def task_ids(self, project_slug: str) -> list:
+        rows = self.conn.execute(
+            "SELECT id FROM files WHERE kind = 'task' AND project = ? AND id IS NOT NULL ORDER BY path",
+            (project_slug,),
+        )
+        return [row[0] for row in rows]
+
+    def task_dependencies(self, project_slug: str) -> dict:
+        """Map task id -> depends_on list for every task in a project."""
+        rows = self.conn.execute(
+            "SELECT id, depends_on FROM files WHERE kind = 'task' AND project = ? AND id IS NOT NULL ORDER BY path",
+            (project_slug,),
+        )
+        graph = {}
+        for task_id, depends_on in rows:
+            # First file wins for duplicate ids, matching a directory scan
+            graph.setdefault(task_id, json.loads(depends_on) if depends_on else [])
+        return graph
+
+    def dependency_order(self, project_slug: str) -> DependencyOrder:
+        """The project's dependency order, kept up to date by refresh()."""
+        order = self._orders.get(project_slug)
+        if order is None:
+            order = DependencyOrder.from_graph(self.task_dependencies(project_slug))
+            self._orders[project_slug] = order
+        return order
+
+    def workspace_graph(self) -> dict:
+        """
+        The project/task graph of the whole workspace:
+        {'project_ids': [...], 'tasks': {project_slug: {task_id: depends_on}},
+        'orders': {project_slug: DependencyOrder}}.
+        """
+        tasks = self.all_task_dependencies()
+        return {'project_ids': self.project_ids(), 'tasks': tasks,
+                'orders': {slug: self.dependency_order(slug) for slug in tasks}}
+
+    def all_task_dependencies(self) -> dict:
+        """Map project slug -> {task id -> depends_on list} for the whole workspace."""
+        rows = self.conn.execute(
+            "SELECT project, id, depends_on FROM files WHERE kind = 'task' AND id IS NOT NULL ORDER BY path"
+        )
+        projects = {}
+        for project, task_id, depends_on in rows:
+            projects.setdefault(project, {}).setdefault(
+                task_id, json.loads(depends_on) if depends_on else []
+            )
+        return projects
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(self, tags=None, updated_since: str = None, updated_before: str = None,
+              order_by: str = 'path', limit: int = None, **filters) -> list:
+        """
+        Documents matching every given filter, as dicts of QUERY_FIELDS.
+
+        filters: FILTER_COLUMNS as keywords; a list matches any of its values
+            (status=['blocked', 'todo'])
+        tags: a tag or list of tags the document must all carry
+        updated_since / updated_before: inclusive / exclusive bounds on the
+            'updated' date ('YYYY-MM-DD'); documents without one never match
+        order_by: 'path', 'updated' (newest first) or 'priority' (urgent first)
+
+        Call refresh() first unless stale results are acceptable.
+        """
+        unknown = set(filters) - set(FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown query filter: {', '.join(sorted(unknown))}")
+        if order_by not in ORDERINGS:
+            raise ValueError(f"Unknown ordering: {order_by} (expected one of {', '.join(ORDERINGS)})")
+
+        clauses = []
+        params = []
+        for column in FILTER_COLUMNS:
+            value = filters.get(column)
+            if value is None:
+                continue
+            values = _normalize_list(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        for tag in _normalize_list(tags):
+            clauses.append('path IN (SELECT path FROM tags WHERE tag = ?)')
+            params.append(tag)
+        if updated_since is not None:
+            clauses.append('updated >= ?')
+            params.append(str(updated_since))
+        if updated_before is not None:
+            clauses.append('updated < ?')
+            params.append(str(updated_before))
+
+        sql = f"SELECT {', '.join(QUERY_FIELDS)} FROM files"
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY ' + ORDERINGS[order_by]
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            doc = dict(zip(QUERY_FIELDS, row))
+            doc['depends_on'] = json.loads(doc['depends_on']) if doc['depends_on'] else []
+            doc['tags'] = json.loads(doc['tags']) if doc['tags'] else []
+            results.append(doc)
+        return results
+
+
+def open_index(root: str, parse_block):
+    """Open (creating if needed) the index for a workspace root, or None if unavailable."""
+    if not root or not index_enabled() or not os.path.isdir(root):
+        return None
+    index = WorkspaceIndex(root, parse_block)
+    try:
+        index.conn
+    except (sqlite3.Error, OSError):
+        return None
+    return index
+
+
+def _split_values(values: list):
+    """Flatten repeated and comma-separated CLI values; None when not given."""
+    if not values:
+        return None
+    return [v.strip() for value in values for v in value.split(',') if v.strip()]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Refresh or query the Hyper workspace index')
+    parser.add_argument('command', nargs='?', choices=['refresh', 'query', 'allocate', 'release'],
+                        default='refresh')
+    parser.add_argument('--root', type=str, help='Workspace root (default: resolved workspace)')
+    parser.add_argument('--prefix', choices=TASK_PREFIXES, default='task', help='Task file prefix (allocate, release)')
+    parser.add_argument('--number', type=int, help='Task number to give back (release)')
+    for column in FILTER_COLUMNS:
+        parser.add_argument(f'--{column}', action='append', metavar='VALUE',
+                            help=f'Match {column} (repeat or comma-separate for any of several)')
+    parser.add_argument('--tag', action='append', metavar='TAG', help='Require a tag (repeatable)')
+    parser.add_argument('--updated-since', type=str, metavar='DATE', help="'updated' on or after DATE")
+    parser.add_argument('--updated-before', type=str, metavar='DATE', help="'updated' before DATE")
+    parser.add_argument('--order-by', choices=list(ORDERINGS), default='path')
+    parser.add_argument('--limit', type=int)
+    args = parser.parse_args()
+
+    from hyper_validator import core as validator
+
+    root = args.root or validator.WORKSPACE_ROOT
+    if args.command in ('allocate', 'release'):
+        projects = _split_values(args.project) or []
+        if len(projects) != 1 or (args.command == 'release' and args.number is None):
+            needed = 'one --project' if args.command == 'allocate' else 'one --project and --number'
+            print(json.dumps({'success': False, 'error': {'message': f'{args.command} requires {needed}'}}))
+            sys.exit(2)
+        try:
+            if args.command == 'allocate':
+                result = validator.allocate_task_number(projects[0], args.prefix, root=root)
+            else:
+                result = validator.release_task_number(projects[0], args.number, args.prefix, root=root)
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(json.dumps({'success': False, 'error': {'message': str(e)}}))
+            sys.exit(1)
+        if result is None:
+            print(json.dumps({'success': False, 'error': {'message': 'No workspace found'}}))
+            sys.exit(1)
+        if args.command == 'allocate':
+            print(json.dumps({'success': True, 'root': root, **result}))
+        else:
+            print(json.dumps({'success': True, 'root': root, 'released': result}))
+        sys.exit(0)
+
+    if args.command == 'query':
+        results = validator.query_workspace(
+            root=root,
+            tags=_split_values(args.tag),
+            updated_since=args.updated_since,
+            updated_before=args.updated_before,
+            order_by=args.order_by,
+            limit=args.limit,
+            **{column: _split_values(getattr(args, column)) for column in FILTER_COLUMNS},
+        )
+        if results is None:
+            print(json.dumps({'success': False, 'error': {'message': 'No workspace found'}}))
+            sys.exit(1)
+        print(json.dumps({'success': True, 'root': root, 'count': len(results), 'results': results}))
+        sys.exit(0)
+
+    index = open_index(root, validator.parse_frontmatter_block)
+    if index is None:
+        print(json.dumps({'success': False, 'error': {'message': 'No workspace index available'}}))
+        sys.exit(1)
+    print(json.dumps({'success': True, 'root': root, **index.refresh()}))
+    sys.exit(0)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Hyper Validator Journal
+Local latency telemetry for validator hooks, so slow hooks show up as a
+trend instead of as agent timeouts.
+
+Every validation (PreToolUse, PostToolUse, each file of a batch run) appends
+one fixed-size binary record to <HyperHome>/telemetry/validator.v1.journal:
+
+  timestamp      float64  seconds since the epoch
+  mode           uint8    pre | pre-edit | post | batch
+  schema         uint8    document type inferred from the path
+  outcome        uint8    ok | invalid | skipped | error
+  total_ms       float32  wall time of the validation
+  <phase>_ms     float32  paths, read, parse, schema, index, relationships
+                          and cache (see hyper_metrics.PHASES)
+
+Records are written with a single O_APPEND write. When the journal reaches
+HYPER_JOURNAL_MAX_BYTES (default 4 MiB, about 95k records) it is rotated to
+validator.v1.journal.1, replacing the previous rotation. Rotation happens
+under a file lock (validator.v1.journal.lock, see hyper_lock) and re-checks
+the size once it holds it, so processes that cross the limit together rotate
+once instead of moving each other's fresh journal over the previous one.
+HYPER_JOURNAL_DIR overrides the location; HYPER_JOURNAL=off disables it.
+
+Usage:
+  python3 hyper_journal.py stats [--since SECONDS]   # p50/p95/p99 as JSON
+"""
+
+import os
+import struct
+import sys
+import time
+
+JOURNAL_FILENAME = 'validator.v1.journal'
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+# Seconds an append waits for another process's rotation
+ROTATE_LOCK_TIMEOUT = 0.5
+
+# Record layout (v1). Codes are indexes into these tuples; never reorder them.
+MODES = ('pre', 'pre-edit', 'post', 'batch')
+SCHEMA_TYPES = ('', 'project', 'task', 'resource', 'doc', 'artifact', 'note', 'other')
+OUTCOMES = ('ok', 'invalid', 'skipped', 'error')
+PHASES = ('paths', 'read', 'parse', 'schema', 'index', 'relationships', 'cache')
+
+RECORD = struct.Struct('<dBBBx' + 'f' * (1 + len(PHASES)))
+
+_MODE_CODES = {name: code for code, name in enumerate(MODES)}
+_SCHEMA_CODES = {name: code for code, name in enumerate(SCHEMA_TYPES)}
+_OUTCOME_CODES = {name: code for code, name in enumerate(OUTCOMES)}
+
+
+def journal_enabled() -> bool:
+    return os.environ.get('HYPER_JOURNAL', '').strip().lower() not in ('0', 'off', 'false', 'no')
+
+
+def max_bytes_from_env() -> int:
+    try:
+        value = int(os.environ.get('HYPER_JOURNAL_MAX_BYTES', ''))
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+    return max(value, RECORD.size)
+
+
+def journal_path() -> str:
+    """Journal file location (HYPER_JOURNAL_DIR, else <HyperHome>/telemetry)."""
+    directory = os.environ.get('HYPER_JOURNAL_DIR', '').strip()
+    if not directory:
+        import hyper_paths
+        hyper_home = hyper_paths.resolve_hyper_home(hyper_paths.detect_platform(), os.environ)
+        directory = os.path.join(hyper_home, 'telemetry')
+    return os.path.join(directory, JOURNAL_FILENAME)
+
+
+def encode(mode: str, schema: str, outcome: str, timings: dict, timestamp: float = None) -> bytes:
+    """Pack one record from a hyper_metrics timings dict (wall_ms, phases_ms)."""
+    phases_ms = timings.get('phases_ms') or {}
+    return RECORD.pack(
+        time.time() if timestamp is None else timestamp,
+        _MODE_CODES[mode],
+        _SCHEMA_CODES.get(schema or '', _SCHEMA_CODES['other']),
+        _OUTCOME_CODES[outcome],
+        timings.get('wall_ms') or 0.0,
+        *(phases_ms.get(name) or 0.0 for name in PHASES),
+    )
+
+
+def decode(data: bytes):
+    """Yield record dicts from journal bytes, skipping records with unknown codes."""
+    usable = len(data) - len(data) % RECORD.size
+    for fields in RECORD.iter_unpack(memoryview(data)[:usable]):
+        timestamp, mode, schema, outcome, total_ms = fields[:5]
+        if mode >= len(MODES) or schema >= len(SCHEMA_TYPES) or outcome >= len(OUTCOMES):
+            continue
+        yield {
+            'timestamp': timestamp,
+            'mode': MODES[mode],
+            'schema': SCHEMA_TYPES[schema],
+            'outcome': OUTCOMES[outcome],
+            'total_ms': total_ms,
+            'phases_ms': dict(zip(PHASES, fields[5:])),
+        }
+
+
+def append(records: list, path: str = None) -> None:
+    """
+    Append encoded records with one write, rotating a full journal first.
+    Telemetry is best effort: I/O errors are swallowed.
+    """
+    if not records or not journal_enabled():
+        return
+    try:
+        path = path or journal_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            max_bytes = max_bytes_from_env()
+            if os.path.getsize(path) >= max_bytes:
+                _rotate(path, max_bytes)
+        except FileNotFoundError:
+            pass
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, b''.join(records))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _rotate(path: str, max_bytes: int) -> None:
+    """Move a full journal to <path>.1, unless another process just did."""
+    import hyper_lock
+
+    try:
+        with hyper_lock.FileLock(path + '.lock', timeout=ROTATE_LOCK_TIMEOUT):
+            if os.path.getsize(path) >= max_bytes:
+                os.replace(path, path + '.1')
+    except TimeoutError:
+        pass  # Rotate on a later append; this record goes to the current file
+
+
+def read_records(path: str = None, since: float = None) -> list:
+    """All records from the rotated and current journal, oldest first."""
+    path = path or journal_path()
+    records = []
+    for source in (path + '.1', path):
+        try:
+            with open(source, 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        records.extend(r for r in decode(data) if since is None or r['timestamp'] >= since)
+    return records
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _group_stats(records: list) -> dict:
+    totals = sorted(r['total_ms'] for r in records)
+    timestamps = [r['timestamp'] for r in records]
+    span = max(timestamps) - min(timestamps)
+    outcomes = {}
+    for r in records:
+        outcomes[r['outcome']] = outcomes.get(r['outcome'], 0) + 1
+    return {
+        'count': len(records),
+        'p50_ms': round(percentile(totals, 50), 3),
+        'p95_ms': round(percentile(totals, 95), 3),
+        'p99_ms': round(percentile(totals, 99), 3),
+        'max_ms': round(totals[-1], 3),
+        # Validations per second over the time the group's records cover
+        'per_second': round(len(records) / span, 3) if span > 0 else None,
+        'outcomes': outcomes,
+        'phases_p50_ms': {
+            name: round(percentile(sorted(r['phases_ms'][name] for r in records), 50), 3)
+            for name in PHASES
+        },
+    }
+
+
+def summarize(records: list) -> dict:
+    """Latency percentiles and throughput per mode, and per mode and schema type."""
+    by_mode = {}
+    by_schema = {}
+    for r in records:
+        by_mode.setdefault(r['mode'], []).append(r)
+        by_schema.setdefault((r['mode'], r['schema']), []).append(r)
+    return {
+        'records': len(records),
+        'by_mode': {mode: _group_stats(group) for mode, group in sorted(by_mode.items())},
+        'by_schema': [
+            {'mode': mode, 'schema': schema or None, **_group_stats(group)}
+            for (mode, schema), group in sorted(by_schema.items())
+        ],
+    }
+
+
+def main(argv=None) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Hyper validator latency journal')
+    parser.add_argument('command', choices=['stats', 'path'])
+    parser.add_argument('--since', type=float, help='Only records from the last SECONDS')
+    parser.add_argument('--journal', type=str, help='Journal file (default: under HyperHome)')
+    args = parser.parse_args(argv)
+
+    path = args.journal or journal_path()
+    if args.command == 'path':
+        print(path)
+        return 0
+
+    since = time.time() - args.since if args.since else None
+    print(json.dumps({'success': True, 'journal': path, **summarize(read_records(path, since))}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
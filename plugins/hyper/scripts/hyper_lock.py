@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Hyper Lock Acquisition
+Retry-with-backoff acquisition of locks shared by concurrent hook processes:
+SQLite write transactions on the workspace index and result cache, and
+advisory file locks (flock) around publishing files such as the
+relationship snapshot. Where flock is unavailable (Windows has no fcntl),
+file locks are no-ops and callers run unserialized.
+
+SQLite's own busy handler waits silently; here a held lock is retried with
+exponential backoff (1 ms doubling to 50 ms) so contention can be measured.
+Time spent waiting is charged to the 'lock' phase of hyper_metrics, and each
+acquisition that found the lock held counts one lock_waits plus its
+lock_retries. Process-wide totals are kept in STATS for long-lived processes
+(the validator daemon reports them in its status).
+"""
+
+import os
+import sqlite3
+import time
+
+import hyper_metrics
+
+DEFAULT_TIMEOUT = 5.0
+FIRST_DELAY = 0.001
+MAX_DELAY = 0.05
+
+# Totals for this process
+STATS = {'acquired': 0, 'contended': 0, 'retries': 0, 'wait_ms': 0.0, 'timeouts': 0}
+
+
+def acquire(try_acquire, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """
+    Call try_acquire() until it returns True, backing off while it returns
+    False (lock held elsewhere). Exceptions propagate.
+    Returns False if the lock was still held after timeout seconds; a
+    timeout of 0 makes a single attempt.
+    """
+    if try_acquire():
+        STATS['acquired'] += 1
+        return True
+
+    start = time.perf_counter()
+    retries = 0
+    delay = FIRST_DELAY
+    acquired = False
+    with hyper_metrics.phase('lock'):
+        while time.perf_counter() - start < timeout:
+            time.sleep(min(delay, max(timeout - (time.perf_counter() - start), 0.0)))
+            retries += 1
+            if try_acquire():
+                acquired = True
+                break
+            delay = min(delay * 2, MAX_DELAY)
+
+    hyper_metrics.count('lock_waits')
+    hyper_metrics.count('lock_retries', retries)
+    STATS['contended'] += 1
+    STATS['retries'] += retries
+    STATS['wait_ms'] = round(STATS['wait_ms'] + (time.perf_counter() - start) * 1000, 3)
+    STATS['acquired' if acquired else 'timeouts'] += 1
+    return acquired
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def begin_immediate(conn: sqlite3.Connection, timeout: float = DEFAULT_TIMEOUT) -> None:
+    """
+    Start a write transaction (BEGIN IMMEDIATE) on an autocommit connection.
+    SQLite allows one writer per database; while another connection holds
+    the write lock this retries through acquire() instead of the
+    connection's busy handler, which is restored afterwards.
+    Raises sqlite3.OperationalError ('database is locked') on timeout.
+    """
+    busy_timeout = conn.execute('PRAGMA busy_timeout').fetchone()[0]
+
+    def attempt() -> bool:
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+        except sqlite3.OperationalError as e:
+            if _is_busy(e):
+                return False
+            raise
+        return True
+
+    conn.execute('PRAGMA busy_timeout=0')
+    try:
+        acquired = acquire(attempt, timeout)
+    finally:
+        conn.execute(f'PRAGMA busy_timeout={int(busy_timeout)}')
+    if not acquired:
+        raise sqlite3.OperationalError('database is locked')
+
+
+class FileLock:
+    """
+    Exclusive advisory lock (flock) on path, created if missing:
+
+        with FileLock(path):
+            ...
+
+    Raises TimeoutError when the lock is still held after timeout seconds.
+    Without fcntl (Windows) entering does not lock anything.
+    """
+
+    def __init__(self, path: str, timeout: float = DEFAULT_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+
+    def __enter__(self):
+        try:
+            import fcntl
+        except ImportError:
+            return self
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+
+        def attempt() -> bool:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            return True
+
+        try:
+            acquired = acquire(attempt, self.timeout)
+        except BaseException:
+            os.close(fd)
+            raise
+        if not acquired:
+            os.close(fd)
+            raise TimeoutError(f'{self.path} is locked')
+        self._fd = fd
+        return self
+
+    def __exit__(self, *exc_info):
+        # Closing the descriptor releases the lock
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        return False
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Hyper Validator Metrics
+Per-phase timings and I/O counters for a validation, so a slow hook can be
+traced to path resolution, parsing, schema checks or relationship lookups.
+
+    with hyper_metrics.collect() as metrics:
+        validator.pre_validate_response(path, content)
+    metrics.as_dict()
+
+Phases are exclusive: time spent in a nested phase (e.g. the index refresh
+inside relationship checks) is not also charged to the enclosing one, and
+time outside every phase is reported as 'other'.
+
+  Phases    paths, read, parse, schema, index, relationships, cache, lock
+            (waiting for a lock another process holds, see hyper_lock)
+  Counters  files_read, bytes_read, yaml_parses (frontmatter blocks parsed),
+            lock_waits (acquisitions that found the lock held), lock_retries
+  Memory    peak_memory_bytes, tracemalloc's peak above the starting level
+
+Instrumented code calls phase() and count(); both are no-ops unless a
+collector is active. The validator enables collection with --timings or
+HYPER_VALIDATOR_TIMINGS=1, and aggregate() sums per-file timings in batch runs.
+"""
+
+import os
+import time
+
+PHASES = ('paths', 'read', 'parse', 'schema', 'index', 'relationships', 'cache', 'lock')
+COUNTERS = ('files_read', 'bytes_read', 'yaml_parses', 'lock_waits', 'lock_retries')
+
+
+def timings_enabled() -> bool:
+    return os.environ.get('HYPER_VALIDATOR_TIMINGS', '').strip().lower() in ('1', 'on', 'true', 'yes')
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('metrics', 'name')
+
+    def __init__(self, metrics, name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.metrics._push(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._pop()
+        return False
+
+
+class Metrics:
+    """Timings and counters for one collection window."""
+
+    def __init__(self):
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.wall_seconds = 0.0
+        self.peak_memory_bytes = None
+        self._stack = []
+        self._mark = 0.0
+
+    def _charge(self, now: float) -> None:
+        if self._stack:
+            name = self._stack[-1]
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + (now - self._mark)
+        self._mark = now
+
+    def _push(self, name: str) -> None:
+        self._charge(time.perf_counter())
+        self._stack.append(name)
+
+    def _pop(self) -> None:
+        self._charge(time.perf_counter())
+        self._stack.pop()
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self) -> dict:
+        phases_ms = {name: round(seconds * 1000, 3) for name, seconds in self.phase_seconds.items()}
+        other = self.wall_seconds - sum(self.phase_seconds.values())
+        phases_ms['other'] = round(max(other, 0.0) * 1000, 3)
+        return {
+            'wall_ms': round(self.wall_seconds * 1000, 3),
+            'phases_ms': phases_ms,
+            **self.counters,
+            'peak_memory_bytes': self.peak_memory_bytes,
+        }
+
+
+# The collector instrumented code reports to (None when not collecting)
+_active = None
+
+
+def active():
+    return _active
+
+
+def phase(name: str):
+    """Context manager charging the enclosed time to a phase of the active collector."""
+    if _active is None:
+        return _NULL_PHASE
+    return _active.phase(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    if _active is not None:
+        _active.count(name, n)
+
+
+class collect:
+    """
+    Context manager that makes a new Metrics the active collector.
+    trace_memory starts tracemalloc (if it is not already tracing) to record
+    peak memory; it slows allocation-heavy code, so wall times run higher.
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.metrics = Metrics()
+        self.trace_memory = trace_memory
+        self._previous = None
+        self._started_tracing = False
+        self._baseline = 0
+        self._start = 0.0
+
+    def __enter__(self) -> Metrics:
+        global _active
+        if self.trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        self._previous = _active
+        _active = self.metrics
+        self._start = self.metrics._mark = time.perf_counter()
+        return self.metrics
+
+    def __exit__(self, *exc):
+        global _active
+        metrics = self.metrics
+        metrics.wall_seconds = time.perf_counter() - self._start
+        _active = self._previous
+        if self.trace_memory:
+            import tracemalloc
+            metrics.peak_memory_bytes = max(tracemalloc.get_traced_memory()[1] - self._baseline, 0)
+            if self._started_tracing:
+                tracemalloc.stop()
+        return False
+
+
+def measure(func, *args, **kwargs) -> tuple:
+    """Call func under a fresh collector. Returns (func's result, timings dict)."""
+    with collect() as metrics:
+        result = func(*args, **kwargs)
+    return result, metrics.as_dict()
+
+
+def aggregate(timings) -> dict:
+    """
+    Combine timings dicts (from Metrics.as_dict) into one: times and counters
+    are summed, peak memory is the largest peak, and 'files' counts inputs.
+    """
+    total = {'files': 0, 'wall_ms': 0.0, 'phases_ms': {}, **dict.fromkeys(COUNTERS, 0),
+             'peak_memory_bytes': None}
+    for item in timings:
+        if not item:
+            continue
+        total['files'] += 1
+        total['wall_ms'] += item.get('wall_ms', 0.0)
+        for name, ms in item.get('phases_ms', {}).items():
+            total['phases_ms'][name] = total['phases_ms'].get(name, 0.0) + ms
+        for name in COUNTERS:
+            total[name] += item.get(name, 0)
+        peak = item.get('peak_memory_bytes')
+        if peak is not None:
+            total['peak_memory_bytes'] = max(total['peak_memory_bytes'] or 0, peak)
+    total['wall_ms'] = round(total['wall_ms'], 3)
+    total['phases_ms'] = {name: round(ms, 3) for name, ms in total['phases_ms'].items()}
+    return total
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Hyper Path Resolution (Python)
+Native implementation of the resolution rules in resolve-paths.sh, for Python
+tooling that cannot afford a `bash -c 'source resolve-paths.sh'` per call.
+
+Resolution order matches the shell script:
+  Platform       - macos | linux | windows | unknown
+  HyperHome      - ~/.hyper, $XDG_DATA_HOME/hyper (Linux, if it exists),
+                   %USERPROFILE%/.hyper or %LOCALAPPDATA%/Hyper (Windows)
+  Account        - activeAccountId from $HYPER_HOME/active-account.json, else "local"
+  Personal Drive - $HYPER_HOME/accounts/<account>/hyper/notes
+  Workspace      - CWD lookup in <account root>/workspaces.json, then the
+                   legacy .hyper/workspace.json in the CWD
+
+Results are memoized in-process and in a small on-disk cache keyed on the
+relevant environment variables, the CWD and resolve-paths.sh's mtime. Each
+entry also records the files the result was derived from (registry, active
+account, workspace directory), so edits to those invalidate it.
+
+Usage:
+  python3 hyper_paths.py            # Print resolved paths as JSON
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOLVER_PATH = os.path.join(SCRIPT_DIR, 'resolve-paths.sh')
+
+# Environment variables that influence resolution
+PATH_ENV_VARS = ('HOME', 'USERPROFILE', 'LOCALAPPDATA', 'XDG_DATA_HOME')
+
+CACHE_FILENAME = 'paths.json'
+MAX_CACHE_ENTRIES = 32
+
+_memo = {}
+
+
+def cache_dir(env=None) -> str:
+    """Directory for Hyper's local caches (override with HYPER_CACHE_DIR)."""
+    env = os.environ if env is None else env
+    override = env.get('HYPER_CACHE_DIR', '').strip()
+    if override:
+        return override
+    xdg_cache = env.get('XDG_CACHE_HOME', '').strip()
+    if xdg_cache:
+        return os.path.join(xdg_cache, 'hyper')
+    if detect_platform() == 'windows' and env.get('LOCALAPPDATA'):
+        return os.path.join(env['LOCALAPPDATA'], 'Hyper', 'cache')
+    return os.path.join(env.get('HOME') or os.path.expanduser('~'), '.cache', 'hyper')
+
+
+# ==============================================================================
+# Resolution rules (mirror resolve-paths.sh)
+# ==============================================================================
+
+def detect_platform() -> str:
+    try:
+        os_name = os.uname().sysname
+    except AttributeError:
+        return 'windows'
+    if os_name.startswith('Darwin'):
+        return 'macos'
+    if os_name.startswith('Linux'):
+        return 'linux'
+    if os_name.startswith(('CYGWIN', 'MINGW', 'MSYS')):
+        return 'windows'
+    return 'unknown'
+
+
+def resolve_hyper_home(platform: str, env) -> str:
+    home = env.get('HOME', '')
+    if platform == 'windows':
+        if env.get('USERPROFILE'):
+            return f"{env['USERPROFILE']}/.hyper"
+        if env.get('LOCALAPPDATA'):
+            return f"{env['LOCALAPPDATA']}/Hyper"
+        return f"{home}/.hyper"
+
+    hyper_home = f"{home}/.hyper"
+    # Linux: Respect XDG Base Directory Specification, only if the user created it
+    xdg_data = env.get('XDG_DATA_HOME', '')
+    if platform == 'linux' and xdg_data and os.path.isdir(f"{xdg_data}/hyper"):
+        hyper_home = f"{xdg_data}/hyper"
+    return hyper_home
+
+
+def _read_json(path: str):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def resolve_account_id(hyper_home: str) -> str:
+    data = _read_json(f"{hyper_home}/active-account.json")
+    if isinstance(data, dict):
+        account_id = data.get('activeAccountId')
+        if account_id and isinstance(account_id, str):
+            return account_id
+    return 'local'
+
+
+def resolve_workspace_id(account_root: str, cwd: str) -> str:
+    physical_cwd = os.path.realpath(cwd)
+    registry = _read_json(f"{account_root}/workspaces.json")
+    if isinstance(registry, dict) and isinstance(registry.get('workspaces'), list):
+        for workspace in registry['workspaces']:
+            if isinstance(workspace, dict) and workspace.get('localPath') == physical_cwd:
+                workspace_id = workspace.get('id')
+                if workspace_id:
+                    return str(workspace_id)
+
+    # Legacy local .hyper directory
+    legacy = _read_json(os.path.join(cwd, '.hyper', 'workspace.json'))
+    if isinstance(legacy, dict):
+        return str(legacy.get('workspaceId') or legacy.get('id') or '')
+    return ''
+
+
+def resolve_workspace_root(account_root: str, workspace_id: str, cwd: str) -> str:
+    if not workspace_id:
+        return ''
+    workspace_root = f"{account_root}/workspaces/{workspace_id}"
+    if os.path.isdir(workspace_root):
+        return workspace_root
+    # Fall back to legacy local .hyper if HyperHome doesn't exist
+    legacy_dir = os.path.join(cwd, '.hyper')
+    if os.path.isdir(legacy_dir) and os.path.isfile(os.path.join(legacy_dir, 'workspace.json')):
+        return f"{cwd}/.hyper"
+    return ''
+
+
+def _resolve_uncached(cwd: str, env) -> dict:
+    platform = detect_platform()
+    hyper_home = resolve_hyper_home(platform, env)
+    account_id = resolve_account_id(hyper_home)
+    account_root = f"{hyper_home}/accounts/{account_id}/hyper"
+    workspace_id = resolve_workspace_id(account_root, cwd)
+    return {
+        'platform': platform,
+        'home': hyper_home,
+        'account_id': account_id,
+        'account_root': account_root,
+        'personal_drive': f"{account_root}/notes",
+        'workspace_id': workspace_id,
+        'workspace_root': resolve_workspace_root(account_root, workspace_id, cwd),
+    }
+
+
+# ==============================================================================
+# Memoization
+# ==============================================================================
+
+def _stamp(path: str):
+    """Cheap change marker for a dependency: mtime for files, True for dirs, None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if os.path.isdir(path):
+        return True
+    return st.st_mtime_ns
+
+
+def _dependencies(paths: dict, cwd: str, env) -> list:
+    deps = [
+        f"{paths['home']}/active-account.json",
+        f"{paths['account_root']}/workspaces.json",
+        os.path.join(cwd, '.hyper', 'workspace.json'),
+        os.path.join(cwd, '.hyper'),
+    ]
+    if env.get('XDG_DATA_HOME'):
+        deps.append(f"{env['XDG_DATA_HOME']}/hyper")
+    if paths['workspace_id']:
+        deps.append(f"{paths['account_root']}/workspaces/{paths['workspace_id']}")
+    return deps
+
+
+def _cache_key(cwd: str, env) -> str:
+    try:
+        resolver_mtime = os.stat(RESOLVER_PATH).st_mtime_ns
+    except OSError:
+        resolver_mtime = None
+    material = json.dumps([[env.get(name, '') for name in PATH_ENV_VARS], cwd, resolver_mtime])
+    return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+
+def _entry_is_fresh(entry) -> bool:
+    if not isinstance(entry, dict) or not isinstance(entry.get('deps'), dict):
+        return False
+    return all(_stamp(path) == stamp for path, stamp in entry['deps'].items())
+
+
+def _load_disk_cache(path: str) -> dict:
+    data = _read_json(path)
+    return data if isinstance(data, dict) else {}
+
+
+def _store_disk_cache(path: str, key: str, entry: dict) -> None:
+    cache = _load_disk_cache(path)
+    cache.pop(key, None)
+    cache[key] = entry
+    # Oldest entries first (dicts keep insertion order)
+    while len(cache) > MAX_CACHE_ENTRIES:
+        cache.pop(next(iter(cache)))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Cache is best-effort
+
+
+def resolve_paths(cwd: str = None, env=None) -> dict:
+    """
+    Resolve Hyper paths for a working directory and environment.
+    Returns a dict with platform, home, account_id, account_root,
+    personal_drive, workspace_id and workspace_root ('' when not in a workspace).
+    """
+    env = os.environ if env is None else env
+    cwd = cwd or os.getcwd()
+    key = _cache_key(cwd, env)
+
+    entry = _memo.get(key)
+    if entry is not None and _entry_is_fresh(entry):
+        return dict(entry['paths'])
+
+    cache_path = os.path.join(cache_dir(env), CACHE_FILENAME)
+    entry = _load_disk_cache(cache_path).get(key)
+    if not _entry_is_fresh(entry):
+        paths = _resolve_uncached(cwd, env)
+        entry = {
+            'paths': paths,
+            'deps': {path: _stamp(path) for path in _dependencies(paths, cwd, env)},
+        }
+        _store_disk_cache(cache_path, key, entry)
+
+    _memo[key] = entry
+    return dict(entry['paths'])
+
+
+def clear_cache() -> None:
+    """Forget in-process memoized results (the disk cache revalidates itself)."""
+    _memo.clear()
+
+
+if __name__ == '__main__':
+    print(json.dumps(resolve_paths(), indent=2))
+    sys.exit(0)
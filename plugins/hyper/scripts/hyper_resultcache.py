@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Hyper Validation Result Cache
+Persistent, content-addressed cache of validation verdicts.
+
+Agents often rewrite a file with identical content or retry a Write after it
+was blocked; with this cache the validator answers those from a single
+SQLite lookup instead of re-running the parse and relationship pipeline.
+
+Each entry is keyed by a BLAKE2b hash of:
+  - the file path, its content and the workspace root
+  - the compiled schema digest (hyper_schema.SchemaSet.digest, a hash of
+    every schemas/*.json file's content)
+  - a digest of the project/task set the file's relationships were checked
+    against (empty for non-task documents)
+  - a stamp of the validator's own source files (the scripts directory and
+    the hyper_validator package)
+  - the effective frontmatter parse limits (hyper_frontmatter.parse_limits,
+    HYPER_FRONTMATTER_MAX_*), which decide whether a file is rejected as
+    too complex
+
+so verdicts are reused only while all of those are unchanged. The cache
+lives in <cache dir>/results.sqlite, holds at most HYPER_RESULT_CACHE_MAX
+entries (default 10000) and evicts the least recently used ones first. The
+entry count is kept in a meta row updated with each store, so checking the
+limit costs no table scan. HYPER_RESULT_CACHE=off disables it.
+
+Every hook process shares the one cache file. Lookups never wait for the
+write lock: a hit whose recency stamp cannot be updated right away is still
+a hit. Stores wait at most PUT_LOCK_TIMEOUT and are dropped after that (see
+hyper_lock for the contention metrics). Within a process, one connection is
+shared by all threads (the daemon's request threads) under a lock.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import hyper_frontmatter
+import hyper_lock
+
+CACHE_FILENAME = 'results.sqlite'
+
+# Bump when the key derivation or stored value layout changes
+FORMAT_VERSION = 2
+
+DEFAULT_MAX_ENTRIES = 10000
+
+# Evicting down to this fraction of the limit amortizes the DELETE across puts
+EVICT_TO = 0.9
+
+# Seconds a store waits for another process's write to finish
+PUT_LOCK_TIMEOUT = 0.25
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Directories whose Python sources make up the validator (as hyper_daemon.SOURCE_DIRS)
+SOURCE_DIRS = (SCRIPT_DIR, os.path.join(SCRIPT_DIR, 'hyper_validator'))
+
+
+def cache_enabled() -> bool:
+    return os.environ.get('HYPER_RESULT_CACHE', '').strip().lower() not in ('0', 'off', 'false', 'no')
+
+
+def max_entries_from_env() -> int:
+    try:
+        value = int(os.environ.get('HYPER_RESULT_CACHE_MAX', ''))
+    except ValueError:
+        return DEFAULT_MAX_ENTRIES
+    return value if value > 0 else DEFAULT_MAX_ENTRIES
+
+
+_code_stamp = None
+
+
+def code_stamp() -> str:
+    """Digest of the validator's source files (name, mtime, size), computed once per process."""
+    global _code_stamp
+    if _code_stamp is None:
+        digest = hashlib.blake2b(digest_size=16)
+        for directory in SOURCE_DIRS:
+            for path in sorted(glob.glob(os.path.join(directory, '*.py'))):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                name = os.path.relpath(path, SCRIPT_DIR)
+                digest.update(f'{name}:{st.st_mtime_ns}:{st.st_size}\0'.encode())
+        _code_stamp = digest.hexdigest()
+    return _code_stamp
+
+
+def relationship_digest(graph: dict) -> str:
+    """
+    Digest of a relationship graph ({'project_ids': [...], 'tasks': {...}}).
+    Order is kept: it decides which ids appear in error suggestions.
+    Dependency orders are derived from 'tasks' and left out.
+    """
+    payload = json.dumps([graph['project_ids'], graph['tasks']], separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def result_key(file_path: str, content: str, schema_digest: str, workspace_root: str = '',
+               relationships: str = '') -> str:
+    """Cache key for validating content at file_path under the given schemas and relationships."""
+    digest = hashlib.blake2b(digest_size=20)
+    limits = json.dumps(hyper_frontmatter.parse_limits(), sort_keys=True, separators=(',', ':'))
+    header = (f'v{FORMAT_VERSION}\0{code_stamp()}\0{limits}\0{schema_digest}\0{workspace_root}\0'
+              f'{relationships}\0{file_path}\0')
+    digest.update(header.encode('utf-8'))
+    digest.update(content.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU-bounded SQLite map of cache key -> (is_valid, errors)."""
+
+    def __init__(self, db_path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._conn = None
+        # Serializes use of the connection: the daemon's request threads share one cache
+        self.lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        if conn.execute('PRAGMA user_version').fetchone()[0] != FORMAT_VERSION:
+            self._create_schema(conn)
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        hyper_lock.begin_immediate(conn)
+        if conn.execute('PRAGMA user_version').fetchone()[0] == FORMAT_VERSION:
+            # Another process created it while we waited for the lock
+            conn.execute('COMMIT')
+            return
+        try:
+            conn.execute('DROP TABLE IF EXISTS results')
+            conn.execute('DROP TABLE IF EXISTS meta')
+            conn.execute('''
+                CREATE TABLE results (
+                    key TEXT PRIMARY KEY,
+                    valid INTEGER NOT NULL,
+                    errors TEXT,
+                    used_ns INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX results_used ON results (used_ns)')
+            conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            conn.execute("INSERT INTO meta VALUES ('rows', 0)")
+            conn.execute(f'PRAGMA user_version={FORMAT_VERSION}')
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def close(self) -> None:
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT value FROM meta WHERE key = 'rows'").fetchone()[0]
+
+    def get(self, key: str):
+        """
+        Return the cached (is_valid, errors_or_none) for key, or None on a miss.
+        An unreadable or damaged cache counts as a miss.
+        """
+        with self.lock:
+            try:
+                row = self.conn.execute('SELECT valid, errors FROM results WHERE key = ?', (key,)).fetchone()
+            except sqlite3.Error:
+                return None
+            if row is None:
+                return None
+            self._touch(key)
+        return bool(row[0]), json.loads(row[1]) if row[1] else None
+
+    def _touch(self, key: str) -> None:
+        """Mark key recently used, unless another process is writing."""
+        conn = self.conn
+        try:
+            hyper_lock.begin_immediate(conn, timeout=0)
+        except sqlite3.Error:
+            return
+        try:
+            conn.execute('UPDATE results SET used_ns = ? WHERE key = ?', (time.time_ns(), key))
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+
+    def put(self, key: str, is_valid: bool, errors) -> None:
+        """Store a verdict, evicting least recently used entries beyond max_entries."""
+        with self.lock:
+            try:
+                conn = self.conn
+                hyper_lock.begin_immediate(conn, timeout=PUT_LOCK_TIMEOUT)
+            except sqlite3.Error:
+                return  # Caching is best effort; the verdict was already computed
+            try:
+                added = conn.execute('SELECT 1 FROM results WHERE key = ?', (key,)).fetchone() is None
+                conn.execute(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                    (key, int(bool(is_valid)), json.dumps(errors) if errors else None, time.time_ns()),
+                )
+                if added:
+                    self._count(1)
+                if len(self) > self.max_entries:
+                    keep = max(1, int(self.max_entries * EVICT_TO))
+                    evicted = conn.execute(
+                        'DELETE FROM results WHERE key IN '
+                        '(SELECT key FROM results ORDER BY used_ns DESC LIMIT -1 OFFSET ?)',
+                        (keep,),
+                    ).rowcount
+                    self._count(-evicted)
+                conn.execute('COMMIT')
+            except sqlite3.Error:
+                conn.execute('ROLLBACK')
+
+    def _count(self, delta: int) -> None:
+        self.conn.execute("UPDATE meta SET value = value + ? WHERE key = 'rows'", (delta,))
+
+    def clear(self) -> None:
+        with self.lock:
+            conn = self.conn
+            hyper_lock.begin_immediate(conn)
+            try:
+                conn.execute('DELETE FROM results')
+                conn.execute("UPDATE meta SET value = 0 WHERE key = 'rows'")
+                conn.execute('COMMIT')
+            except sqlite3.Error:
+                conn.execute('ROLLBACK')
+                raise
+
+
+def open_cache(db_path: str = None):
+    """Open the result cache, or return None when it is disabled or unavailable."""
+    if not cache_enabled():
+        return None
+    if db_path is None:
+        import hyper_paths
+        db_path = os.path.join(hyper_paths.cache_dir(), CACHE_FILENAME)
+    cache = ResultCache(db_path, max_entries_from_env())
+    try:
+        cache.conn
+    except (sqlite3.Error, OSError):
+        return None
+    return cache
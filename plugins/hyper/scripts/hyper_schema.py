@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Hyper Schema Engine
+Loads the declarative document schemas in scripts/schemas/ and compiles them
+into lookup structures the validator can check in constant time per field.
+
+Each <type>.json (or .yaml/.yml, when PyYAML is installed) file describes one
+document type:
+
+  type              document type name (defaults to the file name)
+  required          fields that must be present
+  optional          fields that may be present
+  enums             field -> allowed values (frozensets once compiled)
+  filename          regex the file name must match (optional)
+  filename_example  file name shown in INVALID_FILENAME suggestions
+
+_common.json holds the values accepted when a schema does not narrow them
+(types, statuses, priorities) plus the date fields and their pattern.
+
+Compiled definitions are cached in <cache dir>/schemas.json keyed by a hash of
+the schema files' names and contents, so unchanged schemas are never re-parsed
+or re-validated; adding a schema only means adding a file.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemas')
+COMMON_FILENAME = '_common.json'
+CACHE_FILENAME = 'schemas.json'
+
+# Bump when the normalized definition layout changes
+FORMAT_VERSION = 1
+
+SCHEMA_EXTENSIONS = ('.json', '.yaml', '.yml')
+SCHEMA_KEYS = frozenset(('type', 'description', 'required', 'optional', 'enums', 'filename', 'filename_example'))
+COMMON_KEYS = frozenset(('description', 'types', 'statuses', 'priorities', 'date_fields', 'date_pattern'))
+
+
+class SchemaError(ValueError):
+    """A schema file is missing, unreadable or malformed."""
+
+
+class EnumField:
+    """Allowed values for one field: ordered for messages, a frozenset for lookups."""
+
+    __slots__ = ('values', 'members')
+
+    def __init__(self, values):
+        self.values = tuple(values)
+        self.members = frozenset(self.values)
+
+    def __contains__(self, value) -> bool:
+        try:
+            return value in self.members
+        except TypeError:
+            return False  # Unhashable values (lists, dicts) are never allowed
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+class DocumentSchema:
+    """Compiled schema for one document type."""
+
+    __slots__ = ('name', 'required', 'optional', 'enums', 'filename_re', 'filename_example')
+
+    def __init__(self, name: str, required, optional, enums: dict, filename: str = None,
+                 filename_example: str = None):
+        self.name = name
+        self.required = tuple(required)
+        self.optional = frozenset(optional)
+        self.enums = {field: EnumField(values) for field, values in enums.items()}
+        self.filename_re = re.compile(filename) if filename else None
+        self.filename_example = filename_example
+
+    def enum(self, field: str, default: EnumField = None) -> EnumField:
+        return self.enums.get(field, default)
+
+    def filename_matches(self, filename: str) -> bool:
+        return self.filename_re is None or self.filename_re.match(filename) is not None
+
+
+# Schema used for locations that map to no document type
+FALLBACK_SCHEMA = DocumentSchema('', ['id', 'title'], [], {})
+
+
+class SchemaSet:
+    """All compiled document schemas plus the shared defaults."""
+
+    def __init__(self, definition: dict):
+        common = definition['common']
+        self.digest = definition['digest']
+        self.types = EnumField(common['types'])
+        self.statuses = EnumField(common['statuses'])
+        self.priorities = EnumField(common['priorities'])
+        self.date_fields = tuple(common['date_fields'])
+        self.date_re = re.compile(common['date_pattern'])
+        self.schemas = {
+            name: DocumentSchema(name, spec['required'], spec['optional'], spec['enums'],
+                                 spec['filename'], spec['filename_example'])
+            for name, spec in definition['schemas'].items()
+        }
+
+    def get(self, doc_type: str) -> DocumentSchema:
+        """Schema for a document type, or FALLBACK_SCHEMA for unknown types."""
+        return self.schemas.get(doc_type) or FALLBACK_SCHEMA
+
+
+# ----------------------------------------------------------------------
+# Loading and normalization
+# ----------------------------------------------------------------------
+
+def _schema_files(schema_dir: str) -> list:
+    try:
+        names = sorted(os.listdir(schema_dir))
+    except OSError as e:
+        raise SchemaError(f'Cannot read schema directory {schema_dir}: {e}')
+    files = [os.path.join(schema_dir, name) for name in names if name.endswith(SCHEMA_EXTENSIONS)]
+    if COMMON_FILENAME not in names:
+        raise SchemaError(f'Missing {COMMON_FILENAME} in {schema_dir}')
+    return files
+
+
+def _digest(contents: dict) -> str:
+    digest = hashlib.sha256(f'v{FORMAT_VERSION}'.encode())
+    for path in sorted(contents):
+        digest.update(os.path.basename(path).encode() + b'\0' + contents[path] + b'\0')
+    return digest.hexdigest()
+
+
+def _decode(path: str, raw: bytes):
+    text = raw.decode('utf-8')
+    if path.endswith('.json'):
+        return json.loads(text)
+    try:
+        import yaml
+    except ImportError:
+        raise SchemaError(f'{os.path.basename(path)}: PyYAML is required for YAML schema files')
+    return yaml.safe_load(text)
+
+
+def _string_list(value, where: str) -> list:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise SchemaError(f'{where} must be a list of strings')
+    return value
+
+
+def _normalize_common(raw, source: str) -> dict:
+    if not isinstance(raw, dict):
+        raise SchemaError(f'{source}: expected a mapping')
+    unknown = set(raw) - COMMON_KEYS
+    if unknown:
+        raise SchemaError(f"{source}: unknown keys: {', '.join(sorted(unknown))}")
+    common = {key: _string_list(raw.get(key, []), f'{source}: {key}')
+              for key in ('types', 'statuses', 'priorities', 'date_fields')}
+    common['date_pattern'] = raw.get('date_pattern', r'^\d{4}-\d{2}-\d{2}$')
+    _check_regex(common['date_pattern'], f'{source}: date_pattern')
+    return common
+
+
+def _normalize_schema(raw, source: str) -> dict:
+    if not isinstance(raw, dict):
+        raise SchemaError(f'{source}: expected a mapping')
+    unknown = set(raw) - SCHEMA_KEYS
+    if unknown:
+        raise SchemaError(f"{source}: unknown keys: {', '.join(sorted(unknown))}")
+    enums = raw.get('enums') or {}
+    if not isinstance(enums, dict):
+        raise SchemaError(f'{source}: enums must be a mapping')
+    spec = {
+        'required': _string_list(raw.get('required', []), f'{source}: required'),
+        'optional': _string_list(raw.get('optional', []), f'{source}: optional'),
+        'enums': {field: _string_list(values, f'{source}: enums.{field}') for field, values in enums.items()},
+        'filename': raw.get('filename'),
+        'filename_example': raw.get('filename_example'),
+    }
+    if spec['filename'] is not None:
+        _check_regex(spec['filename'], f'{source}: filename')
+    return spec
+
+
+def _check_regex(pattern, where: str) -> None:
+    if not isinstance(pattern, str):
+        raise SchemaError(f'{where} must be a string')
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise SchemaError(f'{where}: invalid regex: {e}')
+
+
+def compile_definition(contents: dict, digest: str) -> dict:
+    """Parse and validate raw schema files into the normalized (JSON-safe) definition."""
+    definition = {'digest': digest, 'common': None, 'schemas': {}}
+    for path in sorted(contents):
+        source = os.path.basename(path)
+        try:
+            raw = _decode(path, contents[path])
+        except SchemaError:
+            raise
+        except Exception as e:  # JSON, YAML or UTF-8 decode errors
+            raise SchemaError(f'{source}: {e}')
+        if source == COMMON_FILENAME:
+            definition['common'] = _normalize_common(raw, source)
+            continue
+        name = raw.get('type') if isinstance(raw, dict) and raw.get('type') else os.path.splitext(source)[0]
+        if name in definition['schemas']:
+            raise SchemaError(f"{source}: duplicate schema for type '{name}'")
+        definition['schemas'][name] = _normalize_schema(raw, source)
+    return definition
+
+
+def _read_cache(cache_path: str, digest: str):
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if isinstance(cached, dict) and cached.get('digest') == digest:
+        return cached
+    return None
+
+
+def _write_cache(cache_path: str, definition: dict) -> None:
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(definition, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# In-process memo: schema_dir -> (file stamps, SchemaSet)
+_memo = {}
+
+
+def load_schemas(schema_dir: str = None, cache_path: str = None) -> SchemaSet:
+    """
+    Load the compiled schemas for schema_dir (default: scripts/schemas).
+    Files are re-read only when their mtime/size change; they are re-parsed
+    only when their content hash differs from the on-disk cache.
+    Raises SchemaError for missing or malformed schema files.
+    """
+    schema_dir = schema_dir or SCHEMA_DIR
+    files = _schema_files(schema_dir)
+    stamps = []
+    for path in files:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            raise SchemaError(f'Cannot read {path}: {e}')
+        stamps.append((path, st.st_mtime_ns, st.st_size))
+    stamps = tuple(stamps)
+
+    memo = _memo.get(schema_dir)
+    if memo is not None and memo[0] == stamps:
+        return memo[1]
+
+    contents = {}
+    for path in files:
+        try:
+            with open(path, 'rb') as f:
+                contents[path] = f.read()
+        except OSError as e:
+            raise SchemaError(f'Cannot read {path}: {e}')
+    digest = _digest(contents)
+
+    if cache_path is None:
+        import hyper_paths
+        cache_path = os.path.join(hyper_paths.cache_dir(), CACHE_FILENAME)
+    definition = _read_cache(cache_path, digest)
+    if definition is None:
+        definition = compile_definition(contents, digest)
+        _write_cache(cache_path, definition)
+
+    schema_set = SchemaSet(definition)
+    _memo[schema_dir] = (stamps, schema_set)
+    return schema_set
+
+
+def clear_cache() -> None:
+    """Forget in-process compiled schemas (the on-disk cache is keyed by content)."""
+    _memo.clear()
+
+
+if __name__ == '__main__':
+    import sys
+
+    try:
+        schema_set = load_schemas(sys.argv[1] if len(sys.argv) > 1 else None)
+    except SchemaError as e:
+        print(json.dumps({'success': False, 'error': {'message': str(e)}}))
+        sys.exit(1)
+    print(json.dumps({'success': True, 'digest': schema_set.digest, 'types': sorted(schema_set.schemas)}))
+    sys.exit(0)
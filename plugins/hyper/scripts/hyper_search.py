@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Hyper Full-Text Search
+Incrementally-updated inverted index over the bodies of workspace documents
+(projects, tasks, resources, docs; artifacts when the personal drive is
+searched), ranked with BM25.
+
+The index lives next to the frontmatter index in
+<root>/.index/search.sqlite (SQLite, WAL mode):
+
+  docs      doc_id, path, kind, project, title, length (tokens), term ids,
+            mtime, size
+  terms     term_id, term
+  postings  (term_id, doc_id) -> tf, positions
+
+Positions (and each document's term ids, used to delete its postings) are
+stored as delta-encoded varints, so a posting costs a few bytes per
+occurrence. A refresh walks the tree with stat() only and
+re-tokenizes just the files whose mtime/size changed. Writers take the write
+lock through hyper_lock and re-read the rows of the files they are about to
+replace inside the write transaction, so concurrent refreshes of one root
+neither duplicate nor clobber each other's rows.
+
+Text is lowercased and split into runs of letters and digits (so `task-001`
+is the tokens `task`, `001`); JSX/HTML tags and MDX import/export lines are
+skipped and the title is indexed ahead of the body. Queries are words plus
+"quoted phrases": documents must contain every phrase, and are ranked by
+BM25 (k1=1.2, b=0.75) over all query words.
+
+BM25 scores depend on collection statistics (document count, average
+length, each term's document frequency). To rank documents from several
+roots (workspace and personal drive) against each other, take statistics()
+of each index, add them up with merge_statistics() and pass the result to
+every index's search(), so all scores are computed over the combined
+collection.
+
+Usage:
+  python3 hyper_search.py search QUERY... [--root DIR] [--all] [--kind task] [--limit N]
+  python3 hyper_search.py refresh [--root DIR]   # Refresh and print stats as JSON
+"""
+
+import heapq
+import math
+import os
+import re
+import sqlite3
+import sys
+
+import hyper_lock
+from hyper_frontmatter import FrontmatterTooLarge, read_document
+from hyper_index import INDEX_DIRNAME, classify_path, index_enabled, prepare_index_dir, walk_documents
+
+SEARCH_FILENAME = 'search.sqlite'
+
+# Bump when the table layout or tokenization changes; older index files are rebuilt
+SCHEMA_VERSION = 1
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+MAX_TOKEN_LENGTH = 64
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+_TAG_RE = re.compile(r'<[^<>\n]*>')
+_MDX_STATEMENT_RE = re.compile(r'^(?:import|export)\s.*$', re.MULTILINE)
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+
+
+def tokenize(text: str) -> list:
+    """Lowercased letter/digit runs of a piece of text, in order."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) <= MAX_TOKEN_LENGTH]
+
+
+def document_tokens(title, body: str) -> list:
+    """Tokens of a document: its title, then its body without MDX markup."""
+    body = _TAG_RE.sub(' ', _MDX_STATEMENT_RE.sub('', body))
+    return tokenize(f'{title} {body}' if title else body)
+
+
+def parse_query(query: str) -> tuple:
+    """Split a query into (words, phrases); phrases are token lists."""
+    phrases = [tokenize(p) for p in _PHRASE_RE.findall(query)]
+    words = tokenize(_PHRASE_RE.sub(' ', query))
+    return words, [p for p in phrases if p]
+
+
+def _query_terms(words: list, phrases: list) -> list:
+    return list(dict.fromkeys(words + [t for phrase in phrases for t in phrase]))
+
+
+def merge_statistics(statistics: list) -> dict:
+    """Collection statistics of several indexes (see SearchIndex.statistics) as one collection."""
+    merged = {'documents': 0, 'length': 0, 'frequencies': {}}
+    for stats in statistics:
+        merged['documents'] += stats['documents']
+        merged['length'] += stats['length']
+        for term, frequency in stats['frequencies'].items():
+            merged['frequencies'][term] = merged['frequencies'].get(term, 0) + frequency
+    return merged
+
+
+def encode_positions(positions: list) -> bytes:
+    """Delta-encode ascending positions as unsigned LEB128 varints."""
+    out = bytearray()
+    previous = 0
+    for position in positions:
+        delta = position - previous
+        previous = position
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_positions(data: bytes) -> list:
+    positions = []
+    position = delta = shift = 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        position += delta
+        positions.append(position)
+        delta = shift = 0
+    return positions
+
+
+def _phrase_at(position_sets: list) -> bool:
+    """True if the first token occurs at p, the second at p+1, and so on."""
+    first, rest = position_sets[0], position_sets[1:]
+    return any(all(p + i in positions for i, positions in enumerate(rest, 1)) for p in first)
+
+
+class SearchIndex:
+    """Full-text index for one root directory."""
+
+    def __init__(self, root: str, parse_block, db_path: str = None):
+        """
+        root: directory to index (workspace root or personal drive)
+        parse_block: callable(frontmatter_text) -> (frontmatter, error),
+            i.e. hyper_validator.core.parse_frontmatter_block
+        """
+        self.root = root.rstrip('/')
+        self.parse_block = parse_block
+        self.db_path = db_path or os.path.join(self.root, INDEX_DIRNAME, SEARCH_FILENAME)
+        self._conn = None
+
+    # ------------------------------------------------------------------
+    # Connection / schema
+    # ------------------------------------------------------------------
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        prepare_index_dir(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._create_schema(conn)
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        hyper_lock.begin_immediate(conn)
+        if conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+            # Another process created it while we waited for the lock
+            conn.execute('COMMIT')
+            return
+        try:
+            for table in ('postings', 'terms', 'docs'):
+                conn.execute(f'DROP TABLE IF EXISTS {table}')
+            conn.execute('''
+                CREATE TABLE docs (
+                    doc_id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL,
+                    project TEXT NOT NULL,
+                    title TEXT,
+                    length INTEGER NOT NULL,
+                    term_ids BLOB NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE TABLE terms (term_id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE)')
+            conn.execute('''
+                CREATE TABLE postings (
+                    term_id INTEGER NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    positions BLOB NOT NULL,
+                    PRIMARY KEY (term_id, doc_id)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _read_document(self, abs_path: str) -> tuple:
+        """(title, tokens) of a file; unreadable files index as empty."""
+        try:
+            block, body = read_document(abs_path)
+        except (OSError, UnicodeDecodeError, FrontmatterTooLarge):
+            return None, []
+        title = None
+        if block is not None:
+            parsed, error = self.parse_block(block)
+            if not error and isinstance(parsed, dict) and parsed.get('title') is not None:
+                title = str(parsed['title'])
+        return title, document_tokens(title, body)
+
+    def _term_ids(self, terms) -> dict:
+        conn = self.conn
+        conn.executemany('INSERT OR IGNORE INTO terms (term) VALUES (?)', [(t,) for t in terms])
+        ids = {}
+        terms = list(terms)
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            rows = conn.execute(
+                f"SELECT term, term_id FROM terms WHERE term IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            ids.update(rows)
+        return ids
+
+    def refresh(self) -> dict:
+        """Bring the index up to date. Only new or changed files are tokenized."""
+        conn = self.conn
+        known = {
+            path: (doc_id, mtime_ns, size)
+            for doc_id, path, mtime_ns, size in conn.execute('SELECT doc_id, path, mtime_ns, size FROM docs')
+        }
+
+        changed = []
+        seen = set()
+        for rel_path, abs_path, st in walk_documents(self.root):
+            seen.add(rel_path)
+            entry = known.get(rel_path)
+            if entry is None or entry[1:] != (st.st_mtime_ns, st.st_size):
+                title, tokens = self._read_document(abs_path)
+                changed.append((rel_path, st, title, tokens))
+        removed = [path for path in known if path not in seen]
+
+        if changed or removed:
+            hyper_lock.begin_immediate(conn)
+            try:
+                self._apply(changed, removed)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+        return {'files': len(seen), 'updated': len(changed), 'removed': len(removed)}
+
+    def _apply(self, changed: list, removed: list) -> None:
+        conn = self.conn
+        # What is stored now: another process may have refreshed since we looked
+        stored = {}
+        for path in [rel_path for rel_path, *_ in changed] + removed:
+            row = conn.execute('SELECT doc_id, mtime_ns, size FROM docs WHERE path = ?', (path,)).fetchone()
+            if row is not None:
+                stored[path] = row
+        changed = [item for item in changed
+                   if item[0] not in stored or stored[item[0]][1:] != (item[1].st_mtime_ns, item[1].st_size)]
+        stale = [stored[path][0] for path in removed if path in stored]
+        stale += [stored[rel_path][0] for rel_path, *_ in changed if rel_path in stored]
+
+        # Terms whose only postings were in stale documents are dropped below
+        orphan_candidates = set()
+        stale_postings = []
+        for doc_id in stale:
+            row = conn.execute('SELECT term_ids FROM docs WHERE doc_id = ?', (doc_id,)).fetchone()
+            doc_terms = decode_positions(row[0]) if row else []
+            orphan_candidates.update(doc_terms)
+            stale_postings.extend((term_id, doc_id) for term_id in doc_terms)
+        conn.executemany('DELETE FROM postings WHERE term_id = ? AND doc_id = ?', stale_postings)
+        conn.executemany('DELETE FROM docs WHERE doc_id = ?', [(d,) for d in stale])
+
+        doc_positions = []
+        for _rel_path, _st, _title, tokens in changed:
+            positions = {}
+            for position, token in enumerate(tokens):
+                positions.setdefault(token, []).append(position)
+            doc_positions.append(positions)
+        term_ids = self._term_ids({term for positions in doc_positions for term in positions})
+
+        postings = []
+        for (rel_path, st, title, tokens), positions in zip(changed, doc_positions):
+            kind, project = classify_path(rel_path)
+            doc_terms = sorted(term_ids[term] for term in positions)
+            cursor = conn.execute(
+                'INSERT INTO docs (path, kind, project, title, length, term_ids, mtime_ns, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (rel_path, kind, project, title, len(tokens), encode_positions(doc_terms),
+                 st.st_mtime_ns, st.st_size),
+            )
+            postings.extend(
+                (term_ids[term], cursor.lastrowid, len(occurrences), encode_positions(occurrences))
+                for term, occurrences in positions.items()
+            )
+        # Inserting in key order keeps the postings B-tree appends cheap
+        postings.sort()
+        conn.executemany('INSERT INTO postings VALUES (?, ?, ?, ?)', postings)
+        conn.executemany(
+            'DELETE FROM terms WHERE term_id = ? AND NOT EXISTS (SELECT 1 FROM postings WHERE term_id = ?)',
+            [(t, t) for t in orphan_candidates],
+        )
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def statistics(self, query: str) -> dict:
+        """
+        The collection statistics BM25 uses for a query: number of documents,
+        their total length in tokens, and the number of documents containing
+        each query term.
+        """
+        words, phrases = parse_query(query)
+        conn = self.conn
+        doc_count, total_length = conn.execute('SELECT COUNT(*), TOTAL(length) FROM docs').fetchone()
+        frequencies = {}
+        for term in _query_terms(words, phrases):
+            frequencies[term] = conn.execute(
+                'SELECT COUNT(*) FROM postings WHERE term_id = (SELECT term_id FROM terms WHERE term = ?)', (term,)
+            ).fetchone()[0]
+        return {'documents': doc_count, 'length': int(total_length), 'frequencies': frequencies}
+
+    def search(self, query: str, limit: int = 20, kind=None, statistics: dict = None) -> list:
+        """
+        Documents matching a query, best first, as dicts of path (relative to
+        the root), kind, project, title and score. kind restricts results to
+        one or more location kinds (see hyper_index.classify_path).
+        statistics (from merge_statistics) replaces this index's own
+        collection statistics, to score on the scale of a larger collection.
+        Call refresh() first unless stale results are acceptable.
+        """
+        words, phrases = parse_query(query)
+        query_terms = _query_terms(words, phrases)
+        if not query_terms:
+            return []
+        kinds = {kind} if isinstance(kind, str) else set(kind or ())
+
+        conn = self.conn
+        doc_count, total_length = conn.execute('SELECT COUNT(*), TOTAL(length) FROM docs').fetchone()
+        if not doc_count:
+            return []
+        frequencies = {}
+        if statistics is not None:
+            doc_count, total_length = statistics['documents'], statistics['length']
+            frequencies = statistics['frequencies']
+        average_length = total_length / doc_count or 1.0
+
+        term_ids = {}
+        postings = {}
+        for term in query_terms:
+            row = conn.execute('SELECT term_id FROM terms WHERE term = ?', (term,)).fetchone()
+            if row is None:
+                continue
+            term_ids[term] = row[0]
+            postings[term] = conn.execute(
+                'SELECT p.doc_id, p.tf, d.length, d.kind FROM postings p JOIN docs d ON d.doc_id = p.doc_id '
+                'WHERE p.term_id = ?', (row[0],)
+            ).fetchall()
+
+        required = None
+        for phrase in phrases:
+            if any(term not in postings for term in phrase):
+                return []
+            for term in phrase:
+                docs = {doc_id for doc_id, *_ in postings[term]}
+                required = docs if required is None else required & docs
+        if required is not None:
+            required = {doc_id for doc_id in required
+                        if all(self._has_phrase(doc_id, phrase, term_ids) for phrase in phrases)}
+
+        scores = {}
+        for term, rows in postings.items():
+            frequency = frequencies.get(term, len(rows))
+            idf = math.log(1 + (doc_count - frequency + 0.5) / (frequency + 0.5))
+            for doc_id, tf, length, doc_kind in rows:
+                if (required is not None and doc_id not in required) or (kinds and doc_kind not in kinds):
+                    continue
+                norm = tf + K1 * (1 - B + B * length / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / norm
+
+        results = []
+        for doc_id, score in heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0])):
+            path, doc_kind, project, title = conn.execute(
+                'SELECT path, kind, project, title FROM docs WHERE doc_id = ?', (doc_id,)
+            ).fetchone()
+            results.append({'path': path, 'kind': doc_kind, 'project': project, 'title': title,
+                            'score': round(score, 4)})
+        return results
+
+    def _has_phrase(self, doc_id: int, phrase: list, term_ids: dict) -> bool:
+        if len(phrase) == 1:
+            return True
+        position_sets = []
+        for term in phrase:
+            row = self.conn.execute(
+                'SELECT positions FROM postings WHERE term_id = ? AND doc_id = ?', (term_ids[term], doc_id)
+            ).fetchone()
+            position_sets.append(set(decode_positions(row[0])))
+        return _phrase_at(position_sets)
+
+
+def open_search_index(root: str, parse_block):
+    """Open (creating if needed) the search index for a root, or None if unavailable."""
+    if not root or not index_enabled() or not os.path.isdir(root):
+        return None
+    index = SearchIndex(root, parse_block)
+    try:
+        index.conn
+    except (sqlite3.Error, OSError):
+        return None
+    return index
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Search or refresh the Hyper full-text index')
+    parser.add_argument('command', choices=['search', 'refresh'])
+    parser.add_argument('query', nargs='*', help='Words and "quoted phrases"')
+    parser.add_argument('--root', type=str, help='Directory to search (default: resolved workspace)')
+    parser.add_argument('--all', action='store_true', help='Also search the personal drive (artifacts)')
+    parser.add_argument('--kind', action='append', help='Only documents of this kind (repeatable)')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    from hyper_validator import core as validator
+
+    roots = [args.root or validator.WORKSPACE_ROOT]
+    if args.all and validator.PERSONAL_DRIVE:
+        roots.append(validator.PERSONAL_DRIVE)
+
+    if args.command == 'refresh':
+        index = open_search_index(roots[0], validator.parse_frontmatter_block)
+        if index is None:
+            print(json.dumps({'success': False, 'error': {'message': 'No search index available'}}))
+            sys.exit(1)
+        print(json.dumps({'success': True, 'root': roots[0], **index.refresh()}))
+        sys.exit(0)
+
+    results = validator.search_workspace(' '.join(args.query), roots=roots, limit=args.limit, kind=args.kind)
+    if results is None:
+        print(json.dumps({'success': False, 'error': {'message': 'No workspace found'}}))
+        sys.exit(1)
+    print(json.dumps({'success': True, 'count': len(results), 'results': results}))
+    sys.exit(0)
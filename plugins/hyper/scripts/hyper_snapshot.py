@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Hyper Relationship Snapshot
+Immutable binary image of the workspace's projects, tasks and dependencies
+that short-lived hook processes memory-map and binary-search, instead of
+opening the SQLite index and walking the tree before a relationship check.
+
+The index (hyper_index.WorkspaceIndex) writes <root>/.index/relationships.v1.snap
+whenever a refresh changes a project or task, to a temporary file renamed
+over the previous one, so readers always map a complete snapshot. Each
+snapshot carries the index generation it was built from; writers publish
+under an advisory lock and never replace a snapshot with an older one.
+
+Layout (little-endian):
+
+  header     magic, format version, key width, status width, project, task,
+             edge and name counts, generation, project stamp
+  projects   sorted by id:          id[key] status[status] rank
+  tasks      sorted by slug\\0id:    key[key] parent[key] status[status]
+                                    rank first_edge edge_count
+  edges      uint32 per depends_on entry: a task record number, or
+             NAME_BIT | a names record number for ids with no task record
+  names      id[key]
+  stamps     sorted by slug:        slug[key] tasks_stamp
+
+Text is UTF-8, NUL-padded to the widths in the header (the longest value
+written). rank is the document's position in path order, the order the index
+lists ids in.
+
+A snapshot is trusted only while its stamps match the filesystem: the project
+stamp covers (slug, mtime, size) of every projects/*/_project.mdx, and each
+tasks stamp the same for projects/<slug>/tasks/*.mdx. Checking one project
+costs a stat per project and per task in it, and no parsing.
+
+HYPER_SNAPSHOT=off disables writing and reading snapshots.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from collections import deque
+
+# Beside the SQLite index (hyper_index.INDEX_DIRNAME)
+INDEX_DIRNAME = '.index'
+SNAPSHOT_FILENAME = 'relationships.v1.snap'
+
+MAGIC = b'HYPRSNAP'
+FORMAT_VERSION = 1
+
+# magic, version, key width, status width, projects, tasks, edges, names,
+# generation, project stamp
+HEADER = struct.Struct('<8sIIIIIIIQQ')
+EDGE = struct.Struct('<I')
+NAME_BIT = 0x80000000
+
+# Workspaces with longer ids (or non-string ids) are left to the index
+MAX_KEY_BYTES = 1024
+
+
+def snapshot_enabled() -> bool:
+    return os.environ.get('HYPER_SNAPSHOT', '').strip().lower() not in ('0', 'off', 'false', 'no')
+
+
+def snapshot_path(root: str) -> str:
+    return os.path.join(root, INDEX_DIRNAME, SNAPSHOT_FILENAME)
+
+
+def _record_structs(key_width: int, status_width: int) -> tuple:
+    return (
+        struct.Struct(f'<{key_width}s{status_width}sI'),                 # projects
+        struct.Struct(f'<{key_width}s{key_width}s{status_width}sIII'),   # tasks
+        struct.Struct(f'<{key_width}s'),                                 # names
+        struct.Struct(f'<{key_width}sQ'),                                # stamps
+    )
+
+
+# ==============================================================================
+# Stamps
+# ==============================================================================
+
+def stamp(entries) -> int:
+    """64-bit digest of (name, mtime_ns, size) entries, in any order."""
+    digest = hashlib.blake2b(digest_size=8)
+    for name, mtime_ns, size in sorted(entries):
+        digest.update(f'{name}\0{mtime_ns}\0{size}\n'.encode('utf-8', 'surrogateescape'))
+    return int.from_bytes(digest.digest(), 'little')
+
+
+def projects_stamp(root: str) -> int:
+    """Stamp of the project documents on disk (see the module docstring)."""
+    entries = []
+    try:
+        scan = os.scandir(os.path.join(root, 'projects'))
+    except OSError:
+        return stamp(entries)
+    with scan:
+        for entry in scan:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                st = os.stat(os.path.join(entry.path, '_project.mdx'))
+            except OSError:
+                continue
+            entries.append((entry.name, st.st_mtime_ns, st.st_size))
+    return stamp(entries)
+
+
+def tasks_stamp(root: str, project_slug: str) -> int:
+    """Stamp of one project's task documents on disk."""
+    entries = []
+    try:
+        scan = os.scandir(os.path.join(root, 'projects', project_slug, 'tasks'))
+    except OSError:
+        return stamp(entries)
+    with scan:
+        for entry in scan:
+            if entry.name.startswith('.') or not entry.name.endswith('.mdx'):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((entry.name, st.st_mtime_ns, st.st_size))
+    return stamp(entries)
+
+
+# ==============================================================================
+# Writing
+# ==============================================================================
+
+def _encode(value) -> bytes:
+    return value.encode('utf-8', 'surrogatepass') if value else b''
+
+
+def build_snapshot(projects: list, tasks: list, project_stamp: int, task_stamps: dict,
+                   generation: int = 0):
+    """
+    Serialize a snapshot.
+    projects: (id, status) per project document, in path order
+    tasks: (slug, id, parent, status, depends_on) per task, in path order;
+        only the first task with a given id in a project is kept, as in
+        WorkspaceIndex.task_dependencies()
+    task_stamps: project slug -> tasks stamp
+    Returns the bytes, or None when an id cannot be represented (not a
+    string, contains NUL, longer than MAX_KEY_BYTES).
+    """
+    for project_id, _status in projects:
+        if not isinstance(project_id, str) or '\0' in project_id:
+            return None
+    seen = set()
+    unique = []
+    for slug, task_id, parent, status, depends_on in tasks:
+        if not isinstance(task_id, str) or not task_id or '\0' in task_id or '\0' in slug:
+            return None
+        if (slug, task_id) not in seen:
+            seen.add((slug, task_id))
+            unique.append((slug, task_id, parent if isinstance(parent, str) else None,
+                           status if isinstance(status, str) else None, depends_on))
+
+    project_records = sorted((_encode(pid), _encode(status if isinstance(status, str) else None), rank)
+                             for rank, (pid, status) in enumerate(projects))
+    task_records = sorted((_encode(slug) + b'\0' + _encode(task_id), slug, task_id, parent, status, rank, deps)
+                          for rank, (slug, task_id, parent, status, deps) in enumerate(unique))
+    record_numbers = {(record[1], record[2]): number for number, record in enumerate(task_records)}
+
+    names = {}
+    edges = []
+    spans = []
+    for _key, slug, _task_id, _parent, _status, _rank, deps in task_records:
+        start = len(edges)
+        for dep in deps:
+            if not isinstance(dep, str):
+                return None
+            number = record_numbers.get((slug, dep))
+            if number is None:
+                if '\0' in dep:
+                    return None
+                number = NAME_BIT | names.setdefault(dep, len(names))
+            edges.append(number)
+        spans.append((start, len(edges) - start))
+
+    keys = ([record[0] for record in project_records] + [record[0] for record in task_records]
+            + [_encode(record[3]) for record in task_records] + [_encode(name) for name in names]
+            + [_encode(slug) for slug in task_stamps])
+    key_width = max([len(key) for key in keys] + [1])
+    if key_width > MAX_KEY_BYTES:
+        return None
+    status_width = max([len(record[1]) for record in project_records]
+                       + [len(_encode(record[4])) for record in task_records] + [1])
+
+    project_struct, task_struct, name_struct, stamp_struct = _record_structs(key_width, status_width)
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION, key_width, status_width, len(project_records),
+                         len(task_records), len(edges), len(names), generation, project_stamp)]
+    parts += [project_struct.pack(*record) for record in project_records]
+    parts += [task_struct.pack(key, _encode(parent), _encode(status), rank, start, count)
+              for (key, _slug, _id, parent, status, rank, _deps), (start, count) in zip(task_records, spans)]
+    parts.append(struct.pack(f'<{len(edges)}I', *edges))
+    parts += [name_struct.pack(_encode(name)) for name in names]
+    parts += [stamp_struct.pack(_encode(slug), value) for slug, value in sorted(task_stamps.items())]
+    return b''.join(parts)
+
+
+def read_generation(path: str) -> int:
+    """Generation of the snapshot at path, 0 when there is none."""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        magic, version, *_rest, generation, _stamp = HEADER.unpack(header)
+    except (OSError, struct.error):
+        return 0
+    return generation if magic == MAGIC and version == FORMAT_VERSION else 0
+
+
+def write_snapshot(path: str, data: bytes) -> None:
+    """Replace the snapshot at path atomically (write a temporary file, rename it over)."""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def publish(path: str, data, generation: int) -> bool:
+    """
+    Publish data, built from index generation, at path unless the snapshot
+    there is at least as new. Concurrent writers serialize on an advisory
+    lock (path + '.lock'). data None removes the snapshot instead (the
+    workspace cannot be represented in one).
+    Returns True when the published snapshot changed.
+    """
+    import hyper_lock
+
+    with hyper_lock.FileLock(path + '.lock'):
+        if read_generation(path) >= generation:
+            return False
+        if data is None:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                return False
+            return True
+        write_snapshot(path, data)
+    return True
+
+
+# ==============================================================================
+# Reading
+# ==============================================================================
+
+class Snapshot:
+    """A memory-mapped snapshot. Raises OSError/ValueError when unreadable."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._identity = (st.st_dev, st.st_ino, st.st_mtime_ns)
+        try:
+            (magic, version, self.key_width, self.status_width, self.project_count, self.task_count,
+             self.edge_count, self.name_count, self.generation, self.project_stamp) = HEADER.unpack_from(self._mm)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f'{path} is not a version {FORMAT_VERSION} relationship snapshot')
+            (self._project_struct, self._task_struct, self._name_struct,
+             self._stamp_struct) = _record_structs(self.key_width, self.status_width)
+            self._projects = HEADER.size
+            self._tasks = self._projects + self.project_count * self._project_struct.size
+            self._edges = self._tasks + self.task_count * self._task_struct.size
+            self._names = self._edges + self.edge_count * EDGE.size
+            self._stamps = self._names + self.name_count * self._name_struct.size
+            stamps_size = len(self._mm) - self._stamps
+            if stamps_size < 0 or stamps_size % self._stamp_struct.size:
+                raise ValueError(f'{path} is truncated')
+            self.stamp_count = stamps_size // self._stamp_struct.size
+        except (struct.error, ValueError):
+            self.close()
+            raise ValueError(f'{path} is not a valid relationship snapshot') from None
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def replaced(self) -> bool:
+        """True when a newer snapshot has been published (or this one removed)."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return True
+        return (st.st_dev, st.st_ino, st.st_mtime_ns) != self._identity
+
+    # ------------------------------------------------------------------
+    # Record access
+    # ------------------------------------------------------------------
+
+    def _key(self, *parts: str):
+        """parts joined by NUL as a padded key, or None when no record can hold it."""
+        if any('\0' in part for part in parts):
+            return None
+        key = b'\0'.join(_encode(part) for part in parts)
+        if len(key) > self.key_width:
+            return None
+        return key.ljust(self.key_width, b'\0')
+
+    def _lower_bound(self, offset: int, count: int, size: int, key: bytes) -> int:
+        mm = self._mm
+        width = self.key_width
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = offset + mid * size
+            if mm[start:start + width] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, offset: int, count: int, size: int, key) -> int:
+        """Record number of key in a sorted section, or -1."""
+        if key is None:
+            return -1
+        number = self._lower_bound(offset, count, size, key)
+        start = offset + number * size
+        if number < count and self._mm[start:start + self.key_width] == key:
+            return number
+        return -1
+
+    @staticmethod
+    def _text(raw: bytes):
+        raw = raw.rstrip(b'\0')
+        return raw.decode('utf-8', 'surrogatepass') if raw else None
+
+    def has_project(self, project_id: str) -> bool:
+        return self._find(self._projects, self.project_count, self._project_struct.size,
+                          self._key(project_id)) >= 0
+
+    def task_number(self, project_slug: str, task_id: str) -> int:
+        """Task record number of task_id in a project, or -1."""
+        if not isinstance(task_id, str):
+            return -1
+        return self._find(self._tasks, self.task_count, self._task_struct.size,
+                          self._key(project_slug, task_id))
+
+    def task_numbers(self, project_slug: str) -> range:
+        """Record numbers of a project's tasks (its records are contiguous)."""
+        size = self._task_struct.size
+        prefix = _encode(project_slug)
+        if len(prefix) + 1 > self.key_width:
+            return range(0)
+        lo = self._lower_bound(self._tasks, self.task_count, size, (prefix + b'\0').ljust(self.key_width, b'\0'))
+        hi = self._lower_bound(self._tasks, self.task_count, size, (prefix + b'\1').ljust(self.key_width, b'\0'))
+        return range(lo, hi)
+
+    def _task(self, number: int) -> tuple:
+        return self._task_struct.unpack_from(self._mm, self._tasks + number * self._task_struct.size)
+
+    def edges(self, number: int) -> tuple:
+        """depends_on entries of a task record (see NAME_BIT)."""
+        _key, _parent, _status, _rank, start, count = self._task(number)
+        return struct.unpack_from(f'<{count}I', self._mm, self._edges + start * EDGE.size)
+
+    def _dependency_id(self, entry: int) -> str:
+        if entry & NAME_BIT:
+            raw = self._name_struct.unpack_from(self._mm, self._names + (entry ^ NAME_BIT) * self._name_struct.size)[0]
+            return self._text(raw) or ''
+        return self._text(self._task(entry)[0]).split('\0', 1)[1]
+
+    # ------------------------------------------------------------------
+    # Freshness
+    # ------------------------------------------------------------------
+
+    def tasks_stamp(self, project_slug: str) -> int:
+        """The recorded tasks stamp of a project (that of no tasks when absent)."""
+        number = self._find(self._stamps, self.stamp_count, self._stamp_struct.size, self._key(project_slug))
+        if number < 0:
+            return stamp([])
+        return self._stamp_struct.unpack_from(self._mm, self._stamps + number * self._stamp_struct.size)[1]
+
+    def is_current(self, root: str, project_slug: str = '') -> bool:
+        """True when the project documents and project_slug's tasks are unchanged on disk."""
+        if projects_stamp(root) != self.project_stamp:
+            return False
+        return not project_slug or tasks_stamp(root, project_slug) == self.tasks_stamp(project_slug)
+
+    # ------------------------------------------------------------------
+    # Relationship checks
+    # ------------------------------------------------------------------
+
+    def references_ok(self, project_slug: str, task_id, parent, depends_on: list) -> bool:
+        """
+        True when a task with these fields passes every check of
+        validate_relationships(): its parent exists (or there are no
+        projects), its dependencies exist and none of them leads back to it.
+        False means "run the full check", not necessarily an error.
+        """
+        if parent:
+            if not isinstance(parent, str):
+                return False
+            if self.project_count and not self.has_project(parent):
+                return False
+        if not depends_on or not project_slug:
+            return True
+        if not isinstance(depends_on, list):
+            return False
+
+        if any(not isinstance(dep, str) or dep == task_id for dep in depends_on):
+            return False
+        tasks = self.task_numbers(project_slug)
+        starts = []
+        for dep in depends_on:
+            number = self.task_number(project_slug, dep)
+            if number < 0:
+                if tasks:
+                    return False
+            else:
+                starts.append(number)
+        if not task_id or not starts:
+            return True
+
+        # Does any dependency lead back to task_id?
+        target = self.task_number(project_slug, task_id)
+        seen = set(starts)
+        queue = deque(starts)
+        while queue:
+            for entry in self.edges(queue.popleft()):
+                if entry & NAME_BIT:
+                    if self._dependency_id(entry) == task_id:
+                        return False
+                elif entry == target:
+                    return False
+                elif entry not in seen:
+                    seen.add(entry)
+                    queue.append(entry)
+        return True
+
+    def project_ids(self) -> list:
+        """Project ids in path order, as WorkspaceIndex.project_ids() lists them."""
+        size = self._project_struct.size
+        records = [self._project_struct.unpack_from(self._mm, self._projects + n * size)
+                   for n in range(self.project_count)]
+        return [self._text(raw_id) or '' for raw_id, _status, _rank in sorted(records, key=lambda r: r[2])]
+
+    def task_dependencies(self, project_slug: str) -> dict:
+        """Map task id -> depends_on for a project, as WorkspaceIndex.task_dependencies() returns it."""
+        ranked = []
+        for number in self.task_numbers(project_slug):
+            key, _parent, _status, rank, _start, _count = self._task(number)
+            ranked.append((rank, self._text(key).split('\0', 1)[1],
+                           [self._dependency_id(entry) for entry in self.edges(number)]))
+        return {task_id: deps for _rank, task_id, deps in sorted(ranked)}
+
+    def task(self, project_slug: str, task_id: str):
+        """{'id', 'parent', 'status', 'depends_on'} of a task, or None."""
+        number = self.task_number(project_slug, task_id)
+        if number < 0:
+            return None
+        _key, parent, status, _rank, _start, _count = self._task(number)
+        return {'id': task_id, 'parent': self._text(parent), 'status': self._text(status),
+                'depends_on': [self._dependency_id(entry) for entry in self.edges(number)]}
+
+
+def open_snapshot(root: str):
+    """The snapshot of a workspace root, or None when missing, unreadable or disabled."""
+    if not root or not snapshot_enabled():
+        return None
+    try:
+        return Snapshot(snapshot_path(root))
+    except (OSError, ValueError):
+        return None
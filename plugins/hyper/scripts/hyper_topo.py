@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Hyper Dependency Order
+Dynamic topological order of a project's task dependency graph, so cycle
+checks on a write only look at the part of the graph the new edges affect.
+
+Edges run from a dependency to the task that depends on it; the order puts
+every task after its dependencies. Edges are added with the Pearce-Kelly
+online algorithm (Pearce & Kelly, "A Dynamic Topological Sort Algorithm for
+Directed Acyclic Graphs", 2006): an edge dep -> task that already agrees with
+the order costs O(1); otherwise only tasks whose position lies between the
+two endpoints are searched and reordered, and an edge that would close a
+cycle is rejected with the cycle path. Removing an edge never invalidates
+the order.
+
+cycles_closed_by() answers the validator's question for a proposed write
+(which of a task's new depends_on entries would close a cycle) from the
+same affected-region search, without changing the order.
+"""
+
+from collections import deque
+
+
+class DependencyOrder:
+    """Topological order of one project's tasks, maintained under edge changes."""
+
+    def __init__(self):
+        self.position = {}    # task id -> position in the order
+        self.depends_on = {}  # task id -> {dependency: None}, in insertion order
+        self.dependents = {}  # task id -> {dependent: None}, in insertion order
+        # False if the graph it was built from already had a cycle; callers
+        # then fall back to a full search
+        self.acyclic = True
+        self._next_position = 0
+
+    @classmethod
+    def from_graph(cls, graph: dict) -> 'DependencyOrder':
+        """
+        Build from a task id -> depends_on mapping (Kahn's algorithm, O(V+E)).
+        Ids that are only referenced as dependencies become tasks too.
+        """
+        order = cls()
+        for task_id, deps in graph.items():
+            order.add_task(task_id)
+            for dep in deps:
+                order.add_task(dep)
+                order.depends_on[task_id][dep] = None
+                order.dependents[dep][task_id] = None
+
+        order.position = {}
+        remaining = {task_id: len(deps) for task_id, deps in order.depends_on.items()}
+        queue = deque(task_id for task_id, count in remaining.items() if count == 0)
+        position = 0
+        while queue:
+            task_id = queue.popleft()
+            order.position[task_id] = position
+            position += 1
+            for dependent in order.dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    queue.append(dependent)
+        if position < len(remaining):
+            order.acyclic = False
+            # Tasks on or behind a cycle still get a (meaningless) position
+            for task_id in remaining:
+                if task_id not in order.position:
+                    order.position[task_id] = position
+                    position += 1
+        order._next_position = len(remaining)
+        return order
+
+    def __len__(self) -> int:
+        return len(self.depends_on)
+
+    def add_task(self, task_id: str) -> None:
+        """Add a task without edges at the end of the order."""
+        if task_id not in self.depends_on:
+            self.depends_on[task_id] = {}
+            self.dependents[task_id] = {}
+            self.position[task_id] = self._next_position
+            self._next_position += 1
+
+    def remove_edge(self, dep: str, task_id: str) -> None:
+        self.depends_on.get(task_id, {}).pop(dep, None)
+        self.dependents.get(dep, {}).pop(task_id, None)
+
+    def add_edge(self, dep: str, task_id: str) -> list:
+        """
+        Record that task_id depends on dep, reordering the affected region.
+        Returns None, or the cycle the edge would close (task_id, dep, ...,
+        task_id in depends_on direction), in which case nothing changes.
+        """
+        self.add_task(dep)
+        self.add_task(task_id)
+        if dep == task_id:
+            return [task_id, task_id]
+        if dep in self.depends_on[task_id]:
+            return None
+
+        lower, upper = self.position[task_id], self.position[dep]
+        if lower > upper:
+            self._link(dep, task_id)
+            return None
+
+        # Dependents of task_id positioned up to dep: reaching dep means a cycle
+        forward, parent = self._search(task_id, self.dependents, lambda p: p <= upper)
+        if dep in parent:
+            return self._cycle(task_id, dep, parent)
+        # Dependencies of dep positioned from task_id onward
+        backward, _ = self._search(dep, self.depends_on, lambda p: p >= lower)
+
+        # Everything in backward must now precede everything in forward;
+        # the two sets reuse the positions they already occupy
+        backward.sort(key=self.position.__getitem__)
+        forward.sort(key=self.position.__getitem__)
+        moved = backward + forward
+        for task, position in zip(moved, sorted(self.position[t] for t in moved)):
+            self.position[task] = position
+        self._link(dep, task_id)
+        return None
+
+    def update(self, changes: dict) -> bool:
+        """
+        Replace the dependencies of the tasks in changes (task id ->
+        depends_on list). All stale edges are removed before any new one is
+        added, so swapping a dependency between two tasks is not mistaken for
+        a cycle. Returns False if an added edge closed a cycle (that edge is
+        left out and acyclic is cleared).
+        """
+        for task_id, depends_on in changes.items():
+            self.add_task(task_id)
+            for dep in list(self.depends_on[task_id]):
+                if dep not in depends_on:
+                    self.remove_edge(dep, task_id)
+        for task_id, depends_on in changes.items():
+            for dep in depends_on:
+                if self.add_edge(dep, task_id) is not None:
+                    self.acyclic = False
+        return self.acyclic
+
+    def cycles_closed_by(self, task_id: str, depends_on: list) -> list:
+        """
+        The cycles that replacing task_id's dependencies with depends_on
+        would close, in the validator's find_dependency_cycles() format: one
+        shortest path (task_id, dep, ..., task_id) per dependency that leads
+        back. Does not change the order.
+
+        A dependency positioned before task_id cannot be reached from it, so
+        only the region between task_id and the furthest such dependency is
+        searched. Requires acyclic.
+        """
+        if task_id not in self.position:
+            # Nothing depends on an unknown task; only a self-reference cycles
+            return [[task_id, task_id] for dep in dict.fromkeys(depends_on) if dep == task_id]
+
+        start = self.position[task_id]
+        later = [self.position[dep] for dep in depends_on if self.position.get(dep, -1) > start]
+        next_hop = {}
+        if later:
+            upper = max(later)
+            queue = deque([task_id])
+            while queue:
+                node = queue.popleft()
+                for dependent in self.dependents[node]:
+                    if dependent != task_id and dependent not in next_hop and self.position[dependent] <= upper:
+                        next_hop[dependent] = node
+                        queue.append(dependent)
+
+        cycles = []
+        for dep in dict.fromkeys(depends_on):
+            if dep == task_id:
+                cycles.append([task_id, task_id])
+            elif dep in next_hop:
+                cycles.append(self._cycle(task_id, dep, next_hop))
+        return cycles
+
+    def is_consistent(self) -> bool:
+        """True if every task is positioned after all of its dependencies."""
+        return all(
+            self.position[dep] < self.position[task_id]
+            for task_id, deps in self.depends_on.items() for dep in deps
+        )
+
+    def _link(self, dep: str, task_id: str) -> None:
+        self.depends_on[task_id][dep] = None
+        self.dependents[dep][task_id] = None
+
+    def _search(self, start: str, edges: dict, in_region) -> tuple:
+        """Nodes reachable from start along edges within the region, and their parents."""
+        parent = {start: None}
+        stack = [start]
+        found = [start]
+        while stack:
+            node = stack.pop()
+            for neighbour in edges[node]:
+                if neighbour not in parent and in_region(self.position[neighbour]):
+                    parent[neighbour] = node
+                    stack.append(neighbour)
+                    found.append(neighbour)
+        return found, parent
+
+    @staticmethod
+    def _cycle(task_id: str, dep: str, parent: dict) -> list:
+        # parent links lead from dep back to task_id along dependents edges:
+        # dep depends on parent[dep], which depends on ... task_id
+        cycle = [task_id, dep]
+        node = dep
+        while node != task_id:
+            node = parent[node]
+            cycle.append(node)
+        return cycle
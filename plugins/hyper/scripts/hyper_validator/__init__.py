@@ -0,0 +1,21 @@
+"""
+Hyper validator package
+
+  Validator   reusable validation state for one workspace (roots, schemas,
+              index, project/task graph, file and verdict caches); what
+              long-running hosts such as the daemon or the MCP server embed
+  core        the function API and command line used by the hooks, with
+              module-level roots and caches
+
+validate-hyper-file.py and `python3 -m hyper_validator` run core.main().
+"""
+
+__all__ = ['Validator']
+
+
+def __getattr__(name):
+    # PEP 562: hooks import only core, so Validator is loaded on first use
+    if name == 'Validator':
+        from hyper_validator.validator import Validator
+        return Validator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
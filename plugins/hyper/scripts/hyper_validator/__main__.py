@@ -0,0 +1,3 @@
+from hyper_validator.core import main
+
+main()
@@ -0,0 +1,1770 @@
+"""
+Hyper File Validator
+Validates MDX files in the workspace data root for correct frontmatter schema.
+Runs as a PostToolUse hook after Write/Edit operations.
+Can also be called directly for PreToolUse validation with --pre-validate flag.
+
+This module is the validator's function API and command line (main()); its
+roots and caches are module state shared by every caller in the process.
+Hosts that validate many files or several workspaces should hold a
+hyper_validator.Validator instead. validate-hyper-file.py is the script
+entry point.
+"""
+
+import json
+import sys
+import re
+import os
+import argparse
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hyper_frontmatter  # noqa: E402
+import hyper_metrics  # noqa: E402
+
+# PyYAML, HAS_PYYAML, PERSONAL_DRIVE and WORKSPACE_ROOT are resolved on first
+# use (see get_yaml, get_personal_drive, get_workspace_root), so importing this
+# module stays cheap for callers that only parse frontmatter.
+
+# Document schemas live in scripts/schemas/*.json and are compiled by
+# hyper_schema on first use (see get_schemas)
+_schema_set = None
+
+
+def get_schemas():
+    """Compiled document schemas, loaded once per process (hyper_schema.SchemaSet)."""
+    global _schema_set
+    if _schema_set is None:
+        with hyper_metrics.phase('schema'):
+            import hyper_schema
+            _schema_set = hyper_schema.load_schemas()
+    return _schema_set
+
+
+_yaml_module = None
+
+
+def get_yaml():
+    """Import PyYAML on first use. Returns the module, or None if it is not installed."""
+    global _yaml_module
+    if _yaml_module is None:
+        try:
+            import yaml
+            _yaml_module = yaml
+        except ImportError:
+            _yaml_module = False
+    return _yaml_module or None
+
+
+# Largest frontmatter re-parsed with the pure-Python loader for a better
+# error message
+YAML_ERROR_DETAIL_BYTES = 4096
+
+
+def yaml_safe_load(yaml, text: str, limits: dict = None):
+    """
+    yaml.safe_load through libyaml (CSafeLoader) when PyYAML was built with it.
+    Errors in frontmatter up to YAML_ERROR_DETAIL_BYTES are re-raised from the
+    pure-Python loader, whose messages include the offending line; larger
+    blocks keep libyaml's message, as re-parsing them costs tens of
+    milliseconds. The event stream is checked against the parse limits before
+    anything is constructed (raises hyper_frontmatter.FrontmatterTooComplex).
+    """
+    loader = getattr(yaml, 'CSafeLoader', None)
+    if loader is not None:
+        try:
+            hyper_frontmatter.check_yaml_events(yaml, yaml.parse(text, Loader=loader), limits)
+            return yaml.load(text, Loader=loader)
+        except yaml.YAMLError:
+            if len(text) > YAML_ERROR_DETAIL_BYTES:
+                raise
+    hyper_frontmatter.check_yaml_events(yaml, yaml.parse(text, Loader=yaml.SafeLoader), limits)
+    return yaml.safe_load(text)
+
+
+def __getattr__(name):
+    # PEP 562: resolve expensive module state only when something asks for it
+    if name == 'HAS_PYYAML':
+        return get_yaml() is not None
+    if name == 'PERSONAL_DRIVE':
+        return get_personal_drive()
+    if name == 'WORKSPACE_ROOT':
+        return get_workspace_root()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def parse_frontmatter(content: str) -> tuple:
+    """Extract YAML frontmatter from MDX content using PyYAML if available."""
+    if not content.startswith('---'):
+        return {}, content, None
+
+    parts = content.split('---', 2)
+    if len(parts) < 3:
+        return {}, content, None
+
+    body = parts[2].strip() if len(parts) > 2 else ''
+    frontmatter, error_info = parse_frontmatter_block(parts[1])
+    return frontmatter, body, error_info
+
+
+def parse_frontmatter_block(frontmatter_str: str) -> tuple:
+    """
+    Parse the YAML text between the frontmatter delimiters.
+    Returns (frontmatter, error_info); error_info is None on success.
+    """
+    hyper_metrics.count('yaml_parses')
+    with hyper_metrics.phase('parse'):
+        try:
+            return _parse_frontmatter_block(frontmatter_str)
+        except hyper_frontmatter.FrontmatterTooComplex as e:
+            return {}, frontmatter_too_complex_error(e)
+
+
+def frontmatter_too_complex_error(exc) -> dict:
+    """Structured error for frontmatter over one of the parse limits."""
+    what = {
+        'parse_bytes': f'is larger than {exc.maximum} bytes',
+        'nodes': f'has more than {exc.maximum} values',
+        'aliases': f'uses more than {exc.maximum} YAML aliases',
+        'depth': f'is nested more than {exc.maximum} levels deep',
+    }[exc.limit]
+    return {
+        'code': 'FRONTMATTER_TOO_COMPLEX',
+        'field': None,
+        'message': f'Frontmatter {what}',
+        'suggestion': 'Keep frontmatter to flat metadata fields and move long content into the document body',
+        'limit': exc.limit,
+    }
+
+
+def _parse_frontmatter_block(frontmatter_str: str) -> tuple:
+    frontmatter_str = frontmatter_str.strip()
+    # Agent-written input: bound it before any parser runs
+    limits = hyper_frontmatter.parse_limits()
+    hyper_frontmatter.check_size(frontmatter_str, limits)
+
+    # Fast path: flat key/value frontmatter needs no YAML library
+    frontmatter = hyper_frontmatter.parse_flat(frontmatter_str, limits['nodes'])
+    if frontmatter is not None:
+        return frontmatter, None
+
+    # Use PyYAML for robust parsing
+    yaml = get_yaml()
+    if yaml is not None:
+        try:
+            frontmatter = yaml_safe_load(yaml, frontmatter_str, limits)
+            if frontmatter is None:
+                frontmatter = {}
+            return frontmatter, None
+        except yaml.YAMLError as e:
+            # Return parse error with helpful context
+            error_info = {
+                'code': 'YAML_PARSE_ERROR',
+                'message': f'Invalid YAML in frontmatter: {str(e)}',
+                'suggestion': _get_yaml_fix_suggestion(str(e), frontmatter_str),
+            }
+            return {}, error_info
+
+    # Fallback: Simple YAML parsing for basic cases
+    frontmatter = {}
+    current_array_key = None
+
+    for line in frontmatter_str.split('\n'):
+        stripped = line.strip()
+
+        # Handle array items
+        if stripped.startswith('- ') and current_array_key:
+            value = stripped[2:].strip().strip('"\'')
+            if current_array_key not in frontmatter:
+                frontmatter[current_array_key] = []
+            frontmatter[current_array_key].append(value)
+            continue
+
+        # Reset array context on non-array line
+        if not stripped.startswith('- '):
+            current_array_key = None
+
+        if ':' in line and not stripped.startswith('-'):
+            key, value = line.split(':', 1)
+            key = key.strip()
+            value = value.strip().strip('"\'')
+
+            # Handle inline arrays
+            if value.startswith('['):
+                value = [v.strip().strip('"\'') for v in value[1:-1].split(',') if v.strip()]
+                frontmatter[key] = value
+            elif value == '':
+                # Might be a multi-line array
+                current_array_key = key
+            else:
+                frontmatter[key] = value
+
+    return frontmatter, None
+
+
+def read_frontmatter_file(file_path: str) -> dict:
+    """
+    Read and parse only the frontmatter of a file on disk (for bulk scans).
+    Returns {} when the file has no frontmatter or it cannot be parsed.
+    """
+    try:
+        block, _ = hyper_frontmatter.read_frontmatter(file_path)
+    except (OSError, UnicodeDecodeError, hyper_frontmatter.FrontmatterTooLarge):
+        return {}
+    if block is None:
+        return {}
+    frontmatter, error = parse_frontmatter_block(block)
+    if error or not isinstance(frontmatter, dict):
+        return {}
+    return frontmatter
+
+
+def _get_yaml_fix_suggestion(error_msg: str, yaml_str: str) -> str:
+    """Generate a helpful fix suggestion based on the YAML error."""
+    error_lower = error_msg.lower()
+
+    # Check for common issues
+    if 'found character' in error_lower and ':' in error_lower:
+        # Likely unquoted colon issue
+        return 'Values containing colons must be quoted. Example: id: "personal:note-123"'
+
+    if 'expected' in error_lower and 'block' in error_lower:
+        return 'Check indentation. YAML requires consistent spacing (2 spaces recommended).'
+
+    if 'duplicate key' in error_lower:
+        return 'Remove duplicate field names in frontmatter.'
+
+    # Check for unquoted colons in values
+    for line in yaml_str.split('\n'):
+        if ':' in line:
+            parts = line.split(':', 1)
+            if len(parts) == 2:
+                value = parts[1].strip()
+                # If value has colon and isn't quoted
+                if ':' in value and not (value.startswith('"') or value.startswith("'")):
+                    field = parts[0].strip()
+                    return f'The "{field}" field value contains a colon. Wrap it in quotes: {field}: "{value}"'
+
+    return 'Check YAML syntax. Ensure proper quoting for special characters (: @ # etc.).'
+
+
+def normalize_path(file_path: str) -> str:
+    return file_path.replace('\\', '/').rstrip('/')
+
+
+def get_hyper_paths(cwd: str = None, env: dict = None):
+    """
+    Get resolved Hyper paths using the native resolve-paths.sh rules.
+    cwd/env default to the current process; the validator daemon passes the
+    hook caller's values so workspace lookup matches the calling session.
+    """
+    import hyper_paths
+
+    return hyper_paths.resolve_paths(cwd=cwd, env=env)
+
+
+def resolve_workspace_root(paths: dict = None, env: dict = None) -> str:
+    """Resolve workspace root using central path resolution."""
+    env = os.environ if env is None else env
+    if paths is None:
+        paths = get_hyper_paths(env=env)
+    root = paths.get('workspace_root', '')
+    # Handle marker values from resolver indicating no workspace
+    if not root or root.startswith('<') or root == 'null':
+        # Fallback to environment variable
+        root = env.get('HYPER_WORKSPACE_ROOT', '').strip()
+    if not root or root.startswith('<') or root == 'null':
+        return ''
+    return normalize_path(root)
+
+
+def resolve_personal_drive(paths: dict = None) -> str:
+    """Resolve personal drive path using central path resolution."""
+    if paths is None:
+        paths = get_hyper_paths()
+    drive = paths.get('personal_drive', '')
+    if not drive or drive.startswith('<') or drive == 'null':
+        return ''
+    return normalize_path(drive)
+
+
+def get_personal_drive() -> str:
+    """Personal drive path, resolved on first use. Assign PERSONAL_DRIVE to override."""
+    global PERSONAL_DRIVE
+    try:
+        return PERSONAL_DRIVE
+    except NameError:
+        with hyper_metrics.phase('paths'):
+            PERSONAL_DRIVE = resolve_personal_drive()
+        return PERSONAL_DRIVE
+
+
+def get_workspace_root() -> str:
+    """Workspace root, resolved on first use. Assign WORKSPACE_ROOT to override."""
+    global WORKSPACE_ROOT
+    try:
+        return WORKSPACE_ROOT
+    except NameError:
+        with hyper_metrics.phase('paths'):
+            WORKSPACE_ROOT = resolve_workspace_root()
+        return WORKSPACE_ROOT
+
+
+def is_workspace_file(file_path: str, workspace_root: str = None, personal_drive: str = None) -> bool:
+    """
+    Check if file is a Hyper-managed file (workspace, personal drive, etc.)
+    Roots default to the resolved WORKSPACE_ROOT and PERSONAL_DRIVE.
+    """
+    path = normalize_path(file_path)
+    if personal_drive is None:
+        personal_drive = get_personal_drive()
+    if workspace_root is None:
+        workspace_root = get_workspace_root()
+
+    # Check personal drive first (artifacts in ~/.hyper/accounts/.../artifacts/ or legacy notes/)
+    if personal_drive and (path == personal_drive or path.startswith(f"{personal_drive}/")):
+        return True
+
+    # Check workspace root
+    if workspace_root and (path == workspace_root or path.startswith(f"{workspace_root}/")):
+        return True
+
+    # Fallback: any file in a .hyper directory structure
+    return '/.hyper/' in path
+
+
+def infer_type_from_path(file_path: str, workspace_root: str = None) -> str:
+    """Derive expected document type from file path (relative to workspace_root, default WORKSPACE_ROOT)."""
+    path = normalize_path(file_path).lower()
+    rel_path = path
+    if workspace_root is None:
+        workspace_root = get_workspace_root()
+
+    if workspace_root and path.startswith(f"{workspace_root}/"):
+        rel_path = path[len(workspace_root) + 1 :]
+    elif '/workspaces/' in path:
+        tail = path.split('/workspaces/', 1)[1]
+        parts = tail.split('/', 1)
+        if len(parts) == 2:
+            rel_path = parts[1]
+    elif '/.hyper/' in path:
+        rel_path = path.split('/.hyper/', 1)[1]
+
+    # Handle artifacts (personal drive) - new location is artifacts/, legacy is notes/
+    if rel_path.startswith('artifacts/'):
+        return 'artifact'
+    elif '/artifacts/' in rel_path:
+        return 'artifact'
+    # Legacy notes/ path - still return 'artifact' to use the new schema
+    elif rel_path.startswith('notes/'):
+        return 'artifact'  # Use artifact schema for validation
+    elif '/notes/' in rel_path:
+        return 'artifact'  # Use artifact schema for validation
+    elif rel_path.startswith('projects/'):
+        if rel_path.endswith('/_project.mdx'):
+            return 'project'
+        elif '/tasks/' in rel_path:
+            return 'task'
+        elif '/resources/' in rel_path:
+            return 'resource'
+    elif rel_path.startswith('docs/'):
+        return 'doc'
+
+    return None
+
+
+def get_projects_dir() -> str:
+    """Get the projects directory path."""
+    workspace_root = get_workspace_root()
+    if workspace_root:
+        return os.path.join(workspace_root, 'projects')
+    return ''
+
+
+# Open workspace indexes, keyed by workspace root (kept warm in the daemon)
+_workspace_indexes = {}
+
+
+def get_workspace_index(root: str = None):
+    """
+    Return the workspace index (of root, default the resolved workspace),
+    refreshed against the filesystem.
+    Returns None when no index is available (no workspace root, read-only
+    root, HYPER_INDEX=off); callers then fall back to directory scans.
+    """
+    root = root or get_workspace_root()
+    if not root:
+        return None
+
+    import hyper_index
+
+    index = _workspace_indexes.get(root)
+    if index is not None and not os.path.exists(index.db_path):
+        # Index file was removed (workspace deleted or reset); start over
+        unwatch_workspace(root)
+        index.close()
+        index = None
+    elif index is not None and _synced_watcher(root) is not None:
+        # Kept current by filesystem events; no walk needed
+        return index
+    if index is None:
+        index = hyper_index.open_index(root, parse_frontmatter_block)
+        if index is None:
+            return None
+        _workspace_indexes[root] = index
+
+    try:
+        with hyper_metrics.phase('index'):
+            index.refresh()
+    except Exception:
+        return None
+    return index
+
+
+# Filesystem watchers (hyper_watch.WorkspaceWatcher) keeping workspace indexes
+# and graphs current, keyed by workspace root (started by the daemon)
+_workspace_watchers = {}
+
+
+def watch_workspace(root: str = None, lock=None):
+    """
+    Keep the index and project/task graph of root (default: the resolved
+    workspace) current from filesystem events, in a background thread, so
+    relationship checks no longer walk the tree. The personal drive is
+    watched too, dropping changed files from the file cache. lock, when
+    given, is held while updates are applied.
+    Returns the watcher, or None when watching is unavailable
+    (HYPER_WATCH=off, no workspace index).
+    """
+    root = root or get_workspace_root()
+    if not root:
+        return None
+    watcher = _workspace_watchers.get(root)
+    if watcher is not None and watcher.alive:
+        return watcher
+
+    import hyper_watch
+
+    if hyper_watch.watch_mode() == 'off':
+        return None
+    index = get_workspace_index(root)
+    if index is None:
+        return None
+    try:
+        watcher = hyper_watch.WorkspaceWatcher(index, roots=[get_personal_drive()], lock=lock,
+                                               on_change=_discard_cached_files)
+    except OSError:
+        return None
+    _workspace_watchers[root] = watcher.start()
+    return watcher
+
+
+def unwatch_workspace(root: str = None) -> None:
+    """Stop watching root (every watched root when None)."""
+    roots = list(_workspace_watchers) if root is None else [root]
+    for watched in roots:
+        watcher = _workspace_watchers.pop(watched, None)
+        if watcher is not None:
+            watcher.stop()
+
+
+def _synced_watcher(root: str):
+    """The live watcher of root with pending events applied, or None."""
+    watcher = _workspace_watchers.get(root)
+    if watcher is None:
+        return None
+    try:
+        if not watcher.alive:
+            raise RuntimeError('watcher stopped')
+        with hyper_metrics.phase('index'):
+            watcher.sync()
+    except Exception:
+        # Fall back to refreshing the index by walking the tree
+        unwatch_workspace(root)
+        return None
+    return watcher
+
+
+def watched_graph(root: str = None):
+    """
+    The workspace graph of a watched root (see watch_workspace and
+    build_workspace_graph), current as of this call; None when root is not
+    watched.
+    """
+    root = root or get_workspace_root()
+    watcher = _synced_watcher(root) if root else None
+    return watcher.graph if watcher is not None else None
+
+
+# Memory-mapped relationship snapshots (hyper_snapshot.Snapshot), keyed by
+# workspace root
+_workspace_snapshots = {}
+
+
+def current_snapshot(project_slug: str = '', root: str = None):
+    """
+    The relationship snapshot of root (default: the resolved workspace) when
+    it still matches the project documents and project_slug's tasks on disk;
+    None otherwise, and callers use the index, whose refresh publishes a new
+    snapshot.
+    """
+    root = root or get_workspace_root()
+    if not root:
+        return None
+
+    import hyper_snapshot
+
+    if not hyper_snapshot.snapshot_enabled():
+        return None
+    with hyper_metrics.phase('index'):
+        snapshot = _workspace_snapshots.get(root)
+        if snapshot is not None and snapshot.replaced():
+            snapshot.close()
+            snapshot = None
+        if snapshot is None:
+            snapshot = hyper_snapshot.open_snapshot(root)
+            if snapshot is None:
+                _workspace_snapshots.pop(root, None)
+                return None
+            _workspace_snapshots[root] = snapshot
+        return snapshot if snapshot.is_current(root, project_slug) else None
+
+
+def _discard_cached_files(paths) -> None:
+    if _file_cache is None:
+        return
+    if paths is None:
+        _file_cache.clear()
+    else:
+        for path in paths:
+            _file_cache.discard(path)
+
+
+def list_project_ids(index=None) -> list:
+    """List all available project IDs in the workspace."""
+    index = index or get_workspace_index()
+    if index is not None:
+        return index.project_ids()
+
+    projects_dir = get_projects_dir()
+    if not projects_dir or not os.path.exists(projects_dir):
+        return []
+
+    project_ids = []
+    try:
+        for entry in os.listdir(projects_dir):
+            project_path = os.path.join(projects_dir, entry, '_project.mdx')
+            if os.path.isfile(project_path):
+                fm = read_frontmatter_file(project_path)
+                if 'id' in fm:
+                    project_ids.append(fm['id'])
+    except Exception:
+        pass
+    return project_ids
+
+
+def list_task_ids_for_project(project_slug: str, index=None) -> list:
+    """List all task IDs for a given project slug."""
+    index = index or get_workspace_index()
+    if index is not None:
+        return index.task_ids(project_slug)
+
+    projects_dir = get_projects_dir()
+    if not projects_dir:
+        return []
+
+    tasks_dir = os.path.join(projects_dir, project_slug, 'tasks')
+    if not os.path.exists(tasks_dir):
+        return []
+
+    task_ids = []
+    try:
+        for entry in os.listdir(tasks_dir):
+            if entry.endswith('.mdx'):
+                task_path = os.path.join(tasks_dir, entry)
+                fm = read_frontmatter_file(task_path)
+                if 'id' in fm:
+                    task_ids.append(fm['id'])
+    except Exception:
+        pass
+    return task_ids
+
+
+def get_project_slug_from_path(file_path: str) -> str:
+    """Extract project slug from a file path."""
+    path = normalize_path(file_path)
+    # Look for pattern: .../projects/<slug>/...
+    if '/projects/' in path:
+        after_projects = path.split('/projects/', 1)[1]
+        parts = after_projects.split('/')
+        if parts:
+            return parts[0]
+    return ''
+
+
+def load_dependency_graph(project_slug: str, index=None) -> dict:
+    """
+    Build the dependency graph for a project in one pass.
+    Returns a dict mapping task id -> depends_on list, in file order.
+    """
+    index = index or get_workspace_index()
+    if index is not None:
+        return index.task_dependencies(project_slug)
+
+    projects_dir = get_projects_dir()
+    if not projects_dir:
+        return {}
+
+    tasks_dir = os.path.join(projects_dir, project_slug, 'tasks')
+    if not os.path.exists(tasks_dir):
+        return {}
+
+    graph = {}
+    try:
+        for entry in os.listdir(tasks_dir):
+            if entry.endswith('.mdx'):
+                task_path = os.path.join(tasks_dir, entry)
+                fm = read_frontmatter_file(task_path)
+                if 'id' in fm:
+                    deps = fm.get('depends_on', [])
+                    if isinstance(deps, str):
+                        deps = [deps]
+                    elif not isinstance(deps, list):
+                        deps = []
+                    # First file wins for duplicate ids
+                    graph.setdefault(fm['id'], deps)
+    except Exception:
+        pass
+    return graph
+
+
+def get_task_dependencies(task_id: str, project_slug: str, index=None) -> list:
+    """Get depends_on list for a task."""
+    return load_dependency_graph(project_slug, index=index).get(task_id, [])
+
+
+def find_dependency_cycles(task_id: str, depends_on: list, graph: dict) -> list:
+    """
+    Find the cycles that task_id's depends_on would close in a dependency graph.
+    graph maps task id -> depends_on list; task_id's entry is replaced by
+    depends_on. Returns one cycle path (list of ids, starting and ending with
+    task_id) per dependency that leads back to task_id.
+
+    Runs in O(V+E): a single breadth-first search from task_id over reversed
+    edges records, for every task that can reach task_id, its next hop on a
+    shortest path there. Iterative, so deep chains can't hit the recursion limit.
+    """
+    if not depends_on:
+        return []
+
+    graph = dict(graph)
+    graph[task_id] = list(depends_on)
+
+    dependents = {}
+    for node, deps in graph.items():
+        for dep in deps:
+            dependents.setdefault(dep, []).append(node)
+
+    next_hop = {}
+    queue = deque([task_id])
+    while queue:
+        node = queue.popleft()
+        for dependent in dependents.get(node, ()):
+            if dependent != task_id and dependent not in next_hop:
+                next_hop[dependent] = node
+                queue.append(dependent)
+
+    cycles = []
+    reported = set()
+    for dep_id in depends_on:
+        if dep_id in reported:
+            continue
+        reported.add(dep_id)
+        if dep_id == task_id:
+            cycles.append([task_id, task_id])
+        elif dep_id in next_hop:
+            cycle = [task_id, dep_id]
+            node = dep_id
+            while node != task_id:
+                node = next_hop[node]
+                cycle.append(node)
+            cycles.append(cycle)
+    return cycles
+
+
+def dependency_cycles(task_id: str, depends_on: list, graph: dict, order=None) -> list:
+    """
+    find_dependency_cycles(), answered from the project's maintained
+    hyper_topo.DependencyOrder when one is available: that only searches the
+    tasks positioned between task_id and its dependencies instead of the
+    whole project. order must describe the same graph.
+    """
+    if order is not None and order.acyclic:
+        return order.cycles_closed_by(task_id, depends_on)
+    return find_dependency_cycles(task_id, depends_on, graph)
+
+
+def detect_circular_dependency(task_id: str, depends_on: list, project_slug: str, index=None) -> str:
+    """
+    Detect if adding these dependencies would create a circular dependency.
+    Returns the cycle path string if cycle found, empty string otherwise.
+    """
+    index = index or get_workspace_index()
+    order = index.dependency_order(project_slug) if index is not None else None
+    cycles = dependency_cycles(task_id, depends_on, load_dependency_graph(project_slug, index=index), order)
+    return ' -> '.join(cycles[0]) if cycles else ''
+
+
+def build_workspace_graph(index=None) -> dict:
+    """
+    Build the project/task graph for the whole workspace once.
+    Returns {'project_ids': [...], 'tasks': {project_slug: {task_id: depends_on}},
+    'orders': {project_slug: DependencyOrder}}.
+    """
+    import hyper_topo
+
+    index = index or get_workspace_index()
+    if index is not None:
+        return index.workspace_graph()
+
+    tasks = {}
+    projects_dir = get_projects_dir()
+    if projects_dir and os.path.isdir(projects_dir):
+        for entry in sorted(os.listdir(projects_dir)):
+            if os.path.isdir(os.path.join(projects_dir, entry, 'tasks')):
+                tasks[entry] = load_dependency_graph(entry)
+    return {'project_ids': list_project_ids(), 'tasks': tasks,
+            'orders': {slug: hyper_topo.DependencyOrder.from_graph(graph) for slug, graph in tasks.items()}}
+
+
+def query_workspace(root: str = None, **filters) -> list:
+    """
+    Find workspace documents by frontmatter (see hyper_index.WorkspaceIndex.query
+    for the filters), e.g. query_workspace(type='task', status='blocked',
+    priority='urgent') or query_workspace(project='alpha', tags=['api']).
+    Without an index the workspace is scanned into a throwaway in-memory one.
+    Returns None when there is no workspace.
+    """
+    root = root or get_workspace_root()
+    if not root or not os.path.isdir(root):
+        return None
+
+    index = get_workspace_index(root)
+    if index is not None:
+        return index.query(**filters)
+
+    import hyper_index
+    scan = hyper_index.WorkspaceIndex(root, parse_frontmatter_block, db_path=':memory:')
+    try:
+        scan.refresh()
+        return scan.query(**filters)
+    finally:
+        scan.close()
+
+
+def _allocation_index(root: str):
+    """
+    The workspace index of root for task number allocation: opened, but not
+    walked (reserve_task_number() brings a project's task rows up to date
+    before seeding its counter).
+    """
+    import hyper_index
+
+    index = _workspace_indexes.get(root)
+    if index is not None and os.path.exists(index.db_path):
+        return index
+    index = hyper_index.open_index(root, parse_frontmatter_block)
+    if index is None:
+        return None
+    _workspace_indexes[root] = index
+    return index
+
+
+def allocate_task_number(project_slug: str, prefix: str = 'task', root: str = None):
+    """
+    Reserve the next task file number of a project (prefix 'task' or
+    'verify-task'; see hyper_index.WorkspaceIndex.reserve_task_number).
+    Returns {'project', 'number', 'filename', 'path'}, or None when there is
+    no workspace. Without an index the number is claimed with a marker file
+    in the tasks directory instead.
+    Raises ValueError for an invalid project slug or prefix.
+    """
+    root = root or get_workspace_root()
+    if not root or not os.path.isdir(root):
+        return None
+
+    import hyper_index
+
+    index = _allocation_index(root)
+    if index is not None:
+        number = index.reserve_task_number(project_slug, prefix)
+    else:
+        number = hyper_index.reserve_task_number_by_scan(root, project_slug, prefix)
+    filename = hyper_index.task_filename(prefix, number)
+    return {
+        'project': project_slug,
+        'number': number,
+        'filename': filename,
+        'path': os.path.join(root, 'projects', project_slug, 'tasks', filename),
+    }
+
+
+def release_task_number(project_slug: str, number: int, prefix: str = 'task', root: str = None) -> bool:
+    """Give back a number from allocate_task_number() whose file will not be written."""
+    root = root or get_workspace_root()
+    if not root or not os.path.isdir(root):
+        return False
+
+    import hyper_index
+
+    index = _allocation_index(root)
+    if index is not None:
+        return index.release_task_number(project_slug, number, prefix)
+    return hyper_index.release_task_number_by_scan(root, project_slug, number, prefix)
+
+
+# Open full-text indexes, keyed by root (kept warm in the daemon)
+_search_indexes = {}
+
+
+def get_search_index(root: str):
+    """Return the full-text index of root, refreshed, or None when unavailable."""
+    import hyper_search
+
+    index = _search_indexes.get(root)
+    if index is not None and not os.path.exists(index.db_path):
+        index.close()
+        index = None
+    if index is None:
+        index = hyper_search.open_search_index(root, parse_frontmatter_block)
+        if index is None:
+            return None
+        _search_indexes[root] = index
+
+    try:
+        with hyper_metrics.phase('index'):
+            index.refresh()
+    except Exception:
+        return None
+    return index
+
+
+def search_workspace(query: str, roots: list = None, limit: int = 20, kind=None) -> list:
+    """
+    Full-text search over document bodies (see hyper_search.SearchIndex.search).
+    roots defaults to the workspace root; results from several roots carry
+    the root they came from and are scored by BM25 over the roots' combined
+    statistics (hyper_search.merge_statistics), so they rank as one
+    collection.
+    Without an index each root is scanned into a throwaway in-memory one.
+    Returns None when none of the roots exists.
+    """
+    roots = [r for r in (roots or [get_workspace_root()]) if r and os.path.isdir(r)]
+    if not roots:
+        return None
+
+    import hyper_search
+    indexes = []
+    scans = []
+    try:
+        for root in roots:
+            index = get_search_index(root)
+            if index is None:
+                index = hyper_search.SearchIndex(root, parse_frontmatter_block, db_path=':memory:')
+                scans.append(index)
+                index.refresh()
+            indexes.append((root, index))
+
+        statistics = None
+        if len(indexes) > 1:
+            statistics = hyper_search.merge_statistics([index.statistics(query) for _, index in indexes])
+        results = []
+        for root, index in indexes:
+            found = index.search(query, limit=limit, kind=kind, statistics=statistics)
+            results.extend({'root': root, **result} for result in found)
+    finally:
+        for scan in scans:
+            scan.close()
+    results.sort(key=lambda result: -result['score'])
+    return results[:limit]
+
+
+def validate_relationships(frontmatter: dict, expected_type: str, file_path: str,
+                           workspace_graph: dict = None) -> list:
+    """
+    Validate relationship fields (parent, depends_on, blocks).
+    workspace_graph (from build_workspace_graph) replaces index lookups, so
+    batch runs share one graph across all files.
+    """
+    errors = []
+
+    # Only validate relationships for tasks
+    if expected_type != 'task':
+        return errors
+
+    project_slug = get_project_slug_from_path(file_path)
+    task_id = frontmatter.get('id', '')
+
+    # A watched workspace keeps its graph current. Otherwise a current
+    # snapshot answers the common case (every reference exists, no cycle)
+    # with binary searches, and anything else is checked against the graph
+    # it holds; failing both, refresh the index once and read every lookup
+    # below from it.
+    if workspace_graph is None:
+        workspace_graph = watched_graph()
+    if workspace_graph is None:
+        snapshot = current_snapshot(project_slug)
+        if snapshot is not None:
+            depends_on = frontmatter.get('depends_on', [])
+            if snapshot.references_ok(project_slug, task_id, frontmatter.get('parent'),
+                                      [depends_on] if isinstance(depends_on, str) else depends_on):
+                return errors
+            workspace_graph = _snapshot_graph(snapshot, project_slug)
+    index = get_workspace_index() if workspace_graph is None else None
+
+    # Validate parent field
+    parent = frontmatter.get('parent')
+    if parent:
+        if workspace_graph is not None:
+            available_projects = workspace_graph['project_ids']
+        else:
+            available_projects = list_project_ids(index=index)
+        if available_projects and parent not in available_projects:
+            errors.append({
+                'code': 'INVALID_PARENT_REFERENCE',
+                'field': 'parent',
+                'message': f"Parent project '{parent}' does not exist",
+                'suggestion': f"Available projects: {', '.join(available_projects[:5])}{'...' if len(available_projects) > 5 else ''}",
+            })
+
+    # Validate depends_on field
+    depends_on = frontmatter.get('depends_on', [])
+    if depends_on:
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+
+        if project_slug:
+            # Build the project's dependency graph once for all checks below
+            if workspace_graph is not None:
+                graph = workspace_graph['tasks'].get(project_slug, {})
+                order = workspace_graph.get('orders', {}).get(project_slug)
+            else:
+                graph = load_dependency_graph(project_slug, index=index)
+                order = index.dependency_order(project_slug) if index is not None else None
+            available_tasks = list(graph)
+            if available_tasks:
+                for dep_id in depends_on:
+                    # Skip self-reference (will be caught by cycle detection)
+                    if dep_id == task_id:
+                        errors.append({
+                            'code': 'SELF_DEPENDENCY',
+                            'field': 'depends_on',
+                            'message': f"Task cannot depend on itself",
+                            'suggestion': 'Remove self-reference from depends_on',
+                        })
+                    elif dep_id not in graph:
+                        errors.append({
+                            'code': 'INVALID_DEPENDENCY_REFERENCE',
+                            'field': 'depends_on',
+                            'message': f"Dependency '{dep_id}' does not exist in project",
+                            'suggestion': f"Available tasks: {', '.join(available_tasks[:5])}{'...' if len(available_tasks) > 5 else ''}",
+                        })
+
+            # Check for circular dependencies (every cycle the new edges close)
+            if task_id:
+                for cycle in dependency_cycles(task_id, depends_on, graph, order):
+                    errors.append({
+                        'code': 'CIRCULAR_DEPENDENCY',
+                        'field': 'depends_on',
+                        'message': f"Circular dependency detected: {' -> '.join(cycle)}",
+                        'suggestion': f"Remove '{cycle[1]}' from depends_on to break the cycle",
+                    })
+
+    return errors
+
+
+def validate_frontmatter(frontmatter: dict, expected_type: str, file_path: str,
+                         workspace_graph: dict = None) -> list:
+    """Validate frontmatter against schema. Returns list of structured error dicts."""
+    errors = []
+    filename = os.path.basename(file_path)
+
+    # Get schema for this type
+    schemas = get_schemas()
+    schema = schemas.get(expected_type)
+
+    # Check naming convention
+    if not schema.filename_matches(filename):
+        example = f" Example: {schema.filename_example}" if schema.filename_example else ''
+        errors.append({
+            'code': 'INVALID_FILENAME',
+            'field': None,
+            'message': f"File name '{filename}' doesn't follow the {expected_type} naming convention",
+            'suggestion': f"Rename the file to match {schema.filename_re.pattern}.{example}",
+        })
+
+    # Check required fields
+    for field in schema.required:
+        if field not in frontmatter:
+            suggestion = _get_field_suggestion(field, expected_type)
+            errors.append({
+                'code': 'MISSING_REQUIRED_FIELD',
+                'field': field,
+                'message': f"Missing required field: '{field}'",
+                'suggestion': suggestion,
+            })
+
+    # Type validation
+    doc_type = frontmatter.get('type')
+    if doc_type:
+        allowed_types = schema.enum('type', schemas.types)
+        if doc_type not in allowed_types:
+            errors.append({
+                'code': 'INVALID_ENUM_VALUE',
+                'field': 'type',
+                'message': f"Invalid type '{doc_type}'",
+                'suggestion': f"Must be one of: {', '.join(allowed_types)}",
+            })
+        elif expected_type and doc_type != expected_type:
+            errors.append({
+                'code': 'TYPE_MISMATCH',
+                'field': 'type',
+                'message': f"Type '{doc_type}' doesn't match expected type '{expected_type}' for this location",
+                'suggestion': f"Use type: {expected_type}",
+            })
+
+    # Status validation
+    status = frontmatter.get('status')
+    if status:
+        allowed_statuses = schema.enum('status', schemas.statuses)
+        if status not in allowed_statuses:
+            errors.append({
+                'code': 'INVALID_ENUM_VALUE',
+                'field': 'status',
+                'message': f"Invalid status '{status}'",
+                'suggestion': f"Must be one of: {', '.join(allowed_statuses)}",
+            })
+
+    # Priority validation
+    priority = frontmatter.get('priority')
+    if priority:
+        allowed_priorities = schema.enum('priority', schemas.priorities)
+        if priority not in allowed_priorities:
+            errors.append({
+                'code': 'INVALID_ENUM_VALUE',
+                'field': 'priority',
+                'message': f"Invalid priority '{priority}'",
+                'suggestion': f"Must be one of: {', '.join(allowed_priorities)}",
+            })
+
+    # Date format validation
+    for date_field in schemas.date_fields:
+        date_value = frontmatter.get(date_field)
+        if date_value:
+            if not schemas.date_re.match(str(date_value)):
+                errors.append({
+                    'code': 'INVALID_DATE_FORMAT',
+                    'field': date_field,
+                    'message': f"Invalid date format for '{date_field}': '{date_value}'",
+                    'suggestion': 'Use YYYY-MM-DD format (e.g., 2026-01-19)',
+                })
+
+    # ID format validation (must be quoted if contains colon)
+    id_value = frontmatter.get('id')
+    if id_value and isinstance(id_value, str):
+        # Check if ID looks malformed (YAML might have truncated at colon)
+        if id_value in ['personal', 'ws', 'proj', 'task']:
+            errors.append({
+                'code': 'MALFORMED_ID',
+                'field': 'id',
+                'message': f"ID '{id_value}' appears truncated (missing part after colon?)",
+                'suggestion': 'IDs with colons must be quoted: id: "personal:my-note-123"',
+            })
+        # Check if artifact/drive item ID is missing scope prefix
+        elif expected_type in ('artifact', 'note'):
+            # Valid scope prefixes for drive items
+            valid_prefixes = ['personal:', 'ws-', 'org-', 'proj-']
+            has_valid_prefix = any(id_value.startswith(p) for p in valid_prefixes)
+            if not has_valid_prefix:
+                errors.append({
+                    'code': 'MISSING_SCOPE_PREFIX',
+                    'field': 'id',
+                    'message': f"Artifact ID '{id_value}' is missing the required scope prefix",
+                    'suggestion': (
+                        'Artifact IDs must include a scope prefix. Examples:\n'
+                        '  - Personal: id: "personal:my-artifact-slug"\n'
+                        '  - Workspace: id: "ws-{workspaceId}:my-artifact"\n'
+                        '  - Organization: id: "org-{orgId}:my-artifact"\n'
+                        '\n'
+                        'Recommended: Use the CLI to create artifacts automatically:\n'
+                        '  hypercraft drive create "My Artifact Title" --icon "FileText" --json'
+                    ),
+                })
+
+    # Validate relationships (parent, depends_on)
+    with hyper_metrics.phase('relationships'):
+        relationship_errors = validate_relationships(frontmatter, expected_type, file_path, workspace_graph)
+    errors.extend(relationship_errors)
+
+    return errors
+
+
+def _get_field_suggestion(field: str, expected_type: str) -> str:
+    """Get a helpful suggestion for a missing field."""
+    suggestions = {
+        'id': 'Add unique identifier. Example: id: "proj-my-project" (quote if contains colon)',
+        'title': 'Add title field. Example: title: My Project Title',
+        'type': f'Add type field. Example: type: {expected_type}' if expected_type else 'Add type field',
+        'status': 'Add status field. Example: status: todo',
+        'priority': 'Add priority field. Example: priority: high',
+        'parent': 'Add parent field referencing the project. Example: parent: proj-my-project',
+    }
+    return suggestions.get(field, f'Add the {field} field')
+
+
+def format_error_response(errors: list, file_path: str, expected_type: str) -> dict:
+    """Format errors as structured JSON response."""
+    return {
+        'success': False,
+        'error': {
+            'code': 'SCHEMA_VALIDATION_FAILED',
+            'message': f"Invalid frontmatter for {expected_type or 'file'} schema",
+            'context': {
+                'detected_schema': expected_type,
+                'file_path': file_path,
+                'errors': errors,
+            },
+            'suggestion': errors[0].get('suggestion', '') if errors else '',
+        }
+    }
+
+
+def validate_content(file_path: str, content: str, output_json: bool = False,
+                     workspace_graph: dict = None, expected_type: str = None) -> tuple:
+    """
+    Validate MDX content. Returns (is_valid, errors_or_none).
+    If output_json is True, prints JSON and exits with appropriate code.
+    expected_type defaults to the type inferred from the path.
+    """
+    if expected_type is None:
+        expected_type = infer_type_from_path(file_path)
+
+    # Parse frontmatter
+    frontmatter, body, parse_error = parse_frontmatter(content)
+
+    # Check for YAML parse errors
+    if parse_error:
+        errors = [parse_error]
+        if output_json:
+            response = format_error_response(errors, file_path, expected_type)
+            print(json.dumps(response))
+            sys.exit(2)
+        return False, errors
+
+    if not frontmatter:
+        errors = [{
+            'code': 'MISSING_FRONTMATTER',
+            'field': None,
+            'message': 'File is missing YAML frontmatter',
+            'suggestion': 'Add frontmatter block starting with --- and ending with ---',
+        }]
+        if output_json:
+            response = format_error_response(errors, file_path, expected_type)
+            print(json.dumps(response))
+            sys.exit(2)
+        return False, errors
+
+    # Validate against schema
+    with hyper_metrics.phase('schema'):
+        errors = validate_frontmatter(frontmatter, expected_type, file_path, workspace_graph)
+
+    if errors:
+        if output_json:
+            response = format_error_response(errors, file_path, expected_type)
+            print(json.dumps(response))
+            sys.exit(2)
+        return False, errors
+
+    # Success
+    if output_json:
+        print(json.dumps({'success': True, 'schema': expected_type}))
+        sys.exit(0)
+    return True, None
+
+
+# Persistent verdict cache (see get_result_cache). Tracked per process: forked
+# batch workers must open their own SQLite connection.
+_result_cache = None
+_result_cache_pid = None
+
+
+def get_result_cache():
+    """The persistent result cache (hyper_resultcache.ResultCache), or None when disabled."""
+    global _result_cache, _result_cache_pid
+    if _result_cache_pid != os.getpid():
+        with hyper_metrics.phase('cache'):
+            import hyper_resultcache
+            _result_cache = hyper_resultcache.open_cache()
+        _result_cache_pid = os.getpid()
+    return _result_cache
+
+
+def relationship_graph(file_path: str, workspace_graph: dict = None) -> dict:
+    """
+    The part of the workspace graph a task's relationship checks read: all
+    project ids plus the task graph (and dependency order, when one is
+    maintained) of the file's own project.
+    """
+    project_slug = get_project_slug_from_path(file_path)
+    if workspace_graph is None:
+        workspace_graph = watched_graph()
+    if workspace_graph is None:
+        snapshot = current_snapshot(project_slug)
+        if snapshot is not None:
+            return _snapshot_graph(snapshot, project_slug)
+    if workspace_graph is not None:
+        tasks = workspace_graph['tasks'].get(project_slug, {}) if project_slug else {}
+        order = workspace_graph.get('orders', {}).get(project_slug)
+        return {'project_ids': workspace_graph['project_ids'], 'tasks': {project_slug: tasks},
+                'orders': {project_slug: order} if order is not None else {}}
+
+    index = get_workspace_index()
+    tasks = load_dependency_graph(project_slug, index=index) if project_slug else {}
+    orders = {project_slug: index.dependency_order(project_slug)} if index is not None and project_slug else {}
+    return {'project_ids': list_project_ids(index=index), 'tasks': {project_slug: tasks}, 'orders': orders}
+
+
+def _snapshot_graph(snapshot, project_slug: str) -> dict:
+    """relationship_graph() of a project, read from a relationship snapshot."""
+    tasks = snapshot.task_dependencies(project_slug) if project_slug else {}
+    return {'project_ids': snapshot.project_ids(), 'tasks': {project_slug: tasks}, 'orders': {}}
+
+
+def validate_content_cached(file_path: str, content: str, workspace_graph: dict = None) -> tuple:
+    """
+    validate_content() through the persistent result cache.
+    Unchanged content is answered from the cache until the schemas, or (for
+    tasks) the projects and sibling tasks it references, change.
+    Returns (is_valid, errors_or_none).
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return validate_content(file_path, content, workspace_graph=workspace_graph)
+
+    import hyper_resultcache
+
+    relationships = ''
+    if infer_type_from_path(file_path) == 'task':
+        # Validate against the same graph the key was derived from
+        with hyper_metrics.phase('relationships'):
+            workspace_graph = relationship_graph(file_path, workspace_graph)
+        relationships = hyper_resultcache.relationship_digest(workspace_graph)
+    with hyper_metrics.phase('cache'):
+        key = hyper_resultcache.result_key(
+            file_path, content, get_schemas().digest, get_workspace_root() or '', relationships
+        )
+        cached = cache.get(key)
+    if cached is not None:
+        return cached
+    is_valid, errors = validate_content(file_path, content, workspace_graph=workspace_graph)
+    with hyper_metrics.phase('cache'):
+        cache.put(key, is_valid, errors)
+    return is_valid, errors
+
+
+def pre_validate_response(file_path: str, content: str) -> tuple:
+    """
+    Build the PreToolUse response for content about to be written.
+    Returns (response_dict, exit_code) without printing or exiting, so callers
+    such as the validator daemon can serve it from a warm process.
+    """
+    # Skip non-workspace files
+    if not is_workspace_file(file_path):
+        return {'success': True, 'skipped': True, 'reason': 'Not a workspace file'}, 0
+
+    # Skip non-MDX files
+    if not file_path.endswith(('.mdx', '.md')):
+        return {'success': True, 'skipped': True, 'reason': 'Not an MDX file'}, 0
+
+    expected_type = infer_type_from_path(file_path)
+    is_valid, errors = validate_content_cached(file_path, content)
+    if not is_valid:
+        return format_error_response(errors, file_path, expected_type), 2
+    return {'success': True, 'schema': expected_type}, 0
+
+
+# Current contents of recently validated files (see get_file_cache)
+_file_cache = None
+
+
+def get_file_cache():
+    """Stat-validated file content cache (hyper_filecache.FileCache), created on first use."""
+    global _file_cache
+    if _file_cache is None:
+        import hyper_filecache
+        _file_cache = hyper_filecache.FileCache()
+    return _file_cache
+
+
+def _error_keys(errors: list) -> set:
+    return {(e.get('code'), e.get('field')) for e in errors if isinstance(e, dict)}
+
+
+def pre_validate_edit_response(file_path: str, edits: list) -> tuple:
+    """
+    Build the PreToolUse response for an Edit/MultiEdit before it is applied.
+    The edits are applied in memory to the file's current contents (cached
+    while the file is unchanged) and the result is validated like a Write.
+    Edits are only blocked for problems they introduce, so a file that is
+    already invalid can still be fixed one edit at a time.
+    Returns (response_dict, exit_code).
+    """
+    import hyper_filecache
+
+    if not is_workspace_file(file_path):
+        return {'success': True, 'skipped': True, 'reason': 'Not a workspace file'}, 0
+    if not file_path.endswith(('.mdx', '.md')):
+        return {'success': True, 'skipped': True, 'reason': 'Not an MDX file'}, 0
+
+    try:
+        original = get_file_cache().read(file_path)
+        updated = hyper_filecache.apply_edits(original, edits)
+    except (OSError, UnicodeDecodeError, hyper_filecache.EditError) as e:
+        # The Edit tool reports these itself; nothing to validate
+        return {'success': True, 'skipped': True, 'reason': f'Edit not applicable: {e}'}, 0
+
+    expected_type = infer_type_from_path(file_path)
+    is_valid, errors = validate_content_cached(file_path, updated)
+    if is_valid:
+        return {'success': True, 'schema': expected_type}, 0
+
+    _was_valid, previous_errors = validate_content_cached(file_path, original)
+    previous = _error_keys(previous_errors or [])
+    introduced = [e for e in errors if (e.get('code'), e.get('field')) not in previous]
+    if not introduced:
+        return {'success': True, 'schema': expected_type, 'preexisting_errors': len(errors)}, 0
+    return format_error_response(introduced, file_path, expected_type), 2
+
+
+def post_validate_report(file_path: str) -> tuple:
+    """
+    Validate a file after it was written (PostToolUse).
+    Returns (stderr_lines, exit_code). Problems are reported as warnings only.
+    """
+    # Only validate workspace data files
+    if not is_workspace_file(file_path):
+        return [], 0  # Not a workspace data file, skip
+
+    # Only validate MDX/MD files
+    if not file_path.endswith(('.mdx', '.md')):
+        return [], 0
+
+    # Skip workspace.json
+    if file_path.endswith('workspace.json'):
+        return [], 0
+
+    # Read the file content (kept cached for the next Edit's pre-validation)
+    try:
+        content = get_file_cache().read(file_path)
+    except FileNotFoundError:
+        # File was deleted or moved, that's okay
+        return [], 0
+    except Exception as e:
+        return [f"Error reading file: {e}"], 1
+
+    _is_valid, errors = validate_content_cached(file_path, content)
+    error_code = errors[0].get('code') if errors else None
+
+    if error_code == 'YAML_PARSE_ERROR':
+        # YAML parse error - show helpful message
+        # Don't block, just warn (PostToolUse)
+        return [
+            f"YAML Error in {os.path.basename(file_path)}:",
+            f"  {errors[0]['message']}",
+            f"  Fix: {errors[0]['suggestion']}",
+        ], 0
+
+    if error_code == 'MISSING_FRONTMATTER':
+        # Provide helpful feedback, but don't block
+        return [
+            f"Warning: File {os.path.basename(file_path)} is missing YAML frontmatter.",
+            "Expected format:",
+            "---",
+            'id: "unique-id"  # Quote if contains colon',
+            "title: Document Title",
+            "type: task|project|doc|resource",
+            "status: todo|in-progress|complete|...",
+            "---",
+        ], 0
+
+    lines = []
+    if errors:
+        lines.append(f"Validation warnings in {os.path.basename(file_path)}:")
+        for error in errors:
+            if isinstance(error, dict):
+                lines.append(f"  - {error['message']}")
+                if error.get('suggestion'):
+                    lines.append(f"    Fix: {error['suggestion']}")
+            else:
+                lines.append(f"  - {error}")
+    # Don't block, just warn
+    return lines, 0
+
+
+def discover_files(roots: list):
+    """Yield every .mdx/.md file under the given roots, skipping dot directories."""
+    seen_roots = set()
+    for root in roots:
+        if not root or root in seen_roots or not os.path.isdir(root):
+            continue
+        seen_roots.add(root)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            for filename in sorted(filenames):
+                if filename.endswith(('.mdx', '.md')) and not filename.startswith('.'):
+                    yield normalize_path(os.path.join(dirpath, filename))
+
+
+def validate_file(file_path: str, workspace_graph: dict = None) -> dict:
+    """
+    Validate one file on disk.
+    Returns a compact result record: path, schema, valid, errors, elapsed_ms.
+    """
+    start = time.perf_counter()
+    expected_type = infer_type_from_path(file_path)
+    try:
+        with hyper_metrics.phase('read'), open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+            hyper_metrics.count('files_read')
+            hyper_metrics.count('bytes_read', f.buffer.tell())
+    except (OSError, UnicodeDecodeError) as e:
+        errors = [{
+            'code': 'READ_ERROR',
+            'field': None,
+            'message': f"Could not read file: {e}",
+            'suggestion': 'Check file permissions and encoding (UTF-8)',
+        }]
+        is_valid = False
+    else:
+        is_valid, errors = validate_content_cached(file_path, content, workspace_graph)
+    return {
+        'path': file_path,
+        'schema': expected_type,
+        'valid': is_valid,
+        'errors': errors or [],
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+# Per-process state for batch workers (set by _init_batch_worker)
+_batch_graph = None
+_batch_timings = False
+
+
+def _init_batch_worker(workspace_root: str, personal_drive: str, workspace_graph: dict,
+                       timings: bool = False) -> None:
+    global WORKSPACE_ROOT, PERSONAL_DRIVE, _batch_graph, _batch_timings
+    WORKSPACE_ROOT = workspace_root
+    PERSONAL_DRIVE = personal_drive
+    _batch_graph = workspace_graph
+    _batch_timings = timings
+
+
+def _validate_batch_chunk(paths: list) -> list:
+    return validate_chunk(paths, _batch_graph, _batch_timings)
+
+
+def validate_chunk(paths: list, workspace_graph: dict = None, timings: bool = False) -> list:
+    """
+    Validate a list of files (see validate_file), journaling each one.
+    With timings, every record also gets its per-phase 'timings' breakdown.
+    """
+    results = []
+    journal = []
+    for path in paths:
+        with hyper_metrics.collect(trace_memory=timings) as metrics:
+            result = validate_file(path, workspace_graph)
+        measured = metrics.as_dict()
+        if timings:
+            result['timings'] = measured
+        results.append(result)
+        journal.append(journal_record('batch', result['schema'], 'ok' if result['valid'] else 'invalid', measured))
+    write_journal(journal)
+    return results
+
+
+def _chunks(items, size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Files per pool task, and pool tasks in flight per worker. Discovery is
+# consumed lazily, so memory stays bounded however large the workspace is.
+BATCH_CHUNK_SIZE = 16
+BATCH_CHUNKS_PER_WORKER = 4
+
+
+def run_batch(roots: list, jobs: int = None, timings: bool = False):
+    """
+    Validate every document under roots on a process pool.
+    Yields one result record per file (see validate_file) as soon as its
+    chunk completes. The workspace graph is built once here and shared with
+    every worker.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+    workspace_graph = build_workspace_graph()
+    jobs = jobs or os.cpu_count() or 1
+    chunks = _chunks(discover_files(roots), BATCH_CHUNK_SIZE)
+
+    if jobs == 1:
+        for chunk in chunks:
+            yield from validate_chunk(chunk, workspace_graph, timings)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_batch_worker,
+        initargs=(get_workspace_root(), get_personal_drive(), workspace_graph, timings),
+    ) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(_validate_batch_chunk, chunk))
+            if len(pending) < jobs * BATCH_CHUNKS_PER_WORKER:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+        for future in as_completed(pending):
+            yield from future.result()
+
+
+def batch_summary(results) -> dict:
+    """
+    Collect batch results into a single JSON-serializable report.
+    Per-file timings, when present, are aggregated into report['timings'].
+    """
+    start = time.perf_counter()
+    files = valid = 0
+    failures = []
+    timings = []
+    for result in results:
+        files += 1
+        if result['valid']:
+            valid += 1
+        else:
+            failures.append(result)
+        if 'timings' in result:
+            timings.append(result['timings'])
+    report = {
+        'success': not failures,
+        'files': files,
+        'valid': valid,
+        'invalid': len(failures),
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        'failures': failures,
+    }
+    if timings:
+        report['timings'] = hyper_metrics.aggregate(timings)
+    return report
+
+
+def write_jsonl(results, stream) -> bool:
+    """
+    Write one compact JSON line per result, flushing each so consumers can
+    read while validation is still running. Returns True if all were valid.
+    """
+    all_valid = True
+    for result in results:
+        all_valid = all_valid and result['valid']
+        stream.write(json.dumps(result, separators=(',', ':')) + '\n')
+        stream.flush()
+    return all_valid
+
+
+def journal_record(mode: str, schema: str, outcome: str, timings: dict) -> bytes:
+    """Encode one latency journal record (see hyper_journal)."""
+    import hyper_journal
+    return hyper_journal.encode(mode, schema, outcome, timings)
+
+
+def write_journal(records: list) -> None:
+    """Append records to the latency journal (best effort)."""
+    import hyper_journal
+    hyper_journal.append(records)
+
+
+def run_hook(mode: str, file_path: str, *args, timings: bool = False) -> tuple:
+    """
+    Run one hook validation and journal its latency.
+    mode is 'pre' (args: content), 'pre-edit' (args: edits) or 'post'.
+    Returns (response_dict, exit_code) for PreToolUse modes and
+    (stderr_lines, exit_code) for 'post'. With timings the per-phase
+    breakdown is attached: as response['timings'], or as a trailing
+    {"timings": ...} JSON line after the PostToolUse report.
+    """
+    func = {
+        'pre': pre_validate_response,
+        'pre-edit': pre_validate_edit_response,
+        'post': post_validate_report,
+    }[mode]
+    with hyper_metrics.collect(trace_memory=timings) as metrics:
+        result, exit_code = func(file_path, *args)
+    measured = metrics.as_dict()
+
+    if mode == 'post':
+        outcome = 'error' if exit_code else ('invalid' if result else 'ok')
+    else:
+        outcome = 'invalid' if exit_code else ('skipped' if result.get('skipped') else 'ok')
+    write_journal([journal_record(mode, infer_type_from_path(file_path), outcome, measured)])
+
+    if timings:
+        if mode == 'post':
+            result = result + [json.dumps({'timings': measured})]
+        else:
+            result['timings'] = measured
+    return result, exit_code
+
+
+ALLOW = {'decision': 'allow'}
+
+
+def block_reason(response: dict) -> str:
+    """One-line reason for a blocked write: the first error and its fix."""
+    error = response.get('error') or {}
+    errors = (error.get('context') or {}).get('errors') or []
+    first = errors[0] if errors and isinstance(errors[0], dict) else {}
+    if first.get('message'):
+        message, fix = first['message'], first.get('suggestion')
+    else:
+        message, fix = error.get('message') or 'Validation failed', error.get('suggestion')
+    return f"{message}. Fix: {fix}" if fix else message
+
+
+def pre_hook_decision(hook_input, timings: bool = False) -> tuple:
+    """
+    Decide a raw PreToolUse hook payload ({"tool_input": {...}, ...}).
+    Writes are validated by content and Edit/MultiEdit calls by applying
+    their edits; anything that is not a workspace .mdx file is allowed.
+    Returns ({"decision": "allow"|"block", ...}, exit_code 0|2).
+    """
+    import hyper_filecache
+
+    tool_input = hook_input.get('tool_input') if isinstance(hook_input, dict) else None
+    if not isinstance(tool_input, dict):
+        return dict(ALLOW), 0
+    file_path = tool_input.get('file_path') or ''
+    if not file_path.endswith('.mdx') or not is_workspace_file(file_path):
+        return dict(ALLOW), 0
+
+    content = tool_input.get('content')
+    if isinstance(content, str) and content:
+        response, exit_code = run_hook('pre', file_path, content, timings=timings)
+    else:
+        edits = hyper_filecache.edits_from_tool_input(tool_input)
+        if not edits:
+            # Nothing to validate before the write; PostToolUse checks the result
+            return dict(ALLOW), 0
+        response, exit_code = run_hook('pre-edit', file_path, edits, timings=timings)
+
+    decision = dict(ALLOW) if exit_code == 0 else {'decision': 'block', 'reason': block_reason(response)}
+    if 'timings' in response:
+        decision['timings'] = response['timings']
+    return decision, 0 if exit_code == 0 else 2
+
+
+def main():
+    # Check for PreToolUse validation mode (direct invocation)
+    parser = argparse.ArgumentParser(description='Validate Hyper MDX files')
+    parser.add_argument('--pre-validate', action='store_true',
+                        help='Run in PreToolUse mode (validate before write)')
+    parser.add_argument('--path', type=str, help='File path to validate')
+    parser.add_argument('--content', type=str, help='Content to validate (reads from stdin if not provided)')
+    parser.add_argument('--json', action='store_true', help='Output JSON response')
+    parser.add_argument('--edit', action='store_true',
+                        help='With --pre-validate: stdin is an Edit/MultiEdit tool_input to apply to the file')
+    parser.add_argument('--workspace', action='store_true',
+                        help='Validate every document under the workspace root')
+    parser.add_argument('--all', action='store_true',
+                        help='Validate the workspace root and the personal drive')
+    parser.add_argument('--jobs', type=int, help='Worker processes for --workspace/--all (default: CPU count)')
+    parser.add_argument('--format', choices=('json', 'jsonl'), default='json',
+                        help='Batch output: one JSON summary, or one JSON line per file as it completes')
+    parser.add_argument('--hook', choices=('pre', 'post'),
+                        help='Read the raw hook JSON from stdin; "pre" prints the PreToolUse decision document')
+    parser.add_argument('--timings', action='store_true',
+                        help='Add per-phase timings, I/O counters and peak memory to the output '
+                             '(also HYPER_VALIDATOR_TIMINGS=1)')
+
+    # Try to parse args, but fall back to hook mode if no args
+    args, remaining = parser.parse_known_args()
+    timings = args.timings or hyper_metrics.timings_enabled()
+
+    # Batch mode: validate the whole workspace
+    if args.workspace or args.all:
+        roots = [get_workspace_root()]
+        if args.all:
+            roots.append(get_personal_drive())
+        if not any(roots):
+            print(json.dumps({'success': False, 'error': {'message': 'Not in a Hyper workspace'}}))
+            sys.exit(2)
+        results = run_batch(roots, jobs=args.jobs, timings=timings)
+        if args.format == 'jsonl':
+            sys.exit(0 if write_jsonl(results, sys.stdout) else 2)
+        report = batch_summary(results)
+        print(json.dumps(report))
+        sys.exit(0 if report['success'] else 2)
+
+    # PreToolUse hook: raw hook payload in, {"decision": ...} out
+    if args.hook == 'pre':
+        try:
+            hook_input = json.load(sys.stdin)
+        except json.JSONDecodeError:
+            hook_input = None
+        decision, exit_code = pre_hook_decision(hook_input, timings=timings)
+        print(json.dumps(decision))
+        sys.exit(exit_code)
+
+    # PreToolUse mode: validate content before writing
+    if args.pre_validate or args.path:
+        file_path = args.path
+        if not file_path:
+            print(json.dumps({'success': False, 'error': {'message': 'Missing --path argument'}}))
+            sys.exit(2)
+
+        if args.edit:
+            import hyper_filecache
+
+            mode, payload = 'pre-edit', hyper_filecache.read_edits(sys.stdin)
+        elif args.content:
+            # Get content from argument or stdin
+            mode, payload = 'pre', args.content
+        else:
+            mode, payload = 'pre', sys.stdin.read()
+
+        response, exit_code = run_hook(mode, file_path, payload, timings=timings)
+        print(json.dumps(response))
+        sys.exit(exit_code)
+
+    # PostToolUse hook mode (the default, or --hook post): read from stdin JSON
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    tool_input = input_data.get("tool_input", {})
+    file_path = tool_input.get("file_path", "")
+
+    lines, exit_code = run_hook('post', file_path, timings=timings)
+    for line in lines:
+        print(line, file=sys.stderr)
+    sys.exit(exit_code)
+
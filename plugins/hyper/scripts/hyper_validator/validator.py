@@ -0,0 +1,270 @@
+"""
+Validator objects
+A Validator holds everything validation needs for one workspace: its
+resolved roots, the compiled schemas, the workspace index and the
+project/task graph built from it, file contents and per-file verdicts.
+Nothing is shared with other instances or with the module-level state in
+hyper_validator.core, so one process can serve several workspaces.
+
+State stays warm between calls. Contents are revalidated with stat() on
+every read; the index and graph are brought up to date by refresh() (a stat
+walk of the workspace) or dropped for one file by invalidate(path) when the
+host already knows what changed. After watch(), filesystem events keep them
+current instead (hyper_watch).
+"""
+
+import os
+import time
+
+import hyper_filecache
+import hyper_metrics
+
+from hyper_validator import core
+
+
+class Validator:
+    """Reusable validator for one workspace root and personal drive."""
+
+    def __init__(self, workspace_root: str = None, personal_drive: str = None,
+                 cwd: str = None, env: dict = None):
+        """
+        Roots not given are resolved like the hooks resolve them, from cwd
+        and env (default: the current process).
+        """
+        if workspace_root is None or personal_drive is None:
+            with hyper_metrics.phase('paths'):
+                paths = core.get_hyper_paths(cwd=cwd, env=env)
+            if workspace_root is None:
+                workspace_root = core.resolve_workspace_root(paths, env=env)
+            if personal_drive is None:
+                personal_drive = core.resolve_personal_drive(paths)
+        self.workspace_root = core.normalize_path(workspace_root)
+        self.personal_drive = core.normalize_path(personal_drive)
+        self.schemas = core.get_schemas()
+        self.files = hyper_filecache.FileCache()
+        self._index = None
+        self._index_stale = False
+        self._graph = None
+        # Index generation the graph was built at (other processes write too)
+        self._generation = None
+        self._watcher = None
+        # path -> (content, (is_valid, errors)); task verdicts depend on the graph
+        self._verdicts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        self._graph = None
+
+    # ------------------------------------------------------------------
+    # Workspace state
+    # ------------------------------------------------------------------
+
+    @property
+    def index(self):
+        """
+        The workspace index (hyper_index.WorkspaceIndex), opened and
+        refreshed on first use; an in-memory one when the on-disk index is
+        unavailable (HYPER_INDEX=off, read-only workspace). None without a
+        workspace root.
+        """
+        if self._index is None or self._index_stale:
+            self.refresh()
+        elif self._watcher is not None:
+            self._watcher.sync()
+        return self._index
+
+    @property
+    def graph(self) -> dict:
+        """The project/task graph (see core.build_workspace_graph), built on first use."""
+        if self._watcher is not None:
+            if self._index_stale:
+                self.refresh()
+            else:
+                self._watcher.sync()
+            return self._watcher.graph
+        if self._graph is None or self._index_stale:
+            index = self.index
+            if index is None:
+                self._graph = {'project_ids': [], 'tasks': {}, 'orders': {}}
+            elif self._graph is None:
+                with hyper_metrics.phase('relationships'):
+                    self._graph = core.build_workspace_graph(index=index)
+        return self._graph
+
+    def refresh(self) -> dict:
+        """
+        Bring the index up to date with the filesystem. The graph and task
+        verdicts are dropped if any document changed, here or through
+        another process sharing the index.
+        Returns the index refresh stats ({'files', 'updated', 'removed'}).
+        """
+        if self._index is None and not self._open_index():
+            return {'files': 0, 'updated': 0, 'removed': 0}
+        with hyper_metrics.phase('index'):
+            stats = self._index.refresh()
+            generation = self._index.generation
+        self._index_stale = False
+        if generation != self._generation:
+            self._generation = generation
+            self._drop_graph()
+            if self._watcher is not None:
+                self._watcher.graph = self._index.workspace_graph()
+        return stats
+
+    def watch(self) -> bool:
+        """
+        Follow filesystem events over the workspace root and personal drive
+        instead of walking the tree: the index and graph are brought up to
+        date on each use, and changed files are forgotten as they change.
+        Returns False when watching is unavailable (HYPER_WATCH=off, no
+        workspace root).
+        """
+        if self._watcher is not None:
+            return True
+        import hyper_watch
+
+        if hyper_watch.watch_mode() == 'off' or self.index is None:
+            return False
+        try:
+            self._watcher = hyper_watch.WorkspaceWatcher(self._index, roots=[self.personal_drive],
+                                                         on_change=self._changed).start()
+        except OSError:
+            return False
+        return True
+
+    def _changed(self, paths) -> None:
+        """Watcher callback: forget what is cached about changed files (all when None)."""
+        if paths is None:
+            self.files.clear()
+            self._verdicts.clear()
+            return
+        for path in paths:
+            self.files.discard(path)
+            self._verdicts.pop(path, None)
+        if any(self.infer_type(path) in ('project', 'task') for path in paths):
+            self._drop_graph()
+
+    def invalidate(self, path: str = None) -> None:
+        """
+        Forget what is cached about path (every file when None). Changing a
+        project or task also drops the graph; the index is refreshed and the
+        graph rebuilt on next use.
+        """
+        if path is None:
+            self.files.clear()
+            self._verdicts.clear()
+            self._graph = None
+            self._index_stale = True
+            return
+        path = core.normalize_path(path)
+        self.files.discard(path)
+        self._verdicts.pop(path, None)
+        if self.infer_type(path) in ('project', 'task'):
+            self._index_stale = True
+            self._drop_graph()
+
+    def _open_index(self) -> bool:
+        if not self.workspace_root or not os.path.isdir(self.workspace_root):
+            return False
+        import hyper_index
+
+        self._index = hyper_index.open_index(self.workspace_root, core.parse_frontmatter_block)
+        if self._index is None:
+            self._index = hyper_index.WorkspaceIndex(self.workspace_root, core.parse_frontmatter_block,
+                                                     db_path=':memory:')
+        return True
+
+    def _drop_graph(self) -> None:
+        self._graph = None
+        self._verdicts = {path: verdict for path, verdict in self._verdicts.items()
+                          if self.infer_type(path) != 'task'}
+
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+
+    def is_workspace_file(self, path: str) -> bool:
+        return core.is_workspace_file(path, self.workspace_root, self.personal_drive)
+
+    def infer_type(self, path: str) -> str:
+        """Expected document type of path (see core.infer_type_from_path)."""
+        return core.infer_type_from_path(path, self.workspace_root)
+
+    def validate(self, path: str, content: str = None) -> tuple:
+        """
+        Validate content as the document at path (default: the file's
+        current contents). Returns (is_valid, errors_or_none) like
+        core.validate_content. Unchanged content is answered from memory.
+        """
+        path = core.normalize_path(path)
+        if self._watcher is not None:
+            self._watcher.sync()
+        if content is None:
+            content = self.files.read(path)
+        cached = self._verdicts.get(path)
+        if cached is not None and cached[0] == content:
+            return cached[1]
+
+        expected_type = self.infer_type(path)
+        graph = self.graph if expected_type == 'task' else None
+        verdict = core.validate_content(path, content, workspace_graph=graph, expected_type=expected_type)
+        self._verdicts[path] = (content, verdict)
+        return verdict
+
+    def pre_validate(self, path: str, content: str) -> tuple:
+        """
+        The PreToolUse response for content about to be written to path.
+        Returns (response_dict, exit_code) like core.pre_validate_response.
+        """
+        if not self.is_workspace_file(path):
+            return {'success': True, 'skipped': True, 'reason': 'Not a workspace file'}, 0
+        if not path.endswith(('.mdx', '.md')):
+            return {'success': True, 'skipped': True, 'reason': 'Not an MDX file'}, 0
+
+        expected_type = self.infer_type(path)
+        is_valid, errors = self.validate(path, content)
+        if not is_valid:
+            return core.format_error_response(errors, path, expected_type), 2
+        return {'success': True, 'schema': expected_type}, 0
+
+    def validate_files(self, roots: list = None):
+        """
+        Validate every document under roots (default: the workspace root and
+        personal drive) in this process, yielding core.validate_file-style
+        records (path, schema, valid, errors, elapsed_ms).
+        """
+        roots = roots or [root for root in (self.workspace_root, self.personal_drive) if root]
+        for path in core.discover_files(roots):
+            start = time.perf_counter()
+            try:
+                is_valid, errors = self.validate(path)
+            except (OSError, UnicodeDecodeError) as e:
+                is_valid, errors = False, [{
+                    'code': 'READ_ERROR',
+                    'field': None,
+                    'message': f"Could not read file: {e}",
+                    'suggestion': 'Check file permissions and encoding (UTF-8)',
+                }]
+            yield {
+                'path': path,
+                'schema': self.infer_type(path),
+                'valid': is_valid,
+                'errors': errors or [],
+                'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+            }
+
+    def query(self, **filters) -> list:
+        """Find workspace documents by frontmatter (see hyper_index.WorkspaceIndex.query)."""
+        index = self.index
+        return None if index is None else index.query(**filters)
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Hyper Filesystem Watcher
+Keeps a workspace index and its project/task graph current from filesystem
+events, so a long-lived process such as the validator daemon never walks the
+tree before a relationship check.
+
+Backends:
+  inotify   Linux; one watch per directory, read through libc with ctypes.
+            Dot directories (.index, .git, ...) are skipped, as the index
+            skips them.
+  poll      anywhere else, or when inotify is unavailable (watch limit
+            reached); re-stats the tree every HYPER_WATCH_INTERVAL seconds
+            (default 1.0)
+
+Events are coalesced: a burst is published once it has been quiet for
+DEBOUNCE seconds, or after MAX_DELAY at the latest. sync() publishes whatever
+is pending immediately; with inotify that costs one non-blocking read, so a
+caller that syncs before a lookup sees every write completed before it. An
+event queue overflow or a directory moved as a whole is published as "rescan
+everything" (a full index refresh).
+
+HYPER_WATCH=off disables watching; HYPER_WATCH=poll forces the polling
+backend.
+"""
+
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from hyper_index import INDEXED_EXTENSIONS, walk_documents
+
+# Quiet period that ends a burst of events, and the longest a burst is held
+DEBOUNCE = 0.05
+MAX_DELAY = 0.5
+DEFAULT_POLL_INTERVAL = 1.0
+
+# How often the background thread rechecks whether it was stopped
+STOP_CHECK_INTERVAL = 0.5
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+# struct inotify_event: wd, mask, cookie, len, then len bytes of name
+EVENT = struct.Struct('iIII')
+
+
+def watch_mode() -> str:
+    """'off', 'poll' or 'auto' (inotify where available), from HYPER_WATCH."""
+    value = os.environ.get('HYPER_WATCH', '').strip().lower()
+    if value in ('0', 'off', 'false', 'no'):
+        return 'off'
+    return 'poll' if value == 'poll' else 'auto'
+
+
+def poll_interval() -> float:
+    try:
+        return max(float(os.environ.get('HYPER_WATCH_INTERVAL', '')), 0.01)
+    except ValueError:
+        return DEFAULT_POLL_INTERVAL
+
+
+def is_document(name: str) -> bool:
+    return name.endswith(INDEXED_EXTENSIONS) and not name.startswith('.')
+
+
+class InotifyBackend:
+    """Linux inotify over every directory below the roots."""
+
+    name = 'inotify'
+
+    def __init__(self, roots: list):
+        """Raises OSError when inotify is unavailable or the watch limit is reached."""
+        import ctypes
+
+        self._ctypes = ctypes
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            self._inotify_init1 = libc.inotify_init1
+            self._inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(errno.ENOSYS, f'inotify is not available: {e}') from None
+        self._inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.roots = list(roots)
+        self.fd = -1
+        self.dirs = {}  # watch descriptor -> directory
+        self._open()
+
+    def _open(self) -> None:
+        fd = self._inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = self._ctypes.get_errno()
+            raise OSError(err, f'inotify_init1: {os.strerror(err)}')
+        self.fd = fd
+        self.dirs = {}
+        try:
+            for root in self.roots:
+                self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top: str, found: set = None) -> None:
+        """
+        Watch top and every directory below it. Documents already present
+        are added to found, since they may predate the watch.
+        """
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            wd = self._inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                err = self._ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR):
+                    continue  # Removed before we got to it
+                raise OSError(err, f'inotify_add_watch {directory}: {os.strerror(err)}')
+            self.dirs[wd] = directory
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    stack.append(entry.path)
+                elif found is not None and is_document(entry.name):
+                    found.add(entry.path)
+
+    def wait(self, timeout: float) -> bool:
+        """True when events are ready within timeout seconds."""
+        try:
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+        except (OSError, ValueError):
+            return False  # Closed by stop() or a backend switch
+        return bool(readable)
+
+    def read(self) -> tuple:
+        """
+        Drain the pending events without blocking.
+        Returns (changed document paths, rescan).
+        Raises OSError when a new directory cannot be watched.
+        """
+        paths = set()
+        rescan = False
+        reset = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                directory = self.dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    # Subdirectories are handled through their parent's events
+                    reset = reset or directory in self.roots
+                    continue
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                if not mask & IN_ISDIR:
+                    if is_document(name):
+                        paths.add(path)
+                elif mask & IN_MOVED_FROM:
+                    # Watches below it now carry the old paths
+                    reset = True
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path, paths)
+        if reset:
+            os.close(self.fd)
+            self._open()
+            rescan = True
+        return paths, rescan
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingBackend:
+    """Periodic stat() walk of the roots, compared with the previous one."""
+
+    name = 'poll'
+
+    def __init__(self, roots: list, interval: float = None):
+        self.roots = list(roots)
+        self.interval = interval or poll_interval()
+        self._closed = threading.Event()
+        self._stamps = self._scan()
+        self._next_scan = time.monotonic() + self.interval
+
+    def _scan(self) -> dict:
+        stamps = {}
+        for root in self.roots:
+            for _rel_path, abs_path, st in walk_documents(root):
+                stamps[abs_path] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def wait(self, timeout: float) -> bool:
+        """True when the next scan falls due within timeout seconds."""
+        delay = self._next_scan - time.monotonic()
+        if delay > timeout:
+            self._closed.wait(timeout)
+            return False
+        if delay > 0:
+            self._closed.wait(delay)
+        return not self._closed.is_set()
+
+    def read(self) -> tuple:
+        """Scan now. Returns (changed document paths, rescan)."""
+        stamps = self._scan()
+        self._next_scan = time.monotonic() + self.interval
+        previous, self._stamps = self._stamps, stamps
+        paths = {path for path, stamp in stamps.items() if previous.get(path) != stamp}
+        paths.update(path for path in previous if path not in stamps)
+        return paths, False
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+class Watcher:
+    """
+    Watch directory trees and call on_change(paths) with coalesced sets of
+    changed document paths, or on_change(None) when everything must be
+    rescanned. on_change runs with lock held, from the background thread
+    (after start()) or from sync().
+    """
+
+    def __init__(self, roots: list, on_change, lock=None, backend: str = None,
+                 debounce: float = DEBOUNCE, max_delay: float = MAX_DELAY, interval: float = None):
+        """
+        backend: 'inotify', 'poll' or None for inotify where available
+            (HYPER_WATCH=poll forces polling). Raises OSError when 'inotify'
+            is asked for and unavailable.
+        """
+        self.roots = []
+        for root in roots:
+            root = os.path.abspath(root) if root else ''
+            if root and os.path.isdir(root) and root not in self.roots:
+                self.roots.append(root)
+        self.on_change = on_change
+        self.lock = lock or threading.RLock()
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.interval = interval
+        self.backend = self._open_backend(backend or ('poll' if watch_mode() == 'poll' else None))
+        self._pending = set()
+        self._rescan = False
+        self._stopped = threading.Event()
+        self._thread = None
+        self.batches = 0
+
+    def _open_backend(self, kind: str):
+        if kind != 'poll' and (kind == 'inotify' or sys.platform.startswith('linux')):
+            try:
+                return InotifyBackend(self.roots)
+            except OSError:
+                if kind == 'inotify':
+                    raise
+        return PollingBackend(self.roots, self.interval)
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopped.is_set()
+
+    def start(self) -> 'Watcher':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='hyper-watch', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(STOP_CHECK_INTERVAL * 4)
+        with self.lock:
+            self.backend.close()
+
+    def sync(self) -> bool:
+        """
+        Publish every change made before this call, now.
+        Returns True when anything was published.
+        """
+        with self.lock:
+            self._collect()
+            return self._publish()
+
+    def _collect(self) -> None:
+        """Add the backend's pending events to the batch. Call with lock held."""
+        try:
+            paths, rescan = self.backend.read()
+        except OSError:
+            # Typically out of inotify watches: keep going by polling
+            self.backend.close()
+            self.backend = PollingBackend(self.roots, self.interval)
+            paths, rescan = set(), True
+        self._pending |= paths
+        self._rescan = self._rescan or rescan
+
+    def _publish(self) -> bool:
+        if not self._pending and not self._rescan:
+            return False
+        paths = None if self._rescan else self._pending
+        self._pending = set()
+        self._rescan = False
+        try:
+            self.on_change(paths)
+        except Exception:
+            # Lost track of this batch: rebuild from scratch next time
+            self._rescan = True
+            raise
+        self.batches += 1
+        return True
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if not self.backend.wait(STOP_CHECK_INTERVAL):
+                continue
+            deadline = time.monotonic() + self.max_delay
+            with self.lock:
+                self._collect()
+            # Keep collecting until the burst goes quiet or MAX_DELAY passes
+            while not self._stopped.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.backend.wait(min(self.debounce, remaining)):
+                    break
+                with self.lock:
+                    self._collect()
+            if self._stopped.is_set():
+                break
+            with self.lock:
+                try:
+                    self._publish()
+                except Exception:
+                    pass  # Retried as a rescan by the next sync() or batch
+
+
+class WorkspaceWatcher(Watcher):
+    """
+    A Watcher feeding a hyper_index.WorkspaceIndex: changed documents are
+    re-read with update_paths() and the project/task graph (as returned by
+    WorkspaceIndex.workspace_graph) is republished for the projects they
+    belong to.
+
+    graph is replaced, never modified, so a reader holding a reference keeps
+    a consistent snapshot. Pass the index refreshed; extra roots (the
+    personal drive) are watched for on_change only.
+    """
+
+    def __init__(self, index, roots: list = (), lock=None, on_change=None, **options):
+        self.index = index
+        self.graph = index.workspace_graph()
+        self.listener = on_change
+        super().__init__([index.root, *roots], self._apply, lock=lock, **options)
+
+    def _apply(self, paths) -> None:
+        if paths is None:
+            self.index.refresh()
+            self.graph = self.index.workspace_graph()
+        else:
+            projects = self.index.update_paths(paths)['projects']
+            if projects:
+                self._republish(projects)
+        if self.listener is not None:
+            self.listener(paths)
+
+    def _republish(self, projects: set) -> None:
+        graph = self.graph
+        tasks = dict(graph['tasks'])
+        orders = dict(graph['orders'])
+        for slug in projects:
+            dependencies = self.index.task_dependencies(slug)
+            if dependencies:
+                tasks[slug] = dependencies
+                orders[slug] = self.index.dependency_order(slug)
+            else:
+                tasks.pop(slug, None)
+                orders.pop(slug, None)
+        self.graph = {'project_ids': self.index.project_ids(), 'tasks': tasks, 'orders': orders}
@@ -0,0 +1,50 @@
+"""
+Keep test runs out of the user's cache and telemetry directories.
+
+The validator caches verdicts, compiled schemas and resolved paths under
+HYPER_CACHE_DIR and journals hook latencies under HYPER_JOURNAL_DIR. Suites
+that run the validator, its hooks or the daemon point both at a temp dir for
+the whole module by importing the unittest module fixtures:
+
+    from _isolation import setUpModule, tearDownModule
+
+Subprocesses (hooks, the daemon, batch workers) inherit the redirection
+through os.environ.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+ISOLATED_ENV = ('HYPER_CACHE_DIR', 'HYPER_JOURNAL_DIR')
+
+_state = {}
+
+
+def _reset_result_cache():
+    """Drop the validator's per-process result cache so it reopens under the current env."""
+    core = sys.modules.get('hyper_validator.core')
+    if core is None:
+        return
+    if core._result_cache is not None:
+        core._result_cache.close()
+    core._result_cache, core._result_cache_pid = None, None
+
+
+def setUpModule():
+    _state['temp_dir'] = tempfile.mkdtemp()
+    _state['saved'] = {key: os.environ.get(key) for key in ISOLATED_ENV}
+    os.environ['HYPER_CACHE_DIR'] = os.path.join(_state['temp_dir'], 'cache')
+    os.environ['HYPER_JOURNAL_DIR'] = os.path.join(_state['temp_dir'], 'telemetry')
+    _reset_result_cache()
+
+
+def tearDownModule():
+    _reset_result_cache()
+    for key, value in _state.pop('saved').items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    shutil.rmtree(_state.pop('temp_dir'), ignore_errors=True)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batch validation (--workspace / --all, --format jsonl)
+Tests discovery, the shared workspace graph and the process pool runner.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import shutil
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path for imports
+sys.path.insert(0, SCRIPTS_DIR)
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+from hyper_validator import core as validator
+
+# The command-line entry point
+validator_path = os.path.join(SCRIPTS_DIR, 'validate-hyper-file.py')
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def task_content(task_id, depends_on=None, parent='proj-alpha'):
+    deps = ''.join(f'- {d}\n' for d in depends_on or [])
+    depends_line = f'depends_on:\n{deps}' if deps else ''
+    return f'''---
+id: {task_id}
+title: {task_id}
+type: task
+status: todo
+priority: high
+parent: {parent}
+{depends_line}---
+# {task_id}
+'''
+
+
+class TestBatchValidation(unittest.TestCase):
+    """Test whole-workspace validation."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.tasks_dir = os.path.join(self.temp_dir, 'projects', 'alpha', 'tasks')
+        write_file(os.path.join(self.temp_dir, 'projects', 'alpha', '_project.mdx'), '''---
+id: proj-alpha
+title: Alpha
+type: project
+status: todo
+priority: high
+---
+''')
+        write_file(os.path.join(self.tasks_dir, 'task-001.mdx'), task_content('alpha-001'))
+        write_file(os.path.join(self.tasks_dir, 'task-002.mdx'), task_content('alpha-002', ['alpha-001']))
+        write_file(os.path.join(self.temp_dir, '.hidden', 'skip.mdx'), 'not frontmatter')
+        self.saved_root = validator.WORKSPACE_ROOT
+        validator.WORKSPACE_ROOT = self.temp_dir
+
+    def tearDown(self):
+        validator.WORKSPACE_ROOT = self.saved_root
+        shutil.rmtree(self.temp_dir)
+
+    def test_discover_skips_dot_directories(self):
+        """Test that discovery finds documents and ignores dot directories."""
+        files = list(validator.discover_files([self.temp_dir, self.temp_dir, '']))
+        self.assertEqual(len(files), 3)
+        self.assertFalse(any('/.hidden/' in f for f in files))
+
+    def test_workspace_graph(self):
+        """Test that the shared graph covers every project and task."""
+        graph = validator.build_workspace_graph()
+        self.assertEqual(graph['project_ids'], ['proj-alpha'])
+        self.assertEqual(graph['tasks'], {'alpha': {'alpha-001': [], 'alpha-002': ['alpha-001']}})
+
+    def test_graph_used_for_relationships(self):
+        """Test that relationship checks read the supplied graph."""
+        graph = {'project_ids': ['proj-alpha'], 'tasks': {'alpha': {'alpha-001': []}}}
+        path = os.path.join(self.tasks_dir, 'task-002.mdx')
+        is_valid, errors = validator.validate_content(
+            path, task_content('alpha-002', ['alpha-009']), workspace_graph=graph)
+        self.assertFalse(is_valid)
+        self.assertIn('INVALID_DEPENDENCY_REFERENCE', [e['code'] for e in errors])
+
+    def test_all_valid_in_process(self):
+        """Test a clean workspace with a single job."""
+        report = validator.batch_summary(validator.run_batch([self.temp_dir], jobs=1))
+        self.assertTrue(report['success'])
+        self.assertEqual(report['files'], 3)
+        self.assertEqual(report['invalid'], 0)
+
+    def test_markdown_docs_valid(self):
+        """Test that .md documents, which discovery includes, pass the doc naming convention."""
+        write_file(os.path.join(self.temp_dir, 'docs', 'getting-started.md'), '---\nid: start\ntitle: Start\n---\n')
+        report = validator.batch_summary(validator.run_batch([self.temp_dir], jobs=1))
+        self.assertEqual(report['files'], 4)
+        self.assertTrue(report['success'], report['failures'])
+
+    def test_failures_reported_from_pool(self):
+        """Test that worker processes report invalid files."""
+        write_file(os.path.join(self.tasks_dir, 'task-003.mdx'),
+                   task_content('alpha-003', ['alpha-004']))
+        write_file(os.path.join(self.tasks_dir, 'task-004.mdx'),
+                   task_content('alpha-004', ['alpha-003']))
+        write_file(os.path.join(self.tasks_dir, 'task-005.mdx'), task_content('alpha-005', parent='proj-x'))
+
+        report = validator.batch_summary(validator.run_batch([self.temp_dir], jobs=2))
+        self.assertFalse(report['success'])
+        self.assertEqual(report['files'], 6)
+        failures = {os.path.basename(f['path']): [e['code'] for e in f['errors']] for f in report['failures']}
+        self.assertEqual(sorted(failures), ['task-003.mdx', 'task-004.mdx', 'task-005.mdx'])
+        self.assertIn('CIRCULAR_DEPENDENCY', failures['task-003.mdx'])
+        self.assertIn('INVALID_PARENT_REFERENCE', failures['task-005.mdx'])
+
+    def test_cli_workspace_flag(self):
+        """Test the --workspace command line entry point."""
+        result = self._run_cli('--workspace', '--jobs', '2')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        report = json.loads(result.stdout)
+        self.assertEqual(report['files'], 3)
+        self.assertTrue(report['success'])
+
+    def _run_cli(self, *args):
+        env = dict(os.environ, HYPER_WORKSPACE_ROOT=self.temp_dir, HOME=self.temp_dir,
+                   HYPER_CACHE_DIR=os.path.join(self.temp_dir, '.cache'))
+        return subprocess.run([sys.executable, validator_path, *args],
+                              capture_output=True, text=True, env=env, cwd=self.temp_dir)
+
+    def test_cli_jsonl_format(self):
+        """Test that --format jsonl emits one record per file."""
+        write_file(os.path.join(self.tasks_dir, 'task-003.mdx'), task_content('alpha-003', ['alpha-009']))
+        result = self._run_cli('--workspace', '--format', 'jsonl', '--jobs', '2')
+        self.assertEqual(result.returncode, 2, result.stderr)
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual(len(records), 4)
+        for record in records:
+            self.assertEqual(set(record), {'path', 'schema', 'valid', 'errors', 'elapsed_ms'})
+        invalid = [r for r in records if not r['valid']]
+        self.assertEqual([os.path.basename(r['path']) for r in invalid], ['task-003.mdx'])
+        self.assertEqual(invalid[0]['schema'], 'task')
+
+    def test_bounded_in_flight_window(self):
+        """Test that results stream before discovery is exhausted."""
+        for i in range(3, 40):
+            write_file(os.path.join(self.tasks_dir, f'task-{i:03d}.mdx'), task_content(f'alpha-{i:03d}'))
+        discovered = []
+        real_discover = validator.discover_files
+
+        def tracking_discover(roots):
+            for path in real_discover(roots):
+                discovered.append(path)
+                yield path
+
+        saved = (validator.discover_files, validator.BATCH_CHUNK_SIZE, validator.BATCH_CHUNKS_PER_WORKER)
+        validator.discover_files = tracking_discover
+        validator.BATCH_CHUNK_SIZE, validator.BATCH_CHUNKS_PER_WORKER = 2, 1
+        try:
+            results = validator.run_batch([self.temp_dir], jobs=2)
+            next(results)
+            self.assertLess(len(discovered), 40)
+            self.assertEqual(len(list(results)) + 1, 40)
+        finally:
+            validator.discover_files, validator.BATCH_CHUNK_SIZE, validator.BATCH_CHUNKS_PER_WORKER = saved
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_topo.py
+Tests the dynamic topological order and its use by the index and validator.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import shutil
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_index
+from hyper_topo import DependencyOrder
+
+from hyper_validator import core as validator
+
+
+def write_task(tasks_dir, number, task_id, depends_on=()):
+    deps = ''.join(f'  - {d}\n' for d in depends_on)
+    path = os.path.join(tasks_dir, f'task-{number:03d}.mdx')
+    with open(path, 'w') as f:
+        f.write(f'---\nid: {task_id}\ntitle: {task_id}\ntype: task\nstatus: todo\npriority: low\n'
+                f'parent: proj-alpha\n{"depends_on:" + chr(10) + deps if deps else ""}---\n')
+    # Make the change visible to the index even within one mtime tick
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + number * 1_000_000_000))
+
+
+class TestDependencyOrder(unittest.TestCase):
+    """Test order maintenance under edge insertions and removals."""
+
+    def test_from_graph(self):
+        """Test that the initial order puts dependencies first."""
+        order = DependencyOrder.from_graph({'c': ['b'], 'b': ['a'], 'a': []})
+        self.assertTrue(order.acyclic)
+        self.assertTrue(order.is_consistent())
+        self.assertLess(order.position['a'], order.position['c'])
+
+    def test_from_graph_with_cycle(self):
+        """Test that a graph that already cycles is flagged."""
+        order = DependencyOrder.from_graph({'a': ['b'], 'b': ['a'], 'c': []})
+        self.assertFalse(order.acyclic)
+        self.assertEqual(len(set(order.position.values())), 3)
+
+    def test_add_edge_reorders_region(self):
+        """Test that a back edge reorders only the affected tasks."""
+        order = DependencyOrder.from_graph({'a': [], 'b': [], 'c': [], 'd': []})
+        self.assertIsNone(order.add_edge('d', 'a'))
+        self.assertTrue(order.is_consistent())
+        self.assertEqual(order.position['b'], 1)
+        self.assertEqual(order.position['c'], 2)
+
+    def test_add_edge_rejects_cycle(self):
+        """Test that an edge closing a cycle is refused with its path."""
+        order = DependencyOrder.from_graph({'a': [], 'b': ['a'], 'c': ['b']})
+        before = dict(order.position)
+        self.assertEqual(order.add_edge('c', 'a'), ['a', 'c', 'b', 'a'])
+        self.assertEqual(order.add_edge('a', 'a'), ['a', 'a'])
+        self.assertEqual(order.position, before)
+        self.assertNotIn('c', order.depends_on['a'])
+
+    def test_update_swaps_without_false_cycle(self):
+        """Test that reversing an edge across two tasks in one update is allowed."""
+        order = DependencyOrder.from_graph({'a': [], 'b': ['a']})
+        self.assertTrue(order.update({'a': ['b'], 'b': []}))
+        self.assertTrue(order.is_consistent())
+        self.assertLess(order.position['b'], order.position['a'])
+
+    def test_random_insertions_match_full_search(self):
+        """Test against find_dependency_cycles() on random graphs."""
+        rng = random.Random(7)
+        for _ in range(20):
+            tasks = [f't{i}' for i in range(40)]
+            graph = {task: [] for task in tasks}
+            order = DependencyOrder.from_graph(graph)
+            for _ in range(120):
+                dep, task = rng.choice(tasks), rng.choice(tasks)
+                proposed = graph[task] + [dep]
+                expected = validator.find_dependency_cycles(task, proposed, graph)
+                cycles = order.cycles_closed_by(task, proposed)
+                # Same dependencies and path lengths; ties may pick other paths
+                self.assertEqual([(c[1], len(c)) for c in cycles], [(c[1], len(c)) for c in expected])
+                for cycle in cycles:
+                    self.assertEqual(cycle[0], cycle[-1])
+                    for node, dependency in zip(cycle[1:-1], cycle[2:]):
+                        self.assertIn(dependency, graph[node])
+                cycle = order.add_edge(dep, task)
+                self.assertEqual(cycle is None, not expected or dep in graph[task])
+                if cycle is None and dep not in graph[task]:
+                    graph[task].append(dep)
+                self.assertTrue(order.is_consistent())
+
+
+class TestIndexMaintainsOrder(unittest.TestCase):
+    """Test that refreshes move a project's order forward incrementally."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.tasks_dir = os.path.join(self.temp_dir, 'projects', 'alpha', 'tasks')
+        os.makedirs(self.tasks_dir)
+        with open(os.path.join(self.temp_dir, 'projects', 'alpha', '_project.mdx'), 'w') as f:
+            f.write('---\nid: proj-alpha\ntitle: Alpha\ntype: project\nstatus: todo\npriority: low\n---\n')
+        write_task(self.tasks_dir, 1, 'alpha-001')
+        write_task(self.tasks_dir, 2, 'alpha-002', ['alpha-001'])
+        self.index = hyper_index.WorkspaceIndex(self.temp_dir, validator.parse_frontmatter_block)
+        self.index.refresh()
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_order_follows_writes(self):
+        """Test that new and changed tasks update the same order object."""
+        order = self.index.dependency_order('alpha')
+        write_task(self.tasks_dir, 3, 'alpha-003', ['alpha-002'])
+        self.index.refresh()
+        self.assertIs(self.index.dependency_order('alpha'), order)
+        self.assertEqual(order.cycles_closed_by('alpha-001', ['alpha-003']),
+                         [['alpha-001', 'alpha-003', 'alpha-002', 'alpha-001']])
+
+        write_task(self.tasks_dir, 2, 'alpha-002')
+        self.index.refresh()
+        self.assertEqual(order.cycles_closed_by('alpha-001', ['alpha-003']), [])
+        self.assertTrue(order.is_consistent())
+
+    def test_cycle_on_disk_drops_order(self):
+        """Test that a cycle written past the hook falls back to full searches."""
+        order = self.index.dependency_order('alpha')
+        write_task(self.tasks_dir, 1, 'alpha-001', ['alpha-002'])
+        self.index.refresh()
+        rebuilt = self.index.dependency_order('alpha')
+        self.assertIsNot(rebuilt, order)
+        self.assertFalse(rebuilt.acyclic)
+
+    def test_validator_reports_cycle(self):
+        """Test that relationship validation finds cycles through the order."""
+        validator.WORKSPACE_ROOT = self.temp_dir
+        self.addCleanup(setattr, validator, 'WORKSPACE_ROOT', '')
+        frontmatter = {'id': 'alpha-001', 'depends_on': ['alpha-002'], 'parent': 'proj-alpha'}
+        errors = validator.validate_relationships(
+            frontmatter, 'task', os.path.join(self.tasks_dir, 'task-001.mdx'))
+        self.assertEqual([e['code'] for e in errors], ['CIRCULAR_DEPENDENCY'])
+        self.assertIn('alpha-001 -> alpha-002 -> alpha-001', errors[0]['message'])
+
+
+if __name__ == '__main__':
+    unittest.main()
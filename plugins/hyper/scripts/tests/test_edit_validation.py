@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Edit pre-validation
+Tests hyper_filecache.py and validating Edit payloads before they are applied.
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import shutil
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+import hyper_filecache
+from hyper_validator import core as validator
+
+
+VALID_DOC = '''---
+id: guide
+title: Guide
+---
+# Guide
+'''
+
+
+def bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestFileCache(unittest.TestCase):
+    """Test the stat-validated content cache."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'doc.mdx')
+        with open(self.path, 'w') as f:
+            f.write('one')
+        self.cache = hyper_filecache.FileCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_unchanged_file_served_from_cache(self):
+        """Test that an unchanged file is not read again."""
+        self.assertEqual(self.cache.read(self.path), 'one')
+        reads = []
+        real_open = open
+
+        def counting_open(*args, **kwargs):
+            reads.append(args[0])
+            return real_open(*args, **kwargs)
+
+        hyper_filecache.open = counting_open
+        try:
+            self.assertEqual(self.cache.read(self.path), 'one')
+        finally:
+            del hyper_filecache.open
+        self.assertEqual(reads, [])
+
+    def test_changed_file_reread(self):
+        """Test that a modified file is read again."""
+        self.cache.read(self.path)
+        with open(self.path, 'w') as f:
+            f.write('two!')
+        bump_mtime(self.path)
+        self.assertEqual(self.cache.read(self.path), 'two!')
+
+    def test_lru_eviction(self):
+        """Test that the byte budget evicts least recently used entries."""
+        cache = hyper_filecache.FileCache(max_bytes=8)
+        other = os.path.join(self.temp_dir, 'other.mdx')
+        with open(other, 'w') as f:
+            f.write('abcdefg')
+        cache.read(self.path)
+        cache.read(other)
+        self.assertEqual(len(cache), 1)
+
+    def test_missing_file_raises(self):
+        """Test that missing files raise like open()."""
+        with self.assertRaises(FileNotFoundError):
+            self.cache.read(os.path.join(self.temp_dir, 'missing.mdx'))
+
+
+class TestApplyEdit(unittest.TestCase):
+    """Test Edit tool replacement semantics."""
+
+    def test_single_replacement(self):
+        """Test a unique old_string is replaced once."""
+        self.assertEqual(hyper_filecache.apply_edit('a b c', 'b', 'x'), 'a x c')
+
+    def test_ambiguous_edit_rejected(self):
+        """Test that repeated old_string needs replace_all."""
+        with self.assertRaises(hyper_filecache.EditError):
+            hyper_filecache.apply_edit('a a', 'a', 'b')
+        self.assertEqual(hyper_filecache.apply_edit('a a', 'a', 'b', replace_all=True), 'b b')
+
+    def test_missing_old_string_rejected(self):
+        """Test that an absent old_string is rejected."""
+        with self.assertRaises(hyper_filecache.EditError):
+            hyper_filecache.apply_edit('abc', 'z', 'y')
+
+    def test_multi_edit_payload(self):
+        """Test MultiEdit payloads apply in order."""
+        edits = hyper_filecache.edits_from_tool_input({'edits': [
+            {'old_string': 'a', 'new_string': 'b'},
+            {'old_string': 'b', 'new_string': 'c', 'replace_all': True},
+        ]})
+        self.assertEqual(hyper_filecache.apply_edits('ab', edits), 'cc')
+
+    def test_read_edits(self):
+        """Test reading edits from a tool_input document on a stream."""
+        edit = {'old_string': 'a', 'new_string': 'b'}
+        cases = [
+            (json.dumps(edit), [edit]),
+            (json.dumps({'edits': [edit, edit]}), [edit, edit]),
+            (json.dumps([edit]), []),
+            ('not json', []),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(hyper_filecache.read_edits(io.StringIO(text)), expected)
+
+
+class TestPreValidateEdit(unittest.TestCase):
+    """Test validating Edit payloads against the current file."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, '.hyper', 'docs', 'guide.mdx')
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write(VALID_DOC)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _edit(self, old, new):
+        return validator.pre_validate_edit_response(self.path, [{'old_string': old, 'new_string': new}])
+
+    def test_valid_edit_allowed(self):
+        """Test that an edit leaving the file valid is allowed."""
+        response, exit_code = self._edit('title: Guide', 'title: User Guide')
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(response['schema'], 'doc')
+
+    def test_invalid_edit_blocked(self):
+        """Test that an edit introducing an error is blocked before the write."""
+        response, exit_code = self._edit('title: Guide\n', '')
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(response['error']['context']['errors'][0]['code'], 'MISSING_REQUIRED_FIELD')
+        with open(self.path) as f:
+            self.assertEqual(f.read(), VALID_DOC)
+
+    def test_preexisting_errors_do_not_block(self):
+        """Test that an already-invalid file can be fixed one edit at a time."""
+        with open(self.path, 'w') as f:
+            f.write('---\nid: guide\n---\n# Guide\n')
+        bump_mtime(self.path)
+        response, exit_code = self._edit('# Guide', '# User Guide')
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(response['preexisting_errors'], 1)
+
+    def test_inapplicable_edit_skipped(self):
+        """Test that edits the Edit tool would reject are not validated."""
+        response, exit_code = self._edit('not in file', 'x')
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(response['skipped'])
+
+    def test_post_validation_warms_cache(self):
+        """Test that PostToolUse leaves the file cached for the next Edit."""
+        validator.get_file_cache().clear()
+        validator.post_validate_report(self.path)
+        self.assertEqual(len(validator.get_file_cache()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
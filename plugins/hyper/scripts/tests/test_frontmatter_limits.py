@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bounded frontmatter parsing
+Tests the size, node, alias and depth limits in every parsing tier, the
+FRONTMATTER_TOO_COMPLEX error, and the worst-case budget in
+benchmarks/bench_frontmatter_limits.py.
+"""
+
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path for imports
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'benchmarks'))
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+
+import bench_frontmatter_limits
+import hyper_frontmatter
+
+try:
+    import yaml
+    HAS_PYYAML = True
+except ImportError:
+    HAS_PYYAML = False
+
+from hyper_validator import core as validator
+
+SMALL_LIMITS = {'parse_bytes': 1024, 'nodes': 20, 'aliases': 2, 'depth': 3}
+
+
+class TestFlatTierLimits(unittest.TestCase):
+    """Test limits in parse_flat and check_size."""
+
+    def test_node_count_includes_list_items(self):
+        """Test that keys, values and list items all count as nodes."""
+        # Mapping + 2 per key + one per item: 1 + 2 + 2 + 2 = 7
+        text = 'id: a\ntags: [x, y]'
+        self.assertEqual(hyper_frontmatter.parse_flat(text, max_nodes=7), {'id': 'a', 'tags': ['x', 'y']})
+        with self.assertRaises(hyper_frontmatter.FrontmatterTooComplex) as cm:
+            hyper_frontmatter.parse_flat(text, max_nodes=6)
+        self.assertEqual((cm.exception.limit, cm.exception.maximum), ('nodes', 6))
+
+    def test_block_list_items_counted(self):
+        """Test that block list items count like flow list items."""
+        text = 'tags:\n' + '\n'.join(f'  - t{i}' for i in range(30))
+        with self.assertRaises(hyper_frontmatter.FrontmatterTooComplex):
+            hyper_frontmatter.parse_flat(text, max_nodes=20)
+
+    def test_check_size_counts_bytes(self):
+        """Test that multi-byte characters count by their UTF-8 size."""
+        hyper_frontmatter.check_size('a' * 1024, SMALL_LIMITS)
+        with self.assertRaises(hyper_frontmatter.FrontmatterTooComplex) as cm:
+            hyper_frontmatter.check_size('é' * 600, SMALL_LIMITS)
+        self.assertEqual(cm.exception.limit, 'parse_bytes')
+
+    def test_env_overrides(self):
+        """Test HYPER_FRONTMATTER_MAX_<NAME> overrides and bad values."""
+        os.environ['HYPER_FRONTMATTER_MAX_NODES'] = '10'
+        os.environ['HYPER_FRONTMATTER_MAX_DEPTH'] = 'deep'
+        try:
+            limits = hyper_frontmatter.parse_limits()
+        finally:
+            del os.environ['HYPER_FRONTMATTER_MAX_NODES']
+            del os.environ['HYPER_FRONTMATTER_MAX_DEPTH']
+        self.assertEqual(limits['nodes'], 10)
+        self.assertEqual(limits['depth'], hyper_frontmatter.PARSE_LIMITS['depth'])
+
+
+@unittest.skipUnless(HAS_PYYAML, 'PyYAML not installed')
+class TestYamlEventLimits(unittest.TestCase):
+    """Test limits checked on the PyYAML event stream."""
+
+    def check(self, text, limits=SMALL_LIMITS):
+        hyper_frontmatter.check_yaml_events(yaml, yaml.parse(text, Loader=yaml.SafeLoader), limits)
+
+    def assertLimit(self, text, limit):
+        with self.assertRaises(hyper_frontmatter.FrontmatterTooComplex) as cm:
+            self.check(text)
+        self.assertEqual(cm.exception.limit, limit)
+
+    def test_within_limits(self):
+        """Test that ordinary nested frontmatter passes."""
+        self.check('a: {b: [1, 2]}\nc: &x 1\nd: *x')
+
+    def test_depth(self):
+        """Test that nesting past the depth limit is refused."""
+        self.check('a: {b: [1]}')
+        self.assertLimit('a: {b: [[1]]}', 'depth')
+
+    def test_alias_count(self):
+        """Test that alias references are capped."""
+        self.assertLimit('a: &x 1\nb: [*x, *x, *x]', 'aliases')
+
+    def test_alias_expansion_counted(self):
+        """Test that an alias counts as the full size of its anchor."""
+        # The anchored list is 9 nodes; two aliases to it pass 20 nodes
+        self.assertLimit('a: &x [1, 2, 3, 4, 5, 6, 7, 8]\nb: [*x, *x]', 'nodes')
+
+    def test_alias_bomb_rejected_before_expansion(self):
+        """Test that a billion-laughs document is refused by its expanded size."""
+        with self.assertRaises(hyper_frontmatter.FrontmatterTooComplex) as cm:
+            self.check(bench_frontmatter_limits.alias_bomb(), hyper_frontmatter.PARSE_LIMITS)
+        self.assertEqual(cm.exception.limit, 'nodes')
+
+
+class TestFrontmatterTooComplex(unittest.TestCase):
+    """Test that the validator reports limit violations as structured errors."""
+
+    def assertTooComplex(self, text, limit):
+        frontmatter, error = validator.parse_frontmatter_block(text)
+        self.assertEqual(frontmatter, {})
+        self.assertEqual(error['code'], 'FRONTMATTER_TOO_COMPLEX')
+        self.assertEqual(error['limit'], limit)
+        self.assertIn('suggestion', error)
+
+    def test_every_rejected_case(self):
+        """Test each pathological benchmark input against its expected limit."""
+        for name, (limit, text) in bench_frontmatter_limits.rejected_cases().items():
+            if not HAS_PYYAML and limit in ('aliases', 'depth'):
+                continue
+            with self.subTest(case=name):
+                self.assertTooComplex(text, limit)
+
+    def test_accepted_cases_parse(self):
+        """Test that the largest inputs inside the limits still parse."""
+        for name, text in bench_frontmatter_limits.accepted_cases().items():
+            with self.subTest(case=name):
+                self.assertIsNone(validator.parse_frontmatter_block(text)[1])
+
+    def test_pre_validate_blocks_write(self):
+        """Test that the PreToolUse response blocks frontmatter over a limit."""
+        path = '/p/.hyper/docs/bomb.mdx'
+        content = '---\n' + bench_frontmatter_limits.alias_bomb() + '\n---\n# Bomb\n'
+        response, exit_code = validator.pre_validate_response(path, content)
+        self.assertEqual(exit_code, 2)
+        self.assertIn('FRONTMATTER_TOO_COMPLEX', [e['code'] for e in response['error']['context']['errors']])
+
+
+class TestWorstCaseBudget(unittest.TestCase):
+    """Test that worst-case parse time stays within budget."""
+
+    def test_within_budget(self):
+        """Test a short benchmark run against the default budgets."""
+        results = bench_frontmatter_limits.measure(runs=3, mutations=100)
+        self.assertEqual(results['fuzz']['mutations'], 100)
+        self.assertEqual(bench_frontmatter_limits.check(results), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
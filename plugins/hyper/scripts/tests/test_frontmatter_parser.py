@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the tiered frontmatter parser
+Tests that parse_flat, CSafeLoader and yaml.safe_load agree, and that
+parse_flat declines anything outside its subset.
+"""
+
+import datetime
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path for imports
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'benchmarks'))
+
+import bench_frontmatter
+import hyper_frontmatter
+
+try:
+    import yaml
+    HAS_PYYAML = True
+except ImportError:
+    HAS_PYYAML = False
+
+# Flat documents exercising every construct parse_flat accepts
+FLAT_DOCUMENTS = [
+    'id: a\ntitle: Plain words  with spaces',
+    'title: "Phase 1: Setup"\nnote: \'it\'\'s quoted\'\nempty_double: ""\nempty_single: \'\'',
+    'id: personal:artifact-note-1234\nurl: https://example.com/a#b\nlang: C#',
+    'count: 4\nneg: -3\nplus: +7\nzero: 0',
+    'a: yes\nb: No\nc: on\nd: OFF\ne: true\nf: FALSE',
+    'a: ~\nb: null\nc: NULL\nd:',
+    'created: 2025-12-28\nupdated: 2026-01-04',
+    'tags: [a, b c, 1, yes, ~, 2024-01-01]\nnone: []',
+    'depends_on:\n  - x-001\n  - "x-002"\n  - 3\nblocks:\n- y-001\n-\nafter: 1',
+    '# leading comment\nid: a\n\n  # indented comment\ntitle: b',
+    'id: a\r\ntitle: b\r\ntags:\r\n  - c\r\n',
+    'title: Unicode é ✓ 日本',
+]
+
+# Valid YAML that parse_flat must hand to PyYAML
+NOT_FLAT_DOCUMENTS = [
+    'meta:\n  owner: me',
+    'title: >\n  folded',
+    'title: "escaped \\" quote"',
+    'ratio: 1.5',
+    'octal: 010',
+    'when: 2025-12-28 10:00:00',
+    'title: value # trailing comment',
+    'anchor: &a 1\nalias: *a',
+    'tag: !!str 5',
+    'on: 1',
+    'id: a\nid: b',
+    'map: {a: 1}',
+    'list: [a, [b]]',
+    'list: [a,]',
+    'list: ["a", b]',
+    'title: line one\n  continued',
+    'list:\n  - a\n    - b',
+    '',
+]
+
+
+@unittest.skipUnless(HAS_PYYAML, 'PyYAML required')
+class TestTierEquivalence(unittest.TestCase):
+    """Test that all tiers return identical dicts."""
+
+    def assertSameResult(self, text):
+        results = {tier: parse(text) for tier, parse in bench_frontmatter.tiers().items()}
+        expected = results.pop('pure')
+        for tier, result in results.items():
+            self.assertEqual(result, expected, f'{tier} tier differs for {text!r}')
+            self.assertEqual([type(v) for v in result.values()], [type(v) for v in expected.values()])
+
+    def test_flat_documents(self):
+        """Test every flat construct against PyYAML."""
+        for text in FLAT_DOCUMENTS:
+            with self.subTest(text=text):
+                self.assertIsNotNone(hyper_frontmatter.parse_flat(text))
+                self.assertSameResult(text)
+
+    def test_benchmark_samples(self):
+        """Test the project/task/artifact benchmark samples."""
+        for name, text in bench_frontmatter.SAMPLES.items():
+            with self.subTest(sample=name):
+                self.assertIsNotNone(hyper_frontmatter.parse_flat(text))
+                self.assertSameResult(text)
+
+    def test_declined_documents_are_valid_yaml(self):
+        """Test that declined documents still parse through PyYAML."""
+        for text in NOT_FLAT_DOCUMENTS:
+            with self.subTest(text=text):
+                self.assertIsNone(hyper_frontmatter.parse_flat(text))
+                yaml.safe_load(text)
+
+
+class TestParseFlat(unittest.TestCase):
+    """Test parse_flat results directly."""
+
+    def test_types(self):
+        """Test YAML 1.1 resolution of plain scalars."""
+        result = hyper_frontmatter.parse_flat('a: 12\nb: yes\nc: ~\nd: 2025-01-02\ne: [x, 3]\nf: text')
+        self.assertEqual(result, {
+            'a': 12, 'b': True, 'c': None, 'd': datetime.date(2025, 1, 2), 'e': ['x', 3], 'f': 'text',
+        })
+
+    def test_invalid_yaml_declined(self):
+        """Test that malformed YAML is left for PyYAML to report."""
+        invalid = ('id: foo: bar', 'title: "unterminated', 'reviewer: @me', 'orphan\n', '- a',
+                   'list:\n  - a\n - b', 'key:\tvalue', 'bad: 2025-13-45')
+        for text in invalid:
+            with self.subTest(text=text):
+                self.assertIsNone(hyper_frontmatter.parse_flat(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_frontmatter.py
+Tests the streaming frontmatter-only reader (buffered and mmap paths).
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_frontmatter
+
+
+class ReaderTestsMixin:
+    """Cases shared by the buffered and mmap readers."""
+
+    mmap_threshold = None
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.saved_threshold = hyper_frontmatter.MMAP_THRESHOLD
+        hyper_frontmatter.MMAP_THRESHOLD = self.mmap_threshold
+
+    def tearDown(self):
+        hyper_frontmatter.MMAP_THRESHOLD = self.saved_threshold
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, content: bytes) -> str:
+        path = os.path.join(self.temp_dir, 'doc.mdx')
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_block_and_body_offset(self):
+        """Test that the block and the body offset are returned."""
+        content = b'---\nid: task-001\ntitle: Test\n---\n# Body\n'
+        block, offset = hyper_frontmatter.read_frontmatter(self._write(content))
+        self.assertEqual(block, 'id: task-001\ntitle: Test\n')
+        self.assertEqual(content[offset:], b'# Body\n')
+
+    def test_crlf_line_endings(self):
+        """Test that CRLF delimiters are recognized."""
+        content = b'---\r\nid: x\r\n---\r\nBody'
+        block, offset = hyper_frontmatter.read_frontmatter(self._write(content))
+        self.assertEqual(block, 'id: x\r\n')
+        self.assertEqual(content[offset:], b'Body')
+
+    def test_closing_delimiter_at_eof(self):
+        """Test a closing delimiter without a trailing newline."""
+        content = b'---\nid: x\n---'
+        block, offset = hyper_frontmatter.read_frontmatter(self._write(content))
+        self.assertEqual(block, 'id: x\n')
+        self.assertEqual(offset, len(content))
+
+    def test_dashes_inside_value_not_delimiter(self):
+        """Test that --- inside a line does not close the block."""
+        content = b'---\ntitle: a --- b\n----\n---\nBody'
+        block, _ = hyper_frontmatter.read_frontmatter(self._write(content))
+        self.assertEqual(block, 'title: a --- b\n----\n')
+
+    def test_no_frontmatter(self):
+        """Test files that do not start with a delimiter."""
+        block, offset = hyper_frontmatter.read_frontmatter(self._write(b'# Title\n---\n'))
+        self.assertIsNone(block)
+        self.assertEqual(offset, 0)
+
+    def test_unclosed_frontmatter(self):
+        """Test that a block that never closes is not frontmatter."""
+        block, _ = hyper_frontmatter.read_frontmatter(self._write(b'---\nid: x\n'))
+        self.assertIsNone(block)
+
+    def test_byte_cap_enforced(self):
+        """Test that oversized frontmatter raises FrontmatterTooLarge."""
+        content = b'---\n' + b'key: value\n' * 200 + b'---\nBody'
+        with self.assertRaises(hyper_frontmatter.FrontmatterTooLarge):
+            hyper_frontmatter.read_frontmatter(self._write(content), max_bytes=512)
+
+    def test_large_body_ignored(self):
+        """Test that a huge body does not affect the result."""
+        content = b'---\nid: big\n---\n' + b'x' * (hyper_frontmatter.DEFAULT_MAX_BYTES * 2)
+        block, offset = hyper_frontmatter.read_frontmatter(self._write(content))
+        self.assertEqual(block, 'id: big\n')
+        self.assertEqual(offset, 16)
+
+
+class TestBufferedReader(ReaderTestsMixin, unittest.TestCase):
+    """Small files: buffered line reads."""
+
+    mmap_threshold = 1 << 62
+
+
+class TestMmapReader(ReaderTestsMixin, unittest.TestCase):
+    """Large files: mmap search."""
+
+    mmap_threshold = 0
+
+
+if __name__ == '__main__':
+    unittest.main()
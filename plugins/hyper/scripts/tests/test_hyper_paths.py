@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_paths.py
+Tests native path resolution against the resolve-paths.sh rules.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_paths
+
+
+class TestResolvePaths(unittest.TestCase):
+    """Test resolution of HyperHome, account and workspace paths."""
+
+    def setUp(self):
+        self.temp_dir = os.path.realpath(tempfile.mkdtemp())
+        self.home = os.path.join(self.temp_dir, 'home')
+        self.cwd = os.path.join(self.temp_dir, 'repo')
+        os.makedirs(self.cwd)
+        self.hyper_home = os.path.join(self.home, '.hyper')
+        self.account_root = os.path.join(self.hyper_home, 'accounts', 'acct-1', 'hyper')
+        os.makedirs(os.path.join(self.account_root, 'workspaces', 'ws-1'))
+
+        self._write_json(os.path.join(self.hyper_home, 'active-account.json'),
+                         {'activeAccountId': 'acct-1'})
+        self._write_json(os.path.join(self.account_root, 'workspaces.json'),
+                         {'workspaces': [{'id': 'ws-1', 'localPath': self.cwd}]})
+
+        self.env = {
+            'HOME': self.home,
+            'HYPER_CACHE_DIR': os.path.join(self.temp_dir, 'cache'),
+            'PATH': os.environ.get('PATH', ''),
+        }
+        hyper_paths.clear_cache()
+
+    def tearDown(self):
+        hyper_paths.clear_cache()
+        shutil.rmtree(self.temp_dir)
+
+    def _write_json(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    def test_registered_workspace(self):
+        """Test that the CWD is mapped through workspaces.json."""
+        paths = hyper_paths.resolve_paths(cwd=self.cwd, env=self.env)
+        self.assertEqual(paths['home'], self.hyper_home)
+        self.assertEqual(paths['account_id'], 'acct-1')
+        self.assertEqual(paths['personal_drive'], f"{self.account_root}/notes")
+        self.assertEqual(paths['workspace_id'], 'ws-1')
+        self.assertEqual(paths['workspace_root'], f"{self.account_root}/workspaces/ws-1")
+
+    def test_default_account(self):
+        """Test that a missing active-account.json falls back to 'local'."""
+        os.remove(os.path.join(self.hyper_home, 'active-account.json'))
+        paths = hyper_paths.resolve_paths(cwd=self.cwd, env=self.env)
+        self.assertEqual(paths['account_id'], 'local')
+        self.assertEqual(paths['workspace_root'], '')
+
+    def test_legacy_workspace(self):
+        """Test the legacy .hyper/workspace.json fallback."""
+        other = os.path.join(self.temp_dir, 'legacy')
+        self._write_json(os.path.join(other, '.hyper', 'workspace.json'), {'workspaceId': 'ws-legacy'})
+        paths = hyper_paths.resolve_paths(cwd=other, env=self.env)
+        self.assertEqual(paths['workspace_id'], 'ws-legacy')
+        self.assertEqual(paths['workspace_root'], f"{other}/.hyper")
+
+    def test_registry_change_invalidates_cache(self):
+        """Test that editing workspaces.json is picked up despite memoization."""
+        self.assertEqual(hyper_paths.resolve_paths(cwd=self.cwd, env=self.env)['workspace_id'], 'ws-1')
+        os.makedirs(os.path.join(self.account_root, 'workspaces', 'ws-2'))
+        registry = os.path.join(self.account_root, 'workspaces.json')
+        self._write_json(registry, {'workspaces': [{'id': 'ws-2', 'localPath': self.cwd}]})
+        # Make sure the mtime moves even on coarse-grained filesystems
+        st = os.stat(registry)
+        os.utime(registry, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(hyper_paths.resolve_paths(cwd=self.cwd, env=self.env)['workspace_id'], 'ws-2')
+
+    def test_disk_cache_written(self):
+        """Test that results are persisted for the next process."""
+        hyper_paths.resolve_paths(cwd=self.cwd, env=self.env)
+        cache_file = os.path.join(self.env['HYPER_CACHE_DIR'], hyper_paths.CACHE_FILENAME)
+        with open(cache_file) as f:
+            cache = json.load(f)
+        self.assertEqual(len(cache), 1)
+        entry = next(iter(cache.values()))
+        self.assertEqual(entry['paths']['workspace_id'], 'ws-1')
+
+    @unittest.skipUnless(shutil.which('bash') and shutil.which('jq'), 'bash and jq required')
+    def test_matches_shell_resolver(self):
+        """Test that native resolution agrees with resolve-paths.sh."""
+        cmd = f'source "{hyper_paths.RESOLVER_PATH}" && hyper_print_paths'
+        result = subprocess.run(['bash', '-c', cmd], capture_output=True, text=True,
+                                cwd=self.cwd, env=self.env)
+        shell = {}
+        for line in result.stdout.splitlines():
+            if ':' in line and not line.startswith('='):
+                key, value = line.split(':', 1)
+                shell[key.strip()] = value.strip()
+
+        paths = hyper_paths.resolve_paths(cwd=self.cwd, env=self.env)
+        self.assertEqual(shell['HyperHome'], paths['home'])
+        self.assertEqual(shell['Account ID'], paths['account_id'])
+        self.assertEqual(shell['Personal Drive'], paths['personal_drive'])
+        self.assertEqual(shell['Workspace Root'], paths['workspace_root'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_journal.py
+Tests the latency journal records, rotation and the stats summary.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import shutil
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path for imports
+sys.path.insert(0, SCRIPTS_DIR)
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+import hyper_journal
+import hyper_lock
+from hyper_validator import core as validator
+
+DOC = '---\nid: guide\ntitle: Guide\n---\n# Guide\n'
+
+
+def timings(total_ms, parse_ms=0.0):
+    return {'wall_ms': total_ms, 'phases_ms': {'parse': parse_ms}}
+
+
+class TestJournal(unittest.TestCase):
+    """Test writing and reading journal records."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.saved_env = {k: os.environ.get(k) for k in ('HYPER_JOURNAL_DIR', 'HYPER_JOURNAL_MAX_BYTES')}
+        os.environ['HYPER_JOURNAL_DIR'] = self.temp_dir
+        self.path = hyper_journal.journal_path()
+
+    def tearDown(self):
+        for key, value in self.saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        """Test that records decode to what was written."""
+        hyper_journal.append([hyper_journal.encode('pre', 'task', 'invalid', timings(12.5, 3.0), timestamp=100.0)])
+        [record] = hyper_journal.read_records()
+        self.assertEqual(record['timestamp'], 100.0)
+        self.assertEqual((record['mode'], record['schema'], record['outcome']), ('pre', 'task', 'invalid'))
+        self.assertEqual(record['total_ms'], 12.5)
+        self.assertEqual(record['phases_ms']['parse'], 3.0)
+        self.assertEqual(os.path.getsize(self.path), hyper_journal.RECORD.size)
+
+    def test_unknown_schema_recorded_as_other(self):
+        """Test that schema types outside the table are kept as 'other'."""
+        hyper_journal.append([hyper_journal.encode('post', 'meeting', 'ok', timings(1.0))])
+        self.assertEqual(hyper_journal.read_records()[0]['schema'], 'other')
+
+    def test_rotation(self):
+        """Test that a full journal rotates and both files are read."""
+        os.environ['HYPER_JOURNAL_MAX_BYTES'] = str(hyper_journal.RECORD.size * 3)
+        for i in range(5):
+            hyper_journal.append([hyper_journal.encode('pre', 'doc', 'ok', timings(float(i)), timestamp=float(i))])
+        self.assertTrue(os.path.exists(self.path + '.1'))
+        self.assertEqual([r['total_ms'] for r in hyper_journal.read_records()], [0.0, 1.0, 2.0, 3.0, 4.0])
+
+    def test_concurrent_rotation_once(self):
+        """Test that a second process that also saw a full journal does not rotate the fresh one."""
+        max_bytes = hyper_journal.RECORD.size * 3
+        os.environ['HYPER_JOURNAL_MAX_BYTES'] = str(max_bytes)
+        for i in range(3):
+            hyper_journal.append([hyper_journal.encode('pre', 'doc', 'ok', timings(float(i)), timestamp=float(i))])
+        # The first process rotates and appends; the second decided to rotate before that
+        hyper_journal.append([hyper_journal.encode('pre', 'doc', 'ok', timings(3.0), timestamp=3.0)])
+        hyper_journal._rotate(self.path, max_bytes)
+        self.assertEqual([r['total_ms'] for r in hyper_journal.read_records()], [0.0, 1.0, 2.0, 3.0])
+
+    def test_rotation_lock_held(self):
+        """Test that an append goes to the current file while another process holds the rotation lock."""
+        os.environ['HYPER_JOURNAL_MAX_BYTES'] = str(hyper_journal.RECORD.size)
+        hyper_journal.append([hyper_journal.encode('pre', 'doc', 'ok', timings(0.0), timestamp=0.0)])
+        saved = hyper_journal.ROTATE_LOCK_TIMEOUT
+        hyper_journal.ROTATE_LOCK_TIMEOUT = 0
+        try:
+            with hyper_lock.FileLock(self.path + '.lock'):
+                hyper_journal.append([hyper_journal.encode('pre', 'doc', 'ok', timings(1.0), timestamp=1.0)])
+        finally:
+            hyper_journal.ROTATE_LOCK_TIMEOUT = saved
+        self.assertFalse(os.path.exists(self.path + '.1'))
+        self.assertEqual(len(hyper_journal.read_records()), 2)
+
+    def test_truncated_record_ignored(self):
+        """Test that a partial trailing record is skipped."""
+        hyper_journal.append([hyper_journal.encode('pre', 'doc', 'ok', timings(1.0))])
+        with open(self.path, 'ab') as f:
+            f.write(b'\x00' * 5)
+        self.assertEqual(len(hyper_journal.read_records()), 1)
+
+    def test_summary_percentiles(self):
+        """Test p50/p95/p99 and throughput per mode and schema type."""
+        records = [hyper_journal.encode('pre', 'task', 'ok', timings(float(ms)), timestamp=float(ms))
+                   for ms in range(1, 101)]
+        records.append(hyper_journal.encode('post', 'doc', 'ok', timings(7.0), timestamp=50.0))
+        hyper_journal.append(records)
+        summary = hyper_journal.summarize(hyper_journal.read_records())
+        pre = summary['by_mode']['pre']
+        self.assertEqual((pre['count'], pre['p50_ms'], pre['p95_ms'], pre['p99_ms']), (100, 50.0, 95.0, 99.0))
+        self.assertEqual(pre['per_second'], round(100 / 99, 3))
+        self.assertEqual([(g['mode'], g['schema']) for g in summary['by_schema']], [('post', 'doc'), ('pre', 'task')])
+
+    def test_hook_and_batch_journaled(self):
+        """Test that hook and batch validations append records."""
+        path = os.path.join(self.temp_dir, '.hyper', 'docs', 'guide.mdx')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(DOC)
+        validator.run_hook('pre', path, DOC)
+        validator.run_hook('post', path)
+        list(validator.run_batch([os.path.dirname(path)], jobs=1))
+        records = hyper_journal.read_records()
+        self.assertEqual([(r['mode'], r['schema'], r['outcome']) for r in records],
+                         [('pre', 'doc', 'ok'), ('post', 'doc', 'ok'), ('batch', 'doc', 'ok')])
+
+    def test_stats_command(self):
+        """Test the stats subcommand output."""
+        hyper_journal.append([hyper_journal.encode('pre', 'task', 'ok', timings(2.0))])
+        result = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS_DIR, 'hyper_journal.py'), 'stats'],
+            capture_output=True, text=True, env=dict(os.environ),
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        output = json.loads(result.stdout)
+        self.assertEqual(output['records'], 1)
+        self.assertEqual(output['by_mode']['pre']['p99_ms'], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_lock.py
+Tests lock acquisition with backoff, its contention metrics, and the result
+cache under a concurrent writer.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import shutil
+import threading
+import time
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_lock
+import hyper_metrics
+import hyper_resultcache
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    return conn
+
+
+class TestAcquire(unittest.TestCase):
+    """Test the retry loop."""
+
+    def test_uncontended(self):
+        """Test that a free lock is taken without waiting or counting a wait."""
+        with hyper_metrics.collect(trace_memory=False) as metrics:
+            self.assertTrue(hyper_lock.acquire(lambda: True))
+        self.assertEqual(metrics.counters['lock_waits'], 0)
+        self.assertEqual(metrics.phase_seconds['lock'], 0.0)
+
+    def test_retries_recorded(self):
+        """Test that waits, retries and wait time reach the active collector."""
+        attempts = iter([False, False, False, True])
+        before = dict(hyper_lock.STATS)
+        with hyper_metrics.collect(trace_memory=False) as metrics:
+            self.assertTrue(hyper_lock.acquire(lambda: next(attempts)))
+        self.assertEqual(metrics.counters['lock_waits'], 1)
+        self.assertEqual(metrics.counters['lock_retries'], 3)
+        self.assertGreater(metrics.phase_seconds['lock'], 0.0)
+        self.assertEqual(hyper_lock.STATS['contended'], before['contended'] + 1)
+        self.assertEqual(hyper_lock.STATS['retries'], before['retries'] + 3)
+
+    def test_timeout(self):
+        """Test that a lock that stays held gives up after the timeout."""
+        before = hyper_lock.STATS['timeouts']
+        start = time.perf_counter()
+        self.assertFalse(hyper_lock.acquire(lambda: False, timeout=0.05))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertFalse(hyper_lock.acquire(lambda: False, timeout=0))
+        self.assertEqual(hyper_lock.STATS['timeouts'], before + 2)
+
+
+class TestSQLiteWriteLock(unittest.TestCase):
+    """Test begin_immediate() against a second connection."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'test.sqlite')
+        self.holder = connect(self.path)
+        self.holder.execute('CREATE TABLE t (x INTEGER)')
+        self.conn = connect(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        self.holder.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_waits_for_writer(self):
+        """Test that a write transaction starts once the other writer commits."""
+        self.holder.execute('BEGIN IMMEDIATE')
+        timer = threading.Timer(0.05, self.holder.execute, ['COMMIT'])
+        timer.start()
+        with hyper_metrics.collect(trace_memory=False) as metrics:
+            hyper_lock.begin_immediate(self.conn)
+        timer.join()
+        self.conn.execute('INSERT INTO t VALUES (1)')
+        self.conn.execute('COMMIT')
+        self.assertEqual(metrics.counters['lock_waits'], 1)
+        self.assertGreater(metrics.counters['lock_retries'], 0)
+        self.assertGreaterEqual(metrics.phase_seconds['lock'], 0.03)
+        self.assertEqual(self.conn.execute('PRAGMA busy_timeout').fetchone()[0], 5000)
+
+    def test_timeout_raises_locked(self):
+        """Test that a writer that never commits surfaces as 'database is locked'."""
+        self.holder.execute('BEGIN IMMEDIATE')
+        with self.assertRaisesRegex(sqlite3.OperationalError, 'locked'):
+            hyper_lock.begin_immediate(self.conn, timeout=0.05)
+        self.holder.execute('ROLLBACK')
+        # Readers are not blocked by a writer in WAL mode
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM t').fetchone()[0], 0)
+
+
+class TestFileLock(unittest.TestCase):
+    """Test the advisory file lock."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'publish.lock')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_exclusive(self):
+        """Test that a held lock times out a second holder and is free after release."""
+        with hyper_lock.FileLock(self.path):
+            with self.assertRaises(TimeoutError):
+                with hyper_lock.FileLock(self.path, timeout=0.05):
+                    pass
+        with hyper_lock.FileLock(self.path, timeout=0):
+            pass
+
+    def test_without_fcntl(self):
+        """Test that without fcntl (Windows) the lock is a no-op instead of an ImportError."""
+        saved = sys.modules.get('fcntl')
+        sys.modules['fcntl'] = None  # import fcntl raises ImportError
+        try:
+            with hyper_lock.FileLock(self.path, timeout=0):
+                with hyper_lock.FileLock(self.path, timeout=0):
+                    pass
+        finally:
+            if saved is None:
+                del sys.modules['fcntl']
+            else:
+                sys.modules['fcntl'] = saved
+
+
+class TestResultCacheContention(unittest.TestCase):
+    """Test that a busy result cache does not hold up validation."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'results.sqlite')
+        self.cache = hyper_resultcache.ResultCache(self.path)
+        self.cache.put('k1', True, None)
+        self.holder = connect(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.holder.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_hit_while_locked(self):
+        """Test that lookups answer at once while another process writes."""
+        self.holder.execute('BEGIN IMMEDIATE')
+        start = time.perf_counter()
+        self.assertEqual(self.cache.get('k1'), (True, None))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.holder.execute('ROLLBACK')
+
+    def test_put_while_locked_dropped(self):
+        """Test that a store gives up after PUT_LOCK_TIMEOUT rather than the busy timeout."""
+        self.holder.execute('BEGIN IMMEDIATE')
+        start = time.perf_counter()
+        self.cache.put('k2', False, [{'code': 'X'}])
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.holder.execute('ROLLBACK')
+        self.assertIsNone(self.cache.get('k2'))
+        self.cache.put('k2', False, [{'code': 'X'}])
+        self.assertEqual(self.cache.get('k2'), (False, [{'code': 'X'}]))
+
+
+if __name__ == '__main__':
+    unittest.main()
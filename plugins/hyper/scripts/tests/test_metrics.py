@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_metrics.py
+Tests phase accounting, counters and the --timings output of the validator.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+import time
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+import hyper_metrics
+from hyper_validator import core as validator
+
+DOC = '''---
+id: guide
+title: Guide
+---
+# Guide
+'''
+
+
+class TestMetrics(unittest.TestCase):
+    """Test the collector itself."""
+
+    def test_nested_phases_are_exclusive(self):
+        """Test that time in a nested phase is not charged to its parent."""
+        with hyper_metrics.collect(trace_memory=False) as metrics:
+            with hyper_metrics.phase('relationships'):
+                with hyper_metrics.phase('index'):
+                    time.sleep(0.02)
+        timings = metrics.as_dict()
+        self.assertGreaterEqual(timings['phases_ms']['index'], 15)
+        self.assertLess(timings['phases_ms']['relationships'], 10)
+        self.assertLessEqual(sum(timings['phases_ms'].values()), timings['wall_ms'] + 0.01)
+
+    def test_inactive_collector_is_noop(self):
+        """Test that phase() and count() do nothing outside collect()."""
+        self.assertIsNone(hyper_metrics.active())
+        with hyper_metrics.phase('parse'):
+            hyper_metrics.count('yaml_parses')
+        self.assertIsNone(hyper_metrics.active())
+
+    def test_peak_memory(self):
+        """Test that peak memory covers allocations made while collecting."""
+        with hyper_metrics.collect() as metrics:
+            block = bytearray(4 * 1024 * 1024)
+            del block
+        self.assertGreaterEqual(metrics.peak_memory_bytes, 4 * 1024 * 1024)
+
+    def test_aggregate(self):
+        """Test that aggregated timings sum times and counters and keep the largest peak."""
+        one = {'wall_ms': 2.0, 'phases_ms': {'parse': 1.0}, 'files_read': 1, 'bytes_read': 10,
+               'yaml_parses': 1, 'peak_memory_bytes': 100}
+        two = {'wall_ms': 3.0, 'phases_ms': {'parse': 0.5}, 'files_read': 1, 'bytes_read': 5,
+               'yaml_parses': 2, 'peak_memory_bytes': 300}
+        total = hyper_metrics.aggregate([one, two])
+        self.assertEqual(total['files'], 2)
+        self.assertEqual(total['wall_ms'], 5.0)
+        self.assertEqual(total['phases_ms'], {'parse': 1.5})
+        self.assertEqual((total['files_read'], total['bytes_read'], total['yaml_parses']), (2, 15, 3))
+        self.assertEqual(total['peak_memory_bytes'], 300)
+
+
+class TestValidatorTimings(unittest.TestCase):
+    """Test the timings attached to validator responses."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, '.hyper', 'docs', 'guide.mdx')
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write(DOC)
+        # Validate for real rather than from the result cache
+        validator._result_cache, validator._result_cache_pid = None, os.getpid()
+
+    def tearDown(self):
+        validator._result_cache_pid = None
+        shutil.rmtree(self.temp_dir)
+
+    def test_pre_validate_timings(self):
+        """Test that PreToolUse responses gain a timings breakdown."""
+        response, exit_code = validator.run_hook('pre', self.path, DOC, timings=True)
+        self.assertEqual(exit_code, 0)
+        timings = response['timings']
+        self.assertEqual(set(timings['phases_ms']), set(hyper_metrics.PHASES) | {'other'})
+        self.assertEqual(timings['yaml_parses'], 1)
+        self.assertIsNotNone(timings['peak_memory_bytes'])
+
+    def test_post_report_timings(self):
+        """Test that PostToolUse reports end with a timings line."""
+        validator.get_file_cache().clear()
+        lines, _exit_code = validator.run_hook('post', self.path, timings=True)
+        self.assertTrue(lines[-1].startswith('{"timings": '))
+        self.assertIn('"bytes_read": %d' % len(DOC), lines[-1])
+
+    def test_no_timings_by_default(self):
+        """Test that responses are unchanged without timings."""
+        response, _exit_code = validator.run_hook('pre', self.path, DOC)
+        self.assertNotIn('timings', response)
+
+    def test_batch_timings_aggregated(self):
+        """Test that batch runs report per-file and aggregate timings."""
+        results = list(validator.run_batch([os.path.dirname(self.path)], jobs=1, timings=True))
+        self.assertIn('timings', results[0])
+        report = validator.batch_summary(results)
+        self.assertEqual(report['timings']['files'], 1)
+        self.assertEqual(report['timings']['files_read'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,18 +13,9 @@ import unittest
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from importlib.util import spec_from_loader, module_from_spec
-from importlib.machinery import SourceFileLoader
+from _isolation import setUpModule, tearDownModule  # noqa: F401
 
-# Load the validator module (has hyphen in name)
-validator_path = os.path.join(
-    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-    'validate-hyper-file.py'
-)
-loader = SourceFileLoader('validate_hyper_file', validator_path)
-spec = spec_from_loader('validate_hyper_file', loader)
-validator = module_from_spec(spec)
-loader.exec_module(validator)
+from hyper_validator import core as validator
 
 
 class TestRelationshipValidation(unittest.TestCase):
@@ -328,5 +319,58 @@ parent: proj-chain
         self.assertIn('task-a', cycle)
 
 
+class TestFindDependencyCycles(unittest.TestCase):
+    """Test graph-based cycle search used by relationship validation."""
+
+    def test_no_cycle(self):
+        """Test that an acyclic graph reports nothing."""
+        graph = {'a': ['b'], 'b': ['c'], 'c': []}
+        self.assertEqual(validator.find_dependency_cycles('d', ['a'], graph), [])
+
+    def test_reports_every_closing_dependency(self):
+        """Test that each dependency leading back to the task yields a cycle."""
+        graph = {'a': [], 'b': ['a'], 'c': ['b'], 'd': ['a']}
+        cycles = validator.find_dependency_cycles('a', ['c', 'd'], graph)
+        self.assertEqual(cycles, [['a', 'c', 'b', 'a'], ['a', 'd', 'a']])
+
+    def test_existing_edges_of_task_replaced(self):
+        """Test that the task's on-disk depends_on is superseded by the new one."""
+        graph = {'a': ['b'], 'b': []}
+        self.assertEqual(validator.find_dependency_cycles('b', ['a'], graph), [['b', 'a', 'b']])
+        self.assertEqual(validator.find_dependency_cycles('a', [], graph), [])
+
+    def test_deep_chain_no_recursion_limit(self):
+        """Test that very long chains are handled iteratively."""
+        depth = sys.getrecursionlimit() * 5
+        graph = {f't{i}': [f't{i + 1}'] for i in range(depth)}
+        graph[f't{depth}'] = []
+        cycles = validator.find_dependency_cycles(f't{depth}', ['t0'], graph)
+        self.assertEqual(len(cycles), 1)
+        self.assertEqual(len(cycles[0]), depth + 2)
+
+    def test_validate_relationships_reports_all_cycles(self):
+        """Test that validate_relationships emits one error per cycle."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tasks_dir = os.path.join(temp_dir, 'projects', 'multi', 'tasks')
+            os.makedirs(tasks_dir)
+            for task_id in ('m-b', 'm-c'):
+                with open(os.path.join(tasks_dir, f'{task_id}.mdx'), 'w') as f:
+                    f.write(f"---\nid: {task_id}\ntype: task\nparent: proj-multi\ndepends_on:\n- m-a\n---\n")
+            with open(os.path.join(tasks_dir, 'm-a.mdx'), 'w') as f:
+                f.write("---\nid: m-a\ntype: task\nparent: proj-multi\n---\n")
+            validator.WORKSPACE_ROOT = temp_dir
+
+            frontmatter = {'id': 'm-a', 'parent': 'proj-multi', 'depends_on': ['m-b', 'm-c']}
+            errors = validator.validate_relationships(
+                frontmatter, 'task', os.path.join(tasks_dir, 'm-a.mdx')
+            )
+            cycles = [e for e in errors if e['code'] == 'CIRCULAR_DEPENDENCY']
+            self.assertEqual(len(cycles), 2)
+        finally:
+            shutil.rmtree(temp_dir)
+            validator.WORKSPACE_ROOT = ''
+
+
 if __name__ == '__main__':
     unittest.main()
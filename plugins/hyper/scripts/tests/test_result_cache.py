@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_resultcache.py
+Tests the persistent validation result cache and when its verdicts are reused.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+import sqlite3
+import threading
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+import hyper_resultcache
+from hyper_validator import core as validator
+
+PROJECT = '''---
+id: proj-demo
+title: Demo
+type: project
+status: todo
+priority: high
+---
+'''
+
+TASK = '''---
+id: demo-002
+title: Second
+type: task
+status: todo
+priority: high
+parent: proj-demo
+depends_on:
+  - demo-001
+---
+'''
+
+
+def task_doc(task_id):
+    return TASK.replace('demo-002', task_id).replace('  - demo-001\n', '').replace('depends_on:\n', '')
+
+
+class TestResultCache(unittest.TestCase):
+    """Test the SQLite cache itself."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = hyper_resultcache.ResultCache(os.path.join(self.temp_dir, 'results.sqlite'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        """Test that verdicts survive a reopen."""
+        errors = [{'code': 'MISSING_REQUIRED_FIELD', 'field': 'title'}]
+        self.cache.put('a', False, errors)
+        self.cache.put('b', True, None)
+        self.cache.close()
+        self.assertEqual(self.cache.get('a'), (False, errors))
+        self.assertEqual(self.cache.get('b'), (True, None))
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted past the limit."""
+        self.cache.max_entries = 10
+        for i in range(10):
+            self.cache.put(f'k{i}', True, None)
+        self.cache.get('k0')  # Most recently used now
+        self.cache.put('k10', True, None)
+        self.assertLessEqual(len(self.cache), 10)
+        self.assertIsNotNone(self.cache.get('k0'))
+        self.assertIsNone(self.cache.get('k1'))
+
+    def test_entry_count(self):
+        """Test that the stored entry count follows inserts, replacements, eviction and clear."""
+        def rows():
+            return self.cache.conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+        self.cache.max_entries = 10
+        for i in range(25):
+            self.cache.put(f'k{i % 15}', True, None)
+            self.assertEqual(len(self.cache), rows())
+        self.assertLessEqual(len(self.cache), 10)
+        self.cache.close()
+        self.assertEqual(len(self.cache), rows())
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_shared_across_threads(self):
+        """Test that a cache opened in one thread serves lookups and stores from others."""
+        self.cache.put('a', True, None)
+        results = []
+
+        def worker(i):
+            self.cache.put(f'k{i}', True, None)
+            results.append((self.cache.get('a'), self.cache.get(f'k{i}')))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [((True, None), (True, None))] * 4)
+        self.assertEqual(len(self.cache), 5)
+
+    def test_rebuild_keeps_concurrent_rebuild(self):
+        """Test that a stale format check does not drop a cache another process just rebuilt."""
+        path = os.path.join(self.temp_dir, 'old.sqlite')
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.execute('PRAGMA user_version=1')
+        conn.close()
+        # Saw the old format, then lost the race to another opener
+        stale = sqlite3.connect(path, isolation_level=None)
+        winner = hyper_resultcache.ResultCache(path)
+        winner.put('a', True, None)
+        hyper_resultcache.ResultCache(path)._create_schema(stale)
+        stale.close()
+        self.assertEqual(winner.get('a'), (True, None))
+        self.assertEqual(len(winner), 1)
+        winner.close()
+
+    def test_key_inputs(self):
+        """Test that every key input changes the key."""
+        base = ('/w/docs/a.mdx', 'content', 'schemas-1', '/w', 'graph-1')
+        key = hyper_resultcache.result_key(*base)
+        for i in range(len(base)):
+            changed = list(base)
+            changed[i] += 'x'
+            self.assertNotEqual(hyper_resultcache.result_key(*changed), key)
+
+    def test_key_follows_parse_limits(self):
+        """Test that changing a HYPER_FRONTMATTER_MAX_* limit changes the key."""
+        base = ('/w/docs/a.mdx', 'content', 'schemas-1', '/w', '')
+        key = hyper_resultcache.result_key(*base)
+        os.environ['HYPER_FRONTMATTER_MAX_NODES'] = '10'
+        try:
+            self.assertNotEqual(hyper_resultcache.result_key(*base), key)
+        finally:
+            del os.environ['HYPER_FRONTMATTER_MAX_NODES']
+        self.assertEqual(hyper_resultcache.result_key(*base), key)
+
+    def test_code_stamp_covers_package(self):
+        """Test that editing a file of the hyper_validator package changes the code stamp."""
+        package_dir = os.path.join(self.temp_dir, 'hyper_validator')
+        os.makedirs(package_dir)
+        module = os.path.join(package_dir, 'core.py')
+        with open(module, 'w') as f:
+            f.write('x = 1\n')
+        saved = hyper_resultcache.SOURCE_DIRS, hyper_resultcache._code_stamp
+        hyper_resultcache.SOURCE_DIRS = (self.temp_dir, package_dir)
+        try:
+            hyper_resultcache._code_stamp = None
+            before = hyper_resultcache.code_stamp()
+            with open(module, 'w') as f:
+                f.write('x = 22\n')
+            hyper_resultcache._code_stamp = None
+            self.assertNotEqual(hyper_resultcache.code_stamp(), before)
+        finally:
+            hyper_resultcache.SOURCE_DIRS, hyper_resultcache._code_stamp = saved
+
+    def test_disabled_by_env(self):
+        """Test that HYPER_RESULT_CACHE=off disables the cache."""
+        os.environ['HYPER_RESULT_CACHE'] = 'off'
+        try:
+            self.assertIsNone(hyper_resultcache.open_cache(os.path.join(self.temp_dir, 'off.sqlite')))
+        finally:
+            del os.environ['HYPER_RESULT_CACHE']
+
+
+class TestCachedValidation(unittest.TestCase):
+    """Test that validation reuses verdicts only for unchanged inputs."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.temp_dir, 'ws')
+        self.tasks_dir = os.path.join(self.root, 'projects', 'demo', 'tasks')
+        os.makedirs(self.tasks_dir)
+        with open(os.path.join(self.root, 'projects', 'demo', '_project.mdx'), 'w') as f:
+            f.write(PROJECT)
+        self._write_task('task-001.mdx', task_doc('demo-001'))
+
+        self.saved_root = validator.__dict__.get('WORKSPACE_ROOT')
+        validator.WORKSPACE_ROOT = self.root
+        cache = hyper_resultcache.ResultCache(os.path.join(self.temp_dir, 'results.sqlite'))
+        validator._result_cache, validator._result_cache_pid = cache, os.getpid()
+
+        self.runs = 0
+        real_validate = validator.validate_content
+
+        def counting_validate(*args, **kwargs):
+            self.runs += 1
+            return real_validate(*args, **kwargs)
+
+        validator.validate_content = counting_validate
+        self.addCleanup(setattr, validator, 'validate_content', real_validate)
+
+    def tearDown(self):
+        validator._result_cache.close()
+        validator._result_cache = validator._result_cache_pid = None
+        if self.saved_root is None:
+            del validator.WORKSPACE_ROOT
+        else:
+            validator.WORKSPACE_ROOT = self.saved_root
+        shutil.rmtree(self.temp_dir)
+
+    def _write_task(self, name, content):
+        with open(os.path.join(self.tasks_dir, name), 'w') as f:
+            f.write(content)
+
+    def _pre(self, content=TASK):
+        return validator.pre_validate_response(os.path.join(self.tasks_dir, 'task-002.mdx'), content)
+
+    def test_identical_write_served_from_cache(self):
+        """Test that retrying the same Write does not validate again."""
+        first = self._pre()
+        second = self._pre()
+        self.assertEqual(first, second)
+        self.assertEqual(first[1], 0)
+        self.assertEqual(self.runs, 1)
+
+    def test_blocked_write_served_from_cache(self):
+        """Test that a retried invalid Write is blocked from the cache."""
+        invalid = TASK.replace('demo-001', 'demo-404')
+        self.assertEqual(self._pre(invalid)[1], 2)
+        response, exit_code = self._pre(invalid)
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(response['error']['context']['errors'][0]['code'], 'INVALID_DEPENDENCY_REFERENCE')
+        self.assertEqual(self.runs, 1)
+
+    def test_referenced_task_set_invalidates(self):
+        """Test that adding a sibling task re-validates dependent writes."""
+        invalid = TASK.replace('demo-001', 'demo-003')
+        self.assertEqual(self._pre(invalid)[1], 2)
+        self._write_task('task-003.mdx', task_doc('demo-003'))
+        self.assertEqual(self._pre(invalid)[1], 0)
+        self.assertEqual(self.runs, 2)
+
+    def test_lower_parse_limit_revalidates(self):
+        """Test that a verdict cached under other frontmatter limits is not reused."""
+        self.assertEqual(self._pre()[1], 0)
+        os.environ['HYPER_FRONTMATTER_MAX_NODES'] = '3'
+        try:
+            self.assertEqual(self._pre()[1], 2)
+        finally:
+            del os.environ['HYPER_FRONTMATTER_MAX_NODES']
+        self.assertEqual(self.runs, 2)
+
+    def test_unrelated_change_keeps_verdict(self):
+        """Test that editing a task body or a doc does not invalidate."""
+        self._pre()
+        self._write_task('task-001.mdx', task_doc('demo-001') + '\nMore notes.\n')
+        os.makedirs(os.path.join(self.root, 'docs'))
+        with open(os.path.join(self.root, 'docs', 'guide.mdx'), 'w') as f:
+            f.write('---\nid: guide\ntitle: Guide\n---\n')
+        self._pre()
+        self.assertEqual(self.runs, 1)
+
+    def test_post_validation_shares_cache(self):
+        """Test that PostToolUse reuses the PreToolUse verdict for a rewritten file."""
+        self._write_task('task-002.mdx', TASK)
+        self._pre()
+        self._write_task('task-002.mdx', TASK)
+        lines, exit_code = validator.post_validate_report(os.path.join(self.tasks_dir, 'task-002.mdx'))
+        self.assertEqual((lines, exit_code), ([], 0))
+        self.assertEqual(self.runs, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
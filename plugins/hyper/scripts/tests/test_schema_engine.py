@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_schema.py
+Tests loading, compiling and caching the declarative document schemas.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import shutil
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+import hyper_schema
+from hyper_validator import core as validator
+
+try:
+    import yaml  # noqa: F401
+    HAS_PYYAML = True
+except ImportError:
+    HAS_PYYAML = False
+
+
+class TestSchemaEngine(unittest.TestCase):
+    """Test schema compilation from a scratch schema directory."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema_dir = os.path.join(self.temp_dir, 'schemas')
+        self.cache_path = os.path.join(self.temp_dir, 'cache', hyper_schema.CACHE_FILENAME)
+        shutil.copytree(hyper_schema.SCHEMA_DIR, self.schema_dir)
+        hyper_schema.clear_cache()
+
+        self.compiles = 0
+        real_compile = hyper_schema.compile_definition
+
+        def counting_compile(contents, digest):
+            self.compiles += 1
+            return real_compile(contents, digest)
+
+        hyper_schema.compile_definition = counting_compile
+        self.addCleanup(setattr, hyper_schema, 'compile_definition', real_compile)
+
+    def tearDown(self):
+        hyper_schema.clear_cache()
+        shutil.rmtree(self.temp_dir)
+
+    def _load(self):
+        return hyper_schema.load_schemas(self.schema_dir, cache_path=self.cache_path)
+
+    def _write(self, name, data):
+        path = os.path.join(self.schema_dir, name)
+        with open(path, 'w') as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+        # Make sure the stamp moves even on coarse-grained filesystems
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_shipped_schemas_compile(self):
+        """Test that the shipped schema files compile to lookup structures."""
+        schemas = self._load()
+        task = schemas.get('task')
+        self.assertEqual(task.required, ('id', 'title', 'type', 'status', 'priority', 'parent'))
+        self.assertIsInstance(task.enum('status').members, frozenset)
+        self.assertIn('todo', task.enum('status'))
+        self.assertNotIn('planned', task.enum('status'))
+        self.assertTrue(task.filename_matches('task-001.mdx'))
+        self.assertTrue(task.filename_matches('verify-task-1000.mdx'))
+        self.assertFalse(task.filename_matches('my-task.mdx'))
+        self.assertIs(schemas.get('unknown'), hyper_schema.FALLBACK_SCHEMA)
+
+    def test_unhashable_value_not_allowed(self):
+        """Test that list values fail enum checks instead of raising."""
+        self.assertNotIn(['todo'], self._load().get('task').enum('status'))
+
+    def test_cached_by_content_hash(self):
+        """Test that unchanged schema files are not recompiled."""
+        first = self._load()
+        self.assertEqual(self.compiles, 1)
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        hyper_schema.clear_cache()
+        second = self._load()
+        self.assertEqual(self.compiles, 1)
+        self.assertEqual(second.digest, first.digest)
+
+        # Touching a file without changing it re-reads but does not recompile
+        self._write('task.json', open(os.path.join(hyper_schema.SCHEMA_DIR, 'task.json')).read())
+        self._load()
+        self.assertEqual(self.compiles, 1)
+
+    def test_new_schema_file_picked_up(self):
+        """Test that adding a schema file needs no code change."""
+        self._load()
+        self._write('meeting.json', {'required': ['id', 'title', 'attendees'], 'enums': {'type': ['meeting']}})
+        schemas = self._load()
+        self.assertEqual(self.compiles, 2)
+        self.assertEqual(schemas.get('meeting').required, ('id', 'title', 'attendees'))
+
+    def test_malformed_schema_rejected(self):
+        """Test that invalid schema files raise SchemaError."""
+        cases = {
+            'bad-json.json': '{"required": [',
+            'bad-key.json': {'requird': ['id']},
+            'bad-list.json': {'required': 'id'},
+            'bad-regex.json': {'filename': '(unclosed'},
+        }
+        for name, data in cases.items():
+            with self.subTest(file=name):
+                self._write(name, data)
+                with self.assertRaises(hyper_schema.SchemaError):
+                    self._load()
+                os.remove(os.path.join(self.schema_dir, name))
+
+    def test_missing_common_file(self):
+        """Test that _common.json is required."""
+        os.remove(os.path.join(self.schema_dir, hyper_schema.COMMON_FILENAME))
+        with self.assertRaises(hyper_schema.SchemaError):
+            self._load()
+
+    @unittest.skipUnless(HAS_PYYAML, 'PyYAML required')
+    def test_yaml_schema_file(self):
+        """Test that schemas may also be written in YAML."""
+        self._write('meeting.yaml', 'type: meeting\nrequired:\n  - id\n  - title\nfilename: "^mtg-.*\\\\.mdx$"\n')
+        meeting = self._load().get('meeting')
+        self.assertTrue(meeting.filename_matches('mtg-weekly.mdx'))
+
+
+class TestFilenameValidation(unittest.TestCase):
+    """Test that naming conventions are enforced by the validator."""
+
+    def _codes(self, path, frontmatter):
+        return [e['code'] for e in validator.validate_frontmatter(frontmatter, validator.infer_type_from_path(path), path)]
+
+    def test_task_filename(self):
+        """Test task file names against task-NNN.mdx."""
+        frontmatter = {'id': 't-001', 'title': 'T', 'type': 'task', 'status': 'todo',
+                       'priority': 'high', 'parent': 'proj-x'}
+        self.assertNotIn('INVALID_FILENAME', self._codes('/p/.hyper/projects/x/tasks/task-001.mdx', frontmatter))
+        self.assertIn('INVALID_FILENAME', self._codes('/p/.hyper/projects/x/tasks/Setup Task.mdx', frontmatter))
+
+    def test_doc_filename(self):
+        """Test doc file names against lowercase-kebab .mdx or .md."""
+        frontmatter = {'id': 'guide', 'title': 'Guide'}
+        self.assertNotIn('INVALID_FILENAME', self._codes('/p/.hyper/docs/user-guide.mdx', frontmatter))
+        self.assertNotIn('INVALID_FILENAME', self._codes('/p/.hyper/docs/user-guide.md', frontmatter))
+        self.assertIn('INVALID_FILENAME', self._codes('/p/.hyper/docs/UserGuide.mdx', frontmatter))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_search.py
+Tests tokenization, incremental refresh, phrase queries and BM25 ranking.
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import shutil
+import threading
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_metrics
+import hyper_search
+from hyper_validator import core as validator
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def document(title, body):
+    return f'---\nid: {title.lower().replace(" ", "-")}\ntitle: {title}\n---\n{body}\n'
+
+
+class TestTokenizer(unittest.TestCase):
+    """Test tokenization and position encoding."""
+
+    def test_tokenize(self):
+        """Test lowercasing and splitting on punctuation."""
+        self.assertEqual(hyper_search.tokenize('Fix task-001: Cache_Miss!'),
+                         ['fix', 'task', '001', 'cache', 'miss'])
+
+    def test_markup_skipped(self):
+        """Test that JSX tags and MDX import lines are not indexed."""
+        body = "import { Callout } from './callout'\n<Callout type=\"info\">Rotate keys</Callout>"
+        self.assertEqual(hyper_search.document_tokens('Keys', body), ['keys', 'rotate', 'keys'])
+
+    def test_parse_query(self):
+        """Test that quoted phrases are split from words."""
+        self.assertEqual(hyper_search.parse_query('deploy "rate limit" api'),
+                         (['deploy', 'api'], [['rate', 'limit']]))
+
+    def test_positions_round_trip(self):
+        """Test the delta varint encoding."""
+        positions = [0, 1, 127, 128, 300, 70000]
+        encoded = hyper_search.encode_positions(positions)
+        self.assertEqual(hyper_search.decode_positions(encoded), positions)
+        self.assertEqual(len(hyper_search.encode_positions([5, 6, 7])), 3)
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test index refresh and search results."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.tasks_dir = os.path.join(self.temp_dir, 'projects', 'alpha', 'tasks')
+        write_file(os.path.join(self.tasks_dir, 'task-001.mdx'),
+                   document('Rate limiter', 'Add a rate limit to the public API. The limit is per token.'))
+        write_file(os.path.join(self.tasks_dir, 'task-002.mdx'),
+                   document('Token refresh', 'Refresh the token before it expires. Limit retries.'))
+        write_file(os.path.join(self.temp_dir, 'docs', 'guide.mdx'),
+                   document('Guide', 'How to deploy. Limit rate of deploys on Fridays.'))
+
+        self.read = []
+        real_read = hyper_search.read_document
+
+        def counting_read(path, *args):
+            self.read.append(path)
+            return real_read(path, *args)
+
+        hyper_search.read_document = counting_read
+        self.addCleanup(setattr, hyper_search, 'read_document', real_read)
+        self.index = hyper_search.SearchIndex(self.temp_dir, validator.parse_frontmatter_block)
+        self.index.refresh()
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def paths(self, query, **kwargs):
+        return [r['path'] for r in self.index.search(query, **kwargs)]
+
+    def test_bm25_ranking(self):
+        """Test that denser matches rank first and unrelated docs are excluded."""
+        results = self.index.search('token')
+        self.assertEqual([r['path'] for r in results],
+                         ['projects/alpha/tasks/task-002.mdx', 'projects/alpha/tasks/task-001.mdx'])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+        self.assertEqual(results[0]['title'], 'Token refresh')
+
+    def test_phrase_query(self):
+        """Test that phrases need adjacent tokens in order."""
+        self.assertEqual(self.paths('"rate limit"'), ['projects/alpha/tasks/task-001.mdx'])
+        self.assertEqual(self.paths('"limit rate"'), ['docs/guide.mdx'])
+        self.assertEqual(self.paths('"rate token"'), [])
+
+    def test_kind_filter_and_limit(self):
+        """Test restricting results by kind and count."""
+        self.assertEqual(self.paths('limit', kind='doc'), ['docs/guide.mdx'])
+        self.assertEqual(len(self.paths('limit', limit=2)), 2)
+
+    def test_unknown_terms(self):
+        """Test that unmatched queries return nothing."""
+        self.assertEqual(self.paths('kubernetes'), [])
+        self.assertEqual(self.paths(''), [])
+
+    def test_incremental_refresh(self):
+        """Test that only changed files are re-read and stale postings are dropped."""
+        self.read.clear()
+        self.assertEqual(self.index.refresh()['updated'], 0)
+        self.assertEqual(self.read, [])
+
+        path = os.path.join(self.tasks_dir, 'task-002.mdx')
+        write_file(path, document('Token refresh', 'Rotate credentials nightly.'))
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        os.remove(os.path.join(self.temp_dir, 'docs', 'guide.mdx'))
+        stats = self.index.refresh()
+        self.assertEqual((stats['updated'], stats['removed']), (1, 1))
+        self.assertEqual(self.read, [path])
+        self.assertEqual(self.paths('credentials'), ['projects/alpha/tasks/task-002.mdx'])
+        self.assertEqual(self.paths('expires'), [])
+        terms = {row[0] for row in self.index.conn.execute('SELECT term FROM terms')}
+        self.assertNotIn('expires', terms)
+        self.assertNotIn('deploy', terms)
+
+    def test_concurrent_refresh(self):
+        """Test that a refresh racing another process's refresh stores each document once."""
+        other = hyper_search.SearchIndex(self.temp_dir, validator.parse_frontmatter_block)
+        self.addCleanup(other.close)
+        write_file(os.path.join(self.tasks_dir, 'task-003.mdx'), document('Nightly', 'Rotate credentials nightly.'))
+        path = os.path.join(self.tasks_dir, 'task-002.mdx')
+        write_file(path, document('Token refresh', 'Rotate tokens hourly.'))
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        counting_read = hyper_search.read_document
+        raced = []
+
+        def racing_read(path, *args):
+            # The other process refreshes after we walked the tree but before we write
+            if not raced:
+                raced.append(True)
+                other.refresh()
+            return counting_read(path, *args)
+
+        hyper_search.read_document = racing_read
+        self.index.refresh()
+        rows = self.index.conn.execute('SELECT path FROM docs ORDER BY path').fetchall()
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(self.paths('nightly'), ['projects/alpha/tasks/task-003.mdx'])
+        self.assertEqual(self.paths('hourly'), ['projects/alpha/tasks/task-002.mdx'])
+
+    def test_refresh_waits_for_writer(self):
+        """Test that a refresh waits for another writer through hyper_lock and records the wait."""
+        holder = sqlite3.connect(self.index.db_path, isolation_level=None, check_same_thread=False)
+        self.addCleanup(holder.close)
+        write_file(os.path.join(self.temp_dir, 'docs', 'faq.mdx'), document('FAQ', 'Questions.'))
+        holder.execute('BEGIN IMMEDIATE')
+        timer = threading.Timer(0.05, holder.execute, ['COMMIT'])
+        timer.start()
+        with hyper_metrics.collect(trace_memory=False) as metrics:
+            self.assertEqual(self.index.refresh()['updated'], 1)
+        timer.join()
+        self.assertEqual(metrics.counters['lock_waits'], 1)
+        self.assertGreater(metrics.phase_seconds['lock'], 0.0)
+
+    def test_search_workspace_without_index(self):
+        """Test that the validator API scans when the index is disabled."""
+        os.environ['HYPER_INDEX'] = 'off'
+        try:
+            results = validator.search_workspace('"rate limit"', roots=[self.temp_dir])
+        finally:
+            del os.environ['HYPER_INDEX']
+        self.assertEqual([(r['root'], r['path']) for r in results],
+                         [(self.temp_dir, 'projects/alpha/tasks/task-001.mdx')])
+
+    def test_search_command(self):
+        """Test the search subcommand output."""
+        result = subprocess.run(
+            [sys.executable, hyper_search.__file__, 'search', 'refresh', 'token', '--root', self.temp_dir],
+            capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        output = json.loads(result.stdout)
+        self.assertEqual(output['results'][0]['path'], 'projects/alpha/tasks/task-002.mdx')
+
+
+
+class TestSearchAcrossRoots(unittest.TestCase):
+    """Test ranking results from several roots as one collection."""
+
+    DOCS = {
+        'one': {'a': 'Kubernetes deploy checklist.', 'b': 'Deploy notes.', 'c': 'Deploy again on Monday.'},
+        'two': {'d': 'Kubernetes kubernetes cluster sizing.', 'e': 'Kubernetes basics.'},
+    }
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        for root, docs in self.DOCS.items():
+            for name, body in docs.items():
+                for directory in (root, 'combined'):
+                    write_file(os.path.join(self.temp_dir, directory, 'docs', f'{name}.mdx'),
+                               document(name.upper(), body))
+
+    def tearDown(self):
+        for root in self.DOCS:
+            index = validator._search_indexes.pop(os.path.join(self.temp_dir, root), None)
+            if index is not None:
+                index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_scores_match_single_collection(self):
+        """Test that merged results score as if every document were in one index."""
+        query = 'kubernetes deploy'
+        roots = [os.path.join(self.temp_dir, root) for root in self.DOCS]
+        merged = validator.search_workspace(query, roots=roots)
+
+        combined = hyper_search.SearchIndex(os.path.join(self.temp_dir, 'combined'),
+                                            validator.parse_frontmatter_block, db_path=':memory:')
+        self.addCleanup(combined.close)
+        combined.refresh()
+        expected = combined.search(query)
+        self.assertEqual([(r['title'], r['score']) for r in merged], [(r['title'], r['score']) for r in expected])
+        self.assertEqual({r['root'] for r in merged}, set(roots))
+
+    def test_merge_statistics(self):
+        """Test that statistics add up per term."""
+        merged = hyper_search.merge_statistics([
+            {'documents': 3, 'length': 30, 'frequencies': {'a': 1, 'b': 2}},
+            {'documents': 2, 'length': 10, 'frequencies': {'a': 2}},
+        ])
+        self.assertEqual(merged, {'documents': 5, 'length': 40, 'frequencies': {'a': 3, 'b': 2}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_snapshot.py
+Tests the snapshot format, the index publishing it and the validator
+answering relationship checks from it.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_index
+import hyper_snapshot
+from hyper_validator import core as validator
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    # Make the change visible to stamps even within one mtime tick
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def task_content(task_id, depends_on=None, parent='proj-alpha'):
+    deps = ''.join(f'- {d}\n' for d in depends_on or [])
+    depends_line = f'depends_on:\n{deps}' if deps else ''
+    return f'''---
+id: {task_id}
+title: {task_id}
+type: task
+status: todo
+priority: high
+parent: {parent}
+{depends_line}---
+'''
+
+
+PROJECTS = [('proj-alpha', 'todo'), ('proj-beta', None)]
+TASKS = [
+    ('alpha', 'alpha-002', 'proj-alpha', 'todo', ['alpha-001']),
+    ('alpha', 'alpha-001', 'proj-alpha', 'done', []),
+    ('alpha', 'alpha-003', 'proj-alpha', 'todo', ['alpha-002', 'alpha-009']),
+    ('alpha', 'alpha-001', 'proj-alpha', 'todo', ['alpha-003']),
+    ('beta', 'beta-001', None, None, []),
+]
+
+
+class TestSnapshotFormat(unittest.TestCase):
+    """Test build_snapshot() and reading a snapshot back."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'relationships.snap')
+        hyper_snapshot.write_snapshot(self.path, hyper_snapshot.build_snapshot(
+            PROJECTS, TASKS, 11, {'alpha': 22, 'beta': 33}, generation=4))
+        self.snapshot = hyper_snapshot.Snapshot(self.path)
+
+    def tearDown(self):
+        self.snapshot.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        """Test that ids, graphs and stamps read back in path order."""
+        snapshot = self.snapshot
+        self.assertEqual(snapshot.generation, 4)
+        self.assertEqual(snapshot.project_stamp, 11)
+        self.assertEqual(snapshot.project_ids(), ['proj-alpha', 'proj-beta'])
+        self.assertEqual(snapshot.task_dependencies('alpha'), {
+            'alpha-002': ['alpha-001'],
+            'alpha-001': [],
+            'alpha-003': ['alpha-002', 'alpha-009'],
+        })
+        self.assertEqual(snapshot.task('beta', 'beta-001'),
+                         {'id': 'beta-001', 'parent': None, 'status': None, 'depends_on': []})
+        self.assertEqual(snapshot.tasks_stamp('beta'), 33)
+        self.assertEqual(snapshot.tasks_stamp('gamma'), hyper_snapshot.stamp([]))
+
+    def test_lookups(self):
+        """Test binary searches for projects and tasks."""
+        snapshot = self.snapshot
+        self.assertTrue(snapshot.has_project('proj-beta'))
+        self.assertFalse(snapshot.has_project('proj-gamma'))
+        self.assertFalse(snapshot.has_project('x' * 5000))
+        self.assertGreaterEqual(snapshot.task_number('alpha', 'alpha-003'), 0)
+        self.assertEqual(snapshot.task_number('beta', 'alpha-003'), -1)
+        self.assertEqual(snapshot.task_number('alpha', 'bad\0id'), -1)
+        self.assertEqual(len(snapshot.task_numbers('alpha')), 3)
+        self.assertEqual(len(snapshot.task_numbers('alph')), 0)
+
+    def test_references_ok(self):
+        """Test that only references the full check would accept pass."""
+        ok = self.snapshot.references_ok
+        self.assertTrue(ok('alpha', 'alpha-004', 'proj-alpha', ['alpha-003']))
+        self.assertTrue(ok('gamma', 'gamma-001', 'proj-beta', ['anything']))
+        self.assertFalse(ok('alpha', 'alpha-004', 'proj-gamma', []))
+        self.assertFalse(ok('alpha', 'alpha-004', 'proj-alpha', ['alpha-404']))
+        self.assertFalse(ok('alpha', 'alpha-004', 'proj-alpha', ['alpha-004']))
+        self.assertFalse(ok('alpha', 'alpha-001', 'proj-alpha', ['alpha-003']))
+        # alpha-009 has no file yet, but alpha-003 already depends on it
+        self.assertFalse(ok('alpha', 'alpha-009', 'proj-alpha', ['alpha-003']))
+        self.assertFalse(ok('alpha', 'alpha-004', 'proj-alpha', [['alpha-001']]))
+
+    def test_unrepresentable_ids(self):
+        """Test that ids a snapshot cannot hold leave the workspace to the index."""
+        self.assertIsNone(hyper_snapshot.build_snapshot([(7, 'todo')], [], 0, {}))
+        self.assertIsNone(hyper_snapshot.build_snapshot([], [('a', 'a\0b', None, None, [])], 0, {}))
+        self.assertIsNone(hyper_snapshot.build_snapshot([], [('a', 'a-1', None, None, [3])], 0, {}))
+        self.assertIsNone(hyper_snapshot.build_snapshot([('x' * 2000, None)], [], 0, {}))
+
+    def test_replaced(self):
+        """Test that publishing a new snapshot is noticed by open readers."""
+        self.assertFalse(self.snapshot.replaced())
+        self.assertEqual(hyper_snapshot.read_generation(self.path), 4)
+        hyper_snapshot.write_snapshot(self.path, hyper_snapshot.build_snapshot([], [], 0, {}, generation=5))
+        self.assertTrue(self.snapshot.replaced())
+        # The old mapping stays readable until closed
+        self.assertEqual(self.snapshot.project_ids(), ['proj-alpha', 'proj-beta'])
+        self.assertEqual(os.listdir(self.temp_dir), ['relationships.snap'])
+
+    def test_publish_keeps_newest(self):
+        """Test that a slower writer cannot replace a newer snapshot with its older one."""
+        older = hyper_snapshot.build_snapshot([], [], 0, {}, generation=3)
+        self.assertFalse(hyper_snapshot.publish(self.path, older, 3))
+        self.assertEqual(hyper_snapshot.read_generation(self.path), 4)
+        newer = hyper_snapshot.build_snapshot([], [], 0, {}, generation=6)
+        self.assertTrue(hyper_snapshot.publish(self.path, newer, 6))
+        self.assertEqual(hyper_snapshot.read_generation(self.path), 6)
+        self.assertTrue(hyper_snapshot.publish(self.path, None, 7))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_invalid_file(self):
+        """Test that a truncated or foreign file is rejected."""
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        self.assertRaises(ValueError, hyper_snapshot.Snapshot, self.path)
+        with open(self.path, 'wb') as f:
+            f.write(b'SQLite format 3\0' + bytes(100))
+        self.assertRaises(ValueError, hyper_snapshot.Snapshot, self.path)
+
+
+class TestSnapshotWorkspace(unittest.TestCase):
+    """Test publishing from the index and validation against the snapshot."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.project_dir = os.path.join(self.temp_dir, 'projects', 'alpha')
+        write_file(os.path.join(self.project_dir, '_project.mdx'),
+                   '---\nid: proj-alpha\ntitle: Alpha\ntype: project\nstatus: todo\npriority: high\n---\n')
+        write_file(self.task_path(1), task_content('alpha-001'))
+        write_file(self.task_path(2), task_content('alpha-002', ['alpha-001']))
+        validator.WORKSPACE_ROOT = self.temp_dir
+        self.snapshot_path = hyper_snapshot.snapshot_path(self.temp_dir)
+
+    def tearDown(self):
+        for snapshot in validator._workspace_snapshots.values():
+            snapshot.close()
+        validator._workspace_snapshots.clear()
+        for index in validator._workspace_indexes.values():
+            if index is not None:
+                index.close()
+        validator._workspace_indexes.clear()
+        validator.WORKSPACE_ROOT = ''
+        shutil.rmtree(self.temp_dir)
+
+    def task_path(self, number):
+        return os.path.join(self.project_dir, 'tasks', f'task-{number:03d}.mdx')
+
+    def refresh(self):
+        index = hyper_index.open_index(self.temp_dir, validator.parse_frontmatter_block)
+        index.refresh()
+        return index
+
+    def test_refresh_publishes(self):
+        """Test that a refresh writes a current snapshot, and a new one only on change."""
+        index = self.refresh()
+        self.addCleanup(index.close)
+        snapshot = hyper_snapshot.open_snapshot(self.temp_dir)
+        self.addCleanup(snapshot.close)
+        self.assertEqual(snapshot.generation, 1)
+        self.assertTrue(snapshot.is_current(self.temp_dir, 'alpha'))
+        self.assertEqual(snapshot.task_dependencies('alpha'), index.task_dependencies('alpha'))
+
+        index.refresh()
+        self.assertFalse(snapshot.replaced())
+
+        write_file(self.task_path(3), task_content('alpha-003'))
+        self.assertFalse(snapshot.is_current(self.temp_dir, 'alpha'))
+        self.assertTrue(snapshot.is_current(self.temp_dir, 'beta'))
+        index.update_paths([self.task_path(3)])
+        self.assertTrue(snapshot.replaced())
+        self.assertEqual(hyper_snapshot.read_generation(self.snapshot_path), 2)
+
+    def test_stale_snapshot_not_used(self):
+        """Test that a task written after the snapshot sends lookups to the index."""
+        self.refresh().close()
+        self.assertIsNotNone(validator.current_snapshot('alpha'))
+        write_file(self.task_path(3), task_content('alpha-003'))
+        self.assertIsNone(validator.current_snapshot('alpha'))
+        errors = validator.validate_relationships(
+            {'id': 'alpha-004', 'parent': 'proj-alpha', 'depends_on': ['alpha-003']}, 'task', self.task_path(4))
+        self.assertEqual(errors, [])
+        self.assertIsNotNone(validator.current_snapshot('alpha'))
+
+    def test_matches_index(self):
+        """Test that the snapshot gives the errors and graph the index gives."""
+        self.refresh().close()
+        cases = [
+            {'id': 'alpha-003', 'parent': 'proj-alpha', 'depends_on': ['alpha-002']},
+            {'id': 'alpha-003', 'parent': 'proj-nope', 'depends_on': 'alpha-404'},
+            {'id': 'alpha-001', 'parent': 'proj-alpha', 'depends_on': ['alpha-002', 'alpha-001']},
+        ]
+        with_snapshot = [validator.validate_relationships(dict(case), 'task', self.task_path(3))
+                         for case in cases]
+        graph = validator.relationship_graph(self.task_path(3))
+        self.assertIsNotNone(validator.current_snapshot('alpha'))
+
+        os.environ['HYPER_SNAPSHOT'] = 'off'
+        try:
+            self.assertIsNone(validator.current_snapshot('alpha'))
+            without = [validator.validate_relationships(dict(case), 'task', self.task_path(3))
+                       for case in cases]
+            index_graph = validator.relationship_graph(self.task_path(3))
+        finally:
+            del os.environ['HYPER_SNAPSHOT']
+        self.assertEqual(with_snapshot, without)
+        self.assertEqual(with_snapshot[0], [])
+        self.assertEqual({e['code'] for e in without[2]}, {'SELF_DEPENDENCY', 'CIRCULAR_DEPENDENCY'})
+        self.assertEqual(graph['project_ids'], index_graph['project_ids'])
+        self.assertEqual(graph['tasks'], index_graph['tasks'])
+
+    def test_disabled(self):
+        """Test that HYPER_SNAPSHOT=off writes no snapshot."""
+        os.environ['HYPER_SNAPSHOT'] = 'off'
+        try:
+            self.refresh().close()
+        finally:
+            del os.environ['HYPER_SNAPSHOT']
+        self.assertFalse(os.path.exists(self.snapshot_path))
+        self.assertIsNone(hyper_snapshot.open_snapshot(self.temp_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Unit tests for lazy initialization of hyper_validator.core
+Tests that importing the validator defers path resolution and PyYAML, and
+that startup stays within the budget in benchmarks/bench_startup.py.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path for imports
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'benchmarks'))
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+from importlib.util import spec_from_loader, module_from_spec
+from importlib.machinery import SourceFileLoader
+
+import bench_startup
+
+
+def load_validator():
+    """A fresh copy of hyper_validator.core, untouched by other tests' state."""
+    loader = SourceFileLoader('fresh_validator_core', os.path.join(SCRIPTS_DIR, 'hyper_validator', 'core.py'))
+    module = module_from_spec(spec_from_loader('fresh_validator_core', loader))
+    loader.exec_module(module)
+    return module
+
+
+class TestLazyInitialization(unittest.TestCase):
+    """Test that expensive module state is resolved on first use."""
+
+    def test_import_defers_paths_and_yaml(self):
+        """Test that a fresh import loads neither PyYAML nor the path resolver."""
+        code = (
+            bench_startup.IMPORT_SNIPPET.format(scripts=SCRIPTS_DIR)
+            + '; print(sorted(m for m in ("yaml", "hyper_paths", "hyper_index", "sqlite3") if m in sys.modules))'
+            + '; print("WORKSPACE_ROOT" in vars(module), "PERSONAL_DRIVE" in vars(module))'
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        lines = result.stdout.splitlines()
+        self.assertEqual(lines[1], '[]')
+        self.assertEqual(lines[2], 'False False')
+
+    def test_attributes_resolved_on_access(self):
+        """Test that module attributes resolve and then stay memoized."""
+        validator = load_validator()
+        self.assertNotIn('WORKSPACE_ROOT', vars(validator))
+        root = validator.WORKSPACE_ROOT
+        self.assertIsInstance(root, str)
+        self.assertEqual(vars(validator)['WORKSPACE_ROOT'], root)
+        self.assertIsInstance(validator.HAS_PYYAML, bool)
+
+    def test_assignment_overrides_resolution(self):
+        """Test that assigning WORKSPACE_ROOT wins over lazy resolution."""
+        validator = load_validator()
+        validator.WORKSPACE_ROOT = '/tmp/hyper-ws'
+        self.assertEqual(validator.get_workspace_root(), '/tmp/hyper-ws')
+        self.assertEqual(validator.infer_type_from_path('/tmp/hyper-ws/projects/a/_project.mdx'), 'project')
+
+    def test_unknown_attribute(self):
+        """Test that unknown attributes still raise AttributeError."""
+        validator = load_validator()
+        self.assertFalse(hasattr(validator, 'NOT_A_SETTING'))
+
+
+class TestStartupBudget(unittest.TestCase):
+    """Test that cold import and first validation stay within budget."""
+
+    def test_within_budget(self):
+        """Test the medians of a short benchmark run against the budgets."""
+        medians, heaviest = bench_startup.measure(runs=3)
+        over = bench_startup.check(medians)
+        self.assertEqual(over, [], f'Startup budget exceeded: {over}; heaviest imports: {heaviest}')
+
+    def test_heaviest_imports_parsing(self):
+        """Test that nested -X importtime entries are not double counted."""
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       100 |        100 |   _nested\n'
+            'import time:       200 |        300 | parent\n'
+            'import time:      1500 |       1500 | heavy\n'
+        )
+        self.assertEqual(bench_startup.heaviest_imports(stderr), [('heavy', 1.5), ('parent', 0.3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,18 +11,9 @@ import unittest
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from importlib.util import spec_from_loader, module_from_spec
-from importlib.machinery import SourceFileLoader
-
-# Load the validator module (has hyphen in name)
-validator_path = os.path.join(
-    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-    'validate-hyper-file.py'
-)
-loader = SourceFileLoader('validate_hyper_file', validator_path)
-spec = spec_from_loader('validate_hyper_file', loader)
-validator = module_from_spec(spec)
-loader.exec_module(validator)
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+from hyper_validator import core as validator
 
 
 class TestParseYAMLFrontmatter(unittest.TestCase):
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_daemon.py
+Tests the validator daemon protocol and the client's one-shot fallback.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import time
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+import hyper_daemon
+import hyper_lock
+
+
+VALID_TASK = '''---
+id: task-001
+title: Test Task
+type: task
+status: todo
+priority: high
+parent: proj-test
+---
+# Task
+'''
+
+INVALID_TASK = '''---
+id: task-001
+title: Test Task
+type: task
+---
+# Task
+'''
+
+
+class TestValidatorDaemon(unittest.TestCase):
+    """Test request handling through a running daemon."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.temp_dir, 'validator.sock')
+        # Forwarded caller environment: resolve caches under the test's cache dir
+        self.env = {'HYPER_CACHE_DIR': os.environ['HYPER_CACHE_DIR']}
+        self.server = hyper_daemon.ValidatorServer(
+            self.socket, hyper_daemon.ValidatorService(), idle_timeout=0
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        hyper_daemon.request({'op': 'shutdown'}, path=self.socket)
+        self.thread.join(timeout=5)
+        self.server.server_close()
+        self.server.service.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _pre(self, path, content):
+        return hyper_daemon.request({
+            'op': 'pre', 'path': path, 'content': content, 'cwd': self.temp_dir, 'env': self.env,
+        }, path=self.socket)
+
+    def test_ping(self):
+        """Test that a running daemon answers pings."""
+        response = hyper_daemon.request({'op': 'ping'}, path=self.socket)
+        self.assertIsNotNone(response)
+        self.assertEqual(response['pid'], os.getpid())
+
+    def test_valid_content_allowed(self):
+        """Test that valid content comes back with exit code 0."""
+        response = self._pre('/p/.hyper/projects/test/tasks/task-001.mdx', VALID_TASK)
+        self.assertEqual(response['exit_code'], 0)
+        self.assertTrue(response['response']['success'])
+        self.assertEqual(response['response']['schema'], 'task')
+
+    def test_invalid_content_blocked(self):
+        """Test that invalid content returns the same error document as one-shot mode."""
+        path = '/p/.hyper/projects/test/tasks/task-001.mdx'
+        response = self._pre(path, INVALID_TASK)
+        self.assertEqual(response['exit_code'], 2)
+
+        validator = hyper_daemon.load_validator()
+        expected, exit_code = validator.pre_validate_response(path, INVALID_TASK)
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(response['response'], expected)
+
+    def test_non_workspace_file_skipped(self):
+        """Test that files outside Hyper locations are skipped."""
+        response = self._pre('/tmp/other/file.mdx', INVALID_TASK)
+        self.assertEqual(response['exit_code'], 0)
+        self.assertTrue(response['response']['skipped'])
+
+    def test_edit_validated_against_file(self):
+        """Test that pre-edit applies the edit to the file on disk."""
+        path = os.path.join(self.temp_dir, '.hyper', 'projects', 'test', 'tasks', 'task-001.mdx')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(VALID_TASK)
+        response = hyper_daemon.request({
+            'op': 'pre-edit', 'path': path, 'cwd': self.temp_dir, 'env': self.env,
+            'edits': [{'old_string': 'status: todo', 'new_string': 'status: someday'}],
+        }, path=self.socket)
+        self.assertEqual(response['exit_code'], 2)
+        self.assertEqual(response['response']['error']['context']['errors'][0]['field'], 'status')
+
+    def test_pre_hook_decision(self):
+        """Test that pre-hook turns a raw hook payload into the decision document."""
+        hook_input = {'tool_name': 'Write', 'tool_input': {
+            'file_path': '/p/.hyper/projects/test/tasks/task-001.mdx', 'content': INVALID_TASK,
+        }}
+        response = hyper_daemon.request({
+            'op': 'pre-hook', 'input': hook_input, 'cwd': self.temp_dir, 'env': self.env,
+        }, path=self.socket)
+        self.assertEqual(response['exit_code'], 2)
+        self.assertEqual(response['response']['decision'], 'block')
+        self.assertTrue(response['response']['reason'].startswith("Missing required field: 'status'. Fix: "))
+
+    def test_other_settings_declined(self):
+        """Test that requests made with other switches or limits are left to the client."""
+        path = '/p/.hyper/projects/test/tasks/task-001.mdx'
+        message = {'op': 'pre', 'path': path, 'content': VALID_TASK, 'cwd': self.temp_dir, 'env': self.env}
+        own = hyper_daemon.settings()
+        self.assertIsNotNone(hyper_daemon.request({**message, 'settings': own}, path=self.socket))
+        for changed in ({'HYPER_INDEX': 'off'}, {'HYPER_FRONTMATTER_MAX_DEPTH': '3'}):
+            with self.subTest(changed=changed):
+                self.assertIsNone(hyper_daemon.request({**message, 'settings': {**own, **changed}},
+                                                       path=self.socket))
+
+    def test_client_sends_settings(self):
+        """Test that the caller's settings, and only those, go with each request."""
+        environ = {'HYPER_INDEX': 'off', 'HYPER_FRONTMATTER_MAX_BYTES': '10', 'HYPER_OTHER': '1', 'HOME': '/h'}
+        self.assertEqual(hyper_daemon.settings(environ),
+                         {'HYPER_INDEX': 'off', 'HYPER_FRONTMATTER_MAX_BYTES': '10'})
+        self.assertEqual(hyper_daemon._caller_context()['settings'], hyper_daemon.settings())
+
+
+@unittest.skipUnless(hasattr(os, 'getuid'), 'Unix sockets with owners')
+class TestSocketTrust(unittest.TestCase):
+    """Test that clients only talk to a daemon only their user can run."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def serve(self, path):
+        server = hyper_daemon.ValidatorServer(path, hyper_daemon.ValidatorService(), idle_timeout=0)
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+
+        def stop():
+            server.stop()
+            thread.join(timeout=5)
+            server.server_close()
+            server.service.close()
+        self.addCleanup(stop)
+        return server
+
+    def test_default_location_private(self):
+        """Test that the default socket sits in a per-user directory created 0700."""
+        saved = {k: os.environ.get(k) for k in ('HYPER_VALIDATOR_SOCKET', 'XDG_RUNTIME_DIR')}
+        os.environ.pop('HYPER_VALIDATOR_SOCKET', None)
+        os.environ['XDG_RUNTIME_DIR'] = self.temp_dir
+        try:
+            path = hyper_daemon.socket_path()
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+        self.assertEqual(path, os.path.join(self.temp_dir, f'hyper-validator-{os.getuid()}', 'validator.sock'))
+        hyper_daemon.prepare_socket_dir(path)
+        self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+
+        self.serve(path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        self.assertIsNotNone(hyper_daemon.request({'op': 'ping'}, path=path))
+
+    def test_shared_directory_rejected(self):
+        """Test that a socket in a directory others can write to is neither served nor trusted."""
+        shared = os.path.join(self.temp_dir, 'shared')
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        path = os.path.join(shared, 'validator.sock')
+        with self.assertRaises(PermissionError):
+            hyper_daemon.prepare_socket_dir(path)
+        self.assertEqual(hyper_daemon.serve(path), 1)
+
+        self.serve(path)
+        self.assertIsNone(hyper_daemon.request({'op': 'ping'}, path=path))
+
+    def test_non_socket_rejected(self):
+        """Test that a plain file at the socket path is not connected to."""
+        path = os.path.join(self.temp_dir, 'validator.sock')
+        with open(path, 'w'):
+            pass
+        self.assertIsNone(hyper_daemon.request({'op': 'ping'}, path=path))
+
+
+class TestAutostart(unittest.TestCase):
+    """Test that clients start the daemon at most once per backoff period."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.temp_dir, 'validator.sock')
+        self.saved_env = {k: os.environ.get(k) for k in ('HYPER_VALIDATOR_SOCKET', 'HYPER_VALIDATOR_DAEMON')}
+        os.environ['HYPER_VALIDATOR_SOCKET'] = self.socket
+        os.environ.pop('HYPER_VALIDATOR_DAEMON', None)
+        self.spawned = []
+        self.saved_spawn = hyper_daemon.spawn_background
+        hyper_daemon.spawn_background = self.spawned.append
+
+    def tearDown(self):
+        hyper_daemon.spawn_background = self.saved_spawn
+        for key, value in self.saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.temp_dir)
+
+    def test_failed_start_backs_off(self):
+        """Test that a daemon that never comes up is spawned again only after the backoff."""
+        for _ in range(3):
+            self.assertIsNone(hyper_daemon._request_or_autostart({'op': 'ping'}))
+        self.assertEqual(self.spawned, [self.socket])
+
+        stamp = self.socket + '.spawn'
+        past = time.time() - hyper_daemon.SPAWN_BACKOFF - 1
+        os.utime(stamp, (past, past))
+        hyper_daemon._request_or_autostart({'op': 'ping'})
+        self.assertEqual(len(self.spawned), 2)
+        # The second failure doubles the wait
+        os.utime(stamp, (past, past))
+        hyper_daemon._request_or_autostart({'op': 'ping'})
+        self.assertEqual(len(self.spawned), 2)
+
+    def test_starting_daemon_not_duplicated(self):
+        """Test that no daemon is spawned while another holds the server lock."""
+        with hyper_lock.FileLock(self.socket + '.lock'):
+            hyper_daemon._request_or_autostart({'op': 'ping'})
+            self.assertEqual(self.spawned, [])
+            self.assertEqual(hyper_daemon.serve(self.socket), 1)
+        hyper_daemon._request_or_autostart({'op': 'ping'})
+        self.assertEqual(self.spawned, [self.socket])
+
+
+class TestClientFallback(unittest.TestCase):
+    """Test the thin client when no daemon is running."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.saved_env = {k: os.environ.get(k) for k in ('HYPER_VALIDATOR_SOCKET', 'HYPER_VALIDATOR_DAEMON')}
+        os.environ['HYPER_VALIDATOR_SOCKET'] = os.path.join(self.temp_dir, 'missing.sock')
+        os.environ['HYPER_VALIDATOR_DAEMON'] = 'off'
+
+    def tearDown(self):
+        for key, value in self.saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.temp_dir)
+
+    def test_request_without_daemon_returns_none(self):
+        """Test that an absent daemon is reported as unavailable."""
+        self.assertIsNone(hyper_daemon.request({'op': 'ping'}))
+
+    def test_fallback_validates_in_process(self):
+        """Test that the client validates in-process when the daemon is down."""
+        response, exit_code = hyper_daemon.client_pre_validate(
+            '/p/.hyper/projects/test/tasks/task-001.mdx', INVALID_TASK
+        )
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(response['error']['code'], 'SCHEMA_VALIDATION_FAILED')
+
+    def test_pre_hook_allows_without_validating(self):
+        """Test that payloads with nothing to validate are allowed by the client."""
+        payloads = [
+            None,
+            {'tool_input': {'file_path': '/p/src/main.ts', 'content': 'code'}},
+            {'tool_input': {'file_path': '/p/.hyper/workspace.json', 'content': '{}'}},
+            {'tool_input': {'file_path': '/p/other/file.mdx', 'content': '# No frontmatter'}},
+            {'tool_input': {'file_path': '/p/.hyper/docs/guide.mdx'}},
+        ]
+        for hook_input in payloads:
+            with self.subTest(hook_input=hook_input):
+                self.assertEqual(hyper_daemon.client_pre_hook(hook_input), ({'decision': 'allow'}, 0))
+
+    def test_pre_hook_blocks_in_process(self):
+        """Test that the client decides hook payloads in-process when the daemon is down."""
+        decision, exit_code = hyper_daemon.client_pre_hook({'tool_input': {
+            'file_path': '/p/.hyper/projects/test/_project.mdx', 'content': '# No frontmatter',
+        }})
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(decision, {
+            'decision': 'block',
+            'reason': 'File is missing YAML frontmatter. Fix: Add frontmatter block starting with --- and ending with ---',
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
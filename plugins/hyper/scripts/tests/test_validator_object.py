@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_validator.Validator
+Tests per-instance roots, warm caches, refresh()/invalidate() and parity with
+the module-level function API.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import shutil
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path for imports
+sys.path.insert(0, SCRIPTS_DIR)
+
+from _isolation import setUpModule, tearDownModule  # noqa: F401
+
+from hyper_validator import Validator, core
+
+PROJECT = '---\nid: proj-alpha\ntitle: Alpha\ntype: project\nstatus: todo\npriority: low\n---\n'
+
+
+def task(task_id, depends_on=()):
+    deps = ''.join(f'  - {d}\n' for d in depends_on)
+    return (f'---\nid: {task_id}\ntitle: {task_id}\ntype: task\nstatus: todo\npriority: low\n'
+            f'parent: proj-alpha\n{"depends_on:" + chr(10) + deps if deps else ""}---\n')
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    # Make the change visible to the index even within one mtime tick
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestValidator(unittest.TestCase):
+    """Test a Validator over a scratch workspace."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.tasks_dir = os.path.join(self.root, 'projects', 'alpha', 'tasks')
+        write_file(os.path.join(self.root, 'projects', 'alpha', '_project.mdx'), PROJECT)
+        write_file(os.path.join(self.tasks_dir, 'task-001.mdx'), task('alpha-001'))
+        self.validator = Validator(workspace_root=self.root, personal_drive='')
+        self.addCleanup(self.validator.close)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def task_path(self, number):
+        return os.path.join(self.tasks_dir, f'task-{number:03d}.mdx')
+
+    def test_roots_are_per_instance(self):
+        """Test that the instance's roots drive type inference, not the module's."""
+        other = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other)
+        saved = vars(core).get('WORKSPACE_ROOT')
+        core.WORKSPACE_ROOT = other
+        try:
+            self.assertEqual(self.validator.infer_type(self.task_path(1)), 'task')
+            self.assertTrue(self.validator.is_workspace_file(self.task_path(1)))
+            self.assertEqual(self.validator.validate(self.task_path(1)), (True, None))
+        finally:
+            core.WORKSPACE_ROOT = saved
+
+    def test_unchanged_content_answered_from_memory(self):
+        """Test that a second validation of the same content skips validate_content()."""
+        calls = []
+        real_validate = core.validate_content
+
+        def counting_validate(*args, **kwargs):
+            calls.append(args[0])
+            return real_validate(*args, **kwargs)
+
+        core.validate_content = counting_validate
+        self.addCleanup(setattr, core, 'validate_content', real_validate)
+        path = self.task_path(1)
+        self.validator.validate(path)
+        self.validator.validate(path)
+        self.assertEqual(calls, [path])
+        self.validator.validate(path, task('alpha-001', ['alpha-404']))
+        self.assertEqual(len(calls), 2)
+
+    def test_invalidate_picks_up_new_task(self):
+        """Test that invalidating a written task refreshes the graph on next use."""
+        content = task('alpha-002', ['alpha-003'])
+        is_valid, errors = self.validator.validate(self.task_path(2), content)
+        self.assertFalse(is_valid)
+        self.assertEqual([e['code'] for e in errors], ['INVALID_DEPENDENCY_REFERENCE'])
+
+        write_file(self.task_path(3), task('alpha-003'))
+        self.validator.invalidate(self.task_path(3))
+        self.assertIn('alpha-003', self.validator.graph['tasks']['alpha'])
+        self.assertEqual(self.validator.validate(self.task_path(2), content), (True, None))
+
+    def test_refresh_detects_cycle_written_on_disk(self):
+        """Test that refresh() notices changed files and rebuilds the graph."""
+        self.assertEqual(self.validator.validate(self.task_path(1)), (True, None))
+        write_file(self.task_path(2), task('alpha-002', ['alpha-001']))
+        stats = self.validator.refresh()
+        self.assertEqual(stats['updated'], 1)
+        is_valid, errors = self.validator.validate(self.task_path(1), task('alpha-001', ['alpha-002']))
+        self.assertFalse(is_valid)
+        self.assertEqual([e['code'] for e in errors], ['CIRCULAR_DEPENDENCY'])
+        self.assertEqual(self.validator.refresh()['updated'], 0)
+
+    def test_pre_validate_matches_function_api(self):
+        """Test that the PreToolUse response is the one core builds."""
+        saved = vars(core).get('WORKSPACE_ROOT')
+        core.WORKSPACE_ROOT = self.root
+        self.addCleanup(setattr, core, 'WORKSPACE_ROOT', saved)
+        content = '---\nid: alpha-009\ntitle: Broken\ntype: task\nstatus: maybe\n---\n'
+        expected = core.pre_validate_response(self.task_path(9), content)
+        self.assertEqual(self.validator.pre_validate(self.task_path(9), content), expected)
+        self.assertEqual(expected[1], 2)
+
+    def test_validate_files(self):
+        """Test that every document is reported once."""
+        records = list(self.validator.validate_files())
+        self.assertEqual([(os.path.basename(r['path']), r['schema'], r['valid']) for r in records],
+                         [('_project.mdx', 'project', True), ('task-001.mdx', 'task', True)])
+
+    def test_without_on_disk_index(self):
+        """Test that HYPER_INDEX=off falls back to an in-memory index."""
+        os.environ['HYPER_INDEX'] = 'off'
+        try:
+            validator = Validator(workspace_root=self.root, personal_drive='')
+            self.assertEqual(validator.index.db_path, ':memory:')
+            self.assertEqual(validator.graph['project_ids'], ['proj-alpha'])
+            validator.close()
+        finally:
+            del os.environ['HYPER_INDEX']
+        self.assertFalse(os.path.exists(os.path.join(self.root, '.index')))
+
+    def test_watch(self):
+        """Test that a watching validator sees new tasks and drops stale task verdicts."""
+        self.assertTrue(self.validator.watch())
+        content = task('alpha-002', ['alpha-003'])
+        self.assertFalse(self.validator.validate(self.task_path(2), content)[0])
+        with open(self.task_path(3), 'w') as f:
+            f.write(task('alpha-003'))
+        self.assertEqual(self.validator.validate(self.task_path(2), content), (True, None))
+        self.assertIn('alpha-003', self.validator.graph['tasks']['alpha'])
+
+    def test_query(self):
+        """Test frontmatter queries through the instance's index."""
+        self.assertEqual([r['id'] for r in self.validator.query(type='task')], ['alpha-001'])
+
+
+class TestEntryPoints(unittest.TestCase):
+    """Test that the script and `python3 -m hyper_validator` run the same CLI."""
+
+    def test_module_and_script(self):
+        """Test both entry points on a file outside any workspace."""
+        for cmd in ([sys.executable, os.path.join(SCRIPTS_DIR, 'validate-hyper-file.py')],
+                    [sys.executable, '-m', 'hyper_validator']):
+            result = subprocess.run(cmd + ['--pre-validate', '--path', '/tmp/elsewhere/readme.mdx',
+                                           '--content', '# Hi'],
+                                    capture_output=True, text=True, cwd=SCRIPTS_DIR,
+                                    env=dict(os.environ, HYPER_WORKSPACE_ROOT=''))
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn('"skipped": true', result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
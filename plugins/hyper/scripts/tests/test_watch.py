@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_watch.py
+Tests both watcher backends, event coalescing, the workspace graph a
+WorkspaceWatcher publishes and the validator's use of it.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_index
+import hyper_watch
+from hyper_validator import core as validator
+
+
+def inotify_available() -> bool:
+    try:
+        hyper_watch.InotifyBackend([tempfile.gettempdir()]).close()
+    except OSError:
+        return False
+    return True
+
+
+HAS_INOTIFY = inotify_available()
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    # Make the change visible to stat() comparisons within one mtime tick
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def project_doc(slug):
+    return f'---\nid: proj-{slug}\ntitle: {slug}\ntype: project\nstatus: todo\npriority: low\n---\n'
+
+
+def task_doc(task_id, slug, depends_on=()):
+    deps = f'depends_on: [{", ".join(depends_on)}]\n' if depends_on else ''
+    return (f'---\nid: {task_id}\ntitle: {task_id}\ntype: task\nstatus: todo\npriority: low\n'
+            f'parent: proj-{slug}\n{deps}---\n')
+
+
+class BackendTests:
+    """Change detection, run against each backend through Watcher.sync()."""
+
+    BACKEND = None
+
+    def setUp(self):
+        self.root = os.path.realpath(tempfile.mkdtemp())
+        self.batches = []
+        self.watcher = hyper_watch.Watcher([self.root], self.batches.append, backend=self.BACKEND)
+        self.addCleanup(self.watcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def sync(self):
+        self.batches.clear()
+        self.watcher.sync()
+        return self.batches
+
+    def test_create_modify_remove(self):
+        """Test that each change to a document is reported."""
+        path = os.path.join(self.root, 'docs', 'guide.mdx')
+        write_file(path, 'one')
+        self.assertEqual(self.sync(), [{path}])
+        write_file(path, 'two')
+        self.assertEqual(self.sync(), [{path}])
+        os.remove(path)
+        self.assertEqual(self.sync(), [{path}])
+        self.assertEqual(self.sync(), [])
+
+    def test_ignores_dot_dirs_and_other_files(self):
+        """Test that index files, hidden files and non-documents are not reported."""
+        write_file(os.path.join(self.root, '.index', 'workspace.mdx'), 'x')
+        write_file(os.path.join(self.root, 'docs', '.draft.mdx'), 'x')
+        write_file(os.path.join(self.root, 'docs', 'notes.txt'), 'x')
+        self.assertEqual(self.sync(), [])
+
+    def test_new_directory_tree(self):
+        """Test that documents in newly created directories are reported."""
+        path = os.path.join(self.root, 'projects', 'alpha', 'tasks', 'task-001.mdx')
+        write_file(path, 'x')
+        self.assertIn(path, set().union(*self.sync()))
+        write_file(path, 'y')
+        self.assertEqual(self.sync(), [{path}])
+
+
+@unittest.skipUnless(HAS_INOTIFY, 'inotify not available')
+class TestInotifyBackend(BackendTests, unittest.TestCase):
+    """Test the inotify backend."""
+
+    BACKEND = 'inotify'
+
+    def test_directory_moved_away_rescans(self):
+        """Test that moving a directory out publishes a full rescan."""
+        write_file(os.path.join(self.root, 'projects', 'alpha', '_project.mdx'), 'x')
+        self.sync()
+        os.rename(os.path.join(self.root, 'projects', 'alpha'), os.path.join(self.root, 'projects', '.old'))
+        self.assertEqual(self.sync(), [None])
+        # Watches are rebuilt, so later writes are still seen
+        path = os.path.join(self.root, 'projects', 'beta', '_project.mdx')
+        write_file(path, 'x')
+        self.assertIn(path, set().union(*self.sync()))
+
+    def test_falls_back_to_polling(self):
+        """Test that a failing inotify backend is replaced by polling and a rescan."""
+        def fail():
+            raise OSError(28, 'No space left on device')
+        self.watcher.backend.read = fail
+        self.assertEqual(self.sync(), [None])
+        self.assertEqual(self.watcher.backend.name, 'poll')
+
+
+class TestPollingBackend(BackendTests, unittest.TestCase):
+    """Test the polling backend."""
+
+    BACKEND = 'poll'
+
+
+class TestCoalescing(unittest.TestCase):
+    """Test that the background thread publishes bursts as few batches."""
+
+    def setUp(self):
+        self.root = os.path.realpath(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_burst_is_coalesced(self):
+        """Test that a burst of writes arrives in fewer batches than files."""
+        seen = set()
+        batches = []
+        done = threading.Event()
+        paths = {os.path.join(self.root, 'docs', f'guide-{i:02d}.mdx') for i in range(30)}
+
+        def on_change(changed):
+            batches.append(changed)
+            seen.update(changed or ())
+            if paths <= seen:
+                done.set()
+
+        watcher = hyper_watch.Watcher([self.root], on_change, debounce=0.1, max_delay=2.0, interval=0.05)
+        self.addCleanup(watcher.stop)
+        watcher.start()
+        for path in sorted(paths):
+            write_file(path, 'x')
+        self.assertTrue(done.wait(5))
+        self.assertLess(len(batches), len(paths))
+        self.assertTrue(watcher.alive)
+        watcher.stop()
+        self.assertFalse(watcher.alive)
+
+
+class WorkspaceWatcherTests:
+    """The graph a WorkspaceWatcher publishes, with each backend."""
+
+    BACKEND = None
+
+    def setUp(self):
+        self.root = os.path.realpath(tempfile.mkdtemp())
+        self.drive = os.path.realpath(tempfile.mkdtemp())
+        write_file(os.path.join(self.root, 'projects', 'alpha', '_project.mdx'), project_doc('alpha'))
+        write_file(self.task_path('alpha', 1), task_doc('alpha-001', 'alpha'))
+        self.index = hyper_index.WorkspaceIndex(self.root, validator.parse_frontmatter_block, db_path=':memory:')
+        self.index.refresh()
+        self.changes = []
+        self.watcher = hyper_watch.WorkspaceWatcher(self.index, roots=[self.drive], backend=self.BACKEND,
+                                                    on_change=self.changes.append)
+        self.addCleanup(self.watcher.stop)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root)
+        shutil.rmtree(self.drive)
+
+    def task_path(self, slug, number):
+        return os.path.join(self.root, 'projects', slug, 'tasks', f'task-{number:03d}.mdx')
+
+    def test_new_and_changed_tasks(self):
+        """Test that task edits are published to the graph."""
+        before = self.watcher.graph
+        write_file(self.task_path('alpha', 2), task_doc('alpha-002', 'alpha', ['alpha-001']))
+        self.watcher.sync()
+        self.assertEqual(self.watcher.graph['tasks']['alpha'], {'alpha-001': [], 'alpha-002': ['alpha-001']})
+        self.assertEqual(before['tasks']['alpha'], {'alpha-001': []})
+
+        write_file(self.task_path('alpha', 1), task_doc('alpha-001', 'alpha', ['alpha-002']))
+        self.watcher.sync()
+        self.assertEqual(self.watcher.graph['tasks']['alpha']['alpha-001'], ['alpha-002'])
+        self.assertFalse(self.watcher.graph['orders']['alpha'].acyclic)
+
+    def test_new_project_and_removal(self):
+        """Test that projects come and go from the graph."""
+        write_file(os.path.join(self.root, 'projects', 'beta', '_project.mdx'), project_doc('beta'))
+        write_file(self.task_path('beta', 1), task_doc('beta-001', 'beta'))
+        self.watcher.sync()
+        self.assertEqual(self.watcher.graph['project_ids'], ['proj-alpha', 'proj-beta'])
+        self.assertEqual(self.watcher.graph['tasks']['beta'], {'beta-001': []})
+
+        os.remove(self.task_path('beta', 1))
+        self.watcher.sync()
+        self.assertNotIn('beta', self.watcher.graph['tasks'])
+        self.assertEqual(self.index.task_ids('beta'), [])
+
+    def test_personal_drive_changes_reach_listener(self):
+        """Test that changes outside the workspace root are passed on, not indexed."""
+        path = os.path.join(self.drive, 'notes', 'idea.mdx')
+        write_file(path, '---\ntitle: Idea\n---\n')
+        self.watcher.sync()
+        self.assertEqual(self.changes, [{path}])
+        self.assertEqual(len(self.index.query()), 2)
+
+
+@unittest.skipUnless(HAS_INOTIFY, 'inotify not available')
+class TestInotifyWorkspaceWatcher(WorkspaceWatcherTests, unittest.TestCase):
+    """Test the workspace graph with inotify."""
+
+    BACKEND = 'inotify'
+
+    def test_no_tree_walk(self):
+        """Test that applying events never walks the workspace."""
+        def walk(root):
+            raise AssertionError(f'walked {root}')
+        original = hyper_index.walk_documents
+        hyper_index.walk_documents = walk
+        self.addCleanup(setattr, hyper_index, 'walk_documents', original)
+        write_file(self.task_path('alpha', 2), task_doc('alpha-002', 'alpha'))
+        self.watcher.sync()
+        self.assertIn('alpha-002', self.watcher.graph['tasks']['alpha'])
+
+
+class TestPollingWorkspaceWatcher(WorkspaceWatcherTests, unittest.TestCase):
+    """Test the workspace graph with polling."""
+
+    BACKEND = 'poll'
+
+
+class TestUpdatePaths(unittest.TestCase):
+    """Test WorkspaceIndex.update_paths()."""
+
+    def setUp(self):
+        self.root = os.path.realpath(tempfile.mkdtemp())
+        self.index = hyper_index.WorkspaceIndex(self.root, validator.parse_frontmatter_block, db_path=':memory:')
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root)
+
+    def test_filters_and_reports_projects(self):
+        """Test that only indexable workspace paths are read and their projects reported."""
+        task = os.path.join(self.root, 'projects', 'alpha', 'tasks', 'task-001.mdx')
+        doc = os.path.join(self.root, 'docs', 'guide.mdx')
+        write_file(task, task_doc('alpha-001', 'alpha'))
+        write_file(doc, '---\ntitle: Guide\n---\n')
+        write_file(os.path.join(self.root, '.index', 'x.mdx'), 'x')
+        stats = self.index.update_paths([task, doc, os.path.join(self.root, '.index', 'x.mdx'), '/elsewhere/y.mdx'])
+        self.assertEqual(stats, {'updated': 2, 'removed': 0, 'projects': {'alpha'}})
+        self.assertEqual(self.index.update_paths([task, doc])['updated'], 0)
+
+        os.remove(task)
+        self.assertEqual(self.index.update_paths([task]), {'updated': 0, 'removed': 1, 'projects': {'alpha'}})
+        self.assertEqual(self.index.update_paths([task])['removed'], 0)
+
+    def test_usable_from_other_threads(self):
+        """Test that an index opened in one thread serves another (as in the daemon)."""
+        write_file(os.path.join(self.root, 'docs', 'guide.mdx'), '---\ntitle: Guide\n---\n')
+        self.index.refresh()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(self.index.refresh()))
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [{'files': 1, 'updated': 0, 'removed': 0}])
+
+
+class TestValidatorWatching(unittest.TestCase):
+    """Test relationship checks against a watched workspace."""
+
+    def setUp(self):
+        self.root = os.path.realpath(tempfile.mkdtemp())
+        write_file(os.path.join(self.root, 'projects', 'alpha', '_project.mdx'), project_doc('alpha'))
+        write_file(os.path.join(self.root, 'projects', 'alpha', 'tasks', 'task-001.mdx'),
+                   task_doc('alpha-001', 'alpha'))
+        self.saved = {name: vars(validator).get(name) for name in ('WORKSPACE_ROOT', 'PERSONAL_DRIVE')}
+        validator.WORKSPACE_ROOT, validator.PERSONAL_DRIVE = self.root, ''
+
+    def tearDown(self):
+        validator.unwatch_workspace(self.root)
+        index = validator._workspace_indexes.pop(self.root, None)
+        if index is not None:
+            index.close()
+        for name, value in self.saved.items():
+            if value is None:
+                vars(validator).pop(name, None)
+            else:
+                setattr(validator, name, value)
+        shutil.rmtree(self.root)
+
+    def codes(self, task_id, depends_on):
+        frontmatter = {'id': task_id, 'parent': 'proj-alpha', 'depends_on': depends_on}
+        path = os.path.join(self.root, 'projects', 'alpha', 'tasks', f'task-{task_id[-3:]}.mdx')
+        return [e['code'] for e in validator.validate_relationships(frontmatter, 'task', path)]
+
+    def test_sees_writes_immediately(self):
+        """Test that a task written after watching starts is visible to the next check."""
+        watcher = validator.watch_workspace(self.root)
+        self.assertIsNotNone(watcher)
+        self.assertIs(validator.watch_workspace(self.root), watcher)
+        self.assertEqual(self.codes('alpha-003', ['alpha-002']), ['INVALID_DEPENDENCY_REFERENCE'])
+
+        write_file(os.path.join(self.root, 'projects', 'alpha', 'tasks', 'task-002.mdx'),
+                   task_doc('alpha-002', 'alpha', ['alpha-003']))
+        self.assertEqual(self.codes('alpha-003', ['alpha-002']), ['CIRCULAR_DEPENDENCY'])
+        self.assertIs(validator.get_workspace_index(self.root), watcher.index)
+
+    def test_disabled(self):
+        """Test that HYPER_WATCH=off leaves the workspace unwatched."""
+        os.environ['HYPER_WATCH'] = 'off'
+        try:
+            self.assertIsNone(validator.watch_workspace(self.root))
+        finally:
+            del os.environ['HYPER_WATCH']
+        self.assertIsNone(validator.watched_graph(self.root))
+
+    def test_stopped_watcher_falls_back(self):
+        """Test that checks fall back to index refreshes once a watcher dies."""
+        watcher = validator.watch_workspace(self.root)
+        watcher.stop()
+        self.assertIsNone(validator.watched_graph(self.root))
+        self.assertNotIn(self.root, validator._workspace_watchers)
+        self.assertEqual(self.codes('alpha-003', ['alpha-001']), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Unit tests for benchmarks/generate_workspace.py and benchmarks/bench_validator.py
+Tests the dependency shapes, that generated workspaces validate cleanly, and
+baseline comparison.
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path for imports
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'benchmarks'))
+
+import bench_validator
+import generate_workspace
+
+SMALL = dict(generate_workspace.DEFAULTS, projects=2, tasks=10, docs=1, body_bytes=200)
+
+
+class TestDependencyShapes(unittest.TestCase):
+    """Test the dependency DAG shapes."""
+
+    def graph(self, shape, count=10, **kwargs):
+        return generate_workspace.dependency_graph(shape, count, random.Random(0), **kwargs)
+
+    def test_chain(self):
+        """Test that each task depends on the previous one."""
+        self.assertEqual(self.graph('chain', 4), [[], [0], [1], [2]])
+
+    def test_fan_in(self):
+        """Test that each block closes with a task depending on the rest of it."""
+        graph = self.graph('fan_in', 7, fan_in=3)
+        self.assertEqual(graph, [[], [], [0, 1], [], [], [3, 4, 2], [5]])
+
+    def test_random_is_acyclic(self):
+        """Test that random dependencies only point at earlier tasks."""
+        for i, deps in enumerate(self.graph('random', 200)):
+            self.assertTrue(all(dep < i for dep in deps))
+            self.assertLessEqual(len(deps), 3)
+
+    def test_unknown_shape(self):
+        """Test that an unknown shape is refused."""
+        with self.assertRaises(ValueError):
+            self.graph('star')
+
+
+class TestGenerateWorkspace(unittest.TestCase):
+    """Test generated workspaces."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_layout_and_stats(self):
+        """Test the files written and the returned counts."""
+        stats = generate_workspace.generate_workspace(self.temp_dir, **dict(SMALL, shape='chain'))
+        self.assertEqual((stats['files'], stats['tasks'], stats['edges']), (23, 20, 18))
+        with open(os.path.join(self.temp_dir, 'projects', 'bench001', 'tasks', 'task-002.mdx')) as f:
+            content = f.read()
+        self.assertIn('depends_on:\n  - bench001-001\n', content)
+        self.assertIn('parent: proj-bench001\n', content)
+
+    def test_deterministic(self):
+        """Test that the same seed writes the same documents."""
+        other = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other)
+        generate_workspace.generate_workspace(self.temp_dir, **SMALL)
+        generate_workspace.generate_workspace(other, **SMALL)
+        path = os.path.join('projects', 'bench000', 'tasks', 'task-007.mdx')
+        with open(os.path.join(self.temp_dir, path)) as a, open(os.path.join(other, path)) as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_measure_validates_cleanly(self):
+        """Test a small benchmark run (which fails on any invalid document)."""
+        report = bench_validator.measure(SMALL, runs=1, jobs=1)
+        self.assertEqual(set(report['results']), set(bench_validator.METRICS))
+        self.assertEqual(report['workspace']['files'], 23)
+
+
+class TestBaselineComparison(unittest.TestCase):
+    """Test regression detection against a stored baseline."""
+
+    BASELINE = {'config': SMALL, 'results': {'validate_content_us': 100.0, 'batch_files_per_s': 1000.0}}
+
+    def test_regressions_in_both_directions(self):
+        """Test that slower times and lower throughput are both flagged."""
+        report = {'results': {'validate_content_us': 160.0, 'batch_files_per_s': 500.0}}
+        self.assertEqual(bench_validator.compare(report, self.BASELINE, 0.5),
+                         [('validate_content_us', 160.0, 100.0, 0.6),
+                          ('batch_files_per_s', 500.0, 1000.0, 1.0)])
+
+    def test_within_tolerance(self):
+        """Test that changes inside the tolerance and improvements pass."""
+        report = {'results': {'validate_content_us': 140.0, 'batch_files_per_s': 5000.0}}
+        self.assertEqual(bench_validator.compare(report, self.BASELINE, 0.5), [])
+
+    def test_baseline_needs_same_config(self):
+        """Test that a baseline recorded with other parameters is ignored."""
+        path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, 'w') as f:
+            json.dump(self.BASELINE, f)
+        self.assertEqual(bench_validator.load_baseline(path, SMALL), self.BASELINE)
+        self.assertIsNone(bench_validator.load_baseline(path, dict(SMALL, tasks=11)))
+        self.assertIsNone(bench_validator.load_baseline(path + '.missing', SMALL))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hyper_index.py
+Tests incremental refresh of the workspace frontmatter index.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import shutil
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hyper_index
+import hyper_snapshot
+from hyper_validator import core as validator
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def task_content(task_id, depends_on=None, status='todo'):
+    deps = ''.join(f'- {d}\n' for d in depends_on or [])
+    depends_line = f'depends_on:\n{deps}' if deps else ''
+    return f'''---
+id: {task_id}
+title: {task_id}
+type: task
+status: {status}
+priority: high
+parent: proj-alpha
+{depends_line}---
+# {task_id}
+'''
+
+
+class TestWorkspaceIndex(unittest.TestCase):
+    """Test index build, incremental refresh and lookups."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.project_dir = os.path.join(self.temp_dir, 'projects', 'alpha')
+        write_file(os.path.join(self.project_dir, '_project.mdx'), '''---
+id: proj-alpha
+title: Alpha
+type: project
+status: todo
+priority: high
+---
+''')
+        write_file(os.path.join(self.project_dir, 'tasks', 'task-001.mdx'), task_content('alpha-001'))
+        write_file(os.path.join(self.project_dir, 'tasks', 'task-002.mdx'),
+                   task_content('alpha-002', ['alpha-001']))
+        write_file(os.path.join(self.temp_dir, 'docs', 'guide.mdx'), '---\nid: guide\ntitle: Guide\n---\n')
+
+        self.parsed = []
+
+        def counting_parse(block):
+            self.parsed.append(block)
+            return validator.parse_frontmatter_block(block)
+
+        self.index = hyper_index.WorkspaceIndex(self.temp_dir, counting_parse)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_initial_build(self):
+        """Test that the first refresh indexes every document."""
+        stats = self.index.refresh()
+        self.assertEqual(stats['files'], 4)
+        self.assertEqual(stats['updated'], 4)
+        self.assertEqual(self.index.project_ids(), ['proj-alpha'])
+        self.assertEqual(self.index.task_ids('alpha'), ['alpha-001', 'alpha-002'])
+        self.assertEqual(self.index.task_dependencies('alpha'),
+                         {'alpha-001': [], 'alpha-002': ['alpha-001']})
+
+    def test_unchanged_files_not_reparsed(self):
+        """Test that a refresh without changes parses nothing."""
+        self.index.refresh()
+        self.parsed.clear()
+        stats = self.index.refresh()
+        self.assertEqual(stats['updated'], 0)
+        self.assertEqual(self.parsed, [])
+
+    def test_only_changed_file_reparsed(self):
+        """Test that modifying one task re-parses just that file."""
+        self.index.refresh()
+        self.parsed.clear()
+        path = os.path.join(self.project_dir, 'tasks', 'task-001.mdx')
+        write_file(path, task_content('alpha-001', status='in-progress', depends_on=['alpha-003']))
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        stats = self.index.refresh()
+        self.assertEqual(stats['updated'], 1)
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual(self.index.task_dependencies('alpha')['alpha-001'], ['alpha-003'])
+
+    def test_deleted_file_removed(self):
+        """Test that deleted files drop out of the index."""
+        self.index.refresh()
+        os.remove(os.path.join(self.project_dir, 'tasks', 'task-002.mdx'))
+        stats = self.index.refresh()
+        self.assertEqual(stats['removed'], 1)
+        self.assertEqual(self.index.task_ids('alpha'), ['alpha-001'])
+
+    def test_index_dir_not_indexed(self):
+        """Test that the index's own directory is skipped by the walk."""
+        self.index.refresh()
+        paths = [row[0] for row in self.index.conn.execute('SELECT path FROM files')]
+        self.assertFalse(any(p.startswith('.') for p in paths))
+
+    def test_classify_path(self):
+        """Test location-based classification."""
+        self.assertEqual(hyper_index.classify_path('projects/a/_project.mdx'), ('project', 'a'))
+        self.assertEqual(hyper_index.classify_path('projects/a/tasks/task-001.mdx'), ('task', 'a'))
+        self.assertEqual(hyper_index.classify_path('projects/a/resources/x/notes.md'), ('resource', 'a'))
+        self.assertEqual(hyper_index.classify_path('docs/guide.mdx'), ('doc', ''))
+
+
+def tagged_task(task_id, status, priority, tags, updated):
+    tag_lines = ''.join(f'  - {t}\n' for t in tags)
+    return f'''---
+id: {task_id}
+title: Task {task_id}
+type: task
+status: {status}
+priority: {priority}
+parent: proj-alpha
+tags:
+{tag_lines}updated: {updated}
+---
+'''
+
+
+class TestWorkspaceQuery(unittest.TestCase):
+    """Test queries over the secondary indexes."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        tasks_dir = os.path.join(self.temp_dir, 'projects', 'alpha', 'tasks')
+        write_file(os.path.join(self.temp_dir, 'projects', 'alpha', '_project.mdx'),
+                   '---\nid: proj-alpha\ntitle: Alpha\ntype: project\nstatus: todo\npriority: high\n'
+                   'tags: [api]\n---\n')
+        write_file(os.path.join(tasks_dir, 'task-001.mdx'),
+                   tagged_task('alpha-001', 'blocked', 'urgent', ['api', 'auth'], '2026-03-01'))
+        write_file(os.path.join(tasks_dir, 'task-002.mdx'),
+                   tagged_task('alpha-002', 'blocked', 'low', ['api'], '2026-03-05'))
+        write_file(os.path.join(tasks_dir, 'task-003.mdx'),
+                   tagged_task('alpha-003', 'todo', 'urgent', ['ui'], '2026-02-10'))
+        self.index = hyper_index.WorkspaceIndex(self.temp_dir, validator.parse_frontmatter_block)
+        self.index.refresh()
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def ids(self, **filters):
+        return [doc['id'] for doc in self.index.query(**filters)]
+
+    def test_equality_filters(self):
+        """Test that filters combine with AND and lists match any value."""
+        self.assertEqual(self.ids(type='task', status='blocked', priority='urgent'), ['alpha-001'])
+        self.assertEqual(self.ids(kind='task', priority=['urgent', 'low']), ['alpha-001', 'alpha-002', 'alpha-003'])
+        self.assertEqual(self.ids(parent='proj-alpha', status='done'), [])
+
+    def test_tag_filter(self):
+        """Test that every requested tag must be present."""
+        self.assertEqual(self.ids(tags='api'), ['proj-alpha', 'alpha-001', 'alpha-002'])
+        self.assertEqual(self.ids(project='alpha', kind='task', tags=['api', 'auth']), ['alpha-001'])
+
+    def test_updated_range_and_ordering(self):
+        """Test date bounds and the updated/priority orderings."""
+        self.assertEqual(self.ids(updated_since='2026-03-01'), ['alpha-001', 'alpha-002'])
+        self.assertEqual(self.ids(updated_before='2026-03-01'), ['alpha-003'])
+        self.assertEqual(self.ids(kind='task', order_by='updated', limit=2), ['alpha-002', 'alpha-001'])
+        self.assertEqual(self.ids(kind='task', order_by='priority'), ['alpha-001', 'alpha-003', 'alpha-002'])
+
+    def test_result_fields(self):
+        """Test that results carry decoded list fields."""
+        [doc] = self.index.query(id='alpha-001')
+        self.assertEqual(doc['path'], 'projects/alpha/tasks/task-001.mdx')
+        self.assertEqual(doc['tags'], ['api', 'auth'])
+        self.assertEqual(doc['updated'], '2026-03-01')
+        self.assertEqual(doc['title'], 'Task alpha-001')
+
+    def test_tags_follow_changes(self):
+        """Test that re-indexed and deleted files update the tag index."""
+        path = os.path.join(self.temp_dir, 'projects', 'alpha', 'tasks', 'task-002.mdx')
+        write_file(path, tagged_task('alpha-002', 'blocked', 'low', ['ui'], '2026-03-05'))
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        os.remove(os.path.join(self.temp_dir, 'projects', 'alpha', 'tasks', 'task-003.mdx'))
+        self.index.refresh()
+        self.assertEqual(self.ids(tags='ui'), ['alpha-002'])
+        self.assertEqual(self.index.conn.execute('SELECT COUNT(*) FROM tags').fetchone()[0], 4)
+
+    def test_unknown_filter_rejected(self):
+        """Test that misspelled filters raise instead of matching everything."""
+        with self.assertRaises(ValueError):
+            self.index.query(state='blocked')
+
+    def test_query_uses_indexes(self):
+        """Test that SQLite plans filtered queries with the secondary indexes."""
+        plan = ' '.join(row[-1] for row in self.index.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT path FROM files WHERE status = 'blocked'"))
+        self.assertIn('files_status', plan)
+
+    def test_query_workspace_without_index(self):
+        """Test that the validator API scans when the index is disabled."""
+        os.environ['HYPER_INDEX'] = 'off'
+        try:
+            results = validator.query_workspace(root=self.temp_dir, status='blocked', tags='auth')
+        finally:
+            del os.environ['HYPER_INDEX']
+        self.assertEqual([doc['id'] for doc in results], ['alpha-001'])
+
+    def test_query_command(self):
+        """Test the query subcommand output."""
+        result = subprocess.run(
+            [sys.executable, hyper_index.__file__, 'query', '--root', self.temp_dir,
+             '--status', 'blocked', '--priority', 'urgent,high'],
+            capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        output = json.loads(result.stdout)
+        self.assertEqual(output['count'], 1)
+        self.assertEqual(output['results'][0]['id'], 'alpha-001')
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """Test several indexes (processes) sharing one index file."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.tasks_dir = os.path.join(self.temp_dir, 'projects', 'alpha', 'tasks')
+        write_file(os.path.join(self.temp_dir, 'projects', 'alpha', '_project.mdx'),
+                   '---\nid: proj-alpha\ntitle: Alpha\ntype: project\nstatus: todo\npriority: high\n---\n')
+        write_file(self.task_path(1), task_content('alpha-001'))
+        write_file(self.task_path(2), task_content('alpha-002', ['alpha-001']))
+        self.first = hyper_index.WorkspaceIndex(self.temp_dir, validator.parse_frontmatter_block)
+        self.second = hyper_index.WorkspaceIndex(self.temp_dir, validator.parse_frontmatter_block)
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        shutil.rmtree(self.temp_dir)
+
+    def task_path(self, number):
+        return os.path.join(self.tasks_dir, f'task-{number:03d}.mdx')
+
+    def rewrite(self, number, content):
+        write_file(self.task_path(number), content)
+        st = os.stat(self.task_path(number))
+        os.utime(self.task_path(number), ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_generation_counts_writes(self):
+        """Test that the generation moves on every write and only then."""
+        self.first.refresh()
+        self.assertEqual(self.first.generation, 1)
+        self.second.refresh()
+        self.assertEqual(self.second.generation, 1)
+        self.rewrite(1, task_content('alpha-001', status='done'))
+        self.second.refresh()
+        self.assertEqual(self.first.generation, 2)
+
+    def test_other_writer_invalidates_orders(self):
+        """Test that rows another process stored reach this index's dependency orders."""
+        self.first.refresh()
+        self.assertTrue(self.first.dependency_order('alpha').acyclic)
+        self.rewrite(1, task_content('alpha-001', ['alpha-002']))
+        self.second.refresh()
+        self.assertEqual(self.first.refresh()['updated'], 0)
+        self.assertFalse(self.first.dependency_order('alpha').acyclic)
+
+    def test_stale_rows_do_not_replace_newer(self):
+        """Test that a writer delayed behind another keeps the newer row."""
+        self.first.refresh()
+        path = self.task_path(1)
+        self.rewrite(1, task_content('alpha-001', ['alpha-002']))
+        stale = self.first._read_row('projects/alpha/tasks/task-001.mdx', path, os.stat(path))
+        self.rewrite(1, task_content('alpha-001', ['alpha-003']))
+        self.second.refresh()
+        self.first._apply([stale], [], {})
+        self.assertEqual(self.first.task_dependencies('alpha')['alpha-001'], ['alpha-003'])
+
+    def test_parallel_refresh_processes(self):
+        """Test that processes refreshing one new workspace at once leave a consistent index."""
+        for number in range(3, 41):
+            write_file(self.task_path(number), task_content(f'alpha-{number:03d}', [f'alpha-{number - 1:03d}']))
+        processes = [
+            subprocess.Popen([sys.executable, hyper_index.__file__, 'refresh', '--root', self.temp_dir],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            for _ in range(4)
+        ]
+        for process in processes:
+            stdout, stderr = process.communicate(timeout=60)
+            self.assertEqual(process.returncode, 0, stderr)
+            self.assertTrue(json.loads(stdout)['success'])
+
+        self.assertEqual(self.first.conn.execute('PRAGMA integrity_check').fetchone()[0], 'ok')
+        self.assertEqual(len(self.first.task_ids('alpha')), 40)
+        self.assertEqual(self.first.refresh()['updated'], 0)
+        snapshot = hyper_snapshot.open_snapshot(self.temp_dir)
+        self.addCleanup(snapshot.close)
+        self.assertTrue(snapshot.is_current(self.temp_dir, 'alpha'))
+        self.assertEqual(snapshot.generation, self.first.generation)
+
+
+ALLOCATE_LOOP = """
+import json, sys
+sys.path.insert(0, {scripts!r})
+from hyper_validator import core
+print(json.dumps([core.allocate_task_number('alpha', root={root!r})['number'] for _ in range(10)]))
+"""
+
+
+class TestTaskNumbers(unittest.TestCase):
+    """Test task file number reservations."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.tasks_dir = os.path.join(self.temp_dir, 'projects', 'alpha', 'tasks')
+        write_file(os.path.join(self.tasks_dir, 'task-001.mdx'), task_content('alpha-001'))
+        write_file(os.path.join(self.tasks_dir, 'task-007.mdx'), task_content('alpha-007'))
+        write_file(os.path.join(self.tasks_dir, 'verify-task-001.mdx'), task_content('verify-001'))
+        self.index = hyper_index.WorkspaceIndex(self.temp_dir, validator.parse_frontmatter_block)
+        self.index.refresh()
+
+    def tearDown(self):
+        self.index.close()
+        index = validator._workspace_indexes.pop(self.temp_dir, None)
+        if index is not None:
+            index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def create(self, name):
+        write_file(os.path.join(self.tasks_dir, name), task_content(name))
+
+    def test_sequential(self):
+        """Test that numbers continue after the indexed files, per prefix."""
+        reserve = self.index.reserve_task_number
+        self.assertEqual([reserve('alpha'), reserve('alpha')], [8, 9])
+        self.assertEqual(reserve('alpha', 'verify-task'), 2)
+        self.assertEqual(reserve('beta'), 1)
+        self.assertEqual(hyper_index.task_filename('task', 8), 'task-008.mdx')
+        self.assertEqual(hyper_index.task_filename('task', 1234), 'task-1234.mdx')
+
+    def test_unindexed_files_skipped(self):
+        """Test that files written without a reservation are not handed out again."""
+        self.assertEqual(self.index.reserve_task_number('alpha'), 8)
+        self.create('task-009.mdx')
+        self.create('task-010.mdx')
+        self.assertEqual(self.index.reserve_task_number('alpha'), 11)
+
+    def test_counter_seeded_from_current_files(self):
+        """Test that a project's first number follows files the index has not seen yet."""
+        self.create('task-020.mdx')
+        os.remove(os.path.join(self.tasks_dir, 'task-007.mdx'))
+        self.assertEqual(self.index.reserve_task_number('alpha'), 21)
+        self.assertEqual(self.index.reserve_task_number('alpha', 'verify-task'), 2)
+
+    def test_counters_kept_across_rebuild(self):
+        """Test that counters and pending reservations survive a schema version rebuild."""
+        reserve = self.index.reserve_task_number
+        self.assertEqual([reserve('alpha'), reserve('alpha')], [8, 9])
+        self.assertTrue(self.index.release_task_number('alpha', 8))
+        self.index.conn.execute('PRAGMA user_version=3')
+        self.index.close()
+        self.index = hyper_index.WorkspaceIndex(self.temp_dir, validator.parse_frontmatter_block)
+        # 9 is still reserved, 8 was given back
+        reserve = self.index.reserve_task_number
+        self.assertEqual([reserve('alpha'), reserve('alpha')], [8, 10])
+
+    def test_release_and_reclaim(self):
+        """Test that released and expired unwritten numbers are reused, lowest first."""
+        reserve = self.index.reserve_task_number
+        self.assertEqual([reserve('alpha'), reserve('alpha'), reserve('alpha')], [8, 9, 10])
+        self.assertTrue(self.index.release_task_number('alpha', 9))
+        self.assertFalse(self.index.release_task_number('alpha', 9))
+        self.assertEqual(reserve('alpha'), 9)
+
+        self.create('task-008.mdx')
+        self.assertFalse(self.index.release_task_number('alpha', 8))
+        # Once expired, unwritten numbers come back and written ones do not
+        self.assertEqual(reserve('alpha', ttl=0), 9)
+        self.create('task-009.mdx')
+        self.assertEqual(reserve('alpha', ttl=0), 10)
+        self.assertEqual(reserve('alpha'), 11)
+
+    def test_invalid_arguments(self):
+        """Test that slugs leaving the workspace and unknown prefixes are rejected."""
+        for slug, prefix in (('../etc', 'task'), ('', 'task'), ('.index', 'task'), ('alpha', 'story')):
+            with self.assertRaises(ValueError):
+                self.index.reserve_task_number(slug, prefix)
+
+    def test_parallel_processes(self):
+        """Test that workers allocating at once never get the same number."""
+        scripts = os.path.dirname(hyper_index.__file__)
+        code = ALLOCATE_LOOP.format(scripts=scripts, root=self.temp_dir)
+        processes = [subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE, text=True) for _ in range(4)]
+        numbers = []
+        for process in processes:
+            stdout, stderr = process.communicate(timeout=60)
+            self.assertEqual(process.returncode, 0, stderr)
+            numbers += json.loads(stdout)
+        self.assertEqual(sorted(numbers), list(range(8, 48)))
+
+    def test_without_index(self):
+        """Test the marker-file fallback when the index is disabled."""
+        os.environ['HYPER_INDEX'] = 'off'
+        try:
+            first = validator.allocate_task_number('alpha', root=self.temp_dir)
+            second = validator.allocate_task_number('alpha', root=self.temp_dir)
+            self.assertTrue(validator.release_task_number('alpha', second['number'], root=self.temp_dir))
+        finally:
+            del os.environ['HYPER_INDEX']
+        self.assertEqual((first['number'], second['number']), (8, 9))
+        self.assertEqual(first['path'], os.path.join(self.tasks_dir, 'task-008.mdx'))
+        self.assertEqual(sorted(os.listdir(self.tasks_dir))[0], '.task-008.mdx.reserved')
+        # Markers are invisible to the index
+        self.assertEqual(self.index.refresh()['updated'], 0)
+        self.create('task-008.mdx')
+        self.assertEqual(hyper_index.reserve_task_number_by_scan(self.temp_dir, 'alpha'), 9)
+        self.assertFalse(os.path.exists(os.path.join(self.tasks_dir, '.task-008.mdx.reserved')))
+        self.assertEqual(hyper_index.reserve_task_number_by_scan(self.temp_dir, 'alpha', ttl=0), 9)
+
+    def test_allocate_command(self):
+        """Test the allocate and release subcommands."""
+        def run(*args):
+            result = subprocess.run([sys.executable, hyper_index.__file__, *args, '--root', self.temp_dir],
+                                    capture_output=True, text=True)
+            return result.returncode, json.loads(result.stdout)
+
+        code, output = run('allocate', '--project', 'alpha', '--prefix', 'verify-task')
+        self.assertEqual(code, 0)
+        self.assertEqual((output['number'], output['filename']), (2, 'verify-task-002.mdx'))
+        code, output = run('release', '--project', 'alpha', '--prefix', 'verify-task', '--number', '2')
+        self.assertEqual((code, output['released']), (0, True))
+        code, output = run('allocate')
+        self.assertEqual((code, output['success']), (2, False))
+
+
+class TestValidatorUsesIndex(unittest.TestCase):
+    """Test that relationship lookups are served from the index."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        write_file(os.path.join(self.temp_dir, 'projects', 'beta', '_project.mdx'),
+                   '---\nid: proj-beta\ntitle: Beta\ntype: project\nstatus: todo\npriority: low\n---\n')
+        write_file(os.path.join(self.temp_dir, 'projects', 'beta', 'tasks', 'task-001.mdx'),
+                   task_content('beta-001'))
+        validator.WORKSPACE_ROOT = self.temp_dir
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        validator.WORKSPACE_ROOT = ''
+
+    def test_index_created_under_workspace_root(self):
+        """Test that lookups create the on-disk index."""
+        self.assertEqual(validator.list_project_ids(), ['proj-beta'])
+        db_path = os.path.join(self.temp_dir, hyper_index.INDEX_DIRNAME, hyper_index.INDEX_FILENAME)
+        self.assertTrue(os.path.exists(db_path))
+
+    def test_new_task_visible_after_write(self):
+        """Test that the index picks up files written after it was built."""
+        self.assertEqual(validator.list_task_ids_for_project('beta'), ['beta-001'])
+        write_file(os.path.join(self.temp_dir, 'projects', 'beta', 'tasks', 'task-002.mdx'),
+                   task_content('beta-002'))
+        self.assertEqual(validator.list_task_ids_for_project('beta'), ['beta-001', 'beta-002'])
+
+    def test_scan_fallback_when_disabled(self):
+        """Test that HYPER_INDEX=off falls back to directory scans."""
+        os.environ['HYPER_INDEX'] = 'off'
+        try:
+            self.assertEqual(validator.list_task_ids_for_project('beta'), ['beta-001'])
+        finally:
+            del os.environ['HYPER_INDEX']
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, hyper_index.INDEX_DIRNAME)))
+
+
+if __name__ == '__main__':
+    unittest.main()
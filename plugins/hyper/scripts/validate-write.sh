@@ -1,6 +1,7 @@
 #!/bin/bash
 # PreToolUse validation for workspace data root file writes
 # Called BEFORE Write|Edit operations - can BLOCK invalid writes
+# Edits are validated by applying old_string/new_string to the current file
 #
 # Exit codes:
 #   0 = Allow the write
@@ -16,6 +17,39 @@
 #   }
 # }
 
+# With Python available the whole hook runs in one process: hyper_daemon.py
+# pre-hook reads the payload from stdin, decides workspace/extension
+# questions itself and prints the final decision document (via the warm
+# validator daemon when it is up, in-process otherwise).
+# 8-second timeout (hook timeout is 10s, leave buffer for cleanup). Any exit
+# other than 0 (allow) or 2 (block) - a timeout (124) or a crash - blocks:
+# Claude Code treats other codes as non-blocking errors and would let an
+# unvalidated write through.
+if command -v python3 &>/dev/null; then
+  SCRIPT_DIR="${BASH_SOURCE[0]%/*}"
+  [[ "$SCRIPT_DIR" == "${BASH_SOURCE[0]}" ]] && SCRIPT_DIR=.
+  VALIDATOR_CLIENT="$SCRIPT_DIR/hyper_daemon.py"
+  if command -v timeout &>/dev/null; then
+    RESULT=$(timeout 8s python3 "$VALIDATOR_CLIENT" pre-hook)
+  else
+    RESULT=$(python3 "$VALIDATOR_CLIENT" pre-hook)
+  fi
+  EXIT_CODE=$?
+
+  if [[ $EXIT_CODE -eq 0 || $EXIT_CODE -eq 2 ]]; then
+    echo "$RESULT"
+    exit $EXIT_CODE
+  fi
+  if [[ $EXIT_CODE -eq 124 ]]; then
+    echo '{"decision": "block", "reason": "Validation timed out after 8s. Fix: Retry the write; if it keeps timing out, check the validator with: python3 hyper_daemon.py status"}'
+  else
+    echo "{\"decision\": \"block\", \"reason\": \"Validator failed (exit $EXIT_CODE). Fix: Retry the write; run hyper_daemon.py pre-hook by hand to see the error\"}"
+  fi
+  exit 2
+fi
+
+# Without Python: Hypercraft CLI validation, then basic shell checks
+
 # Read PreToolUse JSON from stdin
 INPUT=$(cat)
 
@@ -98,65 +132,13 @@ fi
 # Get content to validate
 CONTENT=$(echo "$INPUT" | jq -r '.tool_input.content // empty')
 
-# If no content (Edit operation), allow - PostToolUse will validate after
+# Edit/MultiEdit carry no content; without Python they are left to PostToolUse
 if [[ -z "$CONTENT" ]]; then
   echo '{"decision": "allow"}'
   exit 0
 fi
 
-# Get the script directory for locating Python validator
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-PYTHON_VALIDATOR="${SCRIPT_DIR}/validate-hyper-file.py"
-
-# Try Python validator first (has PyYAML for robust parsing)
-if [[ -x "$PYTHON_VALIDATOR" ]] || command -v python3 &>/dev/null; then
-  # Write content to temp file for Python to read
-  TEMP_FILE=$(mktemp)
-  echo "$CONTENT" > "$TEMP_FILE"
-
-  # Run Python validator in PreToolUse mode with timeout
-  # 8-second timeout (hook timeout is 10s, leave buffer for cleanup)
-  RESULT=$(timeout 8s python3 "$PYTHON_VALIDATOR" --pre-validate --path "$FILE_PATH" < "$TEMP_FILE" 2>&1)
-  EXIT_CODE=$?
-  rm -f "$TEMP_FILE"
-
-  if [[ $EXIT_CODE -eq 0 ]]; then
-    # Check if it was skipped (non-workspace file)
-    SKIPPED=$(echo "$RESULT" | jq -r '.skipped // false' 2>/dev/null)
-    if [[ "$SKIPPED" == "true" ]]; then
-      echo '{"decision": "allow"}'
-      exit 0
-    fi
-    echo '{"decision": "allow"}'
-    exit 0
-  else
-    # Extract structured error for agent feedback
-    ERROR_MSG=$(echo "$RESULT" | jq -r '.error.message // "Validation failed"' 2>/dev/null || echo "Validation failed")
-    SUGGESTION=$(echo "$RESULT" | jq -r '.error.suggestion // ""' 2>/dev/null || echo "")
-    FIRST_ERROR=$(echo "$RESULT" | jq -r '.error.context.errors[0].message // ""' 2>/dev/null || echo "")
-    FIRST_FIX=$(echo "$RESULT" | jq -r '.error.context.errors[0].suggestion // ""' 2>/dev/null || echo "")
-
-    # Build helpful error message
-    if [[ -n "$FIRST_ERROR" ]]; then
-      FULL_MSG="$FIRST_ERROR"
-      if [[ -n "$FIRST_FIX" ]]; then
-        FULL_MSG="$FULL_MSG. Fix: $FIRST_FIX"
-      fi
-    else
-      FULL_MSG="$ERROR_MSG"
-      if [[ -n "$SUGGESTION" ]]; then
-        FULL_MSG="$FULL_MSG. Fix: $SUGGESTION"
-      fi
-    fi
-
-    # Escape for JSON
-    FULL_MSG=$(echo "$FULL_MSG" | sed 's/"/\\"/g')
-    echo "{\"decision\": \"block\", \"reason\": \"$FULL_MSG\"}"
-    exit 2
-  fi
-fi
-
-# Fallback: Try Hypercraft CLI validation if Python not available
+# Try Hypercraft CLI validation
 HYPER_BIN="$(resolve_hyper_bin)"
 if [[ -x "$HYPER_BIN" ]]; then
   # Use CLI validation
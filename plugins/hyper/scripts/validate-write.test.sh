@@ -7,6 +7,15 @@
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 VALIDATE_SCRIPT="$SCRIPT_DIR/validate-write.sh"
 
+# Validate in-process: never start (or reach) the user's validator daemon,
+# and keep caches and telemetry out of the user's directories
+TEST_TMP=$(mktemp -d)
+export HYPER_VALIDATOR_DAEMON=off
+export HYPER_VALIDATOR_SOCKET="$TEST_TMP/validator.sock"
+export HYPER_CACHE_DIR="$TEST_TMP/cache"
+export HYPER_JOURNAL=off
+trap 'python3 "$SCRIPT_DIR/hyper_daemon.py" stop >/dev/null 2>&1; rm -rf "$TEST_TMP"' EXIT
+
 # Colors for output
 GREEN='\033[0;32m'
 RED='\033[0;31m'
@@ -98,6 +107,38 @@ assert_allow "Empty file_path allows" \
 assert_allow "Edit without content allows" \
   '{"tool_name": "Edit", "tool_input": {"file_path": "/project/.hyper/test.mdx"}}'
 
+# Tests 9-11: Edit payloads are applied to the file on disk and validated
+EDIT_DIR=$(mktemp -d)
+EDIT_FILE="$EDIT_DIR/.hyper/docs/guide.mdx"
+mkdir -p "$(dirname "$EDIT_FILE")"
+printf -- '---\nid: guide\ntitle: Guide\n---\nBody\n' > "$EDIT_FILE"
+
+assert_block "Edit removing a required field blocked" \
+  "{\"tool_name\": \"Edit\", \"tool_input\": {\"file_path\": \"$EDIT_FILE\", \"old_string\": \"title: Guide\\n\", \"new_string\": \"\"}}" \
+  "Missing required field"
+
+assert_allow "Valid Edit allowed" \
+  "{\"tool_name\": \"Edit\", \"tool_input\": {\"file_path\": \"$EDIT_FILE\", \"old_string\": \"title: Guide\", \"new_string\": \"title: User Guide\"}}"
+
+assert_allow "Edit that does not apply is left to the Edit tool" \
+  "{\"tool_name\": \"Edit\", \"tool_input\": {\"file_path\": \"$EDIT_FILE\", \"old_string\": \"missing\", \"new_string\": \"x\"}}"
+
+rm -rf "$EDIT_DIR"
+
+# Tests 12-13: a validator that times out or crashes must block, not fail open
+STUB_DIR="$TEST_TMP/stub"
+mkdir -p "$STUB_DIR"
+cp "$VALIDATE_SCRIPT" "$STUB_DIR/validate-write.sh"
+WRITE_INPUT='{"tool_name": "Write", "tool_input": {"file_path": "/project/.hyper/docs/guide.mdx", "content": "---\nid: guide\n---\n"}}'
+
+printf 'import sys\nsys.exit(124)\n' > "$STUB_DIR/hyper_daemon.py"
+VALIDATE_SCRIPT="$STUB_DIR/validate-write.sh" assert_block "Validator timeout blocks" \
+  "$WRITE_INPUT" "timed out"
+
+printf 'raise RuntimeError("boom")\n' > "$STUB_DIR/hyper_daemon.py"
+VALIDATE_SCRIPT="$STUB_DIR/validate-write.sh" assert_block "Validator crash blocks" \
+  "$WRITE_INPUT" "Validator failed (exit 1)"
+
 echo ""
 echo "=== Results ==="
 echo -e "Passed: ${GREEN}$pass_count${NC}"